@@ -0,0 +1,119 @@
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+"""
+Regression gate for benchmark results.
+
+Compares the JSON written by any benchmark's `--output` against a stored
+baseline and flags every metric that got worse by more than `--threshold`
+(relative). Metrics are found by name anywhere in the JSON:
+
+- higher is better: names containing `per_second`,
+- lower is better: names ending in `seconds`, `_us`, `_ms`, `_bytes`,
+  `bytes` or `_mb` (wall times, latencies, peak memory).
+
+Other values (row counts, accuracies, settings) are not compared. Values
+under `--min-value` in the baseline (tiny timings are mostly noise) are
+skipped. Exits with status 1 when a metric regressed or disappeared.
+
+    python benchmarks/pipeline_stages.py --data data/bench --output benchmarks/baselines/pipeline_stages.json
+    python benchmarks/pipeline_stages.py --data data/bench --output current.json
+    python benchmarks/compare.py benchmarks/baselines/pipeline_stages.json current.json --threshold 0.15
+"""
+
+
+_LOWER_IS_BETTER = ("seconds", "_us", "_ms", "_bytes", "bytes", "_mb")
+
+
+def direction(name: str) -> Optional[int]:
+    """+1 when a larger value is better, -1 when a smaller one is, None for values not compared."""
+    if "per_second" in name:
+        return 1
+    if name.endswith(_LOWER_IS_BETTER):
+        return -1
+    return None
+
+
+def flatten(results: Any, prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves keyed by their dotted path, e.g. 'stages.ingest.rows_per_second'."""
+    if isinstance(results, dict):
+        items = results.items()
+    elif isinstance(results, list):
+        items = enumerate(results)
+    else:
+        if isinstance(results, (int, float)) and not isinstance(results, bool):
+            return {prefix: float(results)}
+        return {}
+    flat: Dict[str, float] = {}
+    for key, value in items:
+        flat.update(flatten(value, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.1, min_value: float = 0.0) -> List[Dict[str, Any]]:
+    """
+    Compare every tracked metric of two benchmark results.
+
+    Args:
+        baseline (dict): Stored results.
+        current (dict): New results.
+        threshold (float): Relative change beyond which a worse value is a regression.
+        min_value (float): Metrics whose baseline is smaller are skipped.
+
+    Returns:
+        list: One entry per metric with both values, the relative change (positive is better)
+            and a status: 'ok', 'improved', 'regressed' or 'missing'.
+    """
+    old, new = flatten(baseline), flatten(current)
+    rows = []
+    for key, before in sorted(old.items()):
+        sign = direction(key.rsplit(".", 1)[-1])
+        if sign is None or abs(before) < min_value:
+            continue
+        after = new.get(key)
+        if after is None:
+            rows.append({"metric": key, "baseline": before, "current": None, "change": None, "status": "missing"})
+            continue
+        change = sign * (after - before) / abs(before) if before else 0.0
+        status = "regressed" if change < -threshold else "improved" if change > threshold else "ok"
+        rows.append({"metric": key, "baseline": before, "current": after, "change": change, "status": status})
+    return rows
+
+
+def report(rows: List[Dict[str, Any]]) -> str:
+    width = max((len(row["metric"]) for row in rows), default=6)
+    lines = [f"{'metric':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}  status"]
+    for row in rows:
+        current = "-" if row["current"] is None else f"{row['current']:12.4g}"
+        change = "-" if row["change"] is None else f"{row['change']:+8.1%}"
+        lines.append(f"{row['metric']:<{width}}  {row['baseline']:12.4g}  {current:>12}  {change:>8}  {row['status']}")
+    return "\n".join(lines)
+
+
+def main() -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Flag benchmark metrics that regressed against a baseline")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change counted as a regression")
+    parser.add_argument("--min-value", type=float, default=0.0, help="Skip metrics whose baseline is smaller")
+    parser.add_argument("--output", type=Path, help="Write the comparison as JSON")
+    args = parser.parse_args()
+
+    rows = compare(json.loads(args.baseline.read_text()), json.loads(args.current.read_text()), args.threshold, args.min_value)
+    failed = [row["metric"] for row in rows if row["status"] in ("regressed", "missing")]
+    results = {"threshold": args.threshold, "metrics": rows, "regressions": failed}
+    print(report(rows))
+    print(f"{len(failed)} regression(s) beyond {args.threshold:.0%}" if failed else f"No regression beyond {args.threshold:.0%}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if failed:
+        sys.exit(1)
+    return results
+
+
+if __name__ == "__main__":
+    main()
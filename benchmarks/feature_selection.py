@@ -0,0 +1,95 @@
+import json
+import time
+import argparse
+import tempfile
+import dataclasses
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict
+from timeseries_inventory.data_config.data_stages_manager import DataStagesManager
+from timeseries_inventory.preprocessing.feature_engineering import FeatureEngine
+from timeseries_inventory.preprocessing.feature_selection import FeatureSelector, mutual_info_scores
+from global_vs_local import synthetic_catalogue
+
+
+"""
+Sampled vs full-data mutual-information feature selection.
+
+Builds a wide lag-feature matrix (lags 1..`--lags`, several rolling and EWM
+windows) on the synthetic catalogue of `global_vs_local.py`, then compares
+
+- the selector (stratified sample of `--sample-rows`, `--workers` processes),
+- a rerun of the selector with another `top_k` (served from the score cache),
+- the baseline: mutual information of every feature on every row,
+
+on wall time, overlap of the selected `top_k` and rank correlation of the scores.
+
+    python benchmarks/feature_selection.py --series 2000 --days 180 --lags 56
+"""
+
+
+def main() -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Compare sampled and full-data mutual-information feature selection")
+    parser.add_argument("--series", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--lags", type=int, default=56)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--sample-rows", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    manager = DataStagesManager()
+    engineering = dataclasses.replace(
+        manager.feature_engineering_config(),
+        enabled=True, lags=list(range(1, args.lags + 1)), rolling_windows=[7, 14, 28, 56], ewm_spans=[7, 28],
+        series_columns=["sku"], generate_polynomials=False, interaction_terms=False,
+    )
+    selection = dataclasses.replace(
+        manager.feature_selection_config(),
+        top_k=args.top_k, sample_rows=args.sample_rows, workers=args.workers, random_state=args.seed,
+        directory=Path(tempfile.mkdtemp(prefix="feature_selection-")),
+    )
+
+    frame = synthetic_catalogue(args.series, args.days, args.seed)
+    chunks = [frame.iloc[start:start + args.chunksize] for start in range(0, len(frame), args.chunksize)]
+    features = list(FeatureEngine(engineering).transform(iter(chunks)))
+    selector = FeatureSelector(selection)
+    candidates = selector.candidates(features[0])
+    results: Dict[str, Any] = {"rows": sum(len(c) for c in features), "features": len(candidates), "top_k": args.top_k}
+
+    started = time.perf_counter()
+    kept = [chunk.columns for chunk in selector.transform(iter(features))][0]
+    results["sampled_seconds"] = time.perf_counter() - started
+    sampled = set(candidates) & set(kept)
+
+    started = time.perf_counter()
+    rerun = FeatureSelector(dataclasses.replace(selection, top_k=args.top_k // 2))
+    for _ in rerun.transform(iter(features)):
+        pass
+    results["rerun_other_top_k_seconds"] = time.perf_counter() - started
+
+    full = pd.concat(features, ignore_index=True)
+    started = time.perf_counter()
+    baseline = mutual_info_scores(full, candidates, selection.target_column, selection.n_neighbors, selection.random_state, args.workers)
+    results["full_seconds"] = time.perf_counter() - started
+    reference = set(selector.select(baseline))
+
+    sample_scores = json.loads(selector.cache_path.read_text())
+    sample_scores = next(iter(sample_scores.values()))
+    ranks = pd.DataFrame({"full": baseline, "sampled": sample_scores}).rank()
+    results["top_k_overlap"] = len(sampled & reference) / args.top_k
+    results["score_rank_correlation"] = float(np.corrcoef(ranks["full"], ranks["sampled"])[0, 1])
+    results["speedup"] = results["full_seconds"] / results["sampled_seconds"]
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import json
+import math
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+
+"""
+Synthetic multi-SKU, multi-location daily demand CSVs.
+
+Writes about `--rows` rows of `date,sku,location,value` (the columns of the
+`data_ingestion.input.schema` config) to `--files` CSV files under `--out`.
+Every file holds its own share of the SKU-location series over every day,
+in date order, so the files can be read in any order. Each series has a
+lognormal level, a weekly pattern and AR(1) noise, capped to the validation
+range (0-1000); `--missing-rate` of the values after the first day are left
+empty (forward filled by cleaning) and `--duplicate-rate` of the rows are
+written twice (dropped by cleaning).
+
+Rows are generated and written `--batch-rows` at a time, so memory does not
+grow with the data set; 100M rows take about 3 GB of disk.
+
+    python benchmarks/generate_data.py --rows 10000000 --skus 5000 --locations 20 --out data/bench
+"""
+
+
+def generate(
+    out: Path,
+    rows: int,
+    skus: int = 1000,
+    locations: int = 10,
+    files: int = 4,
+    missing_rate: float = 0.01,
+    duplicate_rate: float = 0.001,
+    batch_rows: int = 1_000_000,
+    seed: int = 42,
+    start: str = "2020-01-01"
+    ) -> Dict[str, Any]:
+    """
+    Write the data set and return its description.
+
+    Args:
+        out (Path): Output directory, created if needed.
+        rows (int): Rows to write, rounded up to whole days of every series.
+        skus (int): SKUs; every SKU is stocked at every location.
+        locations (int): Locations.
+        files (int): CSV files, each with a disjoint share of the series.
+        missing_rate (float): Share of empty values.
+        duplicate_rate (float): Share of rows written twice.
+        batch_rows (int): Rows generated per write.
+        seed (int): Random seed; the same arguments always give the same files.
+        start (str): First date.
+
+    Returns:
+        dict: Rows, series, days, files and bytes written.
+    """
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    n_series = skus * locations
+    days = max(1, math.ceil(rows / n_series))
+    sku_names = np.array([f"SKU-{i:06d}" for i in range(skus)], dtype=object)
+    location_names = np.array([f"LOC-{i:03d}" for i in range(locations)], dtype=object)
+    dates = pd.date_range(start, periods=days, freq="D").strftime("%Y-%m-%d").to_numpy(dtype=object)
+
+    written, size, paths = 0, 0, []
+    for file_index, series in enumerate(np.array_split(np.arange(n_series), max(1, min(files, n_series)))):
+        level = rng.lognormal(3, 1, len(series))
+        weekly = rng.uniform(0, 0.3, len(series))
+        phase = rng.integers(0, 7, len(series))
+        noise = np.zeros(len(series))
+        path = out / f"demand-{file_index:03d}.csv"
+        paths.append(path)
+        days_per_batch = max(1, batch_rows // len(series))
+        for first in range(0, days, days_per_batch):
+            day = np.arange(first, min(first + days_per_batch, days))
+            shocks = rng.normal(0, 0.1, (len(day), len(series)))
+            values = np.empty((len(day), len(series)))
+            for row, shock in enumerate(shocks):
+                noise = 0.6 * noise + shock
+                values[row] = level * (1 + weekly * np.sin(2 * np.pi * (day[row] + phase) / 7) + noise)
+            values = np.clip(values, 0, 1000).round(2)
+            missing = rng.random(values.shape) < missing_rate
+            missing[day == 0] = False
+            values[missing] = np.nan
+
+            frame = pd.DataFrame({
+                "date": np.repeat(dates[day], len(series)),
+                "sku": np.tile(sku_names[series // locations], len(day)),
+                "location": np.tile(location_names[series % locations], len(day)),
+                "value": values.ravel(),
+            })
+            if duplicate_rate > 0:
+                # A duplicate follows the original row, as a re-sent record would
+                repeat = 1 + (rng.random(len(frame)) < duplicate_rate)
+                frame = frame.loc[frame.index.repeat(repeat)]
+            _write_csv(frame, path, header=first == 0)
+            written += len(frame)
+        size += path.stat().st_size
+
+    return {
+        "path": str(out),
+        "rows": written,
+        "series": n_series,
+        "days": days,
+        "files": len(paths),
+        "bytes": size,
+    }
+
+
+def _write_csv(frame: pd.DataFrame, path: Path, header: bool) -> None:
+    if pa is None:
+        frame.to_csv(path, mode="w" if header else "a", header=header, index=False)
+        return
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    with open(path, "wb" if header else "ab") as handle:
+        pa_csv.write_csv(table, handle, write_options=pa_csv.WriteOptions(include_header=header, quoting_style="none"))
+
+
+def main() -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Write synthetic daily demand CSVs for the benchmarks")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--skus", type=int, default=1000)
+    parser.add_argument("--locations", type=int, default=10)
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--missing-rate", type=float, default=0.01)
+    parser.add_argument("--duplicate-rate", type=float, default=0.001)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path, default=Path("data/bench"))
+    parser.add_argument("--output", type=Path, help="Write the description as JSON")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = generate(
+        args.out, args.rows, args.skus, args.locations, args.files,
+        missing_rate=args.missing_rate, duplicate_rate=args.duplicate_rate, seed=args.seed,
+    )
+    results["seconds"] = time.perf_counter() - started
+    print(json.dumps(results, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import json
+import time
+import argparse
+import tempfile
+import dataclasses
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict
+from timeseries_inventory.data_config.data_stages_manager import DataStagesManager
+from timeseries_inventory.preprocessing.feature_engineering import FeatureEngine
+from timeseries_inventory.models.arima import ArimaTrainer, ARIMA
+from timeseries_inventory.models.global_model import GlobalModelTrainer
+
+
+"""
+Global vs local model benchmark on a synthetic catalogue.
+
+Generates `--series` daily series (level, trend, weekly seasonality, AR(1)
+noise; ten categories), holds out the last day of every series and compares
+
+- fit time (local ARIMA is fitted on `--local-sample` series and scaled up
+  to the full catalogue),
+- inference latency per series (one-step forecast),
+- MAE / sMAPE of the one-step forecast on the sampled series.
+
+    python benchmarks/global_vs_local.py --series 10000 --days 120
+"""
+
+
+def synthetic_catalogue(n_series: int, n_days: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_days)
+    level = rng.lognormal(3, 1, n_series)[:, None]
+    trend = rng.normal(0, 0.002, n_series)[:, None] * t
+    weekly = rng.uniform(0, 0.3, n_series)[:, None] * np.sin(2 * np.pi * (t + rng.integers(0, 7, n_series)[:, None]) / 7)
+    noise = np.zeros((n_series, n_days))
+    shocks = rng.normal(0, 0.1, (n_series, n_days))
+    for day in range(1, n_days):
+        noise[:, day] = 0.6 * noise[:, day - 1] + shocks[:, day]
+    values = level * (1 + trend + weekly + noise)
+    return pd.DataFrame({
+        "date": np.tile(pd.date_range("2024-01-01", periods=n_days, freq="D"), n_series),
+        "sku": np.repeat([f"SKU-{i:06d}" for i in range(n_series)], n_days),
+        "location": np.repeat(rng.choice([f"CAT-{i}" for i in range(10)], n_series), n_days),
+        "value": np.maximum(values, 0).ravel().astype("float32"),
+    })
+
+
+def errors(actual: np.ndarray, forecast: np.ndarray) -> Dict[str, float]:
+    denominator = np.abs(actual) + np.abs(forecast)
+    smape = np.where(denominator > 0, 2 * np.abs(actual - forecast) / np.where(denominator > 0, denominator, 1), 0)
+    return {"mae": float(np.mean(np.abs(actual - forecast))), "smape": float(np.mean(smape))}
+
+
+def main() -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Compare global and local (per-series ARIMA) forecasting")
+    parser.add_argument("--series", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--local-sample", type=int, default=200, help="Series fitted with ARIMA; fit time is scaled to the catalogue")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    manager = DataStagesManager()
+    engineering = dataclasses.replace(
+        manager.feature_engineering_config(),
+        enabled=True, lags=[1, 7, 14], rolling_windows=[7, 28], ewm_spans=[7], series_columns=["sku"],
+        generate_polynomials=False, interaction_terms=False,
+    )
+    workdir = Path(tempfile.mkdtemp(prefix="global_vs_local-"))
+    training = manager.model_training_config()
+    training = dataclasses.replace(
+        training,
+        global_model={**training.global_model, "categorical_columns": ["sku", "location"], "scale_column": "sku", "feature_columns": [], "path": str(workdir / "global.pkl")},
+        arima={**training.arima, "series_columns": ["sku"], "workers": args.workers, "warm_start": False, "params_path": str(workdir / "arima.json")},
+    )
+
+    frame = synthetic_catalogue(args.series, args.days, args.seed)
+    chunks = [frame.iloc[start:start + args.chunksize] for start in range(0, len(frame), args.chunksize)]
+    features = pd.concat(FeatureEngine(engineering).transform(iter(chunks)))
+    last_day = features["date"] == features["date"].max()
+    train, test = features[~last_day], features[last_day]
+    train_chunks = [train.iloc[start:start + args.chunksize] for start in range(0, len(train), args.chunksize)]
+    results: Dict[str, Any] = {"series": args.series, "days": args.days, "local_sample": args.local_sample}
+
+    started = time.perf_counter()
+    model = GlobalModelTrainer(training).fit(iter(train_chunks))
+    results["global_fit_seconds"] = time.perf_counter() - started
+    started = time.perf_counter()
+    global_forecast = model.predict(test)
+    results["global_inference_ms_per_series"] = 1000 * (time.perf_counter() - started) / len(test)
+
+    if ARIMA is None:
+        print("statsmodels is not installed, skipping the local ARIMA comparison")
+    else:
+        sample = np.random.default_rng(args.seed).choice(test["sku"].unique(), min(args.local_sample, args.series), replace=False)
+        local_train = train[train["sku"].isin(sample)]
+        started = time.perf_counter()
+        fits = ArimaTrainer(training).fit(iter([local_train]))
+        fit_seconds = time.perf_counter() - started
+        results["local_fit_seconds_sample"] = fit_seconds
+        results["local_fit_seconds_catalogue_estimate"] = fit_seconds * args.series / len(sample)
+
+        history = {sku: group["value"].to_numpy(dtype="float64") for sku, group in local_train.groupby("sku", sort=False)}
+        order = tuple(training.arima["order"])
+        local_forecast, started = [], time.perf_counter()
+        for sku in sample:
+            fit = fits[sku]
+            y = history[sku]
+            if fit.status == "ok":
+                local_forecast.append(ARIMA(y, order=order).filter(np.asarray(fit.params)).forecast(1)[0])
+            else:
+                local_forecast.append(y[-1])
+        results["local_inference_ms_per_series"] = 1000 * (time.perf_counter() - started) / len(sample)
+
+        in_sample = test["sku"].isin(sample).to_numpy()
+        by_sku = pd.Series(global_forecast[in_sample], index=test["sku"].to_numpy()[in_sample])
+        actual = test.set_index("sku").loc[sample, "value"].to_numpy(dtype="float64")
+        results["local_accuracy"] = errors(actual, np.asarray(local_forecast))
+        results["global_accuracy"] = errors(actual, by_sku.loc[sample].to_numpy())
+    results["global_accuracy_catalogue"] = errors(test["value"].to_numpy(dtype="float64"), global_forecast)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
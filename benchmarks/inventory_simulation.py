@@ -0,0 +1,87 @@
+import json
+import time
+import argparse
+import dataclasses
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List
+from timeseries_inventory.data_config.data_stages_manager import DataStagesManager
+from timeseries_inventory.services.inventory import compute_policies
+from timeseries_inventory.services.simulation import InventorySimulator
+
+
+"""
+Monte-Carlo inventory simulation throughput.
+
+Computes fill-rate policies for `--skus` synthetic SKU-locations (lognormal
+demand levels, 30% forecast error, lead times of 1-10 periods, weekly
+review) and simulates them for `--periods` periods, for every combination
+of `--scenarios` x `--skus`. Reports wall time, simulated
+SKU-scenario-periods per second and the mean simulated fill rate against
+the target. The smallest case is rerun with a single worker to check that
+the results do not depend on the number of workers.
+
+    python benchmarks/inventory_simulation.py --scenarios 100 1000 --skus 1000 10000 100000 --workers 4
+"""
+
+
+def policies(n_skus: int, periods: int, target: float, seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    level = rng.lognormal(2, 1, n_skus)
+    forecasts = level[:, None] * (1 + 0.2 * np.sin(2 * np.pi * np.arange(periods) / 7))
+    error_std = 0.3 * level
+    lead_time = rng.integers(1, 11, n_skus).astype("float64")
+    policy = compute_policies(forecasts, error_std, lead_time, service_level=target, service_type="fill_rate", review_period=7)
+    return {"forecasts": forecasts, "error_std": error_std, "policy": policy, "lead_time": lead_time, "review_period": 7}
+
+
+def main() -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Scale the inventory simulation over scenarios x SKUs")
+    parser.add_argument("--scenarios", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--skus", type=int, nargs="+", default=[1000, 10_000])
+    parser.add_argument("--periods", type=int, default=28)
+    parser.add_argument("--fill-rate", type=float, default=0.98)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    config = dataclasses.replace(DataStagesManager().simulation_config(), periods=args.periods, random_state=args.seed, workers=args.workers)
+    runs: List[Dict[str, Any]] = []
+    for n_skus in args.skus:
+        inputs = policies(n_skus, args.periods, args.fill_rate, args.seed)
+        for scenarios in args.scenarios:
+            simulator = InventorySimulator(dataclasses.replace(config, scenarios=scenarios))
+            started = time.perf_counter()
+            summary = simulator.run(**inputs)
+            seconds = time.perf_counter() - started
+            runs.append({
+                "skus": n_skus,
+                "scenarios": scenarios,
+                "seconds": seconds,
+                "cells_per_second": n_skus * scenarios * args.periods / seconds,
+                "mean_fill_rate": float(np.nanmean(summary.fill_rate)),
+                "mean_stockout_rate": float(summary.stockout_rate.mean()),
+            })
+            print(json.dumps(runs[-1]))
+
+    inputs = policies(min(args.skus), args.periods, args.fill_rate, args.seed)
+    smallest = dataclasses.replace(config, scenarios=min(args.scenarios))
+    parallel = InventorySimulator(smallest).run(**inputs)
+    single = InventorySimulator(dataclasses.replace(smallest, workers=1)).run(**inputs)
+    results = {
+        "periods": args.periods,
+        "workers": args.workers,
+        "target_fill_rate": args.fill_rate,
+        "runs": runs,
+        "identical_across_workers": bool(np.array_equal(parallel.fill_rate, single.fill_rate, equal_nan=True)
+                                         and np.array_equal(parallel.holding_cost, single.holding_cost)),
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
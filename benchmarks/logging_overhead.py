@@ -0,0 +1,97 @@
+import json
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Callable, Dict
+from timeseries_inventory.utils.custom_logging import configure_logging, log_stage
+
+
+"""
+Logging overhead per chunk.
+
+Replays the logging of a chunked load - a DEBUG record per chunk (disabled
+at INFO) and an INFO record per chunk - `--chunks` times, under every
+logging setup, and reports the time the loop spends in logging per chunk
+(against the same loop without logging) plus the time to drain the queue
+afterwards:
+
+- sync_text_fstring: the previous setup, f-string messages built even when DEBUG is off,
+- sync_text: lazy `%s` messages, records written in the calling thread,
+- queue_text / queue_json: records handed to the listener thread,
+- queue_json_sampled: only `--sample-rate` of the stage's INFO records kept.
+
+    python benchmarks/logging_overhead.py --chunks 20000
+"""
+
+
+def replay(logger: Any, chunks: int, frame: pd.DataFrame, lazy: bool) -> float:
+    started = time.perf_counter()
+    with log_stage("ingest"):
+        for index in range(chunks):
+            if lazy:
+                logger.debug("Yielding chunk of shape %s from %s", frame.shape, "part-0001.csv")
+                logger.info("Loaded chunk %d with %d rows", index, len(frame))
+            else:
+                logger.debug(f"Yielding chunk of shape {frame.shape} from part-0001.csv")
+                logger.info(f"Loaded chunk {index} with {len(frame)} rows")
+    return time.perf_counter() - started
+
+
+def main() -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Measure the logging overhead per chunk of every logging setup")
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    parser.add_argument("--console", action="store_true", help="Also write to the console")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="logging-")
+    frame = pd.DataFrame({"value": np.zeros(1000)})
+    setups: Dict[str, Callable[[], Any]] = {
+        "sync_text_fstring": lambda: configure_logging("sync", "text", console=args.console, base_dir=directory),
+        "sync_text": lambda: configure_logging("sync", "text", console=args.console, base_dir=directory),
+        "queue_text": lambda: configure_logging("queue", "text", console=args.console, base_dir=directory),
+        "queue_json": lambda: configure_logging("queue", "json", console=args.console, base_dir=directory),
+        "queue_json_sampled": lambda: configure_logging(
+            "queue", "json", sampling={"ingest": args.sample_rate}, console=args.console, base_dir=directory
+        ),
+    }
+
+    silent = configure_logging("sync", "text", log_level="CRITICAL", console=False, base_dir=directory)
+    baseline = replay(silent, args.chunks, frame, lazy=True)
+    results: Dict[str, Any] = {"chunks": args.chunks}
+    for name, setup in setups.items():
+        logger = setup()
+        seconds = replay(logger, args.chunks, frame, lazy=name != "sync_text_fstring")
+        started = time.perf_counter()
+        configure_logging("sync", "text", log_level="CRITICAL", console=False, base_dir=directory)  # drains the queue
+        results[name] = {
+            "overhead_us_per_chunk": (seconds - baseline) / args.chunks * 1e6,
+            "drain_seconds": time.perf_counter() - started,
+        }
+    results["disabled_debug_fstring_us"] = _disabled_debug(silent, frame, args.chunks, lazy=False)
+    results["disabled_debug_lazy_us"] = _disabled_debug(silent, frame, args.chunks, lazy=True)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return results
+
+
+def _disabled_debug(logger: Any, frame: pd.DataFrame, chunks: int, lazy: bool) -> float:
+    """Cost of one DEBUG call at INFO level, in microseconds."""
+    logger.setLevel("INFO")
+    started = time.perf_counter()
+    for _ in range(chunks):
+        if lazy:
+            logger.debug("Yielding chunk of shape %s from %s", frame.shape, "part-0001.csv")
+        else:
+            logger.debug(f"Yielding chunk of shape {frame.shape} from part-0001.csv")
+    return (time.perf_counter() - started) / chunks * 1e6
+
+
+if __name__ == "__main__":
+    main()
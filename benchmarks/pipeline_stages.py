@@ -0,0 +1,244 @@
+import gc
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import dataclasses
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+from timeseries_inventory.data_config.data_stages_manager import DataStagesManager
+from timeseries_inventory.ingestion.file_loader import FileLoader
+from timeseries_inventory.preprocessing.cleaning import DataCleaner
+from timeseries_inventory.preprocessing.validation import DataValidator
+from timeseries_inventory.preprocessing.feature_engineering import FeatureEngine
+from timeseries_inventory.models.global_model import GlobalModelTrainer
+from timeseries_inventory.services.bulk_prediction import BulkPredictor
+from timeseries_inventory.utils.monitoring import peak_rss_bytes
+from generate_data import generate
+from compare import compare, report
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pa_parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+
+"""
+Throughput and peak memory of every pipeline stage.
+
+Runs ingestion (`FileLoader`), cleaning, validation, feature engineering,
+training (global model) and bulk prediction on the CSVs of `--data`, or on
+`--rows` rows written by `generate_data.py` when no data is given. Each stage
+runs on its own: it streams the output of the previous stage back from a
+spill file (Parquet, or CSV without pyarrow) and spills its own output, so
+per stage
+
+- `seconds` is the time spent in the stage itself; reading its input and
+  writing the spill are timed apart and left out,
+- `rows_per_second` is input rows over `seconds`,
+- `peak_rss_bytes` is the peak RSS of the process while the stage ran (the
+  peak is reset between stages on Linux; elsewhere it is the peak so far,
+  see `peak_rss_reset`).
+
+Training keeps every row it learns from in memory, so it only reads the first
+`--train-rows` rows. Store a run as a baseline with `--output` and check later
+runs with `--baseline` (or `compare.py`), which exits with status 1 when a
+stage got slower or bigger than `--threshold`. Nothing is downloaded.
+
+    python benchmarks/generate_data.py --rows 10000000 --out data/bench
+    python benchmarks/pipeline_stages.py --data data/bench --output benchmarks/baselines/pipeline_stages.json
+    python benchmarks/pipeline_stages.py --data data/bench --baseline benchmarks/baselines/pipeline_stages.json
+"""
+
+
+STAGES = ["ingest", "clean", "validate", "engineer", "train", "predict"]
+
+
+class Timed:
+    """Iterates `chunks`, adding the time spent producing them to `seconds`."""
+
+    def __init__(self, chunks: Iterator[pd.DataFrame]):
+        self.chunks = iter(chunks)
+        self.seconds = 0.0
+        self.rows = 0
+
+
+    def __iter__(self) -> "Timed":
+        return self
+
+
+    def __next__(self) -> pd.DataFrame:
+        started = time.perf_counter()
+        try:
+            chunk = next(self.chunks)
+        finally:
+            self.seconds += time.perf_counter() - started
+        self.rows += len(chunk)
+        return chunk
+
+
+class Spill:
+    """Appends the chunks of a stage to one file, read back in order by the next stage."""
+
+    def __init__(self, path: Path):
+        self.path = path.with_suffix(".parquet" if pa is not None else ".csv")
+        self.seconds = 0.0
+        self._writer: Any = None
+
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        started = time.perf_counter()
+        if pa is None:
+            chunk.to_csv(self.path, mode="a" if self._writer else "w", header=self._writer is None, index=False)
+            self._writer = True
+        else:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._writer is None:
+                self._writer = pa_parquet.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        self.seconds += time.perf_counter() - started
+
+
+    def close(self) -> None:
+        if self._writer is not None and self._writer is not True:
+            self._writer.close()
+
+
+def reset_peak_rss() -> bool:
+    """Reset the peak RSS of the process (Linux, `/proc/self/clear_refs`); False when not supported."""
+    gc.collect()
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+def head_rows(chunks: Iterator[pd.DataFrame], rows: int) -> Iterator[pd.DataFrame]:
+    """The first `rows` rows of a chunk stream."""
+    for chunk in chunks:
+        if rows <= 0:
+            return
+        yield chunk.iloc[:rows]
+        rows -= len(chunk)
+
+
+def main() -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Measure throughput and peak memory of every pipeline stage")
+    parser.add_argument("--data", type=Path, help="Directory of demand CSVs; generated when omitted")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows generated when --data is omitted")
+    parser.add_argument("--skus", type=int, default=1000)
+    parser.add_argument("--locations", type=int, default=10)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--engine", choices=["pandas", "pyarrow"], default="pandas", help="CSV parser")
+    parser.add_argument("--train-rows", type=int, default=2_000_000, help="Rows the model is trained on")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, help="Stages reported (upstream stages still run)")
+    parser.add_argument("--workers", type=int, default=1, help="Bulk prediction processes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", type=Path, help="Spill files and model (a temporary directory by default, removed afterwards)")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON, e.g. to store a baseline")
+    parser.add_argument("--baseline", type=Path, help="Compare against these stored results; exit 1 on a regression")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative change counted as a regression")
+    args = parser.parse_args()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="pipeline_stages-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    results: Dict[str, Any] = {
+        "machine": {"platform": platform.platform(), "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__},
+        "chunksize": args.chunksize,
+        "engine": args.engine,
+    }
+    try:
+        if args.data is None:
+            args.data = workdir / "raw"
+            results["data"] = generate(args.data, args.rows, args.skus, args.locations, seed=args.seed)
+        else:
+            results["data"] = {"path": str(args.data), "files": len(list(args.data.glob("*.csv")))}
+        results["stages"] = run_stages(args, workdir)
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        rows = compare(json.loads(args.baseline.read_text()), results, args.threshold)
+        print(report(rows))
+        if any(row["status"] in ("regressed", "missing") for row in rows):
+            raise SystemExit(1)
+    return results
+
+
+def run_stages(args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    manager = DataStagesManager()
+    ingestion = dataclasses.replace(
+        manager.data_ingestion_config(),
+        path=args.data, file_pattern="*.csv", max_files=10_000, chunksize=args.chunksize, engine=args.engine, format="csv",
+        parallel_enabled=False, cache_enabled=False, checkpoint_enabled=False,
+    )
+    engineering = dataclasses.replace(manager.feature_engineering_config(), enabled=True)
+    training = manager.model_training_config()
+    model_path = workdir / "global_model.pkl"
+    training = dataclasses.replace(training, global_model={**training.global_model, "path": str(model_path)})
+    prediction = dataclasses.replace(manager.model_prediction_config(), chunk_size=args.chunksize, workers=args.workers)
+
+    def spilled(path: Path) -> Iterator[pd.DataFrame]:
+        config = dataclasses.replace(ingestion, path=path.parent, file_pattern=path.name, format=path.suffix[1:], engine="pandas")
+        return FileLoader(config).load()
+
+    streaming: Dict[str, Callable[[Iterator[pd.DataFrame]], Iterator[pd.DataFrame]]] = {
+        "ingest": lambda chunks: chunks,
+        "clean": DataCleaner(manager.data_cleaning_config()).clean,
+        "validate": DataValidator(manager.data_validation_config()).validate,
+        "engineer": FeatureEngine(engineering).transform,
+    }
+    last = max(STAGES.index(stage) for stage in args.stages)
+    results: Dict[str, Any] = {}
+    previous: Optional[Path] = None
+    for name in STAGES[:last + 1]:
+        peak_reset = reset_peak_rss()
+        if previous is None:
+            source = Timed(FileLoader(ingestion).load())
+            input_size = sum(file.stat().st_size for file in args.data.glob("*.csv"))
+        else:
+            source = Timed(spilled(previous))
+            input_size = previous.stat().st_size
+
+        started = time.perf_counter()
+        spill: Optional[Spill] = None
+        if name in streaming:
+            spill = Spill(workdir / name)
+            for chunk in streaming[name](source):
+                spill.write(chunk)
+            spill.close()
+            previous = spill.path
+        elif name == "train":
+            GlobalModelTrainer(training).fit(head_rows(source, args.train_rows))
+        else:
+            BulkPredictor(prediction).predict(source, model_path, workdir / "predictions.csv")
+        elapsed = time.perf_counter() - started
+
+        # Reading the input is the work of the ingest stage, the others are timed without it
+        seconds = elapsed - (spill.seconds if spill else 0.0) - (source.seconds if name != "ingest" else 0.0)
+        if name in args.stages:
+            results[name] = {
+                "rows": source.rows,
+                "input_size": input_size,
+                "seconds": seconds,
+                "rows_per_second": source.rows / seconds if seconds > 0 else None,
+                "peak_rss_bytes": peak_rss_bytes(),
+                "peak_rss_reset": peak_reset,
+            }
+            print(json.dumps({"stage": name, **results[name]}))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,54 @@
 # ingest_data.py placeholder 
+import sys
+import argparse
+import datetime
+import contextlib
+from pathlib import Path
+from typing import List, Optional
+from timeseries_inventory.pipeline.data_pipeline import DataStagesPipeline
+from timeseries_inventory.utils.profiling import PipelineProfiler
+
+
+"""
+Run the data stages of the pipeline: ingestion, cleaning, validation,
+transformation, feature engineering and selection.
+
+With `pipeline.cache.enabled` the stage outputs are cached, so a training
+run afterwards starts from the selected features.
+
+    python scripts/ingest_data.py [--config data_path.yaml] [--targets validate] [--dry-run]
+    python scripts/ingest_data.py --profile  # profiles under artifacts/profiles/ingest-<time>
+"""
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the data stages of the pipeline")
+    parser.add_argument("--config", type=Path, help="YAML config, defaults to data_path.yaml")
+    parser.add_argument("--targets", nargs="+", help="Stages to run with their upstream stages (default: feature selection)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which stages would run")
+    parser.add_argument("--profile", action="store_true", help="Write cProfile, tracemalloc and sampled stack profiles of every stage")
+    parser.add_argument("--profile-dir", type=Path, help="Profile directory (default: artifacts/profiles/ingest-<UTC time>)")
+    parser.add_argument("--profile-interval", type=float, default=0.005, help="Seconds between stack samples")
+    parser.add_argument("--profile-memory-frames", type=int, default=1, help="Frames per allocation traceback, 0 skips tracemalloc")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    pipeline = DataStagesPipeline(args.config)
+    targets = args.targets or [pipeline.manager.feature_selection_config().stage]
+    if args.dry_run:
+        pipeline.dry_run(targets)
+        return 0
+
+    profiler = None
+    if args.profile:
+        directory = args.profile_dir or Path("artifacts/profiles") / f"ingest-{datetime.datetime.now(datetime.timezone.utc):%Y%m%dT%H%M%SZ}"
+        profiler = PipelineProfiler(directory, args.profile_interval, args.profile_memory_frames)
+    with profiler or contextlib.nullcontext():
+        pipeline.run(targets)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
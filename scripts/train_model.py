@@ -1 +1,65 @@
 # train_model.py placeholder 
+import sys
+import argparse
+import datetime
+import contextlib
+from pathlib import Path
+from typing import List, Optional
+from timeseries_inventory.pipeline.data_pipeline import DataStagesPipeline
+from timeseries_inventory.utils.profiling import PipelineProfiler
+
+
+"""
+Train the configured models (`model_training.model.type`), running the
+data stages they need first (or reading them from the stage cache).
+
+    python scripts/train_model.py [--config data_path.yaml] [--models global arima] [--evaluate]
+    python scripts/train_model.py --models global --publish  # then served from serving.registry_directory
+    python scripts/train_model.py --profile  # profiles under artifacts/profiles/train-<time>
+"""
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Train the configured models")
+    parser.add_argument("--config", type=Path, help="YAML config, defaults to data_path.yaml")
+    parser.add_argument("--models", nargs="+", help="Model types to train, among the configured ones (default: all)")
+    parser.add_argument("--evaluate", action="store_true", help="Also cross-validate the global model")
+    parser.add_argument("--publish", action="store_true", help="Publish the trained global model as a serving version")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which stages would run")
+    parser.add_argument("--profile", action="store_true", help="Write cProfile, tracemalloc and sampled stack profiles of every stage")
+    parser.add_argument("--profile-dir", type=Path, help="Profile directory (default: artifacts/profiles/train-<UTC time>)")
+    parser.add_argument("--profile-interval", type=float, default=0.005, help="Seconds between stack samples")
+    parser.add_argument("--profile-memory-frames", type=int, default=1, help="Frames per allocation traceback, 0 skips tracemalloc")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    pipeline = DataStagesPipeline(args.config, publish=args.publish)
+    training = pipeline.manager.model_training_config()
+    models = args.models or list(training.type)
+    unknown = sorted(set(models) - set(training.type))
+    if unknown:
+        raise SystemExit(f"Model types {unknown} are not configured in model_training.model.type {list(training.type)}")
+    if args.publish and "global" not in models:
+        raise SystemExit("--publish needs the global model among the trained model types")
+    targets = [f"{training.stage}_{model_type}" for model_type in models]
+    if args.evaluate:
+        targets.append(pipeline.manager.model_evaluation_config().stage)
+    if args.dry_run:
+        pipeline.dry_run(targets)
+        return 0
+
+    profiler = None
+    if args.profile:
+        directory = args.profile_dir or Path("artifacts/profiles") / f"train-{datetime.datetime.now(datetime.timezone.utc):%Y%m%dT%H%M%SZ}"
+        profiler = PipelineProfiler(directory, args.profile_interval, args.profile_memory_frames)
+    with profiler or contextlib.nullcontext():
+        results = pipeline.run(targets)
+    for name, model in results.items():
+        pipeline.logger.info(f"{name}: {type(model).__name__}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
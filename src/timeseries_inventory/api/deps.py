@@ -1 +1,22 @@
 # deps.py placeholder 
+from fastapi import Request
+from timeseries_inventory.data_config.data_stages_config import ServingConfig
+from timeseries_inventory.services.inventory import InventoryService
+
+
+"""
+Request dependencies of the API routes.
+
+The service objects are created once per application by `main.create_app`
+and stored on `app.state`; routes receive them through these functions.
+"""
+
+__all__ = ["get_inventory_service", "get_serving_config"]
+
+
+def get_inventory_service(request: Request) -> InventoryService:
+    return request.app.state.inventory_service
+
+
+def get_serving_config(request: Request) -> ServingConfig:
+    return request.app.state.serving_config
@@ -1 +1,91 @@
 # inventory.py placeholder 
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from timeseries_inventory.data_config.data_stages_config import ServingConfig
+from timeseries_inventory.services.inventory import ForecastResult, InventoryService
+from timeseries_inventory.api.deps import get_inventory_service, get_serving_config
+
+
+"""
+Forecast endpoints.
+
+    GET  /inventory/forecast/{series_id}?horizon=7&version=...
+    POST /inventory/forecast/batch   {"series_ids": [...], "horizon": 7}
+    GET  /inventory/models
+
+Series ids are the labels the model was published with, the series column
+values joined by '|' (e.g. 'SKU-1|WH-2', URL-encoded in the path).
+"""
+
+__all__ = ["router"]
+
+
+router = APIRouter(prefix="/inventory", tags=["inventory"])
+
+
+class ForecastResponse(BaseModel):
+    series_id: str
+    version: str
+    horizon: int
+    forecast: List[float]
+
+
+class BatchForecastRequest(BaseModel):
+    series_ids: List[str] = Field(min_length=1)
+    horizon: Optional[int] = None
+    version: Optional[str] = None
+
+
+class BatchForecastResponse(BaseModel):
+    version: str
+    horizon: int
+    forecasts: Dict[str, List[float]]
+    missing: List[str]
+
+
+def _forecast(service: InventoryService, series_ids: List[str], horizon: Optional[int], version: Optional[str]) -> ForecastResult:
+    try:
+        return service.forecast(series_ids, horizon, version)
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+    except LookupError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+
+
+@router.get("/forecast/{series_id}", response_model=ForecastResponse)
+async def forecast(
+    series_id: str,
+    horizon: Optional[int] = Query(None, ge=1),
+    version: Optional[str] = None,
+    service: InventoryService = Depends(get_inventory_service)
+    ) -> ForecastResponse:
+    """Forecast one series; concurrent requests are micro-batched into one scoring call."""
+    try:
+        version, horizon, values = await service.forecast_one(series_id, horizon, version)
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown series '{series_id}'")
+    except LookupError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    return ForecastResponse(series_id=series_id, version=version, horizon=horizon, forecast=values)
+
+
+@router.post("/forecast/batch", response_model=BatchForecastResponse)
+def forecast_batch(
+    request: BatchForecastRequest,
+    service: InventoryService = Depends(get_inventory_service),
+    config: ServingConfig = Depends(get_serving_config)
+    ) -> BatchForecastResponse:
+    """Forecast many series in one vectorized call; unknown series are listed in `missing`."""
+    if len(request.series_ids) > config.max_batch_size:
+        raise HTTPException(status_code=413, detail=f"At most {config.max_batch_size} series per batch request")
+    result = _forecast(service, request.series_ids, request.horizon, request.version)
+    return BatchForecastResponse(version=result.version, horizon=result.horizon, forecasts=result.forecasts, missing=result.missing)
+
+
+@router.get("/models")
+def models(service: InventoryService = Depends(get_inventory_service)) -> Dict[str, List[str]]:
+    """Published model versions, oldest first."""
+    return {"versions": service.registry.versions()}
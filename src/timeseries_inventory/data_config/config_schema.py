@@ -0,0 +1,126 @@
+import typing
+import dataclasses
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Tuple, Union
+
+
+"""
+Schema-driven construction of the typed configs.
+
+Every config dataclass is described by the YAML section it is read from
+and, for the fields not stored under their own name in that section, the
+dotted key path holding the value:
+
+    (DataCleaningConfig, "data_cleaning", {"drop_duplicates": "operations.drop_duplicates", ...})
+
+A path starting with '/' is read from the top of the file, and a tuple of
+paths takes the first one that is set. Missing keys - and nulls, unless the
+field is Optional - take the dataclass default. Values are checked against
+the field annotations (str to Path conversion included), and every problem
+of a config is reported at once in a ValueError.
+"""
+
+__all__ = ["FieldPaths", "build_config"]
+
+
+# Field name -> key path(s) in the YAML section
+FieldPaths = Mapping[str, Union[str, Tuple[str, ...]]]
+
+_MISSING = object()
+
+# Field annotations per config class, resolved once
+_hints: Dict[type, Dict[str, Any]] = {}
+
+
+def _lookup(data: Mapping[str, Any], section: str, path: str) -> Any:
+    node: Any = data if path.startswith("/") else data.get(section)
+    for key in path.lstrip("/").split("."):
+        if not isinstance(node, Mapping) or key not in node:
+            return _MISSING
+        node = node[key]
+    return node
+
+
+def _optional(annotation: Any) -> bool:
+    return typing.get_origin(annotation) is Union and type(None) in typing.get_args(annotation)
+
+
+def _coerce(value: Any, annotation: Any) -> Tuple[bool, Any]:
+    """(matches, value converted to the annotation) for the annotations used by the config dataclasses."""
+    origin = typing.get_origin(annotation)
+    if annotation is Any:
+        return True, value
+    if origin is Union:
+        for member in typing.get_args(annotation):
+            matches, converted = _coerce(value, member)
+            if matches:
+                return True, converted
+        return False, value
+    if origin is not None:
+        # Containers are checked by kind only: Dict[...] needs a mapping, List[...] a list
+        return isinstance(value, origin), value
+    if annotation is type(None):
+        return value is None, value
+    if annotation is Path:
+        return isinstance(value, (str, Path)), Path(value) if isinstance(value, (str, Path)) else value
+    if annotation is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool), value
+    if annotation is int:
+        return isinstance(value, int) and not isinstance(value, bool), value
+    if annotation is str:
+        # Versions and levels like 20240101 are parsed as numbers
+        return isinstance(value, (str, int, float)) and not isinstance(value, bool), value if isinstance(value, str) else str(value)
+    return isinstance(value, annotation), value
+
+
+def _type_name(annotation: Any) -> str:
+    return getattr(annotation, "__name__", None) or str(annotation).replace("typing.", "")
+
+
+def build_config(cls: type, data: Mapping[str, Any], section: str, paths: FieldPaths, source: Any = None) -> Any:
+    """
+    Build a config dataclass from parsed YAML.
+
+    Args:
+        cls (type): Config dataclass.
+        data (Mapping): The whole parsed YAML file.
+        section (str): Top-level key the config is read from.
+        paths (FieldPaths): Key path(s) of the fields not stored under their own name.
+        source (Any, optional): File named in error messages.
+
+    Returns:
+        An instance of `cls`.
+
+    Raises:
+        ValueError: With every missing required key and mistyped value of the config.
+    """
+    hints = _hints.get(cls)
+    if hints is None:
+        hints = _hints[cls] = typing.get_type_hints(cls)
+    values: Dict[str, Any] = {}
+    errors: List[str] = []
+    for spec in dataclasses.fields(cls):
+        annotation = hints[spec.name]
+        candidates = paths.get(spec.name, spec.name)
+        if isinstance(candidates, str):
+            candidates = (candidates,)
+        value = _MISSING
+        for path in candidates:
+            value = _lookup(data, section, path)
+            if value is not None and value is not _MISSING:
+                break
+        where = candidates[0] if candidates[0].startswith("/") else f"{section}.{candidates[0]}"
+        if value is None and not _optional(annotation):
+            value = _MISSING
+        if value is _MISSING:
+            if spec.default is dataclasses.MISSING and spec.default_factory is dataclasses.MISSING:
+                errors.append(f"{where}: missing")
+            continue
+        matches, value = _coerce(value, annotation)
+        if not matches:
+            errors.append(f"{where}: expected {_type_name(annotation)}, got {type(value).__name__} {value!r}")
+            continue
+        values[spec.name] = value
+    if errors:
+        raise ValueError(f"Invalid {cls.__name__} in {source or 'config'}:\n  " + "\n  ".join(errors))
+    return cls(**values)
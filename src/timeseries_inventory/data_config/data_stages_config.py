@@ -1,7 +1,7 @@
 # loader.py placeholder 
 
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Union, Optional, List, Dict
 from timeseries_inventory.utils.custom_logging import custom_logger
 from timeseries_inventory.data_config.data_path_loader import DataPathLoader
@@ -23,7 +23,12 @@ __all__ = [
     "FeatureEngineeringConfig",
     "ModelTrainingConfig",
     "ModelEvaluationConfig",
-    "ModelPredictionConfig"
+    "ModelPredictionConfig",
+    "PipelineConfig",
+    "ServingConfig",
+    "SimulationConfig",
+    "LoggingConfig",
+    "MonitoringConfig"
 ]
 
   
@@ -39,6 +44,30 @@ class DataIngestionConfig:
     retry: Dict[str, int]
     attempts: int
     delay_seconds: int
+    parallel: Dict[str, Union[bool, str, int]] = field(default_factory=dict)
+    parallel_enabled: bool = False
+    executor: str = "thread"
+    workers: int = 4
+    ordered: bool = True
+    max_inflight_chunks: int = 8
+    format: str = "csv"
+    engine: str = "pandas"
+    schema: Dict[str, Any] = field(default_factory=dict)
+    dtypes: Dict[str, str] = field(default_factory=dict)
+    datetime_column: Optional[str] = None
+    cache: Dict[str, Union[bool, str, int]] = field(default_factory=dict)
+    cache_enabled: bool = False
+    cache_directory: str = "artifacts/ingest_cache"
+    cache_max_size_mb: Optional[float] = None
+    cache_max_age_days: Optional[float] = None
+    max_delay_seconds: float = 60
+    jitter: bool = True
+    checkpoint: Dict[str, Union[bool, str]] = field(default_factory=dict)
+    checkpoint_enabled: bool = False
+    checkpoint_path: Path = Path("artifacts/checkpoints/ingest.json")
+    auto_commit: bool = True
+    api: Dict[str, Any] = field(default_factory=dict)
+    db: Dict[str, Any] = field(default_factory=dict)
 
 
 @dataclass(frozen=True)
@@ -47,6 +76,11 @@ class DataCleaningConfig:
     operations: Dict[str, Union[bool, List[str]]]    
     drop_duplicates: bool
     fill_columns: List[str]
+    duplicate_keys: List[str] = field(default_factory=list)
+    max_tracked_keys: int = 20_000_000
+    fill_method: str = "ffill"
+    series_columns: List[str] = field(default_factory=list)
+    max_held_rows: int = 1000
 
 
 @dataclass(frozen=True)
@@ -56,9 +90,10 @@ class DataValidationConfig:
     allow_nulls: bool
     fail_fast: bool
     column_ranges: Dict[str, Dict[str, int]]
-    value: str
-    min: int
-    max: int
+    value: Dict[str, float]
+    min: float
+    max: float
+    max_examples: int = 10
 
 
 @dataclass(frozen=True)
@@ -76,6 +111,13 @@ class FeatureSelectionConfig:
     method: str
     top_k: int
     random_state: int
+    target_column: str = "value"
+    sample_rows: int = 100_000
+    time_column: Optional[str] = "date"
+    strata_frequency: str = "M"
+    n_neighbors: int = 3
+    workers: int = 4
+    directory: Path = Path("artifacts/feature_selection")
 
 
 @dataclass(frozen=True)
@@ -88,6 +130,10 @@ class FeatureEngineeringConfig:
     enabled: bool
     lags: List[int]
     target_column: str
+    rolling_windows: List[int] = field(default_factory=list)
+    ewm_spans: List[int] = field(default_factory=list)
+    series_columns: List[str] = field(default_factory=list)
+    polynomial_degree: int = 2
 
 
 @dataclass(frozen=True)
@@ -103,6 +149,11 @@ class ModelTrainingConfig:
     target_column: str
     test_size: float
     random_state: int
+    arima: Dict[str, Any] = field(default_factory=dict)
+    lstm: Dict[str, Any] = field(default_factory=dict)
+    global_model: Dict[str, Any] = field(default_factory=dict)
+    segments: Dict[str, Any] = field(default_factory=dict)
+    batch_size: int = 512
 
 
 @dataclass(frozen=True)
@@ -112,7 +163,17 @@ class ModelEvaluationConfig:
     metric: str
     cross_validation: bool
     n_splits: int
-    
+    metrics: List[str] = field(default_factory=lambda: ["mape", "smape", "mase", "pinball"])
+    quantiles: List[float] = field(default_factory=lambda: [0.5, 0.9])
+    window: str = "expanding"
+    train_window: Optional[int] = None
+    horizon: int = 7
+    date_column: str = "date"
+    workers: int = 4
+    directory: Path = Path("artifacts/cv")
+    report_path: Optional[Path] = None
+    series_columns: List[str] = field(default_factory=list)
+
 
 @dataclass(frozen=True)
 class ModelPredictionConfig:
@@ -123,6 +184,57 @@ class ModelPredictionConfig:
     output_predictions: str
     settings: Dict[str, int]
     batch_size: int
+    chunk_size: int = 100_000
+    workers: int = 1
+    id_columns: List[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class PipelineConfig:
+    max_buffered_chunks: int = 8
+    stages: Dict[str, int] = field(default_factory=dict)
+    cache: Dict[str, Union[bool, int]] = field(default_factory=dict)
+    cache_enabled: bool = False
+    cache_max_size_mb: Optional[float] = None
+    cache_max_entries: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class ServingConfig:
+    registry_directory: Path = Path("data/models/registry")
+    version: str = "latest"
+    memory_budget_mb: float = 256
+    max_versions: int = 2
+    cache_ttl_seconds: float = 300
+    cache_max_entries: int = 100_000
+    default_horizon: int = 7
+    max_horizon: int = 90
+    max_batch_size: int = 1000
+    micro_batching: bool = True
+    batch_window_ms: float = 3
+    batch_max_size: int = 64
+
 
+@dataclass(frozen=True)
+class SimulationConfig:
+    random_state: int = 42
+    scenarios: int = 1000
+    periods: Optional[int] = None
+    block_scenarios: int = 100
+    block_series: int = 500
+    workers: int = 1
 
 
+@dataclass(frozen=True)
+class LoggingConfig:
+    mode: str = "sync"
+    format: str = "text"
+    level: str = "INFO"
+    console: bool = True
+    sampling: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class MonitoringConfig:
+    enabled: bool = True
+    report_path: Optional[Path] = Path("artifacts/metrics/pipeline_run.json")
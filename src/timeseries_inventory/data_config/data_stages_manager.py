@@ -1,8 +1,9 @@
+import dataclasses
 from pathlib import Path
-from dataclasses import dataclass
-from typing import Any, Union, Optional, List
+from typing import Any, Dict, Union, Optional, Tuple
 from timeseries_inventory.utils.custom_logging import custom_logger
 from timeseries_inventory.data_config.data_path_loader import DataPathLoader
+from timeseries_inventory.data_config.config_schema import FieldPaths, build_config
 from timeseries_inventory.data_config.data_stages_config import (
     DataIngestionConfig, 
     DataCleaningConfig, 
@@ -12,143 +13,214 @@ from timeseries_inventory.data_config.data_stages_config import (
     FeatureEngineeringConfig, 
     ModelTrainingConfig, 
     ModelEvaluationConfig,
-    ModelPredictionConfig
+    ModelPredictionConfig,
+    PipelineConfig,
+    ServingConfig,
+    SimulationConfig,
+    LoggingConfig,
+    MonitoringConfig
     )
 
+# Config class -> (YAML section, key paths of the fields not stored under their own name),
+# see `config_schema.build_config`
+_SCHEMAS: Dict[type, Tuple[str, FieldPaths]] = {
+    DataIngestionConfig: ("data_ingestion", {
+        "source": "input.source",
+        "path": "input.path",
+        "file_pattern": "input.file_pattern",
+        "max_files": "input.max_files",
+        "chunksize": "input.chunksize",
+        "attempts": "retry.attempts",
+        "delay_seconds": "retry.delay_seconds",
+        "parallel_enabled": "parallel.enabled",
+        "executor": "parallel.executor",
+        "workers": "parallel.workers",
+        "ordered": "parallel.ordered",
+        "max_inflight_chunks": "parallel.max_inflight_chunks",
+        "format": "input.format",
+        "engine": "input.engine",
+        "schema": "input.schema",
+        "dtypes": "input.schema.dtypes",
+        "datetime_column": "input.schema.datetime_column",
+        "cache_enabled": "cache.enabled",
+        "cache_directory": "cache.directory",
+        "cache_max_size_mb": "cache.max_size_mb",
+        "cache_max_age_days": "cache.max_age_days",
+        "max_delay_seconds": "retry.max_delay_seconds",
+        "jitter": "retry.jitter",
+        "checkpoint_enabled": "checkpoint.enabled",
+        "checkpoint_path": "checkpoint.path",
+        "auto_commit": "checkpoint.auto_commit",
+    }),
+    DataCleaningConfig: ("data_cleaning", {
+        "drop_duplicates": "operations.drop_duplicates",
+        "fill_columns": "operations.fill_columns",
+        "duplicate_keys": "operations.duplicate_keys",
+        "max_tracked_keys": "operations.max_tracked_keys",
+        "fill_method": "operations.fill_method",
+        "series_columns": "operations.series_columns",
+        "max_held_rows": "operations.max_held_rows",
+    }),
+    DataValidationConfig: ("data_validation", {
+        "allow_nulls": "checks.allow_nulls",
+        "fail_fast": "checks.fail_fast",
+        "column_ranges": "checks.column_ranges",
+        "value": "checks.column_ranges.value",
+        "min": "checks.column_ranges.value.min",
+        "max": "checks.column_ranges.value.max",
+        "max_examples": "checks.max_examples",
+    }),
+    DataTransformationConfig: ("data_transformation", {
+        "directory": "output.directory",
+    }),
+    FeatureSelectionConfig: ("feature_selection", {
+        name: f"strategy.{name}" for name in (
+            "method", "top_k", "random_state", "target_column", "sample_rows", "time_column",
+            "strata_frequency", "n_neighbors", "workers", "directory",
+        )
+    }),
+    FeatureEngineeringConfig: ("feature_engineering", {
+        "generate_polynomials": "operations.generate_polynomials",
+        "interaction_terms": "operations.interaction_terms",
+        "lag_features": "operations.lag_features",
+        "enabled": "operations.lag_features.enabled",
+        "lags": "operations.lag_features.lags",
+        "target_column": "operations.lag_features.target_column",
+        "rolling_windows": "operations.lag_features.rolling_windows",
+        "ewm_spans": "operations.lag_features.ewm_spans",
+        "series_columns": "operations.series_columns",
+        "polynomial_degree": "operations.polynomial_degree",
+    }),
+    ModelTrainingConfig: ("model_training", {
+        "type": "model.type",
+        "hyperparameters": "model.hyperparameters",
+        "n_estimators": "model.hyperparameters.n_estimators",
+        "max_depth": "model.hyperparameters.max_depth",
+        "learning_rate": "model.hyperparameters.learning_rate",
+        "target_column": "training.target_column",
+        "test_size": "training.test_size",
+        "random_state": "training.random_state",
+        # Training mini-batches follow the prediction batch size
+        "batch_size": "/model_prediction.settings.batch_size",
+    }),
+    ModelEvaluationConfig: ("model_evaluation", {
+        name: f"evaluation.{name}" for name in (
+            "metric", "cross_validation", "n_splits", "metrics", "quantiles", "window", "train_window",
+            "horizon", "date_column", "workers", "directory", "report_path",
+        )
+    } | {
+        # MASE scales errors per series; series are keyed as in feature engineering unless set here
+        "series_columns": ("evaluation.series_columns", "/feature_engineering.operations.series_columns"),
+    }),
+    ModelPredictionConfig: ("model_prediction", {
+        "model": "paths.model",
+        "input_data": "paths.input_data",
+        "output_predictions": "paths.output_predictions",
+        "batch_size": "settings.batch_size",
+        "chunk_size": "settings.chunk_size",
+        "workers": "settings.workers",
+        "id_columns": "settings.id_columns",
+    }),
+    PipelineConfig: ("pipeline", {
+        "cache_enabled": "cache.enabled",
+        "cache_max_size_mb": "cache.max_size_mb",
+        "cache_max_entries": "cache.max_entries",
+    }),
+    ServingConfig: ("serving", {}),
+    # Simulations reuse the training seed unless they set their own
+    SimulationConfig: ("simulation", {"random_state": ("random_state", "/model_training.training.random_state")}),
+    LoggingConfig: ("logging", {}),
+    MonitoringConfig: ("monitoring", {}),
+}
+
+
+def _copied(value: Any) -> Any:
+    """Copy of nested dicts and lists; other values are shared."""
+    if isinstance(value, dict):
+        return {key: _copied(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copied(item) for item in value]
+    return value
+
+
 class DataStagesManager: 
     """
     Manages access to YAML configuration using dot/bracket notation paths.
     Warps DataPathLoader to provide both raw and sectioned path access
 
+    Configs are built from the schemas above on first use, validated, and
+    memoized for every manager of the same file version (see `DataPathLoader.load`),
+    so creating a manager per worker or task is cheap. Configs are frozen, and
+    every accessor call returns its own copy of their dict and list fields, so
+    changing them does not leak into other managers.
     """
     
-    def __init__(self, data_path: Optional[Union[str, List]]):
+    def __init__(self, data_path: Optional[Union[str, Path]] = None):
         self.logger = custom_logger()
         self._loader= DataPathLoader(data_path)
-        self.yaml_data = self._loader.get_yaml_data()
+        self.yaml_data, self._configs = self._loader.load()
+
+
+    def _config(self, cls: type) -> Any:
+        config = self._configs.get(cls)
+        if config is None:
+            section, paths = _SCHEMAS[cls]
+            config = self._configs.setdefault(cls, build_config(cls, self.yaml_data, section, paths, self._loader.data_path))
+        containers = {name: value for name, value in vars(config).items() if isinstance(value, (dict, list))}
+        return dataclasses.replace(config, **_copied(containers)) if containers else config
 
   
     def data_ingestion_config(self) -> DataIngestionConfig:
-        yaml_data = self._loader.data_ingestion
-        return DataIngestionConfig(
-            stage = yaml_data.stage,
-            input = yaml_data.input,
-            source = yaml_data.input.source,
-            path = yaml_data.input.path,
-            file_pattern = yaml_data.input.file_pattern,
-            max_files = yaml_data.input.max_files,
-            chunksize = yaml_data.input.chunksize,
-            retry = yaml_data.retry,
-            attempts = yaml_data.retry.attempts,
-            delay_seconds = yaml_data.retry.delay_seconds
-                 
-        )
+        return self._config(DataIngestionConfig)
 
 
     def data_cleaning_config(self) -> DataCleaningConfig:
-        yaml_data = self._loader.data_cleaning
-        return DataCleaningConfig(
-          stage = yaml_data.stage,
-          operations = yaml_data.operations,    
-          drop_duplicates = yaml_data.operations.drop_duplicates,
-          fill_columns = yaml_data.operations.fill_columns
-                
-        )
+        return self._config(DataCleaningConfig)
 
 
     def data_validation_config(self) -> DataValidationConfig:
-        yaml_data = self._loader.data_validation
-        return DataValidationConfig(
-            stage = yaml_data.stage,
-            checks = yaml_data.checks,
-            allow_nulls = yaml_data.checks.allow_nulls,
-            fail_fast = yaml_data.checks.fail_fast,
-            column_ranges = yaml_data.checks.column_ranges, 
-            value = yaml_data.checks.column_ranges.value, 
-            min = yaml_data.checks.column_ranges.value.min,
-            max = yaml_data.checks.column_ranges.value.max
-                      
-        )
+        return self._config(DataValidationConfig)
 
 
     def data_transformation_config(self) -> DataTransformationConfig:
-        yaml_data = self._loader.data_transformation
-        return DataTransformationConfig(
-            stage = yaml_data.stage,
-            transformations = yaml_data.transformations,
-            output = yaml_data.output,
-            directory = yaml_data.output.directory   
-            
-        )    
+        return self._config(DataTransformationConfig)
 
 
     def feature_selection_config(self) -> FeatureSelectionConfig:
-        yaml_data = self._loader.feature_selection
-        return FeatureSelectionConfig(
-            stage = yaml_data.stage,
-            strategy = yaml_data.strategy, 
-            method = yaml_data.strategy.method,
-            top_k = yaml_data.strategy.top_k,
-            random_state =  yaml_data.strategy.random_stage,
-            
-        )   
-    
-    
+        return self._config(FeatureSelectionConfig)
+
+
     def feature_engineering_config(self) -> FeatureEngineeringConfig:
-        yaml_data = self._loader.feature_engineering
-        return FeatureEngineeringConfig(
-            stage = yaml_data.stage, 
-            operations = yaml_data.operations,
-            generate_polynomials = yaml_data.operations.generate_polynomials,
-            interaction_terms = yaml_data.operations.interaction_terms, 
-            lag_features = yaml_data.operations.lag_features, 
-            enabled = yaml_data.operations.lag_features.enabled, 
-            lags = yaml_data.operations.lag_features.lags, 
-            target_column = yaml_data.operations.lag_features.target_column
-            
-        ) 
+        return self._config(FeatureEngineeringConfig)
 
 
     def model_training_config(self) -> ModelTrainingConfig:
-        yaml_data = self._loader.model_training
-        return ModelTrainingConfig(
-            stage = yaml_data.stage, 
-            model = yaml_data.model, 
-            type = yaml_data.model.type, 
-            hyperparameters=  yaml_data.model.hyperparameters,
-            n_estimators = yaml_data.model.hyperparameters.n_estimators,
-            max_depth = yaml_data.model.hyperparameters.max_depth,
-            learning_rate = yaml_data.model.hyperparameters.learning_rate, 
-            training = yaml_data.training,
-            target_column = yaml_data.training.target_column,
-            test_size = yaml_data.training.test_size, 
-            random_state = yaml_data.training.random_state
-            
-        )
-    
-    
+        return self._config(ModelTrainingConfig)
+
+
     def model_evaluation_config(self) -> ModelEvaluationConfig:
-        yaml_data = self._loader.model_evaluation
-        return ModelEvaluationConfig(
-            stage = yaml_data.stage,
-            evaluation =  yaml_data.evaluation,
-            metric = yaml_data.evaluation.metric,
-            cross_validation = yaml_data.evaluation.cross_validation,
-            n_splits = yaml_data.evaluation.n_splits
-            
-            
-        )    
-        
-        
+        return self._config(ModelEvaluationConfig)
+
+
     def model_prediction_config(self) -> ModelPredictionConfig:
-        yaml_data = self._loader.model_prediction
-        return ModelPredictionConfig(
-            stage = yaml_data.stage,
-            paths = yaml_data.paths, 
-            model = yaml_data.paths.model, 
-            input_data = yaml_data.paths.input_data,   
-            output_predictions = yaml_data.paths.output_predictions,   
-            settings = yaml_data.settings,        
-            batch_size = yaml_data.settings.batch_size
-              
-        )  
\ No newline at end of file
+        return self._config(ModelPredictionConfig)
+
+
+    def pipeline_config(self) -> PipelineConfig:
+        return self._config(PipelineConfig)
+
+
+    def serving_config(self) -> ServingConfig:
+        return self._config(ServingConfig)
+
+
+    def simulation_config(self) -> SimulationConfig:
+        return self._config(SimulationConfig)
+
+
+    def logging_config(self) -> LoggingConfig:
+        return self._config(LoggingConfig)
+
+
+    def monitoring_config(self) -> MonitoringConfig:
+        return self._config(MonitoringConfig)
@@ -0,0 +1,146 @@
+import asyncio
+import contextlib
+import collections
+import pandas as pd
+from typing import Optional, Dict, Iterator, AsyncIterator, Deque, List, Any
+from timeseries_inventory.utils.custom_logging import custom_logger
+from timeseries_inventory.data_config.data_stages_config import DataIngestionConfig
+from timeseries_inventory.ingestion.readers import apply_schema
+from timeseries_inventory.ingestion.retry import backoff_delay
+
+
+class AsyncPagedLoader:
+    """
+    Base class for loaders that page through a remote source with asyncio.
+
+    Subclasses implement `_fetch_page(page)` returning the records of one
+    page. Up to `max_concurrency` pages are in flight at once, but chunks are
+    always yielded in page order; paging stops at the first short page.
+
+    `aload()` is the native async generator, `load()` drives it on a private
+    event loop so the loader can be used exactly like `FileLoader.load()`.
+
+    Args:
+        config (DataIngestionConfig): Configuration object loaded from YAML
+        settings (dict): Source specific section ('api' or 'db') of the config
+    """
+
+    def __init__(
+        self,
+        config: DataIngestionConfig,
+        settings: Dict[str, Any]
+        ):
+        self.config = config
+        self.settings = settings
+        self.page_size = int(settings.get("page_size", config.chunksize))
+        self.max_concurrency = max(1, int(settings.get("max_concurrency", 4)))
+        self.logger = custom_logger()
+
+
+    async def _fetch_page(self, page: int) -> List[Any]:
+        raise NotImplementedError
+
+
+    def _to_frame(self, records: List[Any]) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+    async def aclose(self) -> None:
+        """
+        Release the pooled connections of the current event loop. Called by
+        `load()` on its private loop; callers of `aload()` own the pool instead.
+        """
+
+
+    async def _fetch_with_retry(self, page: int) -> List[Any]:
+        """Fetch one page, retrying with exponential backoff and jitter."""
+        failures = 0
+        while True:
+            try:
+                return await self._fetch_page(page)
+            except Exception as e:
+                failures += 1
+                self.logger.warning(f"Failed to fetch page {page} on attempt {failures}/{self.config.attempts}: {e}")
+                if failures >= self.config.attempts:
+                    self.logger.error(f"Exceeded max retry attempts for page {page}")
+                    raise
+                await asyncio.sleep(backoff_delay(self.config, failures))
+
+
+    async def _page_window(self, first_page: int, last_page: Optional[int]) -> AsyncIterator[List[Any]]:
+        """
+        Keep a sliding window of concurrent page requests and yield them in order.
+
+        Args:
+            first_page (int): First page number to request.
+            last_page (int, optional): Last page number, if known up front.
+
+        Yields:
+            list: Records of one page.
+        """
+        pending: Deque[asyncio.Task] = collections.deque()
+        next_page, exhausted = first_page, False
+
+        def schedule() -> None:
+            nonlocal next_page
+            while len(pending) < self.max_concurrency and (last_page is None or next_page <= last_page):
+                pending.append(asyncio.ensure_future(self._fetch_with_retry(next_page)))
+                next_page += 1
+
+        schedule()
+        try:
+            while pending:
+                records = await pending.popleft()
+                if len(records) < self.page_size:
+                    exhausted = True
+                if records:
+                    yield records
+                if exhausted:
+                    break
+                schedule()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+    async def aload(self) -> AsyncIterator[pd.DataFrame]:
+        """
+        Async generator that yields one DataFrame chunk per page.
+
+        Yields:
+            pd.DataFrame: A chunk of the loaded data.
+        """
+        first_page, last_page = await self._page_range()
+        async with contextlib.aclosing(self._page_window(first_page, last_page)) as pages:
+            async for records in pages:
+                chunk = apply_schema(self._to_frame(records), self.config.dtypes, self.config.datetime_column)
+                self.logger.debug("Yielding chunk of shape %s from %s", chunk.shape, type(self).__name__)
+                yield chunk
+
+
+    async def _page_range(self) -> tuple:
+        """Return `(first_page, last_page)`; `last_page` is None when the size is unknown."""
+        return 0, None
+
+
+    def load(self) -> Iterator[pd.DataFrame]:
+        """
+        Generator that yields chunks of data, same interface as `FileLoader.load()`.
+
+        Yields:
+            pd.DataFrame: A chunk of the loaded data.
+        """
+        loop = asyncio.new_event_loop()
+        chunks = self.aload()
+        try:
+            while True:
+                try:
+                    chunk = loop.run_until_complete(chunks.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield chunk
+        finally:
+            loop.run_until_complete(chunks.aclose())
+            loop.run_until_complete(self.aclose())
+            loop.close()
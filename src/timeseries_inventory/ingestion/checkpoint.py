@@ -0,0 +1,123 @@
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, Union
+from timeseries_inventory.utils.custom_logging import custom_logger
+
+
+"""
+Ingestion checkpoints.
+
+Records, per input file, how many rows downstream stages have committed so a
+restarted ingest can skip straight to the first uncommitted row. Offsets are
+bound to the file's size and mtime: a file that changed since the checkpoint
+was written is read again from the start.
+"""
+
+__all__ = ["IngestCheckpoint"]
+
+
+class IngestCheckpoint:
+    """
+    JSON-backed record of committed row offsets per input file.
+
+    Args:
+        path (str | Path): Checkpoint file (e.g. 'artifacts/checkpoints/ingest.json').
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = custom_logger()
+        self._lock = threading.Lock()
+        self._files: Dict[str, Dict[str, Any]] = self._load()
+
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks cannot be pickled; workers of a process pool only read offsets
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                files = json.load(f).get("files", {})
+        except (json.JSONDecodeError, AttributeError):
+            self.logger.warning(f"Ignoring unreadable ingest checkpoint: {self.path}")
+            return {}
+        if files:
+            self.logger.info(f"Resuming ingest from checkpoint {self.path} ({len(files)} files started)")
+        return files
+
+
+    def _save(self) -> None:
+        tmp = self.path.with_suffix(f".tmp-{os.getpid()}")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"files": self._files}, f)
+        os.replace(tmp, self.path)
+
+
+    @staticmethod
+    def _fingerprint(file: Path) -> Dict[str, int]:
+        stat = file.stat()
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+    def offset(self, file: Path) -> Optional[int]:
+        """
+        Return the number of committed rows for a file.
+
+        Args:
+            file (Path): Input file.
+
+        Returns:
+            int | None: Committed rows, 0 for an unseen or changed file,
+            or None when the file was already fully committed.
+        """
+        entry = self._files.get(str(file.resolve()))
+        if entry is None or {"size": entry["size"], "mtime_ns": entry["mtime_ns"]} != self._fingerprint(file):
+            return 0
+        return None if entry["complete"] else entry["rows"]
+
+
+    def commit(self, file: Path, rows: int, complete: bool = False) -> None:
+        """
+        Record that the first `rows` rows of a file have been processed.
+
+        Offsets only ever move forward, so late or repeated commits are harmless.
+
+        Args:
+            file (Path): Input file.
+            rows (int): Number of leading rows committed.
+            complete (bool): Whether these were all rows of the file.
+        """
+        key, fingerprint = str(file.resolve()), self._fingerprint(file)
+        with self._lock:
+            entry = self._files.get(key)
+            if (
+                entry is not None
+                and entry["size"] == fingerprint["size"]
+                and entry["mtime_ns"] == fingerprint["mtime_ns"]
+                and entry["rows"] >= rows
+                and (entry["complete"] or not complete)
+            ):
+                return
+            self._files[key] = {**fingerprint, "rows": rows, "complete": complete}
+            self._save()
+
+
+    def clear(self) -> None:
+        """Forget all offsets once an ingest run has completed."""
+        with self._lock:
+            self._files = {}
+            self.path.unlink(missing_ok=True)
@@ -1 +1,109 @@
-# db_loader.py placeholder 
+# db_loader.py placeholder
+import asyncio
+import math
+import weakref
+import pandas as pd
+from typing import Optional, Dict, List, Any
+from timeseries_inventory.data_config.data_stages_config import DataIngestionConfig
+from timeseries_inventory.ingestion.async_loader import AsyncPagedLoader
+
+try:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+except ImportError:  # pragma: no cover - optional dependency
+    create_async_engine = None
+
+
+# One pooled engine per (event loop, database url), shared by every DbLoader
+_engines: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+
+def get_engine(settings: Dict[str, Any]) -> "AsyncEngine":
+    """
+    Return the shared pooled async engine for a database url on the running loop.
+
+    Args:
+        settings (dict): The `data_ingestion.db` section of the config.
+
+    Returns:
+        AsyncEngine: Engine with a connection pool of `pool_size` connections.
+    """
+    if create_async_engine is None:
+        raise ImportError("sqlalchemy[asyncio] is required for the db ingestion source")
+    url = settings["url"]
+    engines = _engines.setdefault(asyncio.get_running_loop(), {})
+    engine = engines.get(url)
+    if engine is None:
+        pool_args = {}
+        if ":memory:" not in url and url.rstrip("/") != "sqlite+aiosqlite:":
+            pool_args = {"pool_size": int(settings.get("pool_size", settings.get("max_concurrency", 4))), "max_overflow": 0}
+        engine = create_async_engine(url, **pool_args)
+        engines[url] = engine
+    return engine
+
+
+async def dispose_engines() -> None:
+    """Dispose every shared engine of the running event loop."""
+    for engine in _engines.pop(asyncio.get_running_loop(), {}).values():
+        await engine.dispose()
+
+
+class DbLoader(AsyncPagedLoader):
+    """
+    Pages through a SQL table or query with LIMIT/OFFSET.
+
+    The row count is read first so every page can be requested concurrently
+    on its own pooled connection; `order_by` keeps the pages stable.
+
+    Args:
+        config (DataIngestionConfig): Configuration object loaded from YAML
+        engine (AsyncEngine, optional): Engine to use instead of the shared pool
+    """
+
+    def __init__(
+        self,
+        config: DataIngestionConfig,
+        engine: Optional[Any] = None
+        ):
+        super().__init__(config, config.db)
+        if "url" not in self.settings:
+            raise ValueError("data_ingestion.db.url is required for the db source")
+        if "query" in self.settings:
+            self.source = f"({self.settings['query']}) AS source"
+        elif "table" in self.settings:
+            self.source = self.settings["table"]
+        else:
+            raise ValueError("data_ingestion.db needs either 'table' or 'query'")
+        self.order_by = self.settings.get("order_by")
+        self._engine = engine
+        self._columns: Optional[List[str]] = None
+
+
+    @property
+    def engine(self) -> "AsyncEngine":
+        return self._engine or get_engine(self.settings)
+
+
+    async def _page_range(self) -> tuple:
+        async with self.engine.connect() as conn:
+            total = (await conn.execute(text(f"SELECT COUNT(*) FROM {self.source}"))).scalar_one()
+        self.logger.info(f"Loading {total} rows from {self.source} in pages of {self.page_size}")
+        return 0, math.ceil(total / self.page_size) - 1
+
+
+    async def _fetch_page(self, page: int) -> List[Any]:
+        order = f" ORDER BY {self.order_by}" if self.order_by else ""
+        query = text(f"SELECT * FROM {self.source}{order} LIMIT :limit OFFSET :offset")
+        async with self.engine.connect() as conn:
+            result = await conn.execute(query, {"limit": self.page_size, "offset": page * self.page_size})
+            self._columns = list(result.keys())
+            return result.fetchall()
+
+
+    def _to_frame(self, records: List[Any]) -> pd.DataFrame:
+        return pd.DataFrame.from_records(records, columns=self._columns)
+
+
+    async def aclose(self) -> None:
+        if self._engine is None:
+            await dispose_engines()
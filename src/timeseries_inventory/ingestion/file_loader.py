@@ -1,71 +1,373 @@
-# file_loader.py placeholder 
+# file_loader.py placeholder
 import time
+import queue
+import multiprocessing
+import threading
 import pandas as pd
 from pathlib import Path
-from typing import Optional, Dict, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Dict, Iterator, List, Any
 from timeseries_inventory.utils.custom_logging import custom_logger
+from timeseries_inventory.utils.monitoring import REGISTRY, ChunkMetrics
 from timeseries_inventory.data_config.data_stages_config import DataIngestionConfig
+from timeseries_inventory.ingestion.readers import apply_schema, get_reader
+from timeseries_inventory.ingestion.ingest_cache import IngestCache
+from timeseries_inventory.ingestion.checkpoint import IngestCheckpoint
+from timeseries_inventory.ingestion.retry import backoff_delay
+
+
+# Message tags exchanged between the file workers and the consuming generator
+_CHUNK = "chunk"
+_DONE = "done"
+_ERROR = "error"
+
+# How long a blocked worker/consumer waits before re-checking for cancellation
+_POLL_SECONDS = 0.1
+
+_CHUNK_METRICS = ChunkMetrics("ingest")
+_SOURCE_BYTES = REGISTRY.counter("ingest_source_bytes_total", "Bytes of the input files read to the end.")
+
+
+def _put(out_queue: Any, item: tuple, stop_event: Any) -> bool:
+    """Put an item on a bounded queue, giving up once the consumer has stopped."""
+    while not stop_event.is_set():
+        try:
+            out_queue.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce_file(loader: "FileLoader", file: Path, index: int, out_queue: Any, stop_event: Any) -> None:
+    """
+    Worker entry point: parse one file and push its chunks onto the queue.
+    Kept at module level so it can be shipped to a process pool.
+    """
+    try:
+        for chunk in loader._read_file(file):
+            if not _put(out_queue, (_CHUNK, index, chunk), stop_event):
+                return
+    except Exception as e:
+        _put(out_queue, (_ERROR, index, e), stop_event)
+        return
+    _put(out_queue, (_DONE, index, None), stop_event)
 
 
 class FileLoader:
     """
-    Loads CSV files from the local source with validation, retry, and chunking support.
-    
-    Args: 
+    Loads CSV, Parquet or Feather files from the local source with validation, retry, and chunking support.
+
+    The parsing backend (pandas or PyArrow) and the declared dtypes come from
+    `data_ingestion.input`, see `timeseries_inventory.ingestion.readers`.
+
+    When `parallel.enabled` is set in the ingestion config, several files are
+    parsed at once by a thread or process pool and their chunks are handed
+    back through bounded queues, so at most `max_inflight_chunks` parsed
+    chunks are held in memory at any time.
+
+    With `cache.enabled`, parsed files are kept in an on-disk ingest cache and
+    unchanged files are served from it instead of being parsed again. With
+    `checkpoint.enabled`, committed row offsets are persisted so a restarted
+    ingest resumes where the previous run stopped.
+
+    Args:
         config (DataIngestionConfig): Configuration object loaded from YAML
-        read_args (dict, optional): Additional arguments fot 'pandas.read_csv'
-        
+        read_args (dict, optional): Additional arguments for the reader backend (e.g. 'pandas.read_csv')
+
     """
-    
+
     def __init__(
-        self, 
+        self,
         config: DataIngestionConfig,
         read_args: Optional[Dict] = None
                  ):
-       
+
         self.config = config
         self.read_args = read_args or {}
+        self.reader = get_reader(config, self.read_args)
         self.logger = custom_logger()
+        self.cache = self._build_cache() if config.cache_enabled else None
+        self.checkpoint = IngestCheckpoint(config.checkpoint_path) if config.checkpoint_enabled else None
         self._validate_directory()
-    
-    
+
+
     def _validate_directory(self):
-        """Check if the directory exists and contains the matching files.""" 
+        """Check if the directory exists and contains the matching files."""
         if not self.config.path.exists():
-            raise FileNotFoundError(f"Directory does not exist: {self.config.path}")   
+            raise FileNotFoundError(f"Directory does not exist: {self.config.path}")
         self.match_files = list(self.config.path.glob(self.config.file_pattern))
         if not self.match_files:
             raise FileNotFoundError(f"No Files matching pattern '{self.config.file_pattern}' in {self.config.path}")
         self.logger.info(f"Found {len(self.match_files)} files matching pattern '{self.config.file_pattern}' in {self.config.path}")
-    
-    
+
+
     def load(self) -> Iterator[pd.DataFrame]:
         """
-        Generator that yields chunks of data from the CSV files.
-        
+        Generator that yields chunks of data from the input files.
+
+        With checkpointing enabled each chunk carries its origin in
+        `chunk.attrs["source"]`. In `auto_commit` mode a chunk is committed as
+        soon as the next one is requested and the checkpoint is cleared once
+        every file has been delivered; otherwise downstream stages call
+        `commit(chunk)` themselves, and the checkpoint is cleared once every
+        file has been committed to its end.
+
         Yields:
             pd.DataFrame: A chunk of the loaded data.
         """
-        files = self.match_files[:self.config.max_files]
-        
+        files = self._files()
+
+        if self.config.parallel_enabled and len(files) > 1:
+            chunks = self._load_parallel(files)
+        else:
+            chunks = self._read_files(files)
+        chunks = _CHUNK_METRICS.track(chunks)
+
+        if self.checkpoint is None or not self.config.auto_commit:
+            yield from chunks
+            return
+
+        previous = None
+        for chunk in chunks:
+            if previous is not None:
+                self.commit(previous)
+            yield chunk
+            previous = chunk
+        if previous is not None:
+            self.commit(previous)
+        self.checkpoint.clear()
+
+
+    def commit(self, chunk: pd.DataFrame) -> None:
+        """
+        Mark a chunk yielded by `load()` as processed by downstream stages.
+
+        Args:
+            chunk (pd.DataFrame): A chunk exactly as yielded by `load()`.
+        """
+        source = chunk.attrs.get("source")
+        if self.checkpoint is None or source is None:
+            return
+        self.checkpoint.commit(Path(source["file"]), source["start_row"] + source["rows"], complete=source["last"])
+        if source["last"] and all(self.checkpoint.offset(file) is None for file in self._files()):
+            # A full pass is committed: the next run starts over
+            self.checkpoint.clear()
+
+
+    def reset_checkpoint(self) -> None:
+        """Forget every committed offset, so the next `load()` reads all files from the start."""
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+
+
+    def _files(self) -> List[Path]:
+        """Files read by `load()`."""
+        return self.match_files[:self.config.max_files]
+
+
+    def _build_cache(self) -> IngestCache:
+        """Create the ingest cache, keyed on every setting that changes the parsed output."""
+        params = {
+            "format": self.config.format,
+            "engine": self.config.engine,
+            "chunksize": self.config.chunksize,
+            "dtypes": self.config.dtypes,
+            "datetime_column": self.config.datetime_column,
+            "read_args": self.read_args,
+        }
+        return IngestCache(
+            self.config.cache_directory,
+            max_size_mb = self.config.cache_max_size_mb,
+            max_age_days = self.config.cache_max_age_days,
+            params = params
+        )
+
+
+    def _read_files(self, files: List[Path]) -> Iterator[pd.DataFrame]:
+        """Read files one after the other."""
         for file in files:
-            self.logger.info(f"Loading file: {file}")
-            for attempt in range(1, self.config.retry['attempts'] + 1):
-                try:
-                    chunk_iter = pd.read_csv(
-                        file, 
-                        chunksize = self.config.chunksize, 
-                        **self.read_args
-                    )
-                    for chunk in chunk_iter:
-                        self.logger.debug(f"Yielding chunk of shape {chunk.shape} from {file.name}")
-                        yield chunk
-                    break    
-                except Exception as e:
-                    self.logger.warning(f"Failed to read {file.name} on attempt {attempt}/{self.config.retry['attempts']}: {e}")
-                    if attempt < self.config.retry['attempts']:
-                        time.sleep(self.config.retry['delay_seconds'])
-                    else:
-                        self.logger.error(f"Exceeded max retry attempts for file: {file.name}")
-                        raise  
-                      
\ No newline at end of file
+            yield from self._read_file(file)
+            _SOURCE_BYTES.inc(file.stat().st_size)
+
+
+    def _read_file(self, file: Path) -> Iterator[pd.DataFrame]:
+        """
+        Read a single file in chunks, resuming from the checkpointed row offset.
+
+        Args:
+            file (Path): File to read.
+
+        Yields:
+            pd.DataFrame: A chunk of the file.
+        """
+        if self.checkpoint is None:
+            yield from self._read_rows(file, 0)
+            return
+        start_row = self.checkpoint.offset(file)
+        if start_row is None:
+            self.logger.info(f"Skipping file committed by a previous run: {file}")
+            return
+        if start_row:
+            self.logger.info(f"Resuming {file} at row {start_row}")
+
+        # Look one chunk ahead so the final chunk of the file can be flagged
+        rows, pending = start_row, None
+        for chunk in self._read_rows(file, start_row):
+            if pending is not None:
+                yield pending
+            chunk.attrs["source"] = {"file": str(file), "start_row": rows, "rows": len(chunk), "last": False}
+            rows += len(chunk)
+            pending = chunk
+        if pending is not None:
+            pending.attrs["source"]["last"] = True
+            yield pending
+
+
+    def _read_rows(self, file: Path, start_row: int) -> Iterator[pd.DataFrame]:
+        """
+        Read a file from `start_row` on, from the ingest cache when it is unchanged.
+
+        Args:
+            file (Path): File to read.
+            start_row (int): Number of leading rows to skip.
+
+        Yields:
+            pd.DataFrame: A chunk of the file.
+        """
+        if self.cache is None:
+            yield from self._parse_file(file, start_row)
+            return
+        key = self.cache.lookup(file)
+        if key is not None:
+            self.logger.info(f"Loading file from ingest cache: {file}")
+            # Entries written by older versions may hold other dtypes (e.g. microsecond dates)
+            for chunk in self.cache.read(key, start_row):
+                yield apply_schema(chunk, self.config.dtypes, self.config.datetime_column)
+            return
+        if start_row:
+            # A partial parse cannot populate the cache
+            yield from self._parse_file(file, start_row)
+            return
+        yield from self.cache.write_through(file, self._parse_file(file))
+
+
+    def _parse_file(self, file: Path, start_row: int = 0) -> Iterator[pd.DataFrame]:
+        """
+        Parse a single file in chunks.
+
+        A failed read is retried from the first row that has not been yielded
+        yet, with exponential backoff and jitter between attempts. The failure
+        counter resets after every successful chunk, so `attempts` bounds the
+        consecutive failures per chunk rather than per file.
+
+        Args:
+            file (Path): File to read.
+            start_row (int): Number of leading rows to skip.
+
+        Yields:
+            pd.DataFrame: A chunk of the file.
+        """
+        self.logger.info(f"Loading file: {file}")
+        rows, failures = start_row, 0
+        while True:
+            try:
+                for chunk in self.reader.read(file, start_row=rows):
+                    self.logger.debug("Yielding chunk of shape %s from %s", chunk.shape, file.name)
+                    rows += len(chunk)
+                    failures = 0
+                    yield chunk
+                return
+            except Exception as e:
+                failures += 1
+                self.logger.warning(f"Failed to read {file.name} at row {rows} on attempt {failures}/{self.config.attempts}: {e}")
+                if failures >= self.config.attempts:
+                    self.logger.error(f"Exceeded max retry attempts for file: {file.name}")
+                    raise
+                time.sleep(backoff_delay(self.config, failures))
+
+
+    def _load_parallel(self, files: List[Path]) -> Iterator[pd.DataFrame]:
+        """
+        Parse several files concurrently and yield their chunks.
+
+        With `ordered` output every file gets its own bounded queue and the
+        files are drained in their original order, with at most `workers`
+        files submitted at once; otherwise all workers share one queue and
+        chunks are yielded as soon as they are parsed. The queues leave room
+        for the chunk each worker holds while it waits for a free slot, so
+        the parsed chunks not yet yielded never exceed `max_inflight_chunks`
+        (at least two).
+
+        Args:
+            files (List[Path]): Files to read.
+
+        Yields:
+            pd.DataFrame: A chunk of one of the files.
+        """
+        max_inflight = max(2, self.config.max_inflight_chunks)
+        workers = max(1, min(self.config.workers, len(files), max_inflight // 2))
+        self.logger.info(
+            f"Loading {len(files)} files with {workers} {self.config.executor} workers "
+            f"({'ordered' if self.config.ordered else 'unordered'}, max {max_inflight} chunks in flight)"
+        )
+
+        if self.config.executor == "process":
+            manager = multiprocessing.Manager()
+            make_queue, stop_event = manager.Queue, manager.Event()
+            executor: Executor = ProcessPoolExecutor(max_workers=workers)
+        elif self.config.executor == "thread":
+            manager = None
+            make_queue, stop_event = queue.Queue, threading.Event()
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="file_loader")
+        else:
+            raise ValueError(f"Unsupported executor '{self.config.executor}', expected 'thread' or 'process'")
+
+        futures: List[Future] = []
+
+        def submit(index: int, out_queue: Any) -> None:
+            futures.append(executor.submit(_produce_file, self, files[index], index, out_queue, stop_event))
+
+        try:
+            if self.config.ordered:
+                # Queue slots plus the chunk held by each of the `workers` open files
+                per_file = max_inflight // workers - 1
+                queues = [make_queue(per_file) for _ in files]
+                for index in range(workers):
+                    submit(index, queues[index])
+                for index in range(len(files)):
+                    yield from self._drain(queues[index], futures, remaining=1)
+                    if index + workers < len(files):
+                        submit(index + workers, queues[index + workers])
+            else:
+                shared = make_queue(max_inflight - workers)
+                for index in range(len(files)):
+                    submit(index, shared)
+                yield from self._drain(shared, futures, remaining=len(files))
+        finally:
+            stop_event.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            if manager is not None:
+                manager.shutdown()
+
+
+    def _drain(self, in_queue: Any, futures: List[Future], remaining: int) -> Iterator[pd.DataFrame]:
+        """Yield chunks from a queue until `remaining` files have reported completion."""
+        while remaining:
+            try:
+                kind, index, payload = in_queue.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                # Surface crashes that happened outside `_produce_file` (e.g. a dead worker process)
+                for future in futures:
+                    if future.done() and not future.cancelled() and future.exception() is not None:
+                        raise future.exception()
+                continue
+            if kind == _CHUNK:
+                yield payload
+            elif kind == _DONE:
+                remaining -= 1
+                _SOURCE_BYTES.inc(self.match_files[index].stat().st_size)
+            else:
+                self.logger.error(f"Parallel load failed for file: {self.match_files[index].name}")
+                raise payload
+
@@ -0,0 +1,314 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+import threading
+import pandas as pd
+from pathlib import Path
+from typing import Optional, Dict, Iterator, List, Any, Union
+from timeseries_inventory.utils.custom_logging import custom_logger
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+
+"""
+Incremental ingest cache.
+
+Every parsed input file is stored as an Arrow IPC stream (`<key>.arrows`)
+next to a small JSON sidecar (`<key>.json`) holding its fingerprint. The key
+is derived from the resolved file path and the reader parameters, so one
+entry exists per file and parsing setup. An entry is served when the file's
+size and mtime still match, or - if only the mtime moved - when the content
+hash is unchanged. Cached batches are read through a memory map, so numeric
+columns are handed to pandas without copying. The last access time that
+drives eviction is only rewritten once it is an hour old, so warm reads do
+not write to the cache directory.
+
+Each entry lives in its own pair of files that are replaced atomically,
+which keeps the cache safe to share between loader threads and processes.
+
+Usage:
+    python -m timeseries_inventory.ingestion.ingest_cache info
+    python -m timeseries_inventory.ingestion.ingest_cache purge --older-than-days 7
+"""
+
+__all__ = ["IngestCache", "file_digest"]
+
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+# Resolution of `last_access`: a hit older than this rewrites the sidecar
+_ACCESS_RESOLUTION_SECONDS = 3600
+
+
+def file_digest(file: Union[str, Path]) -> str:
+    """Return the BLAKE2b content hash of a file, read in 1 MiB blocks."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestCache:
+    """
+    Memory-mapped cache of parsed input files keyed by file fingerprint.
+
+    Args:
+        directory (str | Path): Cache directory (e.g. 'artifacts/ingest_cache').
+        max_size_mb (float, optional): Evict least recently used entries above this total size.
+        max_age_days (float, optional): Evict entries not used for this many days.
+        params (dict, optional): Reader parameters that change the parsed output.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_size_mb: Optional[float] = None,
+        max_age_days: Optional[float] = None,
+        params: Optional[Dict[str, Any]] = None
+        ):
+        if pa is None:
+            raise ImportError("pyarrow is required for the ingest cache")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self.max_age_seconds = max_age_days * 86400 if max_age_days else None
+        self.params = params or {}
+        self._params_key = json.dumps(self.params, sort_keys=True, default=str)
+        self.logger = custom_logger()
+
+
+    def _key(self, file: Path) -> str:
+        raw = f"{file.resolve()}|{self._params_key}".encode("utf-8")
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+    def _data_path(self, key: str) -> Path:
+        return self.directory / f"{key}.arrows"
+
+
+    def _meta_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+
+    def _read_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with self._meta_path(key).open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+
+    def _write_meta(self, key: str, meta: Dict[str, Any]) -> None:
+        tmp = self._meta_path(key).with_suffix(f".json.tmp-{os.getpid()}-{threading.get_ident()}")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_path(key))
+
+
+    def lookup(self, file: Path) -> Optional[str]:
+        """
+        Return the cache key for a file if a valid entry exists.
+
+        The sidecar is only rewritten when the file was touched or the entry's
+        last access is older than `_ACCESS_RESOLUTION_SECONDS`.
+
+        Args:
+            file (Path): Input file.
+
+        Returns:
+            str | None: Cache key, or None on a miss.
+        """
+        key = self._key(file)
+        meta = self._read_meta(key)
+        if meta is None or not self._data_path(key).exists():
+            return None
+        stat = file.stat()
+        if meta["size"] != stat.st_size:
+            return None
+        changed = False
+        if meta["mtime_ns"] != stat.st_mtime_ns:
+            # Touched but possibly unchanged: fall back to the content hash
+            if meta["digest"] != file_digest(file):
+                return None
+            meta["mtime_ns"], changed = stat.st_mtime_ns, True
+        now = time.time()
+        if changed or now - meta["last_access"] > _ACCESS_RESOLUTION_SECONDS:
+            meta["last_access"] = now
+            self._write_meta(key, meta)
+        return key
+
+
+    def read(self, key: str, start_row: int = 0) -> Iterator[pd.DataFrame]:
+        """
+        Stream the cached chunks of an entry through a memory map.
+
+        Args:
+            key (str): Cache key returned by `lookup`.
+            start_row (int): Number of leading rows to skip.
+
+        Yields:
+            pd.DataFrame: A cached chunk.
+        """
+        with pa.memory_map(str(self._data_path(key)), "r") as source:
+            for batch in pa.ipc.open_stream(source):
+                if start_row:
+                    batch, start_row = batch.slice(min(start_row, batch.num_rows)), max(0, start_row - batch.num_rows)
+                    if not batch.num_rows:
+                        continue
+                yield pa.Table.from_batches([batch]).to_pandas(split_blocks=True)
+
+
+    def write_through(self, file: Path, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Pass chunks through while storing them as a new cache entry.
+
+        The entry only becomes visible once the source is fully consumed; an
+        error or an early close discards the partial file.
+
+        Args:
+            file (Path): Input file the chunks were parsed from.
+            chunks (Iterator[pd.DataFrame]): Parsed chunks.
+
+        Yields:
+            pd.DataFrame: The unchanged chunks.
+        """
+        key = self._key(file)
+        stat = file.stat()
+        tmp = self._data_path(key).with_suffix(f".arrows.tmp-{os.getpid()}-{id(chunks)}")
+        sink, writer, schema, rows = None, None, None, 0
+        caching, committed = True, False
+        try:
+            for chunk in chunks:
+                if caching:
+                    try:
+                        batch = pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False)
+                        if writer is None:
+                            schema = batch.schema
+                            sink = pa.OSFile(str(tmp), "wb")
+                            writer = pa.ipc.new_stream(sink, schema)
+                        writer.write_batch(batch)
+                    except (pa.ArrowException, ValueError, TypeError) as e:
+                        self.logger.warning(f"Not caching {file.name}: chunk does not fit the cached schema ({e})")
+                        writer, sink = self._close(writer, sink, tmp)
+                        caching = False
+                rows += len(chunk)
+                yield chunk
+            if writer is not None:
+                writer.close()
+                sink.close()
+                data_bytes = tmp.stat().st_size
+                os.replace(tmp, self._data_path(key))
+                self._write_meta(key, {
+                    "file": str(file.resolve()),
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "digest": file_digest(file),
+                    "params": self.params,
+                    "rows": rows,
+                    "bytes": data_bytes,
+                    "created": time.time(),
+                    "last_access": time.time(),
+                })
+                committed = True
+                self.logger.info(f"Cached {rows} rows of {file.name} in {self._data_path(key)}")
+        finally:
+            if not committed:
+                self._close(writer, sink, tmp)
+        self.evict()
+
+
+    @staticmethod
+    def _close(writer: Any, sink: Any, tmp: Path) -> tuple:
+        try:
+            if writer is not None:
+                writer.close()
+            if sink is not None:
+                sink.close()
+        finally:
+            tmp.unlink(missing_ok=True)
+        return None, None
+
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Return the metadata of every cache entry, most recently used first."""
+        entries = []
+        for meta_path in self.directory.glob("*.json"):
+            meta = self._read_meta(meta_path.stem)
+            if meta is not None:
+                entries.append({"key": meta_path.stem, **meta})
+        return sorted(entries, key=lambda e: e["last_access"], reverse=True)
+
+
+    def remove(self, key: str) -> None:
+        self._meta_path(key).unlink(missing_ok=True)
+        self._data_path(key).unlink(missing_ok=True)
+
+
+    def evict(self) -> int:
+        """
+        Drop entries older than `max_age_days`, then the least recently used
+        ones until the cache fits `max_size_mb`.
+
+        Returns:
+            int: Number of evicted entries.
+        """
+        now, total, evicted = time.time(), 0, 0
+        for entry in self.entries():
+            expired = self.max_age_seconds is not None and now - entry["last_access"] > self.max_age_seconds
+            oversized = self.max_size_bytes is not None and total + entry["bytes"] > self.max_size_bytes
+            if expired or oversized:
+                self.remove(entry["key"])
+                evicted += 1
+            else:
+                total += entry["bytes"]
+        if evicted:
+            self.logger.info(f"Evicted {evicted} ingest cache entries from {self.directory}")
+        return evicted
+
+
+    def purge(self, older_than_days: Optional[float] = None) -> int:
+        """
+        Remove all entries, or only those unused for `older_than_days`.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        now, removed = time.time(), 0
+        for entry in self.entries():
+            if older_than_days is None or now - entry["last_access"] > older_than_days * 86400:
+                self.remove(entry["key"])
+                removed += 1
+        for tmp in self.directory.glob("*.tmp-*"):
+            tmp.unlink(missing_ok=True)
+        return removed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect or purge the ingest cache.")
+    parser.add_argument("--directory", default=os.path.join("artifacts", "ingest_cache"), help="Cache directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("info", help="List cache entries")
+    purge = commands.add_parser("purge", help="Remove cache entries")
+    purge.add_argument("--older-than-days", type=float, default=None, help="Only remove entries unused for this long")
+    args = parser.parse_args(argv)
+
+    cache = IngestCache(args.directory)
+    if args.command == "info":
+        entries = cache.entries()
+        for entry in entries:
+            last_access = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["last_access"]))
+            print(f"{entry['key']}  {entry['bytes'] / 1e6:10.2f} MB  {entry['rows']:>12} rows  {last_access}  {entry['file']}")
+        print(f"{len(entries)} entries, {sum(e['bytes'] for e in entries) / 1e6:.2f} MB in {cache.directory}")
+    else:
+        removed = cache.purge(args.older_than_days)
+        print(f"Removed {removed} entries from {cache.directory}")
+
+
+if __name__ == "__main__":
+    main()
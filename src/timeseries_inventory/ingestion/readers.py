@@ -0,0 +1,255 @@
+import pandas as pd
+from pathlib import Path
+from typing import Optional, Dict, Iterator, Any
+from timeseries_inventory.data_config.data_stages_config import DataIngestionConfig
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as pa_feather
+    import pyarrow.parquet as pa_parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+
+"""
+Pluggable chunk readers used by FileLoader.
+
+The backend is picked from `data_ingestion.input.format` / `engine`:
+
+    format: csv,     engine: pandas   -> PandasCSVReader (default)
+    format: csv,     engine: pyarrow  -> ArrowCSVReader
+    format: parquet                   -> ParquetReader
+    format: feather                   -> FeatherReader
+
+Every reader applies the declared `schema` (dtypes + datetime column) so that
+chunks come out with the same compact dtypes regardless of the backend, and
+can start at a row offset so an interrupted ingest resumes mid-file.
+"""
+
+__all__ = [
+    "BaseReader",
+    "PandasCSVReader",
+    "ArrowCSVReader",
+    "ParquetReader",
+    "FeatherReader",
+    "apply_schema",
+    "get_reader",
+]
+
+
+# Resolution of the datetime column, identical for every backend
+_DATETIME_DTYPE = "datetime64[ns]"
+
+
+def apply_schema(
+    chunk: pd.DataFrame,
+    dtypes: Dict[str, str],
+    datetime_column: Optional[str] = None
+    ) -> pd.DataFrame:
+    """
+    Cast the columns of a chunk to the declared dtypes.
+
+    Columns missing from the chunk are ignored and columns that already have
+    the requested dtype are left untouched, so this is cheap for backends that
+    decode straight into the target types. A timezone-naive datetime column
+    is pinned to `datetime64[ns]`, whatever resolution the backend decoded it
+    to.
+
+    Args:
+        chunk (pd.DataFrame): Chunk to cast.
+        dtypes (dict): Mapping of column name to pandas dtype string.
+        datetime_column (str, optional): Column to parse as datetime64.
+
+    Returns:
+        pd.DataFrame: The chunk with pinned dtypes.
+    """
+    casts = {
+        column: dtype for column, dtype in dtypes.items()
+        if column in chunk.columns and column != datetime_column and str(chunk[column].dtype) != dtype
+    }
+    if casts:
+        chunk = chunk.astype(casts)
+    if datetime_column and datetime_column in chunk.columns:
+        dates = chunk[datetime_column]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, cache=True)
+        if pd.api.types.is_datetime64_dtype(dates) and dates.dtype != _DATETIME_DTYPE:
+            dates = dates.astype(_DATETIME_DTYPE)
+        if dates is not chunk[datetime_column]:
+            chunk[datetime_column] = dates
+    return chunk
+
+
+def _require_pyarrow(backend: str) -> None:
+    if pa is None:
+        raise ImportError(f"pyarrow is required for the '{backend}' ingestion backend")
+
+
+def _arrow_type(dtype: str) -> Any:
+    """Translate a pandas dtype string into the matching Arrow type."""
+    if dtype == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    if dtype in ("str", "object"):
+        return pa.string()
+    if dtype.startswith("datetime64"):
+        return pa.timestamp("ns")
+    return pa.type_for_alias(dtype)
+
+
+class BaseReader:
+    """
+    Reads one file as an iterator of DataFrame chunks.
+
+    Args:
+        config (DataIngestionConfig): Configuration object loaded from YAML
+        read_args (dict, optional): Backend specific read arguments
+    """
+
+    def __init__(
+        self,
+        config: DataIngestionConfig,
+        read_args: Optional[Dict] = None
+        ):
+        self.chunksize = config.chunksize
+        self.dtypes = dict(config.dtypes)
+        self.datetime_column = config.datetime_column
+        self.read_args = read_args or {}
+
+
+    def read(self, file: Path, start_row: int = 0) -> Iterator[pd.DataFrame]:
+        """
+        Yield the chunks of a file.
+
+        Args:
+            file (Path): File to read.
+            start_row (int): Number of leading data rows to skip.
+
+        Yields:
+            pd.DataFrame: A chunk of at most `chunksize` rows.
+        """
+        raise NotImplementedError
+
+
+    def _to_frame(self, table: Any) -> pd.DataFrame:
+        return apply_schema(table.to_pandas(), self.dtypes, self.datetime_column)
+
+
+class PandasCSVReader(BaseReader):
+    """Chunked `pandas.read_csv` with the declared dtypes passed to the parser."""
+
+    def read(self, file: Path, start_row: int = 0) -> Iterator[pd.DataFrame]:
+        dtype = {k: v for k, v in self.dtypes.items() if k != self.datetime_column}
+        read_args = {"dtype": dtype or None, **self.read_args}
+        if start_row:
+            # Keep the header line, skip the already ingested data rows
+            read_args["skiprows"] = range(1, start_row + 1)
+        for chunk in pd.read_csv(file, chunksize = self.chunksize, **read_args):
+            if len(chunk):
+                yield apply_schema(chunk, self.dtypes, self.datetime_column)
+
+
+class ArrowCSVReader(BaseReader):
+    """
+    Multithreaded PyArrow CSV reader.
+
+    Arrow decodes blocks in parallel straight into the declared column types
+    (dictionary-encoded strings become `category`), then the record batches
+    are regrouped into chunks of exactly `chunksize` rows.
+    """
+
+    def __init__(self, config: DataIngestionConfig, read_args: Optional[Dict] = None):
+        _require_pyarrow("pyarrow csv")
+        super().__init__(config, read_args)
+
+
+    def read(self, file: Path, start_row: int = 0) -> Iterator[pd.DataFrame]:
+        column_types = {column: _arrow_type(dtype) for column, dtype in self.dtypes.items()}
+        if self.datetime_column:
+            column_types[self.datetime_column] = pa.timestamp("ns")
+        read_options = {"use_threads": True, "skip_rows_after_names": start_row, **self.read_args.get("read_options", {})}
+        reader = pa_csv.open_csv(
+            file,
+            read_options = pa_csv.ReadOptions(**read_options),
+            convert_options = pa_csv.ConvertOptions(column_types=column_types),
+        )
+        pending, rows = [], 0
+        for batch in reader:
+            pending.append(batch)
+            rows += batch.num_rows
+            while rows >= self.chunksize:
+                table = pa.Table.from_batches(pending)
+                yield self._to_frame(table.slice(0, self.chunksize))
+                rest = table.slice(self.chunksize)
+                pending, rows = rest.to_batches(), rest.num_rows
+        if rows:
+            yield self._to_frame(pa.Table.from_batches(pending))
+
+
+class ParquetReader(BaseReader):
+    """Streams row batches out of a Parquet file without loading the whole file."""
+
+    def __init__(self, config: DataIngestionConfig, read_args: Optional[Dict] = None):
+        _require_pyarrow("parquet")
+        super().__init__(config, read_args)
+
+
+    def read(self, file: Path, start_row: int = 0) -> Iterator[pd.DataFrame]:
+        parquet_file = pa_parquet.ParquetFile(file, memory_map=True)
+        # Skip whole row groups before the offset without decoding them
+        row_groups, skip = [], start_row
+        for index in range(parquet_file.num_row_groups):
+            group_rows = parquet_file.metadata.row_group(index).num_rows
+            if not row_groups and skip >= group_rows:
+                skip -= group_rows
+                continue
+            row_groups.append(index)
+        if not row_groups:
+            return
+        batches = parquet_file.iter_batches(
+            batch_size=self.chunksize, row_groups=row_groups, use_threads=True, **self.read_args
+        )
+        for batch in batches:
+            if skip:
+                batch, skip = batch.slice(min(skip, batch.num_rows)), max(0, skip - batch.num_rows)
+                if not batch.num_rows:
+                    continue
+            yield self._to_frame(pa.Table.from_batches([batch]))
+
+
+class FeatherReader(BaseReader):
+    """Reads a Feather (Arrow IPC) file through a memory map and slices it into chunks."""
+
+    def __init__(self, config: DataIngestionConfig, read_args: Optional[Dict] = None):
+        _require_pyarrow("feather")
+        super().__init__(config, read_args)
+
+
+    def read(self, file: Path, start_row: int = 0) -> Iterator[pd.DataFrame]:
+        table = pa_feather.read_table(file, memory_map=True, **self.read_args).slice(start_row)
+        for batch in table.to_batches(max_chunksize=self.chunksize):
+            yield self._to_frame(pa.Table.from_batches([batch]))
+
+
+def get_reader(config: DataIngestionConfig, read_args: Optional[Dict] = None) -> BaseReader:
+    """
+    Build the reader backend selected by the ingestion config.
+
+    Args:
+        config (DataIngestionConfig): Configuration object loaded from YAML
+        read_args (dict, optional): Backend specific read arguments
+
+    Returns:
+        BaseReader: The configured reader.
+    """
+    if config.format == "csv":
+        if config.engine == "pandas":
+            return PandasCSVReader(config, read_args)
+        if config.engine == "pyarrow":
+            return ArrowCSVReader(config, read_args)
+        raise ValueError(f"Unsupported csv engine '{config.engine}', expected 'pandas' or 'pyarrow'")
+    if config.format == "parquet":
+        return ParquetReader(config, read_args)
+    if config.format == "feather":
+        return FeatherReader(config, read_args)
+    raise ValueError(f"Unsupported input format '{config.format}', expected 'csv', 'parquet' or 'feather'")
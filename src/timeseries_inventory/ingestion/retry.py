@@ -0,0 +1,23 @@
+import random
+from timeseries_inventory.data_config.data_stages_config import DataIngestionConfig
+
+
+def backoff_delay(config: DataIngestionConfig, failures: int) -> float:
+    """
+    Delay before the next attempt after `failures` consecutive failures.
+
+    Exponential backoff starting at `retry.delay_seconds`, capped at
+    `retry.max_delay_seconds`, with equal jitter when `retry.jitter` is set so
+    concurrent readers do not retry in lockstep.
+
+    Args:
+        config (DataIngestionConfig): Configuration object loaded from YAML
+        failures (int): Number of consecutive failures so far (>= 1).
+
+    Returns:
+        float: Seconds to sleep.
+    """
+    delay = min(config.max_delay_seconds, config.delay_seconds * 2 ** (failures - 1))
+    if config.jitter:
+        delay = random.uniform(delay / 2, delay)
+    return delay
@@ -1 +1,80 @@
 # main.py placeholder 
+from pathlib import Path
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Union
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from timeseries_inventory.utils.custom_logging import configure_logging
+from timeseries_inventory.utils import monitoring
+from timeseries_inventory.data_config.data_stages_config import ServingConfig
+from timeseries_inventory.data_config.data_stages_manager import DataStagesManager
+from timeseries_inventory.services.model_registry import ModelRegistry
+from timeseries_inventory.services.inventory import InventoryService
+from timeseries_inventory.api.v1.endpoints import inventory
+
+
+"""
+Forecast serving application.
+
+    uvicorn timeseries_inventory.main:app
+
+The model registry and the forecast service are created once per process;
+the configured model version is loaded at start-up so the first request
+does not pay for it.
+
+`GET /metrics` serves the request, cache, micro-batching and process
+metrics in the Prometheus text format.
+"""
+
+__all__ = ["create_app", "app"]
+
+
+def create_app(data_path: Optional[Union[str, Path]] = None, config: Optional[ServingConfig] = None) -> FastAPI:
+    """
+    Build the API application.
+
+    Args:
+        data_path (str | Path, optional): YAML config, defaults to data_path.yaml
+        config (ServingConfig, optional): Serving settings, instead of the `serving` section of the YAML config.
+    """
+    manager = DataStagesManager(data_path)
+    logging_config = manager.logging_config()
+    logger = configure_logging(logging_config.mode, logging_config.format, logging_config.level, logging_config.sampling, logging_config.console)
+    config = config or manager.serving_config()
+    monitoring.configure(manager.monitoring_config().enabled)
+    registry = ModelRegistry(config)
+    service = InventoryService(registry, config)
+
+    def serving_samples():
+        yield ("serving_resident_series_bytes", "gauge", "Series state paged into memory.", {}, registry.resident_bytes)
+        yield ("forecast_cache_entries", "gauge", "Forecasts in the result cache.", {}, len(service.cache))
+        yield ("forecast_cache_hits_total", "counter", "Forecast cache hits.", {}, service.cache.hits)
+        yield ("forecast_cache_misses_total", "counter", "Forecast cache misses.", {}, service.cache.misses)
+        if service.batcher is not None:
+            yield ("micro_batches_total", "counter", "Micro-batches scored.", {}, service.batcher.batches)
+            yield ("micro_batch_items_total", "counter", "Requests scored in micro-batches.", {}, service.batcher.items)
+
+    monitoring.REGISTRY.add_collector("serving", serving_samples)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        try:
+            registry.get()
+        except LookupError as error:
+            logger.warning(f"No model loaded at start-up: {error}")
+        yield
+
+    app = FastAPI(title="Timeseries Inventory", lifespan=lifespan)
+    app.state.serving_config = config
+    app.state.inventory_service = service
+    app.include_router(inventory.router, prefix="/api/v1")
+    app.add_middleware(monitoring.MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics() -> PlainTextResponse:
+        return PlainTextResponse(monitoring.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    return app
+
+
+app = create_app()
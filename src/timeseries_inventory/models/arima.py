@@ -1 +1,309 @@
-# arima.py placeholder 
+# arima.py placeholder
+import os
+import json
+import time
+import signal
+import warnings
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from multiprocessing import shared_memory
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from timeseries_inventory.utils.custom_logging import custom_logger
+from timeseries_inventory.data_config.data_stages_config import ModelTrainingConfig
+from timeseries_inventory.models.series import collect_series
+
+try:
+    from statsmodels.tsa.arima.model import ARIMA
+except ImportError:  # pragma: no cover - optional dependency
+    ARIMA = None
+
+
+"""
+Batch ARIMA training, one model per series.
+
+The chunk stream is gathered into a single float64 array sorted by series
+and date, which is placed in shared memory; worker processes attach to it by
+name and slice out their series, so no DataFrame is ever pickled. Series are
+sharded across a process pool, every fit runs under a per-series alarm
+(`timeout_seconds`), and fitted parameters are stored so the next refit can
+start the optimizer from them (`warm_start`).
+
+The alarm is a SIGALRM, which only the main thread of a process receives.
+Pool workers always fit on their main thread; with `workers: 1` the fits run
+in-process only when called from the main thread, otherwise (e.g. from a
+pipeline stage thread) a single worker process is used so the timeout still
+applies. On platforms without `signal.setitimer` (Windows) fits are not
+timed out.
+"""
+
+__all__ = ["ArimaTrainer", "ArimaParamStore", "SeriesFit", "train_arima"]
+
+
+DEFAULTS: Dict[str, Any] = {
+    "target_column": "value",
+    "date_column": "date",
+    "series_columns": [],
+    "order": [1, 1, 1],
+    "seasonal_order": [0, 0, 0, 0],
+    "workers": os.cpu_count() or 1,
+    "timeout_seconds": 30,
+    "maxiter": 50,
+    "min_observations": 10,
+    "warm_start": True,
+    "params_path": "data/models/arima_params.json",
+}
+
+# Shards per worker, so long series do not leave the other workers idle at the end
+_SHARDS_PER_WORKER = 4
+
+
+@dataclass
+class SeriesFit:
+    """Outcome of fitting one series; `status` is 'ok', 'failed', 'timeout' or 'skipped'."""
+    series: str
+    status: str
+    n_obs: int
+    params: List[float] = field(default_factory=list)
+    param_names: List[str] = field(default_factory=list)
+    aic: Optional[float] = None
+    seconds: float = 0.0
+    warm_started: bool = False
+    error: Optional[str] = None
+
+
+class _SeriesTimeout(BaseException):
+    # Not an Exception: statsmodels wraps parts of the optimisation in broad
+    # `except Exception` blocks, which would swallow the alarm and keep fitting
+    pass
+
+
+def _raise_timeout(signum: int, frame: Any) -> None:
+    raise _SeriesTimeout()
+
+
+def _fit_series(
+    label: str,
+    y: np.ndarray,
+    start_params: Optional[List[float]],
+    settings: Dict[str, Any],
+    use_alarm: bool
+    ) -> SeriesFit:
+    n_obs = int(np.count_nonzero(~np.isnan(y)))
+    if n_obs < settings["min_observations"]:
+        return SeriesFit(label, "skipped", n_obs)
+    started = time.perf_counter()
+    try:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, settings["timeout_seconds"])
+        with warnings.catch_warnings():
+            # Convergence warnings are expected on short or flat series
+            warnings.simplefilter("ignore")
+            model = ARIMA(y, order=tuple(settings["order"]), seasonal_order=tuple(settings["seasonal_order"]))
+            result = model.fit(start_params=start_params, method_kwargs={"maxiter": settings["maxiter"]})
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        return SeriesFit(
+            label, "ok", n_obs,
+            params=[float(p) for p in result.params],
+            param_names=list(model.param_names),
+            aic=float(result.aic),
+            seconds=time.perf_counter() - started,
+            warm_started=start_params is not None,
+        )
+    except _SeriesTimeout:
+        return SeriesFit(label, "timeout", n_obs, seconds=time.perf_counter() - started)
+    except Exception as e:
+        return SeriesFit(label, "failed", n_obs, seconds=time.perf_counter() - started, error=repr(e))
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _fit_shard(
+    shm_name: str,
+    length: int,
+    shard: List[Tuple[str, int, int, Optional[List[float]]]],
+    settings: Dict[str, Any]
+    ) -> List[SeriesFit]:
+    """
+    Worker entry point: fit every series of a shard from the shared value array.
+    Kept at module level so it can be shipped to a process pool.
+
+    Args:
+        shm_name (str): Name of the shared memory block holding the values.
+        length (int): Number of float64 values in the block.
+        shard (list): `(label, start, end, start_params)` per series.
+        settings (dict): ARIMA settings.
+    """
+    # SIGALRM can only be handled on the main thread (always the case in pool workers)
+    use_alarm = bool(settings["timeout_seconds"]) and hasattr(signal, "setitimer") \
+        and threading.current_thread() is threading.main_thread()
+    previous_handler = signal.signal(signal.SIGALRM, _raise_timeout) if use_alarm else None
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        values = np.ndarray((length,), dtype=np.float64, buffer=shm.buf)
+        fits = [
+            _fit_series(label, values[start:end].copy(), start_params, settings, use_alarm)
+            for label, start, end, start_params in shard
+        ]
+        del values
+        return fits
+    finally:
+        shm.close()
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous_handler)
+
+
+class ArimaParamStore:
+    """
+    JSON store of fitted parameters per series, used to warm-start refits.
+
+    Parameters are only reused while `order` and `seasonal_order` are unchanged.
+
+    Args:
+        path (str | Path): Store file, e.g. 'data/models/arima_params.json'.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.logger = custom_logger()
+
+
+    def load(self) -> Dict[str, Any]:
+        if not self.path.exists():
+            return {}
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            self.logger.warning(f"Ignoring unreadable ARIMA parameter store: {self.path}")
+            return {}
+
+
+    def start_params(self, order: List[int], seasonal_order: List[int]) -> Dict[str, List[float]]:
+        """Return the stored parameters by series, if they were fitted with the same orders."""
+        stored = self.load()
+        if stored.get("order") != list(order) or stored.get("seasonal_order") != list(seasonal_order):
+            return {}
+        return {label: entry["params"] for label, entry in stored.get("series", {}).items()}
+
+
+    def save(self, fits: Dict[str, SeriesFit], order: List[int], seasonal_order: List[int]) -> None:
+        """Merge successful fits into the store; series that failed keep their previous parameters."""
+        stored = self.load()
+        if stored.get("order") != list(order) or stored.get("seasonal_order") != list(seasonal_order):
+            stored = {}
+        series = stored.get("series", {})
+        for label, fit in fits.items():
+            if fit.status == "ok":
+                series[label] = {"params": fit.params, "param_names": fit.param_names, "aic": fit.aic, "n_obs": fit.n_obs}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".tmp-{os.getpid()}")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"order": list(order), "seasonal_order": list(seasonal_order), "updated": time.time(), "series": series}, f)
+        os.replace(tmp, self.path)
+
+
+class ArimaTrainer:
+    """
+    Fits one ARIMA model per series of a chunk stream on a process pool.
+
+    Args:
+        config (ModelTrainingConfig): Configuration object loaded from YAML; settings come from `model_training.arima`.
+    """
+
+    def __init__(self, config: ModelTrainingConfig):
+        if ARIMA is None:
+            raise ImportError("statsmodels is required for ARIMA training: pip install statsmodels")
+        self.config = config
+        self.settings = {**DEFAULTS, **config.arima}
+        self.store = ArimaParamStore(self.settings["params_path"])
+        self.logger = custom_logger()
+
+
+    def _shards(
+        self,
+        labels: List[str],
+        offsets: np.ndarray,
+        start_params: Dict[str, List[float]],
+        n_shards: int
+        ) -> List[List[Tuple[str, int, int, Optional[List[float]]]]]:
+        """Deal the series out longest first, so every shard gets a similar amount of work."""
+        shards: List[List[Tuple[str, int, int, Optional[List[float]]]]] = [[] for _ in range(n_shards)]
+        lengths = np.diff(offsets)
+        for rank, i in enumerate(np.argsort(-lengths, kind="stable")):
+            label = labels[i]
+            shards[rank % n_shards].append((label, int(offsets[i]), int(offsets[i + 1]), start_params.get(label)))
+        return [shard for shard in shards if shard]
+
+
+    @staticmethod
+    def _needs_worker_process(settings: Dict[str, Any]) -> bool:
+        """Whether in-process fits would run without their alarm (called off the main thread)."""
+        return bool(settings["timeout_seconds"]) and hasattr(signal, "setitimer") \
+            and threading.current_thread() is not threading.main_thread()
+
+
+    def fit(self, chunks: Iterator[pd.DataFrame]) -> Dict[str, SeriesFit]:
+        """
+        Fit every series of the stream and update the parameter store.
+
+        Args:
+            chunks (Iterator[pd.DataFrame]): Feature chunks holding the series and target columns.
+
+        Returns:
+            dict: SeriesFit by series label.
+        """
+        labels, values, offsets = collect_series(
+            chunks,
+            self.settings["target_column"],
+            list(self.settings["series_columns"]),
+            self.settings["date_column"]
+        )
+        if not labels:
+            self.logger.warning("No series to fit ARIMA models on")
+            return {}
+        order, seasonal_order = self.settings["order"], self.settings["seasonal_order"]
+        start_params = self.store.start_params(order, seasonal_order) if self.settings["warm_start"] else {}
+        workers = max(1, min(int(self.settings["workers"]), len(labels)))
+        shards = self._shards(labels, offsets, start_params, workers * _SHARDS_PER_WORKER)
+        settings = {key: self.settings[key] for key in ("order", "seasonal_order", "timeout_seconds", "maxiter", "min_observations")}
+        self.logger.info(f"Fitting ARIMA{tuple(order)} on {len(labels)} series ({len(values)} rows) with {workers} workers")
+
+        started = time.perf_counter()
+        fits: Dict[str, SeriesFit] = {}
+        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        try:
+            np.ndarray(values.shape, dtype=np.float64, buffer=shm.buf)[:] = values
+            del values
+            if workers == 1 and not self._needs_worker_process(settings):
+                for shard in shards:
+                    fits.update((fit.series, fit) for fit in _fit_shard(shm.name, int(offsets[-1]), shard, settings))
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(_fit_shard, shm.name, int(offsets[-1]), shard, settings) for shard in shards]
+                    for future in as_completed(futures):
+                        fits.update((fit.series, fit) for fit in future.result())
+        finally:
+            shm.close()
+            shm.unlink()
+
+        statuses = pd.Series([fit.status for fit in fits.values()]).value_counts().to_dict()
+        warm = sum(fit.warm_started for fit in fits.values() if fit.status == "ok")
+        self.logger.info(f"Fitted {len(fits)} ARIMA series in {time.perf_counter() - started:.1f}s: {statuses}, {warm} warm-started")
+        problems = [fit for fit in fits.values() if fit.status in ("failed", "timeout")]
+        for fit in problems[:10]:
+            self.logger.warning(f"ARIMA fit for series '{fit.series}' {fit.status}: {fit.error or ''}")
+        if len(problems) > 10:
+            self.logger.warning(f"... and {len(problems) - 10} more failed or timed out ARIMA series")
+        self.store.save(fits, order, seasonal_order)
+        return fits
+
+
+def train_arima(config: ModelTrainingConfig, chunks: Iterator[pd.DataFrame]) -> Dict[str, SeriesFit]:
+    """Training entry point registered for `model_training.model.type: arima`."""
+    return ArimaTrainer(config).fit(chunks)
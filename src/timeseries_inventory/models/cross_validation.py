@@ -0,0 +1,341 @@
+import os
+import json
+import time
+import shutil
+import resource
+import dataclasses
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from timeseries_inventory.utils.custom_logging import custom_logger
+from timeseries_inventory.data_config.data_stages_config import ModelEvaluationConfig, ModelTrainingConfig
+from timeseries_inventory.models.global_model import GlobalModelTrainer
+from timeseries_inventory.models.metrics import POINT_METRICS, mase, naive_scale, pinball
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # pragma: no cover - optional dependency
+    threadpool_limits = None
+
+
+"""
+Rolling-origin cross-validation of the global model.
+
+The feature stream is written once, sorted by date, to memory-mapped `.npy`
+files under `model_evaluation.evaluation.directory`: the feature matrix, the
+target, the date of every row, the codes of the categorical columns and the
+series code of every row (one code per combination of `series_columns`, the
+unit MASE is scaled by).
+Because rows are in time order, every fold is just two row ranges (train and
+test), and the fold workers, separate processes, open the same files
+read-only: the operating system shares the pages between them instead of
+every worker receiving its own pickled copy of the data.
+
+Fold `k` of `n_splits` tests the `horizon` periods ending `n_splits - k - 1`
+horizons before the latest date. `window: expanding` trains on all earlier
+periods, `window: rolling` on the last `train_window` periods only. Every fold
+reports its metrics, wall time and peak resident memory.
+"""
+
+__all__ = ["Fold", "TimeSeriesCrossValidator"]
+
+
+@dataclasses.dataclass(frozen=True)
+class Fold:
+    """Row ranges of one fold in the date-sorted matrix."""
+    index: int
+    train_start: int
+    train_end: int
+    test_end: int
+
+
+def _reset_peak_rss() -> None:
+    """Restart the peak resident memory count of this process (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as handle:
+            handle.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident memory since the last reset; the process lifetime peak where that is unsupported."""
+    try:
+        with open("/proc/self/status") as handle:
+            for line in handle:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 2 ** 10
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 10
+
+
+def _columns(directory: Path, names: List[str]) -> Dict[str, np.ndarray]:
+    return {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in names}
+
+
+def _evaluate_fold(directory: Path, fold: Fold, layout: Dict[str, Any], evaluation: ModelEvaluationConfig, training: ModelTrainingConfig) -> Dict[str, Any]:
+    """
+    Fit the global model on the train rows of a fold and score the test rows.
+
+    Runs in a worker process; the data is read from the shared memory-mapped files.
+    """
+    started = time.perf_counter()
+    _reset_peak_rss()
+    categorical = layout["categorical_columns"]
+    arrays = _columns(directory, ["X", "y", *[f"code_{column}" for column in categorical]])
+
+    # The trainer reads the train rows straight from the shared files; the model input is built once per fit.
+    # Category codes stand in for the category values; the encodings only need them to be consistent
+    train = slice(fold.train_start, fold.train_end)
+    y_train = arrays["y"][train]
+    categorical_train = {
+        column: ({code: code for code in range(layout["categories"][column])}, arrays[f"code_{column}"][train])
+        for column in categorical
+    }
+    test_rows = slice(fold.train_end, fold.test_end)
+    test = pd.DataFrame(np.asarray(arrays["X"][test_rows]), columns=layout["feature_columns"])
+    for column in categorical:
+        test[column] = np.asarray(arrays[f"code_{column}"][test_rows])
+    actual = np.asarray(arrays["y"][test_rows], dtype="float64")
+
+    def fit_predict(quantile: Optional[float]) -> np.ndarray:
+        settings = {
+            **training.global_model,
+            "feature_columns": layout["feature_columns"],
+            "quantile": quantile,
+            "path": str(directory / f"fold-{fold.index}-{quantile}.pkl"),
+        }
+        trainer = GlobalModelTrainer(dataclasses.replace(training, global_model=settings))
+        model = trainer.fit_arrays(layout["feature_columns"], arrays["X"][train], y_train, categorical_train)
+        Path(settings["path"]).unlink(missing_ok=True)
+        return model.predict(test)
+
+    forecast = fit_predict(None)
+    result: Dict[str, Any] = {
+        "fold": fold.index,
+        "train_rows": fold.train_end - fold.train_start,
+        "test_rows": fold.test_end - fold.train_end,
+    }
+    for name in evaluation.metrics:
+        if name in POINT_METRICS:
+            result[name] = POINT_METRICS[name](actual, forecast)
+        elif name == "mase":
+            series = _columns(directory, ["series"])["series"]
+            codes_train = np.asarray(series[fold.train_start:fold.train_end])
+            codes_test = np.asarray(series[fold.train_end:fold.test_end])
+            keyed = codes_train >= 0
+            scale = naive_scale(np.asarray(y_train, dtype="float64")[keyed], codes_train[keyed])
+            known = (codes_test >= 0) & (codes_test < len(scale))
+            per_row = np.full(len(test), np.nan)
+            per_row[known] = scale[codes_test[known]]
+            result["mase"] = mase(actual, forecast, per_row)
+        elif name == "pinball":
+            for quantile in evaluation.quantiles:
+                result[f"pinball_{quantile:g}"] = pinball(actual, fit_predict(float(quantile)), float(quantile))
+        else:
+            raise ValueError(f"Unknown evaluation metric '{name}'")
+
+    result["seconds"] = time.perf_counter() - started
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+def _run_fold(directory: Path, fold: Fold, layout: Dict[str, Any], evaluation: ModelEvaluationConfig, training: ModelTrainingConfig, threads: int) -> Dict[str, Any]:
+    """Worker entry point: cap the native thread pools so concurrent folds do not oversubscribe the CPUs."""
+    if threadpool_limits is None:
+        return _evaluate_fold(directory, fold, layout, evaluation, training)
+    with threadpool_limits(limits=threads):
+        return _evaluate_fold(directory, fold, layout, evaluation, training)
+
+
+class TimeSeriesCrossValidator:
+    """
+    Evaluates the global model with parallel rolling-origin folds.
+
+    Args:
+        config (ModelEvaluationConfig): Configuration object loaded from YAML.
+        training (ModelTrainingConfig): Training configuration; the model settings come
+            from `model_training.global_model`, tree hyperparameters from `model.hyperparameters`.
+    """
+
+    # Rows gathered at a time when sorting the spilled matrix by date
+    BLOCK_ROWS = 1_000_000
+
+
+    def __init__(self, config: ModelEvaluationConfig, training: ModelTrainingConfig):
+        if config.window not in ("expanding", "rolling"):
+            raise ValueError(f"Unknown cross-validation window '{config.window}', expected 'expanding' or 'rolling'")
+        if config.window == "rolling" and not config.train_window:
+            raise ValueError("A rolling cross-validation window needs `train_window`")
+        self.config = config
+        self.training = training
+        self.trainer = GlobalModelTrainer(training)
+        self.logger = custom_logger()
+
+
+    @staticmethod
+    def _series_codes(chunk: pd.DataFrame, series_columns: List[str], ids: Dict[Tuple, int]) -> np.ndarray:
+        """Series code of every row, stable across chunks through `ids`; -1 for rows with a missing key."""
+        if not series_columns:
+            return np.zeros(len(chunk), dtype=np.int64)
+        local = chunk.groupby(series_columns, sort=False, observed=True, dropna=True).ngroup().to_numpy(dtype="float64", na_value=np.nan)
+        keyed = ~np.isnan(local)
+        local = np.where(keyed, local, -1).astype(np.int64)
+        # First row of every group, in group order
+        _, first = np.unique(local[keyed], return_index=True)
+        keys = chunk[series_columns].iloc[np.flatnonzero(keyed)[first]].itertuples(index=False, name=None)
+        mapping = np.array([ids.setdefault(key, len(ids)) for key in keys], dtype=np.int64)
+        codes = np.full(len(chunk), -1, dtype=np.int64)
+        codes[keyed] = mapping[local[keyed]]
+        return codes
+
+
+    def _spill(self, chunks: Iterator[pd.DataFrame], directory: Path) -> Optional[Dict[str, Any]]:
+        """
+        Write the rows with a known target to the memory-mapped files, sorted by date.
+
+        Returns:
+            dict | None: Column layout of the files; None when the stream holds no rows.
+        """
+        settings = self.trainer.settings
+        target, categorical = settings["target_column"], list(settings["categorical_columns"])
+        feature_columns: Optional[List[str]] = None
+        categories: Dict[str, Dict[Any, int]] = {column: {} for column in categorical}
+        series_columns = list(self.config.series_columns)
+        series_ids: Dict[Tuple, int] = {}
+        names = ["X", "y", "t", "series", *[f"code_{column}" for column in categorical]]
+        raw = {name: open(directory / f"{name}.raw", "wb") for name in names}
+        rows = 0
+        try:
+            for chunk in chunks:
+                if feature_columns is None:
+                    feature_columns = self.trainer.feature_columns(chunk)
+                y = chunk[target].to_numpy(dtype="float64", na_value=np.nan)
+                known = ~np.isnan(y)
+                raw["X"].write(np.ascontiguousarray(chunk[feature_columns].to_numpy(dtype="float32", na_value=np.nan)[known]).tobytes())
+                raw["y"].write(y[known].tobytes())
+                dates = pd.to_datetime(chunk[self.config.date_column]).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+                raw["t"].write(dates[known].tobytes())
+                for column in categorical:
+                    local, uniques = pd.factorize(chunk[column].to_numpy()[known])
+                    mapping = np.array([categories[column].setdefault(u, len(categories[column])) for u in uniques], dtype=np.int64)
+                    codes = np.full(len(local), -1, dtype=np.int64)
+                    codes[local >= 0] = mapping[local[local >= 0]]
+                    raw[f"code_{column}"].write(codes.tobytes())
+                raw["series"].write(self._series_codes(chunk[known], series_columns, series_ids).tobytes())
+                rows += int(known.sum())
+        finally:
+            for handle in raw.values():
+                handle.close()
+        if not rows:
+            return None
+
+        # Sort every file by date through a block-wise gather, so only the permutation is held in memory
+        order = np.argsort(np.fromfile(directory / "t.raw", dtype=np.int64), kind="stable")
+        shapes = {"X": (rows, len(feature_columns)), "y": (rows,), "t": (rows,)}
+        dtypes = {"X": np.float32, "y": np.float64}
+        for name in names:
+            shape, dtype = shapes.get(name, (rows,)), dtypes.get(name, np.int64)
+            source = np.memmap(directory / f"{name}.raw", dtype=dtype, mode="r", shape=shape)
+            target_file = np.lib.format.open_memmap(directory / f"{name}.npy", mode="w+", dtype=dtype, shape=shape)
+            for start in range(0, rows, self.BLOCK_ROWS):
+                target_file[start:start + self.BLOCK_ROWS] = source[order[start:start + self.BLOCK_ROWS]]
+            target_file.flush()
+            del source, target_file
+            (directory / f"{name}.raw").unlink()
+
+        return {
+            "rows": rows,
+            "target_column": target,
+            "feature_columns": feature_columns,
+            "categorical_columns": categorical,
+            "categories": {column: len(categories[column]) for column in categorical},
+            "series": len(series_ids),
+        }
+
+
+    def folds(self, dates: np.ndarray) -> List[Fold]:
+        """
+        Rolling-origin folds over the date-sorted rows.
+
+        Args:
+            dates (np.ndarray): Sorted date of every row.
+
+        Returns:
+            List[Fold]: Folds with at least one train period, oldest first.
+        """
+        periods = np.unique(dates)
+        horizon, n_splits = self.config.horizon, self.config.n_splits
+        folds = []
+        for k in range(n_splits):
+            cut = len(periods) - (n_splits - k) * horizon
+            if cut < 1:
+                continue
+            first = max(cut - self.config.train_window, 0) if self.config.window == "rolling" else 0
+            test_end = periods[cut + horizon] if cut + horizon < len(periods) else None
+            folds.append(Fold(
+                index=k,
+                train_start=int(np.searchsorted(dates, periods[first], side="left")),
+                train_end=int(np.searchsorted(dates, periods[cut], side="left")),
+                test_end=len(dates) if test_end is None else int(np.searchsorted(dates, test_end, side="left")),
+            ))
+        return folds
+
+
+    def _report(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        results = sorted(results, key=lambda row: row["fold"])
+        numeric = [key for key in results[0] if key not in ("fold",)]
+        mean = {key: float(np.nanmean([row[key] for row in results])) for key in numeric}
+        for row in results:
+            self.logger.info("CV fold " + str(row["fold"]) + ": " + ", ".join(f"{key}={row[key]:.4g}" for key in numeric))
+        headline = mean.get(self.config.metric)
+        self.logger.info(f"Cross-validation over {len(results)} folds: mean {self.config.metric} {headline if headline is not None else 'n/a'}")
+        report = {"metric": self.config.metric, "score": headline, "window": self.config.window, "folds": results, "mean": mean}
+        if self.config.report_path is not None:
+            self.config.report_path.parent.mkdir(parents=True, exist_ok=True)
+            self.config.report_path.write_text(json.dumps(report, indent=2))
+            self.logger.info(f"Cross-validation report written to {self.config.report_path}")
+        return report
+
+
+    def evaluate(self, chunks: Iterator[pd.DataFrame]) -> Optional[Dict[str, Any]]:
+        """
+        Cross-validate on the feature stream.
+
+        Args:
+            chunks (Iterator[pd.DataFrame]): Feature chunks with the date, target and categorical columns.
+
+        Returns:
+            dict | None: Report with the per-fold rows and their mean, also written to `report_path`;
+            None when the stream is too short for a single fold.
+        """
+        directory = self.config.directory / f"run-{os.getpid()}-{time.time_ns()}"
+        directory.mkdir(parents=True, exist_ok=True)
+        try:
+            started = time.perf_counter()
+            layout = self._spill(chunks, directory)
+            if layout is None:
+                self.logger.warning("No rows to cross-validate, skipping")
+                return None
+            folds = self.folds(np.load(directory / "t.npy", mmap_mode="r"))
+            if not folds:
+                self.logger.warning(f"Too few periods for a fold of horizon {self.config.horizon}, skipping cross-validation")
+                return None
+            self.logger.info(f"Spilled {layout['rows']} rows x {len(layout['feature_columns'])} features to {directory} in {time.perf_counter() - started:.1f}s")
+
+            workers = max(1, min(self.config.workers, len(folds)))
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            self.logger.info(f"Cross-validating {len(folds)} {self.config.window} folds on {workers} workers")
+            if workers == 1:
+                results = [_run_fold(directory, fold, layout, self.config, self.training, threads) for fold in folds]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(_run_fold, directory, fold, layout, self.config, self.training, threads) for fold in folds]
+                    results = [future.result() for future in futures]
+            return self._report(results)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,324 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from timeseries_inventory.utils.custom_logging import custom_logger
+from timeseries_inventory.data_config.data_stages_config import ModelTrainingConfig
+
+try:
+    import joblib
+    from sklearn.ensemble import HistGradientBoostingRegressor
+except ImportError:  # pragma: no cover - optional dependency
+    joblib = None
+    HistGradientBoostingRegressor = None
+
+
+"""
+Global forecasting model: one gradient boosted tree model for every series.
+
+Instead of one ARIMA/LSTM per SKU, a single HistGradientBoostingRegressor
+learns from the generated lag/window features of all series at once. Series
+identity enters through smoothed target-mean encodings of the categorical
+columns (SKU, location, ...), which scale to any number of categories. The
+target and the features derived from it are divided by the mean level of
+the series (`scale_column`), so series of very different volume share one
+model.
+
+`route_segments` splits the feature stream between the local (per-series)
+and global trainers according to `model_training.segments`.
+"""
+
+__all__ = ["GlobalModel", "GlobalModelTrainer", "route_segments", "train_global"]
+
+
+DEFAULTS: Dict[str, Any] = {
+    "target_column": "value",
+    "categorical_columns": [],
+    "feature_columns": [],
+    "scale_column": None,
+    "smoothing": 20,
+    "quantile": None,
+    "path": "data/models/global_model.pkl",
+}
+
+
+def scale_exponent(column: str, target: str) -> int:
+    """Power of the series level a feature scales with: 1 for lags, d for `_pow_d`, 2 for interactions, 0 otherwise."""
+    if not column.startswith(f"{target}_"):
+        return 0
+    if "_x_" in column:
+        return 2
+    if "_pow_" in column:
+        return int(column.rsplit("_pow_", 1)[1])
+    return 1
+
+
+# Rows scaled at once when building the model input
+_DESIGN_BLOCK_ROWS = 1 << 16
+
+
+def _design(raw: np.ndarray, encoded: List[np.ndarray], scale: np.ndarray, exponents: np.ndarray) -> np.ndarray:
+    """
+    Model input: level-scaled features followed by the category encodings.
+
+    The input is allocated once and filled block by block, so `raw` (a memory-mapped
+    matrix included) is never copied whole.
+    """
+    n_rows, n_features = len(raw), len(exponents)
+    out = np.empty((n_rows, n_features + len(encoded)), dtype="float32")
+    for start in range(0, n_rows, _DESIGN_BLOCK_ROWS):
+        rows = slice(start, start + _DESIGN_BLOCK_ROWS)
+        out[rows, :n_features] = raw[rows] / scale[rows, None] ** exponents
+    for position, values in enumerate(encoded):
+        out[:, n_features + position] = values
+    return out
+
+
+def route_segments(chunks: Iterator[pd.DataFrame], segments: Dict[str, Any], mode: str) -> Iterator[pd.DataFrame]:
+    """
+    Keep the rows of the series assigned to a model mode.
+
+    Args:
+        chunks (Iterator[pd.DataFrame]): Feature chunks.
+        segments (dict): `model_training.segments`: `column`, `default` and `modes` (segment -> mode).
+            Rows without a segment use `default`; a null default sends them to every mode.
+        mode (str): 'local' or 'global'.
+
+    Yields:
+        pd.DataFrame: Rows whose segment maps to `mode`.
+
+    Raises:
+        ValueError: If the stream has rows but none of them is routed to `mode`, so a
+            configured model type would silently be trained on nothing.
+    """
+    column = segments.get("column")
+    default = segments.get("default")
+    modes = segments.get("modes") or {}
+    seen = routed = 0
+    for chunk in chunks:
+        seen += len(chunk)
+        if not column or column not in chunk.columns:
+            if default in (None, mode):
+                routed += len(chunk)
+                yield chunk
+            continue
+        assigned = chunk[column].astype(object).map(modes)
+        if default is not None:
+            assigned = assigned.fillna(default)
+        selected = ((assigned == mode) | assigned.isna()).to_numpy()
+        routed += int(selected.sum())
+        if selected.all():
+            yield chunk
+        elif selected.any():
+            yield chunk[selected]
+    if seen and not routed:
+        raise ValueError(
+            f"No series are routed to the {mode} models: check model_training.segments "
+            f"(default: {default!r}, modes: {modes}) against model_training.model.type"
+        )
+
+
+@dataclass
+class GlobalModel:
+    """Fitted estimator plus the feature layout and category encodings it was trained with."""
+    estimator: Any
+    target_column: str
+    feature_columns: List[str]
+    encodings: Dict[str, Dict[Any, float]]
+    prior: float
+    scale_column: Optional[str] = None
+
+
+    def _encoded(self, frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        return {
+            column: frame[column].astype(object).map(encoding).astype("float64").fillna(self.prior).to_numpy()
+            for column, encoding in self.encodings.items()
+        }
+
+
+    def _scale(self, encoded: Dict[str, np.ndarray], n_rows: int) -> np.ndarray:
+        if self.scale_column is None:
+            return np.ones(n_rows)
+        scale = encoded[self.scale_column].copy()
+        scale[~(scale > 0)] = 1.0
+        return scale
+
+
+    def design(self, raw: np.ndarray, encoded: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the model input and the per-row level the target is scaled by."""
+        scale = self._scale(encoded, len(raw))
+        exponents = np.array([scale_exponent(c, self.target_column) for c in self.feature_columns], dtype="float64")
+        return _design(raw, list(encoded.values()), scale, exponents), scale
+
+
+    @property
+    def input_columns(self) -> List[str]:
+        """Columns of a chunk the model reads."""
+        return [*self.feature_columns, *self.encodings]
+
+
+    def features(self, frame: pd.DataFrame) -> np.ndarray:
+        """Build the model input of a feature chunk; unseen categories get the global mean."""
+        raw = frame[self.feature_columns].to_numpy(dtype="float64", na_value=np.nan)
+        return self.design(raw, self._encoded(frame))[0]
+
+
+    def predict(self, frame: pd.DataFrame) -> np.ndarray:
+        raw = frame[self.feature_columns].to_numpy(dtype="float64", na_value=np.nan)
+        X, scale = self.design(raw, self._encoded(frame))
+        return self.estimator.predict(X) * scale
+
+
+    def save(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".tmp-{os.getpid()}")
+        joblib.dump(self, tmp)
+        os.replace(tmp, path)
+
+
+    @staticmethod
+    def load(path: Union[str, Path]) -> "GlobalModel":
+        return joblib.load(path)
+
+
+class GlobalModelTrainer:
+    """
+    Trains the global model on a feature chunk stream.
+
+    Args:
+        config (ModelTrainingConfig): Configuration object loaded from YAML; settings come from
+            `model_training.global_model`, tree hyperparameters from `model.hyperparameters`.
+    """
+
+    def __init__(self, config: ModelTrainingConfig):
+        if HistGradientBoostingRegressor is None:
+            raise ImportError("scikit-learn is required for the global model: pip install scikit-learn")
+        self.config = config
+        self.settings = {**DEFAULTS, **config.global_model}
+        self.logger = custom_logger()
+
+
+    def feature_columns(self, chunk: pd.DataFrame) -> List[str]:
+        """Configured feature columns, or every numeric column generated from the target."""
+        if self.settings["feature_columns"]:
+            return list(self.settings["feature_columns"])
+        prefix = f"{self.settings['target_column']}_"
+        return [c for c in chunk.columns if c.startswith(prefix) and pd.api.types.is_numeric_dtype(chunk[c])]
+
+
+    def _collect(self, chunks: Iterator[pd.DataFrame]) -> Tuple[List[str], np.ndarray, np.ndarray, Dict[str, Tuple[Dict[Any, int], np.ndarray]]]:
+        """
+        Gather features, target and category codes of every row with a known target.
+
+        Category statistics are accumulated per chunk so the encodings need no second pass.
+        """
+        target = self.settings["target_column"]
+        categorical = list(self.settings["categorical_columns"])
+        feature_columns: Optional[List[str]] = None
+        features, targets = [], []
+        codes: Dict[str, List[np.ndarray]] = {column: [] for column in categorical}
+        categories: Dict[str, Dict[Any, int]] = {column: {} for column in categorical}
+        for chunk in chunks:
+            if feature_columns is None:
+                feature_columns = self.feature_columns(chunk)
+            y = chunk[target].to_numpy(dtype="float64", na_value=np.nan)
+            known = ~np.isnan(y)
+            features.append(chunk[feature_columns].to_numpy(dtype="float32", na_value=np.nan)[known])
+            targets.append(y[known])
+            for column in categorical:
+                local, uniques = pd.factorize(chunk[column].to_numpy()[known])
+                mapping = np.array([categories[column].setdefault(u, len(categories[column])) for u in uniques], dtype=np.int64)
+                chunk_codes = np.full(len(local), -1, dtype=np.int64)
+                chunk_codes[local >= 0] = mapping[local[local >= 0]]
+                codes[column].append(chunk_codes)
+        if not targets:
+            return [], np.empty((0, 0), dtype="float32"), np.empty(0), {}
+        return (
+            feature_columns or [],
+            np.vstack(features),
+            np.concatenate(targets),
+            {column: (categories[column], np.concatenate(codes[column])) for column in categorical},
+        )
+
+
+    def _encode(self, y: np.ndarray, codes: np.ndarray, n_categories: int, prior: float) -> np.ndarray:
+        """Smoothed target mean per category."""
+        valid = codes >= 0
+        sums = np.bincount(codes[valid], weights=y[valid], minlength=n_categories)
+        counts = np.bincount(codes[valid], minlength=n_categories)
+        m = self.settings["smoothing"]
+        return (sums + m * prior) / (counts + m)
+
+
+    def fit(self, chunks: Iterator[pd.DataFrame]) -> Optional[GlobalModel]:
+        """
+        Train on every row of the stream.
+
+        Args:
+            chunks (Iterator[pd.DataFrame]): Feature chunks.
+
+        Returns:
+            GlobalModel | None: The fitted model, also saved to `global_model.path`; None without training rows.
+        """
+        return self.fit_arrays(*self._collect(chunks))
+
+
+    def fit_arrays(
+        self,
+        feature_columns: List[str],
+        X: np.ndarray,
+        y: np.ndarray,
+        categorical: Dict[str, Tuple[Dict[Any, int], np.ndarray]]
+        ) -> Optional[GlobalModel]:
+        """
+        Train on prepared arrays, e.g. row ranges of a memory-mapped matrix, which are read but not copied.
+
+        Args:
+            feature_columns (List[str]): Name of every column of `X`.
+            X (np.ndarray): Generated features, one row per target value.
+            y (np.ndarray): Known target values.
+            categorical (dict): Column -> (category -> code, code of every row, -1 when missing).
+
+        Returns:
+            GlobalModel | None: The fitted model, also saved to `global_model.path`; None without training rows.
+        """
+        if not len(y):
+            self.logger.warning("No rows for the global model, skipping")
+            return None
+        prior = float(y.mean())
+        encodings, encoded = {}, {}
+        for column, (categories, codes) in categorical.items():
+            values = self._encode(y, codes, len(categories), prior)
+            encodings[column] = {category: float(values[code]) for category, code in categories.items()}
+            encoded[column] = np.where(codes >= 0, values[np.maximum(codes, 0)], prior)
+        scale_column = self.settings["scale_column"]
+        if scale_column is not None and scale_column not in encodings:
+            raise ValueError(f"scale_column '{scale_column}' must be one of the categorical columns")
+        model = GlobalModel(None, self.settings["target_column"], feature_columns, encodings, prior, scale_column)
+        X, scale = model.design(X, encoded)
+
+        # With `quantile` set the model predicts that quantile instead of the mean
+        loss = {"loss": "quantile", "quantile": self.settings["quantile"]} if self.settings["quantile"] is not None else {}
+        estimator = HistGradientBoostingRegressor(
+            **loss,
+            max_iter=self.config.n_estimators,
+            max_depth=self.config.max_depth,
+            learning_rate=self.config.learning_rate,
+            random_state=self.config.random_state,
+        )
+        self.logger.info(f"Training global model on {len(y)} rows, {X.shape[1]} features ({len(feature_columns)} generated, {len(encodings)} encoded)")
+        started = time.perf_counter()
+        estimator.fit(X, y / scale)
+        model.estimator = estimator
+        self.logger.info(f"Global model trained in {time.perf_counter() - started:.1f}s ({estimator.n_iter_} iterations)")
+        model.save(self.settings["path"])
+        return model
+
+
+def train_global(config: ModelTrainingConfig, chunks: Iterator[pd.DataFrame]) -> Optional[GlobalModel]:
+    """Training entry point registered for `model_training.model.type: global`."""
+    return GlobalModelTrainer(config).fit(chunks)
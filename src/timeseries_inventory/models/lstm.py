@@ -1 +1,333 @@
-# lstm.py placeholder 
+# lstm.py placeholder
+import os
+import math
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from dataclasses import dataclass
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from timeseries_inventory.utils.custom_logging import custom_logger
+from timeseries_inventory.data_config.data_stages_config import ModelTrainingConfig
+from timeseries_inventory.models.series import collect_series, series_blocks
+
+try:
+    import torch
+    from torch import nn
+except ImportError:  # pragma: no cover - optional dependency
+    torch = None
+    nn = None
+
+
+"""
+Global LSTM forecaster trained on CPU.
+
+All series share one network. Training samples are `window` consecutive
+values followed by `horizon` targets, taken from a `sliding_window_view`
+over the flat series array: the windows are strided views, and only the
+rows of the current mini-batch are ever copied. The series array itself is
+assembled chunk by chunk in a memory-mapped file next to the checkpoints
+(see `collect_series`), and batches are
+drawn by index rather than from a materialized permutation, so resident
+memory does not grow with the length of the history.
+
+Checkpoints are written every `checkpoint_every` steps and at the end of
+every epoch; an interrupted run resumes from the last one, and they are
+removed once training completes.
+"""
+
+__all__ = ["WindowedSeries", "LstmNetwork", "LstmModel", "LstmTrainer", "train_lstm"]
+
+
+DEFAULTS: Dict[str, Any] = {
+    "target_column": "value",
+    "date_column": "date",
+    "series_columns": [],
+    "window": 28,
+    "horizon": 1,
+    "hidden_size": 32,
+    "num_layers": 1,
+    "epochs": 5,
+    "threads": 0,
+    "checkpoint_every": 500,
+    "checkpoint_dir": "data/models/lstm",
+}
+
+
+class WindowedSeries:
+    """
+    Lazily windowed view over many series stored back to back.
+
+    Sample `k` is mapped to its series and start row through the cumulative
+    window counts per series, so no per-sample index is stored.
+
+    Args:
+        values (np.ndarray): float32 values of all series, ordered by series and time.
+        offsets (np.ndarray): Series `i` is `values[offsets[i]:offsets[i + 1]]`.
+        window (int): Input length of a sample.
+        horizon (int): Number of target values following the input.
+    """
+
+    def __init__(self, values: np.ndarray, offsets: np.ndarray, window: int, horizon: int):
+        self.window = window
+        self.horizon = horizon
+        self.offsets = offsets
+        span = window + horizon
+        self.windows = sliding_window_view(values, span) if len(values) >= span else np.empty((0, span), dtype=values.dtype)
+        lengths = np.diff(offsets)
+        self.counts = np.maximum(lengths - span + 1, 0)
+        self.cumulative = np.cumsum(self.counts)
+        self.mean, self.std = self._scale(values, offsets)
+
+
+    @staticmethod
+    def _scale(values: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-series mean and standard deviation, ignoring missing values, one block of series at a time."""
+        lengths = np.diff(offsets)
+        n, total, squares = (np.zeros(len(lengths)) for _ in range(3))
+        for first, last in series_blocks(offsets):
+            block = np.asarray(values[offsets[first]:offsets[last]], dtype="float64")
+            present = ~np.isnan(block)
+            codes = np.repeat(np.arange(last - first), lengths[first:last])[present]
+            block = block[present]
+            n[first:last] = np.bincount(codes, minlength=last - first)
+            total[first:last] = np.bincount(codes, weights=block, minlength=last - first)
+            squares[first:last] = np.bincount(codes, weights=block ** 2, minlength=last - first)
+        n = np.maximum(n, 1)
+        mean = total / n
+        var = np.maximum(squares / n - mean ** 2, 0)
+        std = np.sqrt(var)
+        std[std == 0] = 1.0
+        return mean.astype("float32"), std.astype("float32")
+
+
+    def __len__(self) -> int:
+        return int(self.cumulative[-1]) if len(self.cumulative) else 0
+
+
+    def locate(self, index: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Map sample numbers to `(series, first row)`."""
+        series = np.searchsorted(self.cumulative, index, side="right")
+        before = self.cumulative[series] - self.counts[series]
+        return series, self.offsets[series] + (index - before)
+
+
+    def batch(self, index: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build the scaled inputs and targets of a mini-batch; samples with missing values are dropped.
+
+        Returns:
+            tuple: Inputs of shape (batch, window, 1) and targets of shape (batch, horizon).
+        """
+        series, start = self.locate(index)
+        sample = (self.windows[start] - self.mean[series, None]) / self.std[series, None]
+        sample = sample[~np.isnan(sample).any(axis=1)]
+        return np.ascontiguousarray(sample[:, :self.window, None]), np.ascontiguousarray(sample[:, self.window:])
+
+
+if nn is not None:
+
+    class LstmNetwork(nn.Module):
+        """LSTM encoder followed by a linear head predicting `horizon` steps."""
+
+        def __init__(self, hidden_size: int, num_layers: int, horizon: int):
+            super().__init__()
+            self.lstm = nn.LSTM(input_size=1, hidden_size=hidden_size, num_layers=num_layers, batch_first=True)
+            self.head = nn.Linear(hidden_size, horizon)
+
+
+        def forward(self, x: "torch.Tensor") -> "torch.Tensor":
+            output, _ = self.lstm(x)
+            return self.head(output[:, -1])
+
+else:  # pragma: no cover
+    LstmNetwork = None
+
+
+@dataclass
+class LstmModel:
+    """Trained network plus what is needed to scale inputs per series."""
+    network: Any
+    labels: List[str]
+    mean: np.ndarray
+    std: np.ndarray
+    settings: Dict[str, Any]
+
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".tmp-{os.getpid()}")
+        torch.save({
+            "network": self.network.state_dict(),
+            "labels": self.labels,
+            "mean": self.mean,
+            "std": self.std,
+            "settings": self.settings,
+        }, tmp)
+        os.replace(tmp, path)
+
+
+    @classmethod
+    def load(cls, path: Path) -> "LstmModel":
+        if torch is None:
+            raise ImportError("torch is required for the LSTM model: pip install torch")
+        state = torch.load(path, weights_only=False)
+        settings = state["settings"]
+        network = LstmNetwork(settings["hidden_size"], settings["num_layers"], settings["horizon"])
+        network.load_state_dict(state["network"])
+        network.eval()
+        return cls(network, state["labels"], state["mean"], state["std"], settings)
+
+
+    def predict(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Forecast the `horizon` steps following the last `window` values of every series.
+
+        Series not seen in training, or whose last window is short or has missing
+        values, get NaN forecasts.
+
+        Args:
+            frame (pd.DataFrame): Recent history with the series, date and target columns.
+
+        Returns:
+            pd.DataFrame: One row per series (indexed by label), one column per step ahead (1 to `horizon`).
+        """
+        settings = self.settings
+        window, horizon = int(settings["window"]), int(settings["horizon"])
+        labels, values, offsets = collect_series(
+            iter([frame]), settings["target_column"], list(settings["series_columns"]), settings["date_column"], dtype="float32"
+        )
+        forecasts = np.full((len(labels), horizon), np.nan, dtype="float32")
+        position = {label: i for i, label in enumerate(self.labels)}
+        trained = np.array([position.get(label, -1) for label in labels], dtype=np.int64)
+        ready = np.flatnonzero((trained >= 0) & (np.diff(offsets) >= window))
+        if len(ready):
+            rows = offsets[ready + 1, None] - window + np.arange(window)
+            mean, std = self.mean[trained[ready], None], self.std[trained[ready], None]
+            x = (values[rows] - mean) / std
+            complete = ~np.isnan(x).any(axis=1)
+            with torch.no_grad():
+                y = self.network(torch.from_numpy(np.ascontiguousarray(x[complete, :, None]))).numpy()
+            forecasts[ready[complete]] = y * std[complete] + mean[complete]
+        return pd.DataFrame(forecasts, index=pd.Index(labels, name="series"), columns=range(1, horizon + 1))
+
+
+class LstmTrainer:
+    """
+    Trains the global LSTM on a chunk stream with CPU threads and resumable checkpoints.
+
+    Args:
+        config (ModelTrainingConfig): Configuration object loaded from YAML; settings come
+            from `model_training.lstm`, the mini-batch size from `model_prediction.settings.batch_size`.
+    """
+
+    def __init__(self, config: ModelTrainingConfig):
+        if torch is None:
+            raise ImportError("torch is required for LSTM training: pip install torch")
+        self.config = config
+        self.settings = {**DEFAULTS, "learning_rate": config.learning_rate, **config.lstm}
+        self.batch_size = int(config.batch_size)
+        self.checkpoint_dir = Path(self.settings["checkpoint_dir"])
+        self.checkpoint_path = self.checkpoint_dir / "checkpoint.pt"
+        self.logger = custom_logger()
+
+
+    @property
+    def _signature(self) -> Dict[str, Any]:
+        keys = ("window", "horizon", "hidden_size", "num_layers", "learning_rate")
+        return {key: self.settings[key] for key in keys} | {"batch_size": self.batch_size}
+
+
+    def _save_checkpoint(self, network: Any, optimizer: Any, rng: np.random.Generator, epoch: int, step: int) -> None:
+        tmp = self.checkpoint_path.with_suffix(f".tmp-{os.getpid()}")
+        torch.save({
+            "signature": self._signature,
+            "network": network.state_dict(),
+            "optimizer": optimizer.state_dict(),
+            "rng": rng.bit_generator.state,
+            "epoch": epoch,
+            "step": step,
+        }, tmp)
+        os.replace(tmp, self.checkpoint_path)
+
+
+    def _resume(self, network: Any, optimizer: Any, rng: np.random.Generator) -> Tuple[int, int]:
+        """Restore the last checkpoint, returning the epoch and step to continue from."""
+        if not self.checkpoint_path.exists():
+            return 0, 0
+        state = torch.load(self.checkpoint_path, weights_only=False)
+        if state.get("signature") != self._signature:
+            self.logger.warning(f"Ignoring LSTM checkpoint {self.checkpoint_path}: settings changed")
+            return 0, 0
+        network.load_state_dict(state["network"])
+        optimizer.load_state_dict(state["optimizer"])
+        rng.bit_generator.state = state["rng"]
+        self.logger.info(f"Resuming LSTM training from epoch {state['epoch'] + 1}, step {state['step']}")
+        return state["epoch"], state["step"]
+
+
+    def fit(self, chunks: Iterator[pd.DataFrame]) -> Optional[LstmModel]:
+        """
+        Train on every series of the stream.
+
+        Args:
+            chunks (Iterator[pd.DataFrame]): Feature chunks holding the series and target columns.
+
+        Returns:
+            LstmModel | None: The trained model, also saved as '<checkpoint_dir>/model.pt';
+            None when the stream holds no series long enough for one window.
+        """
+        settings = self.settings
+        labels, values, offsets = collect_series(
+            chunks, settings["target_column"], list(settings["series_columns"]), settings["date_column"],
+            dtype="float32", spill=self.checkpoint_dir / "series.npy"
+        )
+        dataset = WindowedSeries(values, offsets, settings["window"], settings["horizon"])
+        del values
+        if not len(dataset):
+            self.logger.warning(f"No series with more than {settings['window']} values, skipping LSTM training")
+            return None
+
+        torch.set_num_threads(settings["threads"] or os.cpu_count() or 1)
+        torch.manual_seed(self.config.random_state)
+        rng = np.random.default_rng(self.config.random_state)
+        network = LstmNetwork(settings["hidden_size"], settings["num_layers"], settings["horizon"])
+        optimizer = torch.optim.Adam(network.parameters(), lr=settings["learning_rate"])
+        loss_fn = nn.MSELoss()
+        first_epoch, first_step = self._resume(network, optimizer, rng)
+        steps = math.ceil(len(dataset) / self.batch_size)
+        self.logger.info(
+            f"Training LSTM on {len(labels)} series, {len(dataset)} windows, "
+            f"{steps} steps of {self.batch_size} per epoch, {torch.get_num_threads()} threads"
+        )
+
+        network.train()
+        for epoch in range(first_epoch, settings["epochs"]):
+            started, total, seen = time.perf_counter(), 0.0, 0
+            for step in range(first_step if epoch == first_epoch else 0, steps):
+                # Sampling indices instead of permuting them keeps memory independent of the dataset size
+                x, y = dataset.batch(rng.integers(0, len(dataset), self.batch_size))
+                if len(x):
+                    optimizer.zero_grad()
+                    loss = loss_fn(network(torch.from_numpy(x)), torch.from_numpy(y))
+                    loss.backward()
+                    optimizer.step()
+                    total += loss.item() * len(x)
+                    seen += len(x)
+                if settings["checkpoint_every"] and (step + 1) % settings["checkpoint_every"] == 0:
+                    self._save_checkpoint(network, optimizer, rng, epoch, step + 1)
+            self._save_checkpoint(network, optimizer, rng, epoch + 1, 0)
+            self.logger.info(f"LSTM epoch {epoch + 1}/{settings['epochs']}: loss {total / max(seen, 1):.4f} ({time.perf_counter() - started:.1f}s)")
+
+        network.eval()
+        model = LstmModel(network, labels, dataset.mean, dataset.std, dict(settings))
+        model.save(self.checkpoint_dir / "model.pt")
+        self.checkpoint_path.unlink(missing_ok=True)
+        (self.checkpoint_dir / "series.npy").unlink(missing_ok=True)
+        return model
+
+
+def train_lstm(config: ModelTrainingConfig, chunks: Iterator[pd.DataFrame]) -> Optional[LstmModel]:
+    """Training entry point registered for `model_training.model.type: lstm`."""
+    return LstmTrainer(config).fit(chunks)
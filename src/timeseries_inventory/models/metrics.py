@@ -0,0 +1,90 @@
+import numpy as np
+from typing import Callable, Dict, Optional
+
+
+"""
+Forecast error metrics.
+
+All functions take flat arrays and ignore rows where the actual value is
+missing. MAPE skips zero actuals (it is undefined there); sMAPE and MASE do
+not have that problem and are preferred for intermittent demand.
+"""
+
+__all__ = ["mape", "smape", "mase", "pinball", "naive_scale", "POINT_METRICS"]
+
+
+def _valid(actual: np.ndarray, forecast: np.ndarray) -> np.ndarray:
+    return ~(np.isnan(actual) | np.isnan(forecast))
+
+
+def mape(actual: np.ndarray, forecast: np.ndarray) -> float:
+    """Mean absolute percentage error over the non-zero actuals."""
+    valid = _valid(actual, forecast) & (actual != 0)
+    if not valid.any():
+        return float("nan")
+    return float(np.mean(np.abs((actual[valid] - forecast[valid]) / actual[valid])))
+
+
+def smape(actual: np.ndarray, forecast: np.ndarray) -> float:
+    """Symmetric MAPE in [0, 2]; a row with actual and forecast both zero counts as a perfect forecast."""
+    valid = _valid(actual, forecast)
+    a, f = actual[valid], forecast[valid]
+    denominator = np.abs(a) + np.abs(f)
+    ratio = np.divide(2 * np.abs(a - f), denominator, out=np.zeros_like(denominator, dtype="float64"), where=denominator > 0)
+    return float(ratio.mean()) if ratio.size else float("nan")
+
+
+def naive_scale(values: np.ndarray, series: np.ndarray) -> np.ndarray:
+    """
+    In-sample MAE of the one-step naive forecast of every series.
+
+    Args:
+        values (np.ndarray): Training values, in time order within each series.
+        series (np.ndarray): Integer series code of every value.
+
+    Returns:
+        np.ndarray: Scale per series code (NaN for series with fewer than two values).
+    """
+    order = np.argsort(series, kind="stable")
+    codes, ordered = series[order], values[order]
+    same = codes[1:] == codes[:-1]
+    steps = np.abs(np.diff(ordered))[same]
+    valid = ~np.isnan(steps)
+    n_series = int(series.max()) + 1 if series.size else 0
+    sums = np.bincount(codes[1:][same][valid], weights=steps[valid], minlength=n_series)
+    counts = np.bincount(codes[1:][same][valid], minlength=n_series)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def mase(actual: np.ndarray, forecast: np.ndarray, scale: Optional[np.ndarray] = None) -> float:
+    """
+    Mean absolute scaled error: absolute errors divided by the naive in-sample MAE of their series.
+
+    Args:
+        actual (np.ndarray): Actual values.
+        forecast (np.ndarray): Forecasts.
+        scale (np.ndarray, optional): Naive scale of the series of every row, see `naive_scale`.
+    """
+    if scale is None:
+        return float("nan")
+    valid = _valid(actual, forecast) & (scale > 0)
+    if not valid.any():
+        return float("nan")
+    return float(np.mean(np.abs(actual[valid] - forecast[valid]) / scale[valid]))
+
+
+def pinball(actual: np.ndarray, forecast: np.ndarray, quantile: float) -> float:
+    """Mean pinball (quantile) loss of a forecast of the given quantile."""
+    valid = _valid(actual, forecast)
+    diff = actual[valid] - forecast[valid]
+    if not diff.size:
+        return float("nan")
+    return float(np.mean(np.maximum(quantile * diff, (quantile - 1) * diff)))
+
+
+# Metrics of a point forecast, by config name; MASE and pinball need extra inputs
+POINT_METRICS: Dict[str, Callable[[np.ndarray, np.ndarray], float]] = {
+    "mape": mape,
+    "smape": smape,
+}
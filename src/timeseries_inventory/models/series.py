@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+"""
+Helpers shared by the per-series models.
+
+`collect_series` turns the feature chunk stream into one flat array of
+target values ordered by series and date, plus offsets into it, which is the
+layout the ARIMA workers (via shared memory) and the LSTM window sampler
+(via stride tricks) both read from.
+
+With `spill`, every chunk is appended to scratch files as it arrives and the
+result is assembled in a memory-mapped `.npy` file: the rows are scattered
+to their series in blocks, then sorted by date one block of series at a
+time, so resident memory is bounded by the block size and the number of
+series rather than by the length of the history.
+"""
+
+__all__ = ["collect_series", "series_blocks", "series_label"]
+
+
+# Rows handled at once when assembling a spilled series array
+_BLOCK_ROWS = 1 << 20
+
+
+def series_label(key: Tuple) -> str:
+    """Readable identifier of a series, e.g. 'SKU-1|WH-2'."""
+    return "|".join(str(part) for part in key)
+
+
+def series_blocks(offsets: np.ndarray, rows: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+    """Consecutive ranges `[first, last)` of series holding about `rows` values (default `_BLOCK_ROWS`) each, at least one series."""
+    rows = rows or _BLOCK_ROWS
+    first, n_series = 0, len(offsets) - 1
+    while first < n_series:
+        last = int(np.searchsorted(offsets, offsets[first] + rows, side="right")) - 1
+        last = min(max(last, first + 1), n_series)
+        yield first, last
+        first = last
+
+
+def _chunk_rows(
+    chunks: Iterator[pd.DataFrame],
+    target_column: str,
+    series_columns: List[str],
+    date_column: Optional[str],
+    dtype: str,
+    ids: Dict[Tuple, int]
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Series code, date and value of the rows of every chunk, registering new series in `ids`."""
+    seen = 0
+    for chunk in chunks:
+        keep = slice(None)
+        if series_columns:
+            local, uniques = pd.factorize(pd.MultiIndex.from_frame(chunk[series_columns]))
+            mapping = np.array([ids.setdefault(tuple(u), len(ids)) for u in uniques], dtype=np.int64)
+            keep = local >= 0
+            chunk_codes = mapping[local[keep]]
+        else:
+            ids.setdefault(("all",), 0)
+            chunk_codes = np.zeros(len(chunk), dtype=np.int64)
+        if date_column and date_column in chunk.columns:
+            chunk_dates = pd.to_datetime(chunk[date_column]).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        else:
+            chunk_dates = np.arange(seen, seen + len(chunk), dtype=np.int64)
+        seen += len(chunk)
+        yield chunk_codes, chunk_dates[keep], chunk[target_column].to_numpy(dtype=dtype, na_value=np.nan)[keep]
+
+
+def _rank_within(codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Stable order of rows by code, and the rank of every row among the rows of its code."""
+    order = np.argsort(codes, kind="stable")
+    ordered = codes[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    sizes = np.diff(np.r_[starts, len(codes)])
+    rank = np.empty(len(codes), dtype=np.int64)
+    rank[order] = np.arange(len(codes)) - np.repeat(starts, sizes)
+    return order, rank
+
+
+def _spill_series(
+    rows: Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+    ids: Dict[Tuple, int],
+    path: Path,
+    dtype: str
+    ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Assemble the rows of every series into a memory-mapped array sorted by series and date.
+
+    Returns:
+        tuple: Values (memory-mapped `.npy` at `path`) and offsets.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    scratch = {name: path.with_name(f"{path.name}.{name}.tmp") for name in ("codes", "dates", "values")}
+    counts = np.zeros(0, dtype=np.int64)
+    last_date = np.zeros(0, dtype=np.int64)
+    in_order, total = True, 0
+    try:
+        # Pass 1: append every chunk to the scratch files, counting the rows of every series
+        files = {name: file.open("wb") for name, file in scratch.items()}
+        try:
+            for codes, dates, values in rows:
+                if not len(codes):
+                    continue
+                size = int(codes.max()) + 1
+                if size > len(counts):
+                    counts = np.r_[counts, np.zeros(size - len(counts), dtype=np.int64)]
+                    last_date = np.r_[last_date, np.full(size - len(last_date), np.iinfo(np.int64).min)]
+                if in_order:
+                    order, _ = _rank_within(codes)
+                    ordered_codes, ordered_dates = codes[order], dates[order]
+                    previous = np.r_[last_date[ordered_codes[0]], ordered_dates[:-1]]
+                    same = np.r_[False, ordered_codes[1:] == ordered_codes[:-1]]
+                    previous = np.where(same, previous, last_date[ordered_codes])
+                    in_order = bool((ordered_dates >= previous).all())
+                    np.maximum.at(last_date, codes, dates)
+                counts += np.bincount(codes, minlength=len(counts))
+                codes.astype(np.int64).tofile(files["codes"])
+                dates.astype(np.int64).tofile(files["dates"])
+                values.astype(dtype).tofile(files["values"])
+                total += len(codes)
+        finally:
+            for file in files.values():
+                file.close()
+
+        counts = np.r_[counts, np.zeros(len(ids) - len(counts), dtype=np.int64)]
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(total,))
+        if not total:
+            return out, offsets
+        spilled = {name: np.memmap(file, dtype=np.int64 if name != "values" else dtype, mode="r") for name, file in scratch.items()}
+        out_dates = None if in_order else np.memmap(path.with_name(f"{path.name}.sorted-dates.tmp"), dtype=np.int64, mode="w+", shape=(total,))
+
+        # Pass 2: scatter the rows to their series, keeping their arrival order within a series
+        cursor = offsets[:-1].copy()
+        for start in range(0, total, _BLOCK_ROWS):
+            codes = np.asarray(spilled["codes"][start:start + _BLOCK_ROWS])
+            _, rank = _rank_within(codes)
+            positions = cursor[codes] + rank
+            out[positions] = spilled["values"][start:start + _BLOCK_ROWS]
+            if out_dates is not None:
+                out_dates[positions] = spilled["dates"][start:start + _BLOCK_ROWS]
+            cursor += np.bincount(codes, minlength=len(cursor))
+
+        # Pass 3 (rows out of date order only): stable sort of every series by date, block by block of series
+        if out_dates is not None:
+            for first, last in series_blocks(offsets, _BLOCK_ROWS):
+                lo, hi = offsets[first], offsets[last]
+                segment_codes = np.repeat(np.arange(first, last), counts[first:last])
+                order = np.lexsort((np.asarray(out_dates[lo:hi]), segment_codes))
+                out[lo:hi] = np.asarray(out[lo:hi])[order]
+        out.flush()
+        return out, offsets
+    finally:
+        for file in scratch.values():
+            file.unlink(missing_ok=True)
+        path.with_name(f"{path.name}.sorted-dates.tmp").unlink(missing_ok=True)
+
+
+def collect_series(
+    chunks: Iterator[pd.DataFrame],
+    target_column: str,
+    series_columns: List[str],
+    date_column: Optional[str] = None,
+    dtype: str = "float64",
+    with_keys: bool = False,
+    spill: Optional[Path] = None
+    ) -> Tuple:
+    """
+    Gather the target of every series into one array sorted by series and date.
+
+    Rows with a missing series key are dropped. Without a date column, rows
+    keep their arrival order within a series.
+
+    Args:
+        chunks (Iterator[pd.DataFrame]): Chunks with the series, date and target columns.
+        target_column (str): Column holding the series values.
+        series_columns (List[str]): Columns identifying a series; empty treats the stream as one series.
+        date_column (str, optional): Column ordering the rows of a series.
+        dtype (str): dtype of the returned values.
+        with_keys (bool): Also return the key of every series, the tuple of its `series_columns` values.
+        spill (Path, optional): `.npy` file the values are assembled in, chunk by chunk; the returned
+            values are then memory-mapped from it.
+
+    Returns:
+        tuple: Series labels, values, and offsets such that series `i` is `values[offsets[i]:offsets[i + 1]]`,
+        followed by the series keys with `with_keys`.
+    """
+    ids: Dict[Tuple, int] = {}
+    rows = _chunk_rows(chunks, target_column, series_columns, date_column, dtype, ids)
+    if spill is not None:
+        values, offsets = _spill_series(rows, ids, Path(spill), dtype)
+        labels = [series_label(key) for key in ids]
+        return (labels, values, offsets, list(ids)) if with_keys else (labels, values, offsets)
+
+    codes, dates, values = [], [], []
+    for chunk_codes, chunk_dates, chunk_values in rows:
+        codes.append(chunk_codes)
+        dates.append(chunk_dates)
+        values.append(chunk_values)
+
+    if not codes:
+        empty = ([], np.empty(0, dtype=dtype), np.zeros(1, dtype=np.int64))
+        return (*empty, []) if with_keys else empty
+    all_codes = np.concatenate(codes)
+    order = np.lexsort((np.concatenate(dates), all_codes))
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(all_codes, minlength=len(ids)))])
+    labels = [series_label(key) for key in ids]
+    if with_keys:
+        return labels, np.concatenate(values)[order], offsets, list(ids)
+    return labels, np.concatenate(values)[order], offsets
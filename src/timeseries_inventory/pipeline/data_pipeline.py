@@ -1,91 +1,342 @@
+import datetime
+import tempfile
+import pandas as pd
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
 from timeseries_inventory.data_config.data_stages_manager import DataStagesManager
-from timeseries_inventory.utils.custom_logging import custom_logger
+from timeseries_inventory.data_config.data_stages_config import ModelTrainingConfig
+from timeseries_inventory.utils.custom_logging import custom_logger, configure_logging
+from timeseries_inventory.utils import monitoring
 from timeseries_inventory.ingestion.file_loader import FileLoader
+from timeseries_inventory.preprocessing.cleaning import DataCleaner
+from timeseries_inventory.preprocessing.validation import DataValidator
+from timeseries_inventory.preprocessing.feature_engineering import FeatureEngine
+from timeseries_inventory.preprocessing.feature_selection import FeatureSelector
+from timeseries_inventory.models.arima import train_arima
+from timeseries_inventory.models.lstm import train_lstm
+from timeseries_inventory.models.global_model import GlobalModelTrainer, route_segments, train_global
+from timeseries_inventory.models.cross_validation import TimeSeriesCrossValidator
+from timeseries_inventory.services.bulk_prediction import BulkPredictor
+from timeseries_inventory.services.model_registry import publish_version
+from timeseries_inventory.pipeline.executor import DagExecutor, Stage
+from timeseries_inventory.pipeline.stage_cache import StageCache, chain_key, files_fingerprint
+
+
+# Training entry points by `model_training.model.type`; each consumes the
+# feature chunk stream and returns the trained model.
+MODEL_TRAINERS: Dict[str, Callable[[ModelTrainingConfig, Iterator[pd.DataFrame]], Any]] = {
+    "arima": train_arima,
+    "lstm": train_lstm,
+    "global": train_global,
+}
 
 
 class DataStagesPipeline:
-    def __init__(self):
-        self._data_stages_manager = DataStagesManager()
-        
+    """
+    Wires the stage pipelines below into a streaming DAG:
+
+        raw -> clean -> validate -> transform -> engineer -> select
+        select -> train_<type> (one concurrent branch per model type)
+        select -> evaluate
+        train_<type> -> predict
+
+    With `pipeline.cache.enabled`, the outputs of the data stages are cached
+    under `data_transformation.output.directory`, keyed by their config and
+    everything upstream, and reruns skip stages whose inputs are unchanged.
+
+    Args:
+        data_path (str | Path, optional): YAML config, defaults to data_path.yaml
+        publish (bool): Publish the trained global model as a serving version
+            under `serving.registry_directory`.
+    """
+
+    def __init__(self, data_path: Optional[Union[str, Path]] = None, publish: bool = False):
+        self.logger = custom_logger()
+        self.publish = publish
+        self._data_stages_manager = DataStagesManager(data_path)
+        logging_config = self._data_stages_manager.logging_config()
+        configure_logging(logging_config.mode, logging_config.format, logging_config.level, logging_config.sampling, logging_config.console)
+        self.monitoring_config = self._data_stages_manager.monitoring_config()
+        monitoring.configure(self.monitoring_config.enabled)
+        self.pipeline_config = self._data_stages_manager.pipeline_config()
+        self.stage_cache = self._build_stage_cache() if self.pipeline_config.cache_enabled else None
+
+
+    @property
+    def manager(self) -> DataStagesManager:
+        return self._data_stages_manager
+
+
+    def _build_stage_cache(self) -> StageCache:
+        directory = Path(self.manager.data_transformation_config().directory) / "stage_cache"
+        return StageCache(
+            directory,
+            max_size_mb = self.pipeline_config.cache_max_size_mb,
+            max_entries = self.pipeline_config.cache_max_entries
+        )
+
+
+    def build_stages(self) -> List[Stage]:
+        """Create the DAG nodes for every configured stage."""
+        buffers = self.pipeline_config.stages
+        keys: Dict[str, Optional[str]] = {}
+
+        def stage(name: str, func: Callable[..., Any], *depends_on: str) -> Stage:
+            return Stage(name, func, tuple(depends_on), buffers.get(name))
+
+        def data_stage(name: str, config: Any, func: Callable[..., Any], upstream: str) -> Stage:
+            # Keys chain through the data stages; an unkeyed source disables caching downstream
+            keys[name] = chain_key(name, config, [keys[upstream]]) if keys[upstream] else None
+            return Stage(name, func, (upstream,), buffers.get(name), keys[name])
+
+        ingestion = DataIngestionPipeline(self)
+        cleaning = DataCleaningPipeline(self)
+        validation = DataValidationPipeline(self)
+        transformation = DataTransformationPipeline(self)
+        engineering = FeatureEngineeringPipeline(self)
+        selection = FeatureSelectionPipeline(self)
+        evaluation = ModelEvaluationPipeline(self)
+        prediction = ModelPredictionPipeline(self)
+
+        keys[ingestion.config.stage] = ingestion.fingerprint()
+        stages = [
+            stage(ingestion.config.stage, ingestion.data_ingestion_pipeline),
+            data_stage(cleaning.config.stage, cleaning.config, cleaning.data_cleaning_pipeline, ingestion.config.stage),
+            data_stage(validation.config.stage, validation.config, validation.data_validation_pipeline, cleaning.config.stage),
+            data_stage(transformation.config.stage, transformation.config, transformation.data_transformation_pipeline, validation.config.stage),
+            data_stage(engineering.config.stage, engineering.config, engineering.feature_engineering_pipeline, transformation.config.stage),
+            data_stage(selection.config.stage, selection.config, selection.feature_selection_pipeline, engineering.config.stage),
+            stage(evaluation.config.stage, evaluation.model_evaluation_pipeline, selection.config.stage),
+        ]
+        training_stages = []
+        for model_type in self.manager.model_training_config().type:
+            training = ModelTrainingPipeline(self, model_type)
+            training_stages.append(training.name)
+            stages.append(stage(training.name, training.model_training_pipeline, selection.config.stage))
+        stages.append(stage(prediction.config.stage, prediction.model_prediction_pipeline, *training_stages))
+        return stages
+
+
+    def run(self, targets: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Run the pipeline.
+
+        Args:
+            targets (List[str], optional): Stage names to run, together with their upstream stages.
+
+        With monitoring enabled, a JSON snapshot of the metrics is written to
+        `monitoring.report_path` when the run ends, successfully or not.
+
+        Returns:
+            dict: Results of the final stages, by stage name.
+        """
+        started = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            return self._executor().run(targets)
+        finally:
+            if self.monitoring_config.enabled and self.monitoring_config.report_path:
+                path = monitoring.write_report(self.monitoring_config.report_path, {
+                    "started": started.isoformat(),
+                    "finished": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    "targets": targets,
+                })
+                self.logger.info(f"Wrote metrics report to {path}")
+
+
+    def dry_run(self, targets: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        Report which stages a run would recompute, without running anything.
+
+        Args:
+            targets (List[str], optional): Stage names whose results are wanted.
+
+        Returns:
+            dict: Stage name -> 'cached', 'recompute' or 'run'.
+        """
+        plan = self._executor().plan(targets)
+        for name, status in plan.items():
+            self.logger.info(f"[dry-run] {name:<12} {status}")
+        return plan
+
+
+    def _executor(self) -> DagExecutor:
+        return DagExecutor(self.build_stages(), self.pipeline_config.max_buffered_chunks, self.stage_cache)
+
 
 class DataIngestionPipeline:
     def __init__(self, data_pipeline: DataStagesPipeline):
-        self._data_ingestion = self._dat
-    
-    
-    def data_ingestion_pipeline(self):
-        pass
+        self.config = data_pipeline.manager.data_ingestion_config()
+        self.logger = custom_logger()
+
+
+    def data_ingestion_pipeline(self) -> Iterator[pd.DataFrame]:
+        """Stream raw chunks from the configured source."""
+        if self.config.source == "local":
+            loader = FileLoader(self.config)
+        elif self.config.source == "api":
+            from timeseries_inventory.ingestion.api_loader import ApiLoader
+            loader = ApiLoader(self.config)
+        elif self.config.source == "db":
+            from timeseries_inventory.ingestion.db_loader import DbLoader
+            loader = DbLoader(self.config)
+        else:
+            raise ValueError(f"Unsupported ingestion source '{self.config.source}'")
+        return loader.load()
 
 
+    def fingerprint(self) -> Optional[str]:
+        """Fingerprint of the input files and ingestion settings, None for remote sources."""
+        if self.config.source != "local" or not self.config.path.exists():
+            return None
+        files = list(self.config.path.glob(self.config.file_pattern))[:self.config.max_files]
+        return chain_key(self.config.stage, self.config, [files_fingerprint(files)])
+
 
 class DataCleaningPipeline:
-    def __init__(self):
-        pass
-    
-    
-    def data_cleaning_pipeline(self):
-        pass
-    
-    
-    
-class DataValidationPipeline:    
-    def __init__(self):
-        pass
-    
-    
-    def data_validation_pipeline(self):
-        pass
-  
-    
-class DataTransformationPipeline: 
-    def __init__(self):
-        pass
-    
-    
-    def data_transformation_pipeline(self):
-        pass
-    
-    
-class FeatureSelectionPipeline:       
-    def __init__(self):
-        pass
-    
-    
-    def feature_selection_pipeline(self):
-        pass
-    
-    
-class FeatureEngineeringPipeline: 
-    def __init__(self):
-        pass
-    
-    
-    def feature_engineering_pipeline(self):
-        pass
-   
-    
-class ModelTrainingPipeline:   
-    def __init__(self):
-        pass
-    
-    
-    def model_training_pipeline(self):
-        pass
+    def __init__(self, data_pipeline: DataStagesPipeline):
+        self.config = data_pipeline.manager.data_cleaning_config()
+        self.logger = custom_logger()
+
+
+    def data_cleaning_pipeline(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Drop duplicates and fill gaps chunk by chunk, see `preprocessing.cleaning`."""
+        return DataCleaner(self.config).clean(chunks)
+
+
+
+class DataValidationPipeline:
+    def __init__(self, data_pipeline: DataStagesPipeline):
+        self.config = data_pipeline.manager.data_validation_config()
+        self.validator = DataValidator(self.config)
+        self.logger = custom_logger()
+
+
+    def data_validation_pipeline(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Check every chunk in one pass; the violation summary ends up in `self.validator.report`."""
+        return self.validator.validate(chunks)
+
+
+class DataTransformationPipeline:
+    def __init__(self, data_pipeline: DataStagesPipeline):
+        self.config = data_pipeline.manager.data_transformation_config()
+        self.logger = custom_logger()
+
+
+    def data_transformation_pipeline(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """No transformations are configured yet (`transformations: {}`); chunks pass through."""
+        yield from chunks
+
+
+class FeatureSelectionPipeline:
+    def __init__(self, data_pipeline: DataStagesPipeline):
+        self.config = data_pipeline.manager.feature_selection_config()
+        self.logger = custom_logger()
+
+
+    def feature_selection_pipeline(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Keep the `top_k` generated features by mutual information with the target."""
+        return FeatureSelector(self.config).transform(chunks)
+
+
+class FeatureEngineeringPipeline:
+    def __init__(self, data_pipeline: DataStagesPipeline):
+        self.config = data_pipeline.manager.feature_engineering_config()
+        self.logger = custom_logger()
+
+
+    def feature_engineering_pipeline(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Add lag/rolling/EWM features with per-series state carried across chunks."""
+        return FeatureEngine(self.config).transform(chunks)
+
+
+class ModelTrainingPipeline:
+    def __init__(self, data_pipeline: DataStagesPipeline, model_type: str):
+        self.config = data_pipeline.manager.model_training_config()
+        self.model_type = model_type
+        self.name = f"{self.config.stage}_{model_type}"
+        self.publish = data_pipeline.publish and model_type == "global"
+        if self.publish:
+            self.serving_config = data_pipeline.manager.serving_config()
+            self.series_columns = list(data_pipeline.manager.feature_engineering_config().series_columns)
+            self.date_column = data_pipeline.manager.data_ingestion_config().datetime_column or "date"
+        self.logger = custom_logger()
+
+
+    def model_training_pipeline(self, chunks: Iterator[pd.DataFrame]) -> Any:
+        """Train the model registered for this branch's model type on the series of its segments."""
+        trainer = MODEL_TRAINERS.get(self.model_type)
+        if trainer is None:
+            self.logger.warning(f"No trainer registered for model type '{self.model_type}', skipping")
+            for _ in chunks:
+                pass
+            return None
+        mode = "global" if self.model_type == "global" else "local"
+        routed = route_segments(chunks, self.config.segments, mode)
+        if not self.publish:
+            return trainer(self.config, routed)
+        return self._train_and_publish(trainer, routed)
+
+
+    def _train_and_publish(self, trainer: Callable[..., Any], chunks: Iterator[pd.DataFrame]) -> Any:
+        """
+        Train, then publish the model with the history it was trained on.
+
+        The series, date and target columns of every chunk are kept in a scratch
+        directory as the trainer consumes the stream, so the history is read once.
+        """
+        directory = Path(self.serving_config.registry_directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        target = GlobalModelTrainer(self.config).settings["target_column"]
+        columns = [*self.series_columns, self.date_column, target]
+        with tempfile.TemporaryDirectory(prefix=".history-", dir=directory) as scratch:
+            parts: List[Path] = []
+
+            def keep(chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+                for chunk in chunks:
+                    parts.append(Path(scratch) / f"part-{len(parts):05d}.parquet")
+                    chunk[[column for column in columns if column in chunk.columns]].to_parquet(parts[-1], index=False)
+                    yield chunk
+
+            model = trainer(self.config, keep(chunks))
+            if model is None:
+                self.logger.warning("No global model trained, nothing to publish")
+                return None
+            path = publish_version(directory, model, (pd.read_parquet(part) for part in parts), self.series_columns, self.date_column)
+        self.logger.info(f"Published global model version {path.name} to {directory}")
+        return model
 
 
 class ModelEvaluationPipeline:
-    def __init__(self):
-        pass
-    
-    
-    def model_evaluation_pipeline(self):
-        pass
-   
-    
-class ModelPredictionPipeline:    
-    def __init__(self):
-        pass    
-    
-    
-    def model_prediction_pipeline(self):
-        pass    
\ No newline at end of file
+    def __init__(self, data_pipeline: DataStagesPipeline):
+        self.config = data_pipeline.manager.model_evaluation_config()
+        self.training_config = data_pipeline.manager.model_training_config()
+        self.logger = custom_logger()
+
+
+    def model_evaluation_pipeline(self, chunks: Iterator[pd.DataFrame]) -> Any:
+        """Cross-validates the global model on the feature stream when `cross_validation` is enabled."""
+        if not self.config.cross_validation:
+            for _ in chunks:
+                pass
+            return None
+        return TimeSeriesCrossValidator(self.config, self.training_config).evaluate(chunks)
+
+
+class ModelPredictionPipeline:
+    def __init__(self, data_pipeline: DataStagesPipeline):
+        self.config = data_pipeline.manager.model_prediction_config()
+        self.ingestion_config = data_pipeline.manager.data_ingestion_config()
+        self.engineering_config = data_pipeline.manager.feature_engineering_config()
+        self.logger = custom_logger()
+
+
+    def model_prediction_pipeline(self, *models: Iterator[Any]) -> Any:
+        """Waits for every training branch, then bulk scores `input_data` with the saved global model."""
+        for trained in models:
+            for _ in trained:
+                pass
+        if not Path(self.config.model).exists():
+            self.logger.warning(f"No model at {self.config.model}, skipping bulk prediction")
+            return None
+        predictor = BulkPredictor(self.config, self.ingestion_config)
+        return predictor.run(FeatureEngine(self.engineering_config).transform)
@@ -0,0 +1,294 @@
+import queue
+import threading
+import collections
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from timeseries_inventory.utils.custom_logging import custom_logger, set_log_stage
+from timeseries_inventory.utils.monitoring import StageRun
+from timeseries_inventory.utils.profiling import profile_stage
+from timeseries_inventory.pipeline.stage_cache import StageCache
+
+
+"""
+Streaming DAG executor.
+
+Every stage runs in its own thread. A stage function receives one iterator
+per upstream stage (in `depends_on` order) and either returns an iterator,
+whose items are streamed to the downstream stages as they are produced, or
+a plain value, which is handed downstream as a single item. Edges are
+bounded queues sized by the consuming stage's `max_buffered_chunks`, so a
+slow stage blocks its producers instead of letting chunks pile up in memory.
+Stages without a path between them - e.g. one training branch per model
+type - run concurrently.
+
+Stages with a `cache_key` are backed by a StageCache: a stage whose key is
+already cached is served from the cache and its upstream stages are not run
+at all, any other keyed stage stores its output while streaming it.
+
+Items fanned out to several consumers are shared, not copied: stages must
+treat their input chunks as read-only.
+"""
+
+__all__ = ["Stage", "DagExecutor", "PipelineError"]
+
+
+_END = object()
+
+# How long a blocked stage waits before re-checking for cancellation
+_POLL_SECONDS = 0.1
+
+
+class PipelineError(RuntimeError):
+    """Raised when a stage of the DAG fails."""
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"Stage '{stage}' failed: {error!r}")
+        self.stage = stage
+        self.error = error
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    A node of the pipeline DAG.
+
+    Args:
+        name (str): Unique stage name.
+        func (Callable): Called with one iterator per upstream stage.
+        depends_on (tuple): Names of the upstream stages.
+        max_buffered_chunks (int, optional): Capacity of each input edge of this stage.
+        cache_key (str, optional): Content address of the stage output; None disables caching.
+    """
+    name: str
+    func: Callable[..., Any]
+    depends_on: Tuple[str, ...] = field(default_factory=tuple)
+    max_buffered_chunks: Optional[int] = None
+    cache_key: Optional[str] = None
+
+
+class _Edge:
+    """Bounded queue between two stages that the consumer can close early."""
+
+    def __init__(self, maxsize: int, stop_event: threading.Event):
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize)
+        self._stop_event = stop_event
+        self.closed = False
+
+
+    def put(self, item: Any) -> None:
+        while not self.closed and not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+
+    def __iter__(self) -> Iterator[Any]:
+        while not self._stop_event.is_set():
+            try:
+                item = self._queue.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            if item is _END:
+                return
+            yield item
+
+
+class DagExecutor:
+    """
+    Runs a DAG of stages with streaming, bounded edges.
+
+    Args:
+        stages (List[Stage]): Stages of the pipeline.
+        max_buffered_chunks (int): Default capacity of an edge.
+        cache (StageCache, optional): Store for the outputs of keyed stages.
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        max_buffered_chunks: int = 8,
+        cache: Optional[StageCache] = None
+        ):
+        self.logger = custom_logger()
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        self.max_buffered_chunks = max_buffered_chunks
+        self.cache = cache
+        self.order = self._topological_order()
+
+
+    def _topological_order(self) -> List[str]:
+        """Return the stage names in dependency order, rejecting unknown or cyclic dependencies."""
+        indegree = {name: 0 for name in self.stages}
+        consumers: Dict[str, List[str]] = collections.defaultdict(list)
+        for stage in self.stages.values():
+            for upstream in stage.depends_on:
+                if upstream not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{upstream}'")
+                indegree[stage.name] += 1
+                consumers[upstream].append(stage.name)
+        ready = collections.deque(name for name, degree in indegree.items() if degree == 0)
+        order = []
+        while ready:
+            name = ready.popleft()
+            order.append(name)
+            for consumer in consumers[name]:
+                indegree[consumer] -= 1
+                if indegree[consumer] == 0:
+                    ready.append(consumer)
+        if len(order) != len(self.stages):
+            raise ValueError(f"Pipeline has a cycle between stages: {sorted(set(self.stages) - set(order))}")
+        return order
+
+
+    def plan(self, targets: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        Decide what a run would do, without running anything.
+
+        Walks upstream from the targets (default: every stage without
+        consumers) and stops at stages whose output is already cached.
+
+        Args:
+            targets (List[str], optional): Stages whose results are wanted.
+
+        Returns:
+            dict: Stage name -> 'cached' (served from the cache), 'recompute'
+            (run and cached) or 'run' (uncacheable), in execution order.
+        """
+        if not targets:
+            consumed = {upstream for stage in self.stages.values() for upstream in stage.depends_on}
+            targets = [name for name in self.order if name not in consumed]
+        status: Dict[str, str] = {}
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage '{name}'")
+            if name in status:
+                continue
+            stage = self.stages[name]
+            if stage.cache_key is not None and self.cache is not None:
+                if self.cache.has(stage.cache_key):
+                    status[name] = "cached"
+                    continue
+                status[name] = "recompute"
+            else:
+                status[name] = "run"
+            pending.extend(stage.depends_on)
+        return {name: status[name] for name in self.order if name in status}
+
+
+    def run(self, targets: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Execute the DAG.
+
+        Args:
+            targets (List[str], optional): Only run these stages and the upstream stages they need.
+
+        Returns:
+            dict: Return value of every stage without downstream consumers, by name.
+        """
+        plan = self.plan(targets)
+        stages = [self._resolve(self.stages[name], status) for name, status in plan.items()]
+        order = [stage.name for stage in stages]
+        stop_event = threading.Event()
+        inputs: Dict[str, List[_Edge]] = {name: [] for name in order}
+        outputs: Dict[str, List[_Edge]] = {name: [] for name in order}
+        for stage in stages:
+            size = stage.max_buffered_chunks or self.max_buffered_chunks
+            for upstream in stage.depends_on:
+                edge = _Edge(size, stop_event)
+                inputs[stage.name].append(edge)
+                outputs[upstream].append(edge)
+
+        results: Dict[str, Any] = {}
+        errors: List[PipelineError] = []
+        threads = [
+            threading.Thread(
+                target=self._run_stage,
+                args=(stage, inputs[stage.name], outputs[stage.name], results, errors, stop_event),
+                name=f"stage-{stage.name}",
+                daemon=True,
+            )
+            for stage in stages
+        ]
+        self.logger.info(f"Running pipeline stages: {plan}")
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return results
+
+
+    def _resolve(self, stage: Stage, status: str) -> Stage:
+        """Swap cached stages for a cache reader and make recomputed stages write through."""
+        cache, key = self.cache, stage.cache_key
+        if status == "cached":
+            return dataclasses.replace(stage, func=lambda: cache.read(key), depends_on=())
+        if status == "recompute":
+            func = stage.func
+
+            def write_through(*inputs: Iterator[Any]) -> Any:
+                result = func(*inputs)
+                return cache.write_through(key, stage.name, result) if isinstance(result, Iterator) else result
+
+            return dataclasses.replace(stage, func=write_through)
+        return stage
+
+
+    def _run_stage(
+        self,
+        stage: Stage,
+        inputs: List[_Edge],
+        outputs: List[_Edge],
+        results: Dict[str, Any],
+        errors: List[PipelineError],
+        stop_event: threading.Event
+        ) -> None:
+        """Thread body: run one stage and stream its output to the downstream edges."""
+        set_log_stage(stage.name)
+        run = StageRun(stage.name)
+        profile = profile_stage(stage.name)
+        try:
+            self.logger.info(f"Stage '{stage.name}' started")
+            result = stage.func(*[iter(edge) for edge in inputs])
+            if isinstance(result, Iterator):
+                result = run.track(result)
+                try:
+                    for item in result:
+                        if stop_event.is_set() or (outputs and all(edge.closed for edge in outputs)):
+                            break
+                        for edge in outputs:
+                            edge.put(item)
+                finally:
+                    if hasattr(result, "close"):
+                        result.close()
+            elif outputs:
+                for edge in outputs:
+                    edge.put(result)
+            if not outputs:
+                results[stage.name] = result if not isinstance(result, Iterator) else None
+            if stop_event.is_set():
+                self.logger.info(f"Stage '{stage.name}' cancelled")
+                run.finish("cancelled")
+            else:
+                self.logger.info(f"Stage '{stage.name}' finished")
+                run.finish()
+        except Exception as e:
+            self.logger.exception(f"Stage '{stage.name}' failed")
+            run.finish("failed")
+            errors.append(PipelineError(stage.name, e))
+            stop_event.set()
+        finally:
+            # Unblock producers if this stage stopped reading early, then signal end of stream
+            for edge in inputs:
+                edge.closed = True
+            for edge in outputs:
+                edge.put(_END)
+            profile.stop()
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import dataclasses
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+from timeseries_inventory.utils.custom_logging import custom_logger
+
+
+"""
+Content-addressed cache of stage outputs.
+
+A stage's key is the hash of its name, its (frozen dataclass) config and the
+keys of its upstream stages; the source stage is keyed by the fingerprint of
+its input files. Keys therefore change exactly when a stage or anything
+upstream of it changes, and rerunning after editing e.g. only
+`feature_engineering.lags` reuses the cleaned and validated outputs.
+
+Every entry is a directory of Parquet parts (one per chunk) plus a
+`meta.json`, published with an atomic rename once the stage has finished.
+"""
+
+__all__ = ["StageCache", "config_fingerprint", "files_fingerprint", "chain_key"]
+
+
+def _digest(payload: Any) -> str:
+    raw = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def config_fingerprint(config: Any) -> str:
+    """Stable hash of a stage config dataclass."""
+    return _digest(dataclasses.asdict(config))
+
+
+def files_fingerprint(files: Iterable[Path]) -> str:
+    """Hash of the path, size and mtime of every input file."""
+    stats = []
+    for file in sorted(files):
+        stat = file.stat()
+        stats.append([str(file.resolve()), stat.st_size, stat.st_mtime_ns])
+    return _digest(stats)
+
+
+def chain_key(name: str, config: Any, upstream_keys: List[str]) -> str:
+    """Cache key of a stage from its config and the keys of its upstream stages."""
+    return _digest([name, config_fingerprint(config), upstream_keys])
+
+
+class StageCache:
+    """
+    Parquet store of stage outputs with LRU / size based eviction.
+
+    Args:
+        directory (str | Path): Cache root, e.g. '<data_transformation.output.directory>/stage_cache'.
+        max_size_mb (float, optional): Evict least recently used entries above this total size.
+        max_entries (int, optional): Evict least recently used entries above this count.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_size_mb: Optional[float] = None,
+        max_entries: Optional[int] = None
+        ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self.max_entries = max_entries
+        self.logger = custom_logger()
+
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / key
+
+
+    def _read_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with (self._entry(key) / "meta.json").open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+
+    def _write_meta(self, entry: Path, meta: Dict[str, Any]) -> None:
+        tmp = entry / f"meta.json.tmp-{os.getpid()}"
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, entry / "meta.json")
+
+
+    def has(self, key: str) -> bool:
+        return self._read_meta(key) is not None
+
+
+    def read(self, key: str) -> Iterator[pd.DataFrame]:
+        """
+        Stream the cached chunks of an entry.
+
+        Args:
+            key (str): Stage cache key.
+
+        Yields:
+            pd.DataFrame: A cached chunk.
+        """
+        entry = self._entry(key)
+        meta = self._read_meta(key)
+        meta["last_access"] = time.time()
+        self._write_meta(entry, meta)
+        self.logger.info(f"Reusing cached output of stage '{meta['stage']}' ({meta['rows']} rows)")
+        for part in range(meta["parts"]):
+            yield pd.read_parquet(entry / f"part-{part:05d}.parquet")
+
+
+    def write_through(self, key: str, stage: str, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Pass chunks through while storing them as a cache entry.
+
+        The entry is only published when the stream is exhausted; an error or
+        an early close discards it.
+
+        Args:
+            key (str): Stage cache key.
+            stage (str): Stage name, for reporting.
+            chunks (Iterator[pd.DataFrame]): Stage output.
+
+        Yields:
+            pd.DataFrame: The unchanged chunks.
+        """
+        tmp = self.directory / f"{key}.tmp-{os.getpid()}-{id(chunks)}"
+        tmp.mkdir(parents=True)
+        parts, rows, size, committed = 0, 0, 0, False
+        try:
+            for chunk in chunks:
+                part = tmp / f"part-{parts:05d}.parquet"
+                chunk.to_parquet(part, index=False)
+                size += part.stat().st_size
+                parts += 1
+                rows += len(chunk)
+                yield chunk
+            now = time.time()
+            self._write_meta(tmp, {"stage": stage, "parts": parts, "rows": rows, "bytes": size, "created": now, "last_access": now})
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            os.replace(tmp, self._entry(key))
+            committed = True
+            self.logger.info(f"Cached output of stage '{stage}' ({rows} rows, {size / 1e6:.2f} MB)")
+        finally:
+            if not committed:
+                shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Return the metadata of every entry, most recently used first."""
+        entries = []
+        for entry in self.directory.iterdir():
+            meta = self._read_meta(entry.name) if entry.is_dir() else None
+            if meta is not None:
+                entries.append({"key": entry.name, **meta})
+        return sorted(entries, key=lambda e: e["last_access"], reverse=True)
+
+
+    def evict(self) -> int:
+        """
+        Drop least recently used entries until both limits are met.
+
+        Returns:
+            int: Number of evicted entries.
+        """
+        total, kept, evicted = 0, 0, 0
+        for entry in self.entries():
+            too_big = self.max_size_bytes is not None and total + entry["bytes"] > self.max_size_bytes
+            too_many = self.max_entries is not None and kept >= self.max_entries
+            if too_big or too_many:
+                shutil.rmtree(self._entry(entry["key"]), ignore_errors=True)
+                evicted += 1
+            else:
+                total += entry["bytes"]
+                kept += 1
+        if evicted:
+            self.logger.info(f"Evicted {evicted} stage cache entries from {self.directory}")
+        return evicted
+
+
+    def purge(self) -> None:
+        """Remove every entry."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
@@ -1,6 +1,282 @@
-# cleaning.py placeholder 
+# cleaning.py placeholder
+import numpy as np
 import pandas as pd
-from pathlib import Path
-from typing import Optional, Dict, Iterator, List
+from typing import Optional, Iterator, List
+from pandas.api.types import union_categoricals
 from timeseries_inventory.utils import custom_logging
-from timeseries_inventory.data_config.data_stages_manager import DataCleaningConfig
\ No newline at end of file
+from timeseries_inventory.data_config.data_stages_manager import DataCleaningConfig
+from timeseries_inventory.preprocessing.series_state import SeriesState
+
+
+"""
+Chunk-aware cleaning of the ingestion stream.
+
+Chunks are cleaned one at a time and never concatenated. Two pieces of state
+are carried from chunk to chunk:
+
+- a hashed key set (64-bit hashes of the `duplicate_keys` columns) that drops
+  rows already seen in an earlier chunk;
+- per series (`series_columns`), the last valid value of every fill column,
+  which seeds the forward fill / interpolation of the next chunk. Only the
+  series present in a chunk are looked up and updated, so the cost of a
+  chunk does not grow with the number of series seen so far.
+
+Rows are assumed to arrive in time order within each series.
+"""
+
+__all__ = ["DataCleaner", "HashedKeySet"]
+
+
+# Column holding the series hash in the working frames
+_KEY = "__series_key"
+
+# Current-generation blocks merged into one sorted array above this count
+_MAX_BLOCKS = 16
+
+
+class HashedKeySet:
+    """
+    Bounded set of uint64 row hashes.
+
+    Keys are kept in sorted NumPy blocks and looked up with `searchsorted`.
+    Once the current generation holds `max_keys / 2` keys it replaces the
+    previous generation, which is dropped, so memory stays below roughly
+    `8 * max_keys` bytes. A duplicate is therefore detected as long as fewer
+    than `max_keys / 2` distinct keys arrived since its first occurrence.
+
+    Args:
+        max_keys (int): Upper bound on the number of remembered keys.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max(2, int(max_keys))
+        self._previous = np.empty(0, dtype=np.uint64)
+        self._blocks: List[np.ndarray] = []
+        self._current_size = 0
+
+
+    def __len__(self) -> int:
+        return self._previous.size + self._current_size
+
+
+    def _contains(self, hashes: np.ndarray) -> np.ndarray:
+        seen = np.zeros(hashes.size, dtype=bool)
+        for block in (self._previous, *self._blocks):
+            if block.size:
+                idx = np.minimum(np.searchsorted(block, hashes), block.size - 1)
+                seen |= block[idx] == hashes
+        return seen
+
+
+    def add(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Remember a batch of hashes.
+
+        Args:
+            hashes (np.ndarray): uint64 hashes, one per row.
+
+        Returns:
+            np.ndarray: Boolean mask, True for the first occurrence of every hash not seen before.
+        """
+        unique, first = np.unique(hashes, return_index=True)
+        fresh = ~self._contains(unique)
+        new = np.zeros(hashes.size, dtype=bool)
+        new[first[fresh]] = True
+        if fresh.any():
+            # Blocks are disjoint, so merging them only needs a sort
+            self._blocks.append(unique[fresh])
+            self._current_size += int(fresh.sum())
+            if len(self._blocks) > _MAX_BLOCKS:
+                self._blocks = [np.sort(np.concatenate(self._blocks))]
+            if self._current_size >= self.max_keys // 2:
+                self._previous = np.sort(np.concatenate(self._blocks))
+                self._blocks, self._current_size = [], 0
+        return new
+
+
+def _concat(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate chunks, keeping categorical columns categorical when their categories differ."""
+    combined = pd.concat(frames)
+    for col, dtype in frames[-1].dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype) and not isinstance(combined[col].dtype, pd.CategoricalDtype):
+            if all(isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames):
+                combined[col] = union_categoricals([frame[col] for frame in frames])
+    return combined
+
+
+class DataCleaner:
+    """
+    Drops duplicates and fills gaps in a stream of chunks with bounded state.
+
+    With `fill_method: interpolate`, rows whose gap is still open at the end of
+    a chunk (no later valid value in that chunk) are held back and emitted
+    with the next chunk, once the gap can be closed; gaps still open when the
+    stream ends are forward filled, as `pandas.Series.interpolate` does. A
+    series holds at most `max_held_rows` rows: beyond that its open gap is
+    forward filled and emitted, and the rest of the gap is interpolated from
+    there, so a series that stops reporting values (or is discontinued) does
+    not keep growing the held rows.
+
+    Args:
+        config (DataCleaningConfig): Configuration object loaded from YAML
+    """
+
+    def __init__(self, config: DataCleaningConfig):
+        if config.fill_method not in ("ffill", "interpolate"):
+            raise ValueError(f"Unsupported fill method '{config.fill_method}'")
+        self.config = config
+        self.logger = custom_logging.custom_logger()
+        self.reset()
+
+
+    def reset(self) -> None:
+        """Forget all state carried between chunks."""
+        self.seen = HashedKeySet(self.config.max_tracked_keys)
+        self._last_valid: Optional[SeriesState] = None
+        self._held: Optional[pd.DataFrame] = None
+        self.duplicates_dropped = 0
+        self.values_filled = 0
+
+
+    def clean(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Clean a chunk stream, e.g. the output of `FileLoader.load()`.
+
+        Args:
+            chunks (Iterator[pd.DataFrame]): Raw chunks.
+
+        Yields:
+            pd.DataFrame: A cleaned chunk.
+        """
+        self.reset()
+        for chunk in chunks:
+            cleaned = self.clean_chunk(chunk)
+            if len(cleaned):
+                yield cleaned
+        remainder = self.flush()
+        if remainder is not None:
+            yield remainder
+        self.logger.info(f"Cleaning dropped {self.duplicates_dropped} duplicate rows and filled {self.values_filled} values")
+
+
+    def clean_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Clean the next chunk of the stream."""
+        if self.config.drop_duplicates:
+            chunk = self._drop_duplicates(chunk)
+        if self._fill_columns(chunk):
+            chunk = self._fill(chunk)
+        return chunk
+
+
+    def flush(self) -> Optional[pd.DataFrame]:
+        """Return the held back rows at the end of the stream, forward filled."""
+        held, self._held = self._held, None
+        if held is None:
+            return None
+        return self._fill(held, final=True)
+
+
+    def _drop_duplicates(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        keys = self.config.duplicate_keys or list(chunk.columns)
+        hashes = pd.util.hash_pandas_object(chunk[keys], index=False).to_numpy()
+        new = self.seen.add(hashes)
+        dropped = int(new.size - new.sum())
+        if not dropped:
+            return chunk
+        self.duplicates_dropped += dropped
+        return chunk[new]
+
+
+    def _fill_columns(self, chunk: pd.DataFrame) -> List[str]:
+        return [col for col in self.config.fill_columns if col in chunk.columns]
+
+
+    def _series_key(self, frame: pd.DataFrame) -> np.ndarray:
+        if not self.config.series_columns:
+            return np.zeros(len(frame), dtype=np.uint64)
+        missing = [col for col in self.config.series_columns if col not in frame.columns]
+        if missing:
+            raise ValueError(f"Series columns missing from chunk: {missing}")
+        return pd.util.hash_pandas_object(frame[self.config.series_columns], index=False).to_numpy()
+
+
+    def _fill(self, chunk: pd.DataFrame, final: bool = False) -> pd.DataFrame:
+        """
+        Fill the gaps of one chunk, seeded with the last valid values of earlier chunks.
+
+        The last valid values of the series in the chunk are prepended as one
+        anchor row per series, so a single grouped ffill/bfill over anchors +
+        chunk handles chunk boundaries.
+        """
+        if self._held is not None:
+            chunk, self._held = _concat([self._held, chunk]), None
+        cols = self._fill_columns(chunk)
+        if self._last_valid is None or self._last_valid.width != len(cols):
+            self._last_valid = SeriesState(depth=1, width=len(cols))
+        values = chunk[cols].astype("float64").reset_index(drop=True)
+        values[_KEY] = self._series_key(chunk)
+        anchor_keys, anchor_values = self._last_valid.get(pd.unique(values[_KEY].to_numpy()))
+        anchors = len(anchor_keys)
+        if anchors:
+            anchor = pd.DataFrame(anchor_values, columns=cols)
+            anchor[_KEY] = anchor_keys
+            values = pd.concat([anchor, values], ignore_index=True)
+
+        grouped = values.groupby(_KEY, sort=False)[cols]
+        filled = grouped.ffill()
+        hold = np.zeros(len(values), dtype=bool)
+        if self.config.fill_method == "interpolate":
+            filled, hold = self._interpolate(values, filled, cols, final)
+        last = grouped.last()
+        self._last_valid.put(last.index.to_numpy(), last.to_numpy())
+
+        filled, hold = filled.iloc[anchors:], hold[anchors:]
+        was_missing = chunk[cols].isna().to_numpy()
+        result = chunk.copy()
+        for col in cols:
+            result[col] = filled[col].to_numpy().astype(chunk[col].dtype, copy=False)
+        self.values_filled += int((was_missing & result[cols].notna().to_numpy())[~hold].sum())
+        if hold.any():
+            self._held = chunk[hold]
+            result = result[~hold]
+        return result
+
+
+    def _interpolate(
+        self,
+        values: pd.DataFrame,
+        prev: pd.DataFrame,
+        cols: List[str],
+        final: bool
+        ) -> tuple:
+        """
+        Linear interpolation per series from the previous and next valid value of every row.
+
+        Returns:
+            tuple: Filled values and the mask of rows to hold back until a later valid value arrives
+            (at most `max_held_rows` per series).
+        """
+        key = values[_KEY]
+        position = values.groupby(_KEY, sort=False).cumcount().to_numpy(dtype="float64")
+        valid = values[cols].notna().to_numpy()
+        positions = pd.DataFrame(np.where(valid, position[:, None], np.nan), columns=cols)
+        positions[_KEY] = key
+        prev_pos = positions.groupby(_KEY, sort=False)[cols].ffill().to_numpy()
+        next_pos = positions.groupby(_KEY, sort=False)[cols].bfill().to_numpy()
+        next_val = values.groupby(_KEY, sort=False)[cols].bfill().to_numpy()
+        prev_val = prev.to_numpy()
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(next_pos > prev_pos, (position[:, None] - prev_pos) / (next_pos - prev_pos), 0.0)
+            interpolated = prev_val + (next_val - prev_val) * weight
+        open_gap = ~valid & ~np.isnan(prev_val) & np.isnan(next_val)
+        if final:
+            release = np.ones(len(values), dtype=bool)
+        else:
+            hold = open_gap.any(axis=1)
+            # Series over the cap give up on their open gap instead of holding it further
+            release = hold & (pd.Series(hold).groupby(key.to_numpy(), sort=False).transform("sum").to_numpy() > self.config.max_held_rows)
+        # Nothing left to interpolate towards: carry the last value forward
+        interpolated = np.where(open_gap & release[:, None], prev_val, interpolated)
+        hold = np.zeros(len(values), dtype=bool) if final else hold & ~release
+        return pd.DataFrame(interpolated, columns=cols), hold
@@ -1 +1,183 @@
-# feature_engineering.py placeholder 
+# feature_engineering.py placeholder
+import itertools
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, List
+from timeseries_inventory.utils import custom_logging
+from timeseries_inventory.data_config.data_stages_manager import FeatureEngineeringConfig
+from timeseries_inventory.preprocessing.series_state import SeriesState
+
+
+"""
+Streaming feature engineering.
+
+Lag, rolling mean and EWM features of the target are computed per series on
+each chunk, seeded with state carried over from the previous chunks:
+
+- a tail buffer with the last `max(lags + rolling_windows)` target values of
+  every series, prepended to the chunk so grouped shifts and window sums see
+  across the chunk boundary;
+- the last EWM value of every series and span, prepended as an anchor row so
+  the (adjust=False) recursion continues where it stopped.
+
+Only the state of the series present in a chunk is prepended and replaced,
+so the cost of a chunk does not grow with the number of series seen so far.
+
+Rolling means and EWMs only look at previous values (`rolling_mean_7` of a
+row is the mean of the 7 values before it), so no feature leaks the target.
+Rows are assumed to arrive in time order within each series.
+"""
+
+__all__ = ["FeatureEngine"]
+
+
+# Column holding the series hash in the working frames
+_KEY = "__series_key"
+
+
+class FeatureEngine:
+    """
+    Adds lag, rolling, EWM, polynomial and interaction features to a chunk stream.
+
+    Polynomial (`generate_polynomials`, up to `polynomial_degree`) and pairwise
+    interaction (`interaction_terms`) features are built from the generated
+    lag/rolling/EWM features.
+
+    Args:
+        config (FeatureEngineeringConfig): Configuration object loaded from YAML
+    """
+
+    def __init__(self, config: FeatureEngineeringConfig):
+        self.config = config
+        self.logger = custom_logging.custom_logger()
+        self.lags = sorted(set(config.lags)) if config.enabled else []
+        self.windows = sorted(set(config.rolling_windows)) if config.enabled else []
+        self.spans = sorted(set(config.ewm_spans)) if config.enabled else []
+        self.tail_length = max(self.lags + self.windows, default=0)
+        self.reset()
+
+
+    def reset(self) -> None:
+        """Forget the state carried between chunks."""
+        self._tail = SeriesState(depth=self.tail_length, width=1)
+        self._ewm_state: Dict[int, SeriesState] = {span: SeriesState(depth=1, width=1) for span in self.spans}
+
+
+    @property
+    def base_features(self) -> List[str]:
+        target = self.config.target_column
+        return (
+            [f"{target}_lag_{lag}" for lag in self.lags]
+            + [f"{target}_rolling_mean_{window}" for window in self.windows]
+            + [f"{target}_ewm_{span}" for span in self.spans]
+        )
+
+
+    def transform(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Add the configured features to every chunk of a stream.
+
+        Args:
+            chunks (Iterator[pd.DataFrame]): Cleaned chunks.
+
+        Yields:
+            pd.DataFrame: The chunk with the feature columns appended.
+        """
+        self.reset()
+        for chunk in chunks:
+            yield self.transform_chunk(chunk)
+
+
+    def transform_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Add the features to the next chunk of the stream."""
+        target = self.config.target_column
+        if target not in chunk.columns:
+            raise ValueError(f"Target column '{target}' missing from chunk")
+        values = chunk[target].to_numpy(dtype="float64", na_value=np.nan)
+        keys = self._series_key(chunk)
+        features: Dict[str, np.ndarray] = {}
+        if self.tail_length:
+            features.update(self._lag_window_features(keys, values))
+        for span in self.spans:
+            features[f"{target}_ewm_{span}"] = self._ewm_feature(keys, values, span)
+        base = list(features)
+        if self.config.generate_polynomials:
+            for name in base:
+                for degree in range(2, self.config.polynomial_degree + 1):
+                    features[f"{name}_pow_{degree}"] = features[name] ** degree
+        if self.config.interaction_terms:
+            for left, right in itertools.combinations(base, 2):
+                features[f"{left}_x_{right}"] = features[left] * features[right]
+
+        dtype = chunk[target].dtype if pd.api.types.is_float_dtype(chunk[target].dtype) else np.float64
+        frame = pd.DataFrame({name: col.astype(dtype, copy=False) for name, col in features.items()}, index=chunk.index)
+        return pd.concat([chunk, frame], axis=1)
+
+
+    def _series_key(self, frame: pd.DataFrame) -> np.ndarray:
+        if not self.config.series_columns:
+            return np.zeros(len(frame), dtype=np.uint64)
+        missing = [col for col in self.config.series_columns if col not in frame.columns]
+        if missing:
+            raise ValueError(f"Series columns missing from chunk: {missing}")
+        return pd.util.hash_pandas_object(frame[self.config.series_columns], index=False).to_numpy()
+
+
+    @staticmethod
+    def _extend(state: SeriesState, keys: np.ndarray, values: np.ndarray) -> pd.DataFrame:
+        """The chunk's (key, value) rows, preceded by the carried rows of the series it contains."""
+        current = pd.DataFrame({_KEY: keys, "value": values})
+        carried_keys, carried = state.get(pd.unique(keys))
+        if not len(carried_keys):
+            return current
+        return pd.concat([pd.DataFrame({_KEY: carried_keys, "value": carried[:, 0]}), current], ignore_index=True)
+
+
+    def _lag_window_features(self, keys: np.ndarray, values: np.ndarray) -> Dict[str, np.ndarray]:
+        """Lags and rolling means over tail buffer + chunk, then refresh the tail buffer."""
+        target = self.config.target_column
+        extended = self._extend(self._tail, keys, values)
+        start = len(extended) - len(values)
+        grouped = extended.groupby(_KEY, sort=False)["value"]
+
+        features = {}
+        for lag in self.lags:
+            features[f"{target}_lag_{lag}"] = grouped.shift(lag).to_numpy()[start:]
+        if self.windows:
+            # Window sums as differences of per-series running sums of the previous values
+            previous = grouped.shift(1)
+            present = previous.notna()
+            frame = pd.DataFrame({
+                _KEY: extended[_KEY],
+                "sum": previous.fillna(0.0).groupby(extended[_KEY], sort=False).cumsum(),
+                "count": present.groupby(extended[_KEY], sort=False).cumsum(),
+            })
+            position = grouped.cumcount().to_numpy()
+            running = frame.groupby(_KEY, sort=False)[["sum", "count"]]
+            for window in self.windows:
+                before = running.shift(window).fillna(0.0).to_numpy()
+                total = frame[["sum", "count"]].to_numpy() - before
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    mean = np.where((position >= window) & (total[:, 1] > 0), total[:, 0] / total[:, 1], np.nan)
+                features[f"{target}_rolling_mean_{window}"] = mean[start:]
+
+        self._tail.put(extended[_KEY].to_numpy(), extended["value"].to_numpy())
+        return features
+
+
+    def _ewm_feature(self, keys: np.ndarray, values: np.ndarray, span: int) -> np.ndarray:
+        """EWM of the previous values, continuing the recursion from the carried per-series state."""
+        state = self._ewm_state[span]
+        extended = self._extend(state, keys, values)
+        start = len(extended) - len(values)
+        ewm = (
+            extended.groupby(_KEY, sort=False)["value"]
+            .ewm(span=span, adjust=False)
+            .mean()
+            .droplevel(0)
+            .sort_index()
+        )
+        extended["ewm"] = ewm.to_numpy()
+        last = extended.groupby(_KEY, sort=False)["ewm"].last()
+        state.put(last.index.to_numpy(), last.to_numpy())
+        return extended.groupby(_KEY, sort=False)["ewm"].shift(1).to_numpy()[start:]
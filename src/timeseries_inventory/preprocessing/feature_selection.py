@@ -0,0 +1,283 @@
+import os
+import json
+import math
+import time
+import shutil
+import hashlib
+import itertools
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from timeseries_inventory.utils import custom_logging
+from timeseries_inventory.data_config.data_stages_config import FeatureSelectionConfig
+
+try:
+    from sklearn.feature_selection import mutual_info_regression
+except ImportError:  # pragma: no cover - optional dependency
+    mutual_info_regression = None
+
+
+"""
+Mutual-information feature selection on a sample of the stream.
+
+Candidates are the numeric columns other than the target; the `top_k` with
+the highest mutual information with the target are kept, every other column
+(ids, dates, categoricals, the target) always passes through.
+
+Scores are computed on a stratified reservoir sample instead of the full
+stream: every period of `time_column` (at `strata_frequency`) contributes an
+equal number of uniformly drawn rows, so seasonal and recent behaviour are
+both represented. The stream is spilled to Parquet while it is sampled and
+replayed with the selected columns once the scores are known. Features are
+scored in parallel worker processes, and the scores are cached under the
+hash of the sample, so rerunning with another `top_k` skips the scoring.
+"""
+
+__all__ = ["StratifiedReservoir", "FeatureSelector", "mutual_info_scores"]
+
+
+# Score cache entries kept, most recent last
+MAX_CACHED_SCORES = 16
+
+
+def _score_feature(x: np.ndarray, y: np.ndarray, n_neighbors: int, random_state: int) -> float:
+    """Mutual information of one feature with the target over the rows where both are known."""
+    known = ~(np.isnan(x) | np.isnan(y))
+    if known.sum() <= n_neighbors:
+        return 0.0
+    return float(mutual_info_regression(x[known, None], y[known], n_neighbors=n_neighbors, random_state=random_state)[0])
+
+
+def mutual_info_scores(sample: pd.DataFrame, features: List[str], target: str, n_neighbors: int = 3, random_state: int = 0, workers: int = 1) -> Dict[str, float]:
+    """
+    Mutual information of every feature with the target, one feature per task.
+
+    Args:
+        sample (pd.DataFrame): Rows to score on.
+        features (List[str]): Numeric feature columns.
+        target (str): Target column.
+        n_neighbors (int): Neighbours of the k-NN entropy estimator.
+        random_state (int): Seed of the estimator's tie-breaking noise.
+        workers (int): Processes scoring features concurrently.
+
+    Returns:
+        dict: Feature -> mutual information (nats).
+    """
+    if mutual_info_regression is None:
+        raise ImportError("scikit-learn is required for mutual information feature selection: pip install scikit-learn")
+    y = sample[target].to_numpy(dtype="float64", na_value=np.nan)
+    columns = [sample[f].to_numpy(dtype="float64", na_value=np.nan) for f in features]
+    if workers <= 1 or len(features) <= 1:
+        scores = [_score_feature(x, y, n_neighbors, random_state) for x in columns]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(features))) as pool:
+            scores = list(pool.map(_score_feature, columns, [y] * len(columns), [n_neighbors] * len(columns), [random_state] * len(columns)))
+    return dict(zip(features, scores))
+
+
+class StratifiedReservoir:
+    """
+    Equal-size uniform samples per stratum, drawn in one pass over a stream.
+
+    Every row gets a random key and each stratum keeps the rows with the
+    smallest keys (bottom-k sampling). When a new stratum appears the quota
+    per stratum shrinks, and trimming a bottom-k sample to fewer rows still
+    leaves a uniform sample, so the result does not depend on chunking.
+
+    A chunk is only compared against the largest key kept per stratum: rows
+    that cannot enter the sample are dropped right away and the others are
+    buffered, then merged into the sample once `size` rows are pending. The
+    cost of a chunk therefore does not grow with the sample.
+
+    Args:
+        size (int): Total rows kept.
+        random_state (int): Seed of the row keys.
+    """
+
+    def __init__(self, size: int, random_state: int):
+        self.size = size
+        self.rng = np.random.default_rng(random_state)
+        self.sample: Optional[pd.DataFrame] = None
+        self.keys = np.empty(0)
+        self.row_strata = np.empty(0, dtype=np.int64)
+        # Largest kept key of every full stratum: rows above it never enter the sample
+        self.limits: Dict[int, float] = {}
+        self.seen: Set[int] = set()
+        self.pending: List[Tuple[pd.DataFrame, np.ndarray, np.ndarray]] = []
+        self.pending_rows = 0
+
+
+    def add(self, frame: pd.DataFrame, strata: np.ndarray) -> None:
+        keys = self.rng.random(len(frame))
+        if not len(frame):
+            return
+        strata = np.asarray(strata, dtype=np.int64)
+        codes, uniques = pd.factorize(strata)
+        self.seen.update(uniques.tolist())
+        limits = np.array([self.limits.get(stratum, np.inf) for stratum in uniques.tolist()])
+        candidates = np.flatnonzero(keys < limits[codes])
+        if not len(candidates):
+            return
+        self.pending.append((frame.iloc[candidates], keys[candidates], strata[candidates]))
+        self.pending_rows += len(candidates)
+        if self.pending_rows >= self.size:
+            self._merge()
+
+
+    def _merge(self) -> None:
+        """Fold the pending rows into the sample, keeping the bottom-`quota` keys per stratum."""
+        if not self.pending:
+            return
+        frames = [frame for frame, _, _ in self.pending]
+        keys = np.concatenate([self.keys, *(k for _, k, _ in self.pending)])
+        strata = np.concatenate([self.row_strata, *(s for _, _, s in self.pending)])
+        combined = pd.concat(frames if self.sample is None else [self.sample, *frames], ignore_index=True)
+        self.pending, self.pending_rows = [], 0
+
+        quota = math.ceil(self.size / max(len(self.seen), 1))
+        order = np.lexsort((keys, strata))
+        # Rank of every row within its stratum, in key order
+        starts = np.r_[True, strata[order][1:] != strata[order][:-1]]
+        positions = np.arange(len(order))
+        rank = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+        keep = np.sort(order[rank < quota])
+
+        self.sample = combined.iloc[keep].reset_index(drop=True)
+        self.keys, self.row_strata = keys[keep], strata[keep]
+        summary = pd.Series(self.keys).groupby(self.row_strata).agg(["max", "size"])
+        full = summary[summary["size"] >= quota]
+        self.limits = dict(zip(full.index.tolist(), full["max"].tolist()))
+
+
+    def result(self) -> pd.DataFrame:
+        self._merge()
+        if self.sample is None:
+            return pd.DataFrame()
+        return self.sample
+
+
+class FeatureSelector:
+    """
+    Keeps the `top_k` generated features with the highest mutual information with the target.
+
+    Args:
+        config (FeatureSelectionConfig): Configuration object loaded from YAML
+    """
+
+    def __init__(self, config: FeatureSelectionConfig):
+        if config.method != "mutual_info":
+            raise ValueError(f"Unsupported feature selection method '{config.method}', expected 'mutual_info'")
+        self.config = config
+        self.cache_path = Path(config.directory) / "scores.json"
+        self.logger = custom_logging.custom_logger()
+
+
+    def candidates(self, chunk: pd.DataFrame) -> List[str]:
+        """Numeric columns other than the target and the time column."""
+        excluded = {self.config.target_column, self.config.time_column}
+        return [
+            c for c in chunk.columns
+            if c not in excluded and pd.api.types.is_numeric_dtype(chunk[c]) and not pd.api.types.is_bool_dtype(chunk[c])
+        ]
+
+
+    def _strata(self, chunk: pd.DataFrame) -> np.ndarray:
+        column = self.config.time_column
+        if not column or column not in chunk.columns:
+            return np.zeros(len(chunk), dtype=np.int64)
+        return pd.to_datetime(chunk[column]).dt.to_period(self.config.strata_frequency).array.asi8
+
+
+    def _sample_key(self, sample: pd.DataFrame, features: List[str]) -> str:
+        """Hash of the scoring settings and the sampled values."""
+        digest = hashlib.blake2b(digest_size=16)
+        settings = [self.config.method, self.config.n_neighbors, self.config.random_state, self.config.target_column, features]
+        digest.update(json.dumps(settings).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(sample[[*features, self.config.target_column]], index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+
+    def _cached_scores(self, key: str) -> Optional[Dict[str, float]]:
+        try:
+            return json.loads(self.cache_path.read_text()).get(key)
+        except (OSError, ValueError):
+            return None
+
+
+    def _store_scores(self, key: str, scores: Dict[str, float]) -> None:
+        try:
+            cache = json.loads(self.cache_path.read_text())
+        except (OSError, ValueError):
+            cache = {}
+        cache.pop(key, None)
+        cache[key] = scores
+        cache = dict(list(cache.items())[-MAX_CACHED_SCORES:])
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(f".tmp-{os.getpid()}")
+        tmp.write_text(json.dumps(cache, indent=2))
+        os.replace(tmp, self.cache_path)
+
+
+    def scores(self, sample: pd.DataFrame, features: List[str]) -> Dict[str, float]:
+        """Mutual information of every candidate, from the cache when the sample was scored before."""
+        key = self._sample_key(sample, features)
+        cached = self._cached_scores(key)
+        if cached is not None:
+            self.logger.info(f"Reusing cached mutual information scores of {len(features)} features")
+            return cached
+        started = time.perf_counter()
+        scores = mutual_info_scores(
+            sample, features, self.config.target_column, self.config.n_neighbors, self.config.random_state, self.config.workers
+        )
+        self.logger.info(f"Scored {len(features)} features on {len(sample)} sampled rows in {time.perf_counter() - started:.1f}s")
+        self._store_scores(key, scores)
+        return scores
+
+
+    def select(self, scores: Dict[str, float]) -> List[str]:
+        """The `top_k` features by score, ties broken by name."""
+        ranked = sorted(scores, key=lambda feature: (-scores[feature], feature))
+        return ranked[:self.config.top_k]
+
+
+    def transform(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Drop the candidate features that are not among the `top_k`.
+
+        Args:
+            chunks (Iterator[pd.DataFrame]): Feature chunks.
+
+        Yields:
+            pd.DataFrame: The same chunks without the dropped features.
+        """
+        chunks = iter(chunks)
+        first = next(chunks, None)
+        if first is None:
+            return
+        features = self.candidates(first)
+        if len(features) <= self.config.top_k or self.config.target_column not in first.columns:
+            self.logger.info(f"Keeping all {len(features)} candidate features (top_k={self.config.top_k})")
+            yield first
+            yield from chunks
+            return
+
+        spill = Path(self.config.directory) / f"spill-{os.getpid()}-{time.time_ns()}"
+        spill.mkdir(parents=True)
+        try:
+            reservoir = StratifiedReservoir(self.config.sample_rows, self.config.random_state)
+            parts = 0
+            for chunk in itertools.chain([first], chunks):
+                chunk.to_parquet(spill / f"part-{parts:05d}.parquet", index=False)
+                parts += 1
+                reservoir.add(chunk[[*features, self.config.target_column]], self._strata(chunk))
+
+            scores = self.scores(reservoir.result(), features)
+            selected = set(self.select(scores))
+            dropped = [f for f in features if f not in selected]
+            self.logger.info(f"Selected {sorted(selected)}; dropping {len(dropped)} features")
+            for index in range(parts):
+                yield pd.read_parquet(spill / f"part-{index:05d}.parquet").drop(columns=dropped)
+        finally:
+            shutil.rmtree(spill, ignore_errors=True)
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+from typing import List, Tuple
+
+
+"""
+Per-series state carried between the chunks of a stream.
+
+The streaming cleaner and feature engine keep a few values per series - the
+last valid values, the tail of the target, the last EWM - and seed the next
+chunk with them. The state of every series ever seen is kept, but a chunk
+must only pay for the series it contains: `SeriesState` looks rows up and
+replaces them by series hash, so the cost per chunk is independent of the
+size of the catalogue.
+
+Series hashes are looked up with `pandas.Index.get_indexer` over a few
+immutable indexes of geometrically decreasing size (the slots of the series
+seen first, then of later arrivals), so lookups run in vectorized hash
+tables and a new series is re-indexed only O(log n) times.
+"""
+
+__all__ = ["SeriesState"]
+
+
+class SeriesState:
+    """
+    Up to `depth` rows of `width` float64 values per series, keyed by series hash.
+
+    Rows are kept in time order within each series; storing more than `depth`
+    rows for a series keeps its last `depth`.
+
+    Args:
+        depth (int): Rows kept per series.
+        width (int): Values per row.
+    """
+
+    def __init__(self, depth: int, width: int):
+        self.depth = max(1, int(depth))
+        self.width = int(width)
+        self._size = 0
+        # Series hashes of consecutive slot ranges, largest (oldest) first
+        self._levels: List[pd.Index] = []
+        self._values = np.empty((0, self.depth, self.width), dtype=np.float64)
+        self._counts = np.zeros(0, dtype=np.int64)
+
+
+    def __len__(self) -> int:
+        """Number of stored rows."""
+        return int(self._counts[:self._size].sum())
+
+
+    @property
+    def series(self) -> int:
+        """Number of series with stored rows."""
+        return self._size
+
+
+    def _find(self, keys: np.ndarray) -> np.ndarray:
+        """Slot of every key, -1 for unseen series."""
+        slots = np.full(len(keys), -1, dtype=np.int64)
+        missing, offset = np.arange(len(keys)), 0
+        for level in self._levels:
+            if not missing.size:
+                break
+            found = level.get_indexer(keys[missing])
+            hit = found >= 0
+            slots[missing[hit]] = found[hit] + offset
+            missing = missing[~hit]
+            offset += len(level)
+        return slots
+
+
+    def _assign(self, keys: np.ndarray) -> np.ndarray:
+        """Slots of `keys` (unique), allocating slots for unseen series."""
+        slots = self._find(keys)
+        new = np.flatnonzero(slots < 0)
+        if new.size:
+            first = self._size
+            slots[new] = np.arange(first, first + new.size)
+            self._size += new.size
+            self._levels.append(pd.Index(keys[new]))
+            # Merge levels like a binary counter: each hash is re-indexed O(log n) times
+            while len(self._levels) > 1 and len(self._levels[-1]) >= len(self._levels[-2]):
+                last = self._levels.pop()
+                self._levels[-1] = self._levels[-1].append(last)
+            if first + new.size > len(self._counts):
+                capacity = max(first + new.size, 2 * len(self._counts), 64)
+                values = np.empty((capacity, self.depth, self.width), dtype=np.float64)
+                values[:first] = self._values[:first]
+                counts = np.zeros(capacity, dtype=np.int64)
+                counts[:first] = self._counts[:first]
+                self._values, self._counts = values, counts
+        return slots
+
+
+    def get(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Stored rows of the given series.
+
+        Args:
+            keys (np.ndarray): Unique series hashes.
+
+        Returns:
+            tuple: Series hash of every row and the rows (n x width), grouped by
+            series in the order of `keys`, in time order within each series.
+        """
+        slots = self._find(keys)
+        known = slots >= 0
+        slots = slots[known]
+        counts = self._counts[slots]
+        present = np.arange(self.depth)[None, :] >= (self.depth - counts)[:, None]
+        return np.repeat(keys[known], counts), self._values[slots][present]
+
+
+    def put(self, keys: np.ndarray, values: np.ndarray) -> None:
+        """
+        Replace the stored rows of every series in `keys` with its last `depth` rows.
+
+        Series not in `keys` keep their rows.
+
+        Args:
+            keys (np.ndarray): Series hash per row.
+            values (np.ndarray): Rows (n x width, or n values when width is 1) in time order within each series.
+        """
+        if not len(keys):
+            return
+        values = np.asarray(values, dtype=np.float64).reshape(len(keys), self.width)
+        # Group the rows by series with a stable sort, which keeps their time order
+        order = np.argsort(keys, kind="stable")
+        ordered = keys[order]
+        starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+        sizes = np.diff(np.r_[starts, len(keys)])
+        from_end = np.repeat(starts + sizes, sizes) - 1 - np.arange(len(keys))
+        kept = from_end < self.depth
+        slots = self._assign(ordered[starts])
+        self._counts[slots] = np.minimum(sizes, self.depth)
+        self._values[np.repeat(slots, sizes)[kept], self.depth - 1 - from_end[kept]] = values[order[kept]]
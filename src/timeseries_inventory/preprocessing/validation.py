@@ -1 +1,164 @@
-# validation.py placeholder 
+# validation.py placeholder
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterator, List, Tuple
+from timeseries_inventory.utils import custom_logging
+from timeseries_inventory.data_config.data_stages_manager import DataValidationConfig
+
+
+"""
+Streaming data validation.
+
+Every chunk is checked against all configured rules at once: the null check
+and the `column_ranges` bounds are evaluated into a single boolean
+(rows x rules) matrix, which is reduced to per-rule counts. Offending rows
+are never copied; the report only keeps their counts and the stream
+positions of the first `max_examples` of them per rule.
+"""
+
+__all__ = ["DataValidator", "DataValidationError", "ValidationReport"]
+
+
+class ValidationReport:
+    """
+    Violation counts and example row positions per rule.
+
+    Args:
+        max_examples (int): Offending row positions kept per rule.
+    """
+
+    def __init__(self, max_examples: int = 10):
+        self.max_examples = max_examples
+        self.rows = 0
+        self.violating_rows = 0
+        self.chunks = 0
+        self.violations: Dict[str, Dict[str, Any]] = {}
+
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+
+    def record(self, rule: str, count: int, positions: np.ndarray) -> None:
+        """Add the violations of one rule in one chunk."""
+        entry = self.violations.setdefault(rule, {"count": 0, "examples": []})
+        entry["count"] += count
+        room = self.max_examples - len(entry["examples"])
+        if room > 0:
+            entry["examples"].extend(int(p) for p in positions[:room])
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"rows": self.rows, "violating_rows": self.violating_rows, "chunks": self.chunks, "violations": self.violations}
+
+
+    def summary(self) -> str:
+        if self.ok:
+            return f"Validation passed ({self.rows} rows in {self.chunks} chunks)"
+        lines = [f"Validation found violations in {self.violating_rows} of {self.rows} rows ({self.chunks} chunks):"]
+        for rule, entry in self.violations.items():
+            lines.append(f"  {rule}: {entry['count']} rows, first at {entry['examples']}")
+        return "\n".join(lines)
+
+
+class DataValidationError(ValueError):
+    """Raised when a chunk violates the validation rules and `fail_fast` is set."""
+
+    def __init__(self, report: ValidationReport):
+        super().__init__(report.summary())
+        self.report = report
+
+
+class DataValidator:
+    """
+    Validates a chunk stream against the `data_validation` config.
+
+    With `fail_fast` the first chunk with a violation raises
+    DataValidationError; otherwise chunks keep streaming unchanged and the
+    violations are collected in `self.report`.
+
+    Args:
+        config (DataValidationConfig): Configuration object loaded from YAML
+    """
+
+    def __init__(self, config: DataValidationConfig):
+        self.config = config
+        self.logger = custom_logging.custom_logger()
+        self.report = ValidationReport(config.max_examples)
+        self._ranges = self._range_rules(config.column_ranges)
+
+
+    @staticmethod
+    def _range_rules(column_ranges: Dict[str, Dict[str, Any]]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        columns = list(column_ranges)
+        lower = np.array([column_ranges[c].get("min", -np.inf) for c in columns], dtype="float64")
+        upper = np.array([column_ranges[c].get("max", np.inf) for c in columns], dtype="float64")
+        return columns, lower, upper
+
+
+    def validate(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Validate every chunk and pass it through.
+
+        Args:
+            chunks (Iterator[pd.DataFrame]): Chunks to validate.
+
+        Yields:
+            pd.DataFrame: The unchanged chunk.
+        """
+        self.report = ValidationReport(self.config.max_examples)
+        for chunk in chunks:
+            self.check(chunk)
+            yield chunk
+        if self.report.ok:
+            self.logger.info(self.report.summary())
+        else:
+            self.logger.warning(self.report.summary())
+
+
+    def check(self, chunk: pd.DataFrame) -> None:
+        """
+        Evaluate all rules on one chunk and record the violations.
+
+        Raises:
+            DataValidationError: On a violation when `fail_fast` is set.
+        """
+        rules, matrix = self._violations(chunk)
+        counts = matrix.sum(axis=0) if matrix.size else np.zeros(0, dtype=int)
+        offset = self.report.rows
+        for j in np.flatnonzero(counts):
+            self.report.record(rules[j], int(counts[j]), offset + np.flatnonzero(matrix[:, j])[:self.config.max_examples])
+        violating = int(matrix.any(axis=1).sum()) if matrix.size else 0
+        for column in self._ranges[0]:
+            if column not in chunk.columns:
+                self.report.record(f"{column}: missing column", len(chunk), np.empty(0, dtype=int))
+                violating = len(chunk)
+        self.report.violating_rows += violating
+        self.report.rows += len(chunk)
+        self.report.chunks += 1
+        if self.config.fail_fast and not self.report.ok:
+            raise DataValidationError(self.report)
+
+
+    def _violations(self, chunk: pd.DataFrame) -> Tuple[List[str], np.ndarray]:
+        """Boolean (rows x rules) matrix of all rule violations of a chunk."""
+        rules: List[str] = []
+        blocks: List[np.ndarray] = []
+        if not self.config.allow_nulls:
+            rules.extend(f"{column}: null" for column in chunk.columns)
+            blocks.append(chunk.isna().to_numpy())
+
+        columns, lower, upper = self._ranges
+        present = [i for i, column in enumerate(columns) if column in chunk.columns]
+        if present:
+            names = [columns[i] for i in present]
+            values = chunk[names].to_numpy(dtype="float64", na_value=np.nan)
+            # NaN compares False, so nulls are only reported by the null rule
+            blocks.append(values < lower[present])
+            blocks.append(values > upper[present])
+            rules.extend(f"{name}: below min {lower[i]:g}" for name, i in zip(names, present))
+            rules.extend(f"{name}: above max {upper[i]:g}" for name, i in zip(names, present))
+        if not blocks:
+            return rules, np.zeros((len(chunk), 0), dtype=bool)
+        return rules, np.hstack(blocks)
@@ -0,0 +1,85 @@
+import asyncio
+import functools
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from timeseries_inventory.utils.custom_logging import custom_logger
+
+
+"""
+Asyncio micro-batching of concurrent single-item requests.
+
+Requests that can be scored together (same group, e.g. horizon and model
+version) are collected for at most `max_wait_ms` after the first one, or
+until `max_batch_size` are waiting, and then handed to the handler as one
+batch. The handler runs in the loop's default executor so the event loop
+keeps accepting requests while a batch is scored; every caller gets its
+own item's result, or the handler's exception.
+"""
+
+__all__ = ["MicroBatcher"]
+
+
+class MicroBatcher:
+    """
+    Args:
+        handler (callable): `handler(group, items) -> {item: result}`; items without a
+            result fail with KeyError.
+        max_batch_size (int): Items that trigger a flush without waiting for the window.
+        max_wait_ms (float): Longest a request waits for others to join its batch.
+    """
+
+    def __init__(self, handler: Callable[[Hashable, List[Hashable]], Dict[Hashable, Any]], max_batch_size: int, max_wait_ms: float):
+        self.handler = handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._pending: Dict[Hashable, List[Tuple[Hashable, asyncio.Future]]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self.batches = 0
+        self.items = 0
+        self.logger = custom_logger()
+
+
+    async def submit(self, group: Hashable, item: Hashable) -> Any:
+        """Queue an item and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiting = self._pending.setdefault(group, [])
+        waiting.append((item, future))
+        if len(waiting) >= self.max_batch_size:
+            self._flush(group)
+        elif len(waiting) == 1:
+            self._timers[group] = loop.call_later(self.max_wait, self._flush, group)
+        return await future
+
+
+    def _flush(self, group: Hashable) -> None:
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(group, [])
+        if batch:
+            asyncio.get_running_loop().create_task(self._run(group, batch))
+
+
+    async def _run(self, group: Hashable, batch: List[Tuple[Hashable, asyncio.Future]]) -> None:
+        items = list(dict.fromkeys(item for item, _ in batch))
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(None, functools.partial(self.handler, group, items))
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for item, future in batch:
+            if future.done():
+                continue  # the caller went away
+            if item in results:
+                future.set_result(results[item])
+            else:
+                future.set_exception(KeyError(item))
+
+
+    @property
+    def mean_batch_size(self) -> Optional[float]:
+        return self.items / self.batches if self.batches else None
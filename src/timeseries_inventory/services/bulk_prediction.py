@@ -0,0 +1,212 @@
+import os
+import time
+import dataclasses
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+from timeseries_inventory.utils.custom_logging import custom_logger
+from timeseries_inventory.data_config.data_stages_config import DataIngestionConfig, ModelPredictionConfig
+from timeseries_inventory.ingestion.readers import get_reader
+from timeseries_inventory.models.global_model import GlobalModel
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pa_parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+
+"""
+Bulk scoring of the catalogue with the global model.
+
+`model_prediction.paths.input_data` is streamed in chunks of `chunk_size`
+rows; every chunk is one vectorized `predict` call covering all the SKUs it
+holds. With `workers > 1` the chunks are scored by a process pool whose
+workers load the model once, at start-up, and only the columns the model
+reads are sent to them. At most two chunks per worker are in flight, and
+predictions are appended to `output_predictions` (.csv or .parquet) in input
+order as they complete, so memory does not grow with the catalogue.
+"""
+
+__all__ = ["BulkPredictor", "PredictionWriter"]
+
+
+_FORMATS = {".csv": "csv", ".parquet": "parquet", ".feather": "feather"}
+
+# Model of a scoring worker, loaded once by the pool initializer
+_worker_model: Optional[GlobalModel] = None
+
+
+def _load_worker_model(path: str) -> None:
+    global _worker_model
+    _worker_model = GlobalModel.load(path)
+
+
+def _predict_worker(frame: pd.DataFrame) -> np.ndarray:
+    return _worker_model.predict(frame)
+
+
+class PredictionWriter:
+    """
+    Appends prediction chunks to a CSV or Parquet file.
+
+    The file is written under a temporary name and moved into place by `close`,
+    so an interrupted run never leaves a truncated prediction file behind, and
+    a run without rows leaves an empty file rather than the previous predictions.
+
+    Args:
+        path (Path): Output file; the suffix selects the format.
+    """
+
+    def __init__(self, path: Path):
+        if path.suffix not in (".csv", ".parquet"):
+            raise ValueError(f"Unsupported prediction output '{path.suffix}', expected '.csv' or '.parquet'")
+        if path.suffix == ".parquet" and pa is None:
+            raise ImportError("pyarrow is required to write Parquet predictions")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+        self._parquet: Any = None
+        self._started = False
+
+
+    def write(self, frame: pd.DataFrame) -> None:
+        # Categories differ between chunks; plain strings keep the output schema stable
+        frame = frame.astype({c: str for c in frame.columns if isinstance(frame[c].dtype, pd.CategoricalDtype)})
+        if self.path.suffix == ".csv":
+            frame.to_csv(self.tmp, mode="a" if self._started else "w", header=not self._started, index=False)
+        else:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pa_parquet.ParquetWriter(self.tmp, table.schema)
+            self._parquet.write_table(table)
+        self._started = True
+
+
+    def close(self, columns: Sequence[str] = ()) -> None:
+        """
+        Move the file into place.
+
+        Args:
+            columns (Sequence[str]): Header of the empty file written when no chunk was.
+        """
+        if not self._started:
+            self.write(pd.DataFrame({column: pd.Series(dtype="float64" if column == "prediction" else "object") for column in columns}))
+        if self._parquet is not None:
+            self._parquet.close()
+        os.replace(self.tmp, self.path)
+
+
+    def abort(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+        self.tmp.unlink(missing_ok=True)
+
+
+class BulkPredictor:
+    """
+    Streams feature chunks through the global model and writes the predictions.
+
+    Args:
+        config (ModelPredictionConfig): Configuration object loaded from YAML.
+        ingestion (DataIngestionConfig, optional): Reader settings (CSV engine, dtypes, datetime
+            column) used to stream `input_data`; only needed by `run`.
+    """
+
+    def __init__(self, config: ModelPredictionConfig, ingestion: Optional[DataIngestionConfig] = None):
+        self.config = config
+        self.ingestion = ingestion
+        self.logger = custom_logger()
+
+
+    def read_input(self) -> Iterator[pd.DataFrame]:
+        """Stream `input_data` in chunks of `chunk_size` rows with the ingestion reader for its format."""
+        if self.ingestion is None:
+            raise ValueError("Reading input_data needs the ingestion config")
+        path = Path(self.config.input_data)
+        if path.suffix not in _FORMATS:
+            raise ValueError(f"Unsupported prediction input '{path.suffix}', expected one of {sorted(_FORMATS)}")
+        reader = get_reader(dataclasses.replace(self.ingestion, format=_FORMATS[path.suffix], chunksize=self.config.chunk_size))
+        return reader.read(path)
+
+
+    def run(self, transform: Optional[Callable[[Iterator[pd.DataFrame]], Iterator[pd.DataFrame]]] = None) -> Dict[str, Any]:
+        """
+        Score `input_data` with the model at `paths.model`.
+
+        Args:
+            transform (callable, optional): Applied to the input stream before scoring,
+                typically `FeatureEngine.transform` to generate the model features.
+
+        Returns:
+            dict: Rows scored, elapsed seconds and the output path.
+        """
+        chunks = self.read_input()
+        if transform is not None:
+            chunks = transform(chunks)
+        return self.predict(chunks, Path(self.config.model), Path(self.config.output_predictions))
+
+
+    def _batches(self, chunks: Iterator[pd.DataFrame], model: GlobalModel) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """Split every chunk into the id columns kept for the output and the model input sent for scoring."""
+        missing: Optional[List[str]] = None
+        for chunk in chunks:
+            if missing is None:
+                missing = [c for c in model.input_columns if c not in chunk.columns]
+                if missing:
+                    raise ValueError(f"Prediction input lacks the model columns {missing}")
+            if len(chunk):
+                ids = [c for c in self.config.id_columns if c in chunk.columns]
+                yield chunk[ids].reset_index(drop=True), chunk[model.input_columns]
+
+
+    def predict(self, chunks: Iterator[pd.DataFrame], model_path: Path, output: Path) -> Dict[str, Any]:
+        """
+        Score a chunk stream and write `id_columns` plus a `prediction` column to `output`.
+
+        Args:
+            chunks (Iterator[pd.DataFrame]): Feature chunks.
+            model_path (Path): Saved global model.
+            output (Path): Prediction file, .csv or .parquet.
+
+        Returns:
+            dict: Rows scored, elapsed seconds and the output path.
+        """
+        model = GlobalModel.load(model_path)
+        writer = PredictionWriter(output)
+        started, rows = time.perf_counter(), 0
+
+        def emit(ids: pd.DataFrame, prediction: np.ndarray) -> None:
+            nonlocal rows
+            writer.write(ids.assign(prediction=prediction))
+            rows += len(prediction)
+
+        workers = max(1, self.config.workers)
+        self.logger.info(f"Scoring {self.config.chunk_size}-row chunks from {workers} worker(s) with {model_path}")
+        try:
+            if workers == 1:
+                for ids, frame in self._batches(chunks, model):
+                    emit(ids, model.predict(frame))
+            else:
+                # Bounded and ordered: results are written in input order, at most two chunks per worker wait
+                pending: Deque[Tuple[pd.DataFrame, Future]] = deque()
+                with ProcessPoolExecutor(max_workers=workers, initializer=_load_worker_model, initargs=(str(model_path),)) as pool:
+                    for ids, frame in self._batches(chunks, model):
+                        pending.append((ids, pool.submit(_predict_worker, frame)))
+                        if len(pending) >= 2 * workers:
+                            ids, future = pending.popleft()
+                            emit(ids, future.result())
+                    while pending:
+                        ids, future = pending.popleft()
+                        emit(ids, future.result())
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close([*self.config.id_columns, "prediction"])
+
+        elapsed = time.perf_counter() - started
+        self.logger.info(f"Scored {rows} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s) -> {output}")
+        return {"rows": rows, "seconds": elapsed, "output": str(output)}
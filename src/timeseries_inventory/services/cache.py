@@ -0,0 +1,64 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+"""
+Thread-safe TTL cache with an entry cap.
+
+Entries expire `ttl_seconds` after they were stored; beyond `max_entries`
+the least recently used entry is dropped. Expired entries are removed
+lazily, on access and when the cap is reached.
+"""
+
+__all__ = ["TTLCache"]
+
+
+class TTLCache:
+    """
+    Args:
+        ttl_seconds (float): Lifetime of an entry.
+        max_entries (int): Entries kept at most.
+        clock (callable): Time source, monotonic seconds.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the live value stored under `key`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -1 +1,301 @@
-# inventory.py placeholder 
+# inventory.py placeholder
+import asyncio
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+from timeseries_inventory.utils.custom_logging import custom_logger
+from timeseries_inventory.data_config.data_stages_config import ServingConfig
+from timeseries_inventory.services.cache import TTLCache
+from timeseries_inventory.services.batching import MicroBatcher
+from timeseries_inventory.services.model_registry import ModelRegistry
+
+try:
+    from scipy.special import ndtr, ndtri
+except ImportError:  # pragma: no cover - optional dependency
+    ndtr = ndtri = None
+
+
+"""
+Forecasts and inventory decisions.
+
+Forecasts come from the TTL cache when the same series, horizon and model
+version were requested recently; the remaining series of a request are
+scored together by one vectorized recursive forecast of the model version.
+
+With `micro_batching`, concurrent single-series requests (`forecast_one`) of
+the same horizon and version are coalesced by a `MicroBatcher` and scored as
+one batch.
+
+`compute_policies` turns forecasts and forecast-error spreads into safety
+stock, reorder points and order quantities for every SKU x location at
+once; every input is a scalar or an array with one element per
+SKU-location, and the work is a fixed number of array operations, so a
+million SKU-locations take well under a second.
+"""
+
+__all__ = ["ForecastResult", "InventoryService", "InventoryPolicy", "compute_policies", "residual_std", "fill_rate_z"]
+
+ArrayLike = Union[float, np.ndarray]
+
+
+@dataclass
+class ForecastResult:
+    version: str
+    horizon: int
+    forecasts: Dict[str, List[float]] = field(default_factory=dict)
+    missing: List[str] = field(default_factory=list)
+    cached: int = 0
+
+
+class InventoryService:
+    """
+    Args:
+        registry (ModelRegistry): Loaded model versions and series state.
+        config (ServingConfig): Configuration object loaded from YAML.
+    """
+
+    def __init__(self, registry: ModelRegistry, config: ServingConfig):
+        self.registry = registry
+        self.config = config
+        self.cache = TTLCache(config.cache_ttl_seconds, config.cache_max_entries)
+        self.batcher = MicroBatcher(self._score_batch, config.batch_max_size, config.batch_window_ms) if config.micro_batching else None
+        self.logger = custom_logger()
+
+
+    def horizon(self, horizon: Optional[int]) -> int:
+        """The requested horizon, or the default; raises ValueError outside 1..max_horizon."""
+        horizon = self.config.default_horizon if horizon is None else horizon
+        if not 1 <= horizon <= self.config.max_horizon:
+            raise ValueError(f"horizon must be between 1 and {self.config.max_horizon}, got {horizon}")
+        return horizon
+
+
+    def forecast(self, series_ids: List[str], horizon: Optional[int] = None, version: Optional[str] = None) -> ForecastResult:
+        """
+        Forecast several series.
+
+        Args:
+            series_ids (List[str]): Series labels, e.g. 'SKU-1|WH-2'.
+            horizon (int, optional): Periods ahead, `default_horizon` when omitted.
+            version (str, optional): Model version, `serving.version` when omitted.
+
+        Returns:
+            ForecastResult: Forecasts by series, and the series the model version does not know.
+
+        Raises:
+            ValueError: Invalid horizon.
+            LookupError: Unknown model version, or none published.
+        """
+        horizon = self.horizon(horizon)
+        version = self.registry.resolve(version)
+        result = ForecastResult(version, horizon)
+        pending = []
+        for series_id in dict.fromkeys(series_ids):
+            cached = self.cache.get((series_id, horizon, version))
+            if cached is None:
+                pending.append(series_id)
+            else:
+                result.forecasts[series_id] = cached
+                result.cached += 1
+        if pending:
+            loaded, batch, result.missing = self.registry.series(pending, version)
+            if batch.labels:
+                values = loaded.forecast(batch, horizon)
+                for series_id, row in zip(batch.labels, np.round(values, 6).tolist()):
+                    self.cache.set((series_id, horizon, version), row)
+                    result.forecasts[series_id] = row
+        return result
+
+
+    def _score_batch(self, group: Tuple[int, str], series_ids: List[str]) -> Dict[str, List[float]]:
+        horizon, version = group
+        return self.forecast(series_ids, horizon, version).forecasts
+
+
+    async def forecast_one(self, series_id: str, horizon: Optional[int] = None, version: Optional[str] = None) -> Tuple[str, int, List[float]]:
+        """
+        Forecast one series without blocking the event loop.
+
+        Cache hits are answered directly; misses join a micro-batch, or are
+        scored alone in the default executor when micro-batching is off.
+
+        Returns:
+            tuple: Model version, horizon and forecast.
+
+        Raises:
+            KeyError: The model version does not know the series.
+        """
+        horizon = self.horizon(horizon)
+        version = self.registry.resolve(version)
+        cached = self.cache.get((series_id, horizon, version))
+        if cached is not None:
+            return version, horizon, cached
+        if self.batcher is not None:
+            return version, horizon, await self.batcher.submit((horizon, version), series_id)
+        loop = asyncio.get_running_loop()
+        forecasts = await loop.run_in_executor(None, self._score_batch, (horizon, version), [series_id])
+        if series_id not in forecasts:
+            raise KeyError(series_id)
+        return version, horizon, forecasts[series_id]
+
+
+@dataclass
+class InventoryPolicy:
+    """Replenishment policy of every SKU-location, one array element each."""
+    lead_time_demand: np.ndarray
+    demand_std: np.ndarray
+    safety_stock: np.ndarray
+    reorder_point: np.ndarray
+    order_quantity: np.ndarray
+    order: Optional[np.ndarray] = None
+
+
+def residual_std(actual: np.ndarray, forecast: np.ndarray, series: np.ndarray, n_series: Optional[int] = None) -> np.ndarray:
+    """
+    Per-period forecast error spread of every series: the root mean squared backtest error.
+
+    Args:
+        actual (np.ndarray): Actual values.
+        forecast (np.ndarray): Forecasts of the same periods.
+        series (np.ndarray): Integer series code of every value.
+        n_series (int, optional): Number of series, `series.max() + 1` by default.
+
+    Returns:
+        np.ndarray: Error standard deviation per series code (NaN for series without errors).
+    """
+    errors = actual - forecast
+    valid = ~np.isnan(errors)
+    n_series = int(series.max()) + 1 if n_series is None else n_series
+    squares = np.bincount(series[valid], weights=errors[valid] ** 2, minlength=n_series)
+    counts = np.bincount(series[valid], minlength=n_series)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, np.sqrt(squares / np.maximum(counts, 1)), np.nan)
+
+
+def _protection_demand(forecasts: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """Forecast demand over a fractional number of periods per row; past the horizon the last forecast repeats."""
+    horizon = forecasts.shape[1]
+    rows = np.arange(len(forecasts))
+    cumulative = np.concatenate([np.zeros((len(forecasts), 1)), np.cumsum(forecasts, axis=1)], axis=1)
+    whole = np.floor(periods).astype(np.int64)
+    inside = np.minimum(whole, horizon)
+    return (
+        cumulative[rows, inside]
+        + (whole - inside) * forecasts[:, -1]
+        + (periods - whole) * forecasts[rows, np.minimum(whole, horizon - 1)]
+    )
+
+
+def _loss(z: np.ndarray) -> np.ndarray:
+    """Standard normal loss function E[(X - z)+]."""
+    return np.exp(-0.5 * z ** 2) / np.sqrt(2 * np.pi) - z * (1 - ndtr(z))
+
+
+def fill_rate_z(target_loss: np.ndarray, tolerance: float = 1e-10, max_iterations: int = 50) -> np.ndarray:
+    """
+    Safety factor whose normal loss equals `target_loss`, by vectorized Newton iterations.
+
+    The loss function is convex and decreasing, so Newton steps started left
+    of the root (where the loss is about `-z`) approach it monotonically.
+    """
+    target = np.asarray(target_loss, dtype="float64")
+    z = -target - 1.0
+    for _ in range(max_iterations):
+        # d/dz loss(z) = -(1 - Phi(z)) = -Phi(-z)
+        step = (_loss(z) - target) / np.maximum(ndtr(-z), 1e-300)
+        z = z + step
+        if np.max(np.abs(step), initial=0.0) < tolerance:
+            break
+    return z
+
+
+def compute_policies(
+    forecasts: np.ndarray,
+    error_std: ArrayLike,
+    lead_time: ArrayLike,
+    lead_time_std: ArrayLike = 0.0,
+    service_level: ArrayLike = 0.95,
+    service_type: str = "cycle",
+    review_period: ArrayLike = 0.0,
+    order_cost: Optional[ArrayLike] = None,
+    holding_cost: Optional[ArrayLike] = None,
+    pack_size: ArrayLike = 1.0,
+    min_order: ArrayLike = 0.0,
+    inventory_position: Optional[ArrayLike] = None
+    ) -> InventoryPolicy:
+    """
+    Vectorized (s, Q) replenishment policies.
+
+    Demand over the protection period (lead time plus review period) is the
+    sum of the forecasts over it; its standard deviation combines forecast
+    error and lead time variability, `sqrt(L * error_std^2 + d^2 * lead_time_std^2)`
+    with `d` the mean forecast per period over it.
+
+    Args:
+        forecasts (np.ndarray): Demand forecast per period, shape (n,) for a flat rate or (n, horizon).
+        error_std (float | np.ndarray): Forecast error standard deviation per period.
+        lead_time (float | np.ndarray): Mean lead time, in periods (fractional allowed).
+        lead_time_std (float | np.ndarray): Lead time standard deviation, in periods.
+        service_level (float | np.ndarray): Target probability of no stock-out per cycle ('cycle')
+            or share of demand served from stock ('fill_rate').
+        service_type (str): 'cycle' or 'fill_rate'.
+        review_period (float | np.ndarray): Periods between reviews, 0 for continuous review.
+        order_cost (float | np.ndarray, optional): Fixed cost per order; with `holding_cost`, lots are the EOQ.
+        holding_cost (float | np.ndarray, optional): Holding cost per unit and period.
+        pack_size (float | np.ndarray): Orders are rounded up to multiples of this.
+        min_order (float | np.ndarray): Smallest lot.
+        inventory_position (float | np.ndarray, optional): On hand plus on order minus backorders;
+            when given, `order` holds what to order now.
+
+    Returns:
+        InventoryPolicy: Arrays with one element per row of `forecasts`.
+    """
+    if ndtri is None:
+        raise ImportError("scipy is required for inventory policies: pip install scipy")
+    if service_type not in ("cycle", "fill_rate"):
+        raise ValueError(f"Unknown service_type '{service_type}', expected 'cycle' or 'fill_rate'")
+    forecasts = np.asarray(forecasts, dtype="float64")
+    if forecasts.ndim == 1:
+        forecasts = forecasts[:, None]
+    n = len(forecasts)
+
+    def column(value: ArrayLike) -> np.ndarray:
+        return np.broadcast_to(np.asarray(value, dtype="float64"), (n,))
+
+    periods = column(lead_time) + column(review_period)
+    lead_time_demand = _protection_demand(forecasts, periods)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = np.where(periods > 0, lead_time_demand / periods, forecasts[:, 0])
+    demand_std = np.sqrt(periods * column(error_std) ** 2 + rate ** 2 * column(lead_time_std) ** 2)
+
+    # Lot size: EOQ with costs, otherwise a review period (at least one period) of demand
+    if order_cost is not None and holding_cost is not None:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            lot = np.sqrt(2 * rate * column(order_cost) / column(holding_cost))
+    else:
+        lot = rate * np.maximum(column(review_period), 1.0)
+    pack = np.maximum(column(pack_size), 1e-12)
+    lot = np.ceil(np.maximum(np.nan_to_num(lot), column(min_order)) / pack) * pack
+
+    level = np.clip(column(service_level), 1e-9, 1 - 1e-9)
+    if service_type == "cycle":
+        z = ndtri(level)
+    else:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            target = np.where(demand_std > 0, (1 - level) * lot / demand_std, np.inf)
+        z = np.where(demand_std > 0, fill_rate_z(np.minimum(target, 1e6)), 0.0)
+    safety_stock = np.maximum(z * demand_std, 0.0)
+    reorder_point = lead_time_demand + safety_stock
+
+    order = None
+    if inventory_position is not None:
+        shortfall = reorder_point - column(inventory_position)
+        # Whole lots that lift the position above the reorder point; without a lot size, the shortfall in packs
+        with np.errstate(invalid="ignore", divide="ignore"):
+            lots = np.where(lot > 0, np.floor(shortfall / np.where(lot > 0, lot, 1)) + 1, 0)
+        order = np.where(
+            shortfall >= 0,
+            np.where(lot > 0, lots * lot, np.ceil(shortfall / pack) * pack),
+            0.0,
+        )
+    return InventoryPolicy(lead_time_demand, demand_std, safety_stock, reorder_point, lot, order)
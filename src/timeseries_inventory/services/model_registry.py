@@ -0,0 +1,327 @@
+import os
+import json
+import shutil
+import datetime
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+from timeseries_inventory.utils.custom_logging import custom_logger
+from timeseries_inventory.data_config.data_stages_config import ServingConfig
+from timeseries_inventory.models.global_model import GlobalModel
+from timeseries_inventory.models.series import collect_series, series_blocks
+
+
+"""
+In-process registry of servable global model versions.
+
+A version is a directory under `serving.registry_directory` holding the
+fitted model plus the per-series state recursive forecasting starts from:
+
+    model.pkl     GlobalModel
+    tail.npy      last values of every series (n_series x longest lag/window), right aligned
+    counts.npy    number of observed periods per series
+    ewm.npy       final EWM value per series and span
+    encoded.npy   category encodings of every series
+    index.json    series labels and the lag/window/span layout
+
+`publish_version` writes one from a trained model and the series history.
+`ModelRegistry` loads the model and the index of a version once, keeps the
+state files memory-mapped, and pages the state of individual series in on
+demand: loaded series stay in an LRU map bounded by `memory_budget_mb`.
+"""
+
+__all__ = ["SeriesBatch", "ModelVersion", "ModelRegistry", "feature_layout", "publish_version"]
+
+
+_FILES = ("tail", "counts", "ewm", "encoded")
+
+# History rows smoothed at once when computing the final EWM of the series
+_EWM_BLOCK_ROWS = 1 << 20
+
+
+def feature_layout(feature_columns: List[str], target: str) -> Tuple[List[int], List[int], List[int]]:
+    """Lags, rolling windows and EWM spans the generated feature columns of a model are built from."""
+    lags, windows, spans = set(), set(), set()
+    prefix = f"{target}_"
+    for column in feature_columns:
+        for name in column.split("_x_"):
+            name = name.rsplit("_pow_", 1)[0]
+            if not name.startswith(prefix):
+                continue
+            kind, _, size = name[len(prefix):].rpartition("_")
+            if not size.isdigit():
+                continue
+            {"lag": lags, "rolling_mean": windows, "ewm": spans}.get(kind, set()).add(int(size))
+    return sorted(lags), sorted(windows), sorted(spans)
+
+
+def publish_version(
+    directory: Path,
+    model: GlobalModel,
+    chunks: Iterator[pd.DataFrame],
+    series_columns: List[str],
+    date_column: Optional[str] = "date",
+    version: Optional[str] = None
+    ) -> Path:
+    """
+    Write a servable version of a trained global model.
+
+    Args:
+        directory (Path): Registry root (`serving.registry_directory`).
+        model (GlobalModel): Trained model.
+        chunks (Iterator[pd.DataFrame]): History of every series to serve, with the target column.
+        series_columns (List[str]): Columns identifying a series, as in feature engineering.
+        date_column (str, optional): Column ordering the history of a series.
+        version (str, optional): Version name; defaults to the current UTC time, so names sort by age.
+
+    Returns:
+        Path: Directory of the published version.
+    """
+    version = version or datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S")
+    target = Path(directory) / version
+    tmp = Path(directory) / f".{version}.tmp-{os.getpid()}"
+    tmp.mkdir(parents=True)
+    try:
+        # The history is assembled on disk chunk by chunk; only the per-series state is kept in memory
+        labels, values, offsets, keys = collect_series(
+            chunks, model.target_column, series_columns, date_column, with_keys=True, spill=tmp / "history.npy"
+        )
+        if not labels:
+            raise ValueError("No series history to publish")
+        lags, windows, spans = feature_layout(model.feature_columns, model.target_column)
+        length = max(lags + windows, default=1)
+        lengths = np.diff(offsets)
+
+        # Right-aligned tail of every series, NaN before its first value
+        index = offsets[1:, None] - length + np.arange(length)
+        tail = np.where(index >= offsets[:-1, None], values[np.maximum(index, 0)], np.nan)
+        ewm = np.empty((len(labels), len(spans)))
+        for first, last in series_blocks(offsets, _EWM_BLOCK_ROWS):
+            block = pd.Series(values[offsets[first]:offsets[last]])
+            codes = np.repeat(np.arange(last - first), lengths[first:last])
+            ends = offsets[first + 1:last + 1] - offsets[first] - 1
+            for position, span in enumerate(spans):
+                smoothed = block.groupby(codes).ewm(span=span, adjust=False).mean().droplevel(0).sort_index()
+                ewm[first:last, position] = smoothed.to_numpy()[ends]
+        del values
+        (tmp / "history.npy").unlink()
+        encoded = np.full((len(labels), len(model.encodings)), model.prior)
+        for position, (column, encoding) in enumerate(model.encodings.items()):
+            if column in series_columns:
+                part = series_columns.index(column)
+                encoded[:, position] = [encoding.get(key[part], model.prior) for key in keys]
+
+        model.save(tmp / "model.pkl")
+        arrays = {"tail": tail, "counts": lengths, "ewm": ewm, "encoded": encoded}
+        for name in _FILES:
+            np.save(tmp / f"{name}.npy", arrays[name])
+        (tmp / "index.json").write_text(json.dumps({
+            "labels": labels, "lags": lags, "windows": windows, "spans": spans, "series_columns": series_columns,
+        }))
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return target
+
+
+@dataclass
+class SeriesBatch:
+    """Forecast state of several series, stacked row by row."""
+    labels: List[str]
+    tail: np.ndarray
+    counts: np.ndarray
+    ewm: np.ndarray
+    encoded: np.ndarray
+
+
+class ModelVersion:
+    """
+    A loaded version: the model, the series index and memory-mapped series state.
+
+    Args:
+        path (Path): Version directory written by `publish_version`.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.name = path.name
+        self.model = GlobalModel.load(path / "model.pkl")
+        meta = json.loads((path / "index.json").read_text())
+        self.index: Dict[str, int] = {label: row for row, label in enumerate(meta["labels"])}
+        self.lags, self.windows, self.spans = meta["lags"], meta["windows"], meta["spans"]
+        self.arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in _FILES}
+        self.alpha = np.array([2 / (span + 1) for span in self.spans])
+
+
+    def read(self, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """Copy the state rows of the given series out of the memory-mapped files."""
+        order = np.argsort(rows)
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(len(order))
+        # Reading in file order keeps the page faults sequential
+        return {name: np.asarray(array[rows[order]])[inverse] for name, array in self.arrays.items()}
+
+
+    def _features(self, tail: np.ndarray, counts: np.ndarray, ewm: np.ndarray) -> np.ndarray:
+        """Feature matrix of the next period, built like FeatureEngine builds it from the history."""
+        target = self.model.target_column
+        length = tail.shape[1]
+        base: Dict[str, np.ndarray] = {}
+        for lag in self.lags:
+            base[f"{target}_lag_{lag}"] = tail[:, length - lag]
+        for window in self.windows:
+            recent = tail[:, length - window:]
+            present = ~np.isnan(recent)
+            n = present.sum(axis=1)
+            total = np.where(present, recent, 0.0).sum(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                base[f"{target}_rolling_mean_{window}"] = np.where((counts >= window) & (n > 0), total / n, np.nan)
+        for position, span in enumerate(self.spans):
+            base[f"{target}_ewm_{span}"] = ewm[:, position]
+
+        columns = []
+        for column in self.model.feature_columns:
+            if column in base:
+                columns.append(base[column])
+            elif "_x_" in column:
+                left, right = column.split("_x_", 1)
+                columns.append(base[left] * base[right])
+            elif "_pow_" in column:
+                name, degree = column.rsplit("_pow_", 1)
+                columns.append(base[name] ** int(degree))
+            else:
+                raise ValueError(f"Feature '{column}' cannot be built from the series state")
+        return np.column_stack(columns) if columns else np.empty((len(tail), 0))
+
+
+    def forecast(self, batch: SeriesBatch, horizon: int) -> np.ndarray:
+        """
+        Recursive multi-step forecast of every series of a batch in one vectorized pass per step.
+
+        Returns:
+            np.ndarray: Forecasts of shape (series, horizon).
+        """
+        tail, counts, ewm = batch.tail.astype("float64"), batch.counts.astype("float64"), batch.ewm.astype("float64")
+        encoded = {column: batch.encoded[:, position] for position, column in enumerate(self.model.encodings)}
+        forecasts = np.empty((len(tail), horizon))
+        for step in range(horizon):
+            X, scale = self.model.design(self._features(tail, counts, ewm), encoded)
+            y = self.model.estimator.predict(X) * scale
+            forecasts[:, step] = y
+            tail = np.concatenate([tail[:, 1:], y[:, None]], axis=1)
+            counts = counts + 1
+            ewm = np.where(np.isnan(ewm), y[:, None], ewm + self.alpha * (y[:, None] - ewm))
+        return forecasts
+
+
+class ModelRegistry:
+    """
+    Loads model versions once and pages series state in under an LRU memory budget.
+
+    Thread safe; loading a version or paging in series happens under a lock.
+
+    Args:
+        config (ServingConfig): Configuration object loaded from YAML.
+    """
+
+    def __init__(self, config: ServingConfig):
+        self.config = config
+        self.directory = Path(config.registry_directory)
+        self.budget = int(config.memory_budget_mb * 2 ** 20)
+        self._versions: "OrderedDict[str, ModelVersion]" = OrderedDict()
+        self._series: "OrderedDict[Tuple[str, str], Tuple[Dict[str, np.ndarray], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.logger = custom_logger()
+
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._bytes
+
+
+    def versions(self) -> List[str]:
+        """Published versions, oldest first."""
+        if not self.directory.exists():
+            return []
+        return sorted(p.name for p in self.directory.iterdir() if not p.name.startswith(".") and (p / "index.json").exists())
+
+
+    def resolve(self, version: Optional[str] = None) -> str:
+        """Name of the requested version, the configured one by default; 'latest' is the newest."""
+        version = version or self.config.version
+        if version != "latest":
+            return version
+        versions = self.versions()
+        if not versions:
+            raise LookupError(f"No model version published under {self.directory}")
+        return versions[-1]
+
+
+    def get(self, version: Optional[str] = None) -> ModelVersion:
+        """Return a loaded version, loading it on first use and evicting the least recently used beyond `max_versions`."""
+        name = self.resolve(version)
+        with self._lock:
+            if name in self._versions:
+                self._versions.move_to_end(name)
+                return self._versions[name]
+            path = self.directory / name
+            if not (path / "index.json").exists():
+                raise LookupError(f"Unknown model version '{name}'")
+            loaded = ModelVersion(path)
+            self._versions[name] = loaded
+            self.logger.info(f"Loaded model version {name} ({len(loaded.index)} series)")
+            while len(self._versions) > max(self.config.max_versions, 1):
+                evicted, _ = self._versions.popitem(last=False)
+                self._drop_series(evicted)
+                self.logger.info(f"Unloaded model version {evicted}")
+            return loaded
+
+
+    def _drop_series(self, version: str) -> None:
+        for key in [key for key in self._series if key[0] == version]:
+            self._bytes -= self._series.pop(key)[1]
+
+
+    def series(self, labels: List[str], version: Optional[str] = None) -> Tuple[ModelVersion, SeriesBatch, List[str]]:
+        """
+        Gather the forecast state of several series.
+
+        Args:
+            labels (List[str]): Series labels, e.g. 'SKU-1|WH-2'.
+            version (str, optional): Model version, the configured one by default.
+
+        Returns:
+            tuple: The model version, the state of the known series (in request order)
+            and the labels the version does not know.
+        """
+        loaded = self.get(version)
+        known = [label for label in labels if label in loaded.index]
+        missing = [label for label in labels if label not in loaded.index]
+        with self._lock:
+            absent = [label for label in dict.fromkeys(known) if (loaded.name, label) not in self._series]
+            if absent:
+                state = loaded.read(np.array([loaded.index[label] for label in absent]))
+                for row, label in enumerate(absent):
+                    entry = {name: values[row].copy() for name, values in state.items()}
+                    size = sum(values.nbytes for values in entry.values())
+                    self._series[(loaded.name, label)] = (entry, size)
+                    self._bytes += size
+            entries = []
+            for label in known:
+                self._series.move_to_end((loaded.name, label))
+                entries.append(self._series[(loaded.name, label)][0])
+            # Never evict what this request is using
+            while self._bytes > self.budget and len(self._series) > len(known):
+                _, (_, size) = self._series.popitem(last=False)
+                self._bytes -= size
+        stacked = {
+            name: np.stack([entry[name] for entry in entries]) if entries else loaded.arrays[name][:0]
+            for name in _FILES
+        }
+        return loaded, SeriesBatch(known, **stacked), missing
@@ -0,0 +1,251 @@
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from timeseries_inventory.utils.custom_logging import custom_logger
+from timeseries_inventory.data_config.data_stages_config import SimulationConfig
+from timeseries_inventory.services.inventory import ArrayLike, InventoryPolicy
+
+
+"""
+Monte-Carlo simulation of replenishment policies.
+
+Every SKU-location follows its (s, Q) policy over `periods` periods in
+`scenarios` independent demand paths. Each period, in order:
+
+1. at review periods, when the inventory position (net stock plus stock on
+   order) is at or below the reorder point, whole lots are ordered to lift
+   it above; each order arrives after its own lead time,
+2. orders due this period arrive,
+3. demand is drawn, normal around the forecast with the error spread and
+   cut at zero; what stock cannot serve is backordered.
+
+The state of a block of scenarios x series is a few (scenarios, series)
+arrays advanced by one vectorized step per period. Every block draws from
+its own random stream, derived from `random_state` and the block's position
+(`SeedSequence` spawn keys), and block results are summed in block order, so
+the results do not depend on the number of workers nor on which worker ran
+which block. Only per-series totals are kept, never the trajectories.
+"""
+
+__all__ = ["SimulationSummary", "InventorySimulator"]
+
+
+@dataclass
+class SimulationSummary:
+    """Per SKU-location outcome of a policy, averaged over the scenarios."""
+    fill_rate: np.ndarray  # share of demand served from stock
+    stockout_rate: np.ndarray  # share of periods with demand stock could not serve
+    mean_on_hand: np.ndarray  # end-of-period stock on hand
+    holding_cost: np.ndarray  # per scenario, over all periods
+    orders: np.ndarray  # per scenario
+    scenarios: int
+    periods: int
+
+
+    def to_frame(self, labels: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        frame = pd.DataFrame({
+            "fill_rate": self.fill_rate,
+            "stockout_rate": self.stockout_rate,
+            "mean_on_hand": self.mean_on_hand,
+            "holding_cost": self.holding_cost,
+            "orders": self.orders,
+        })
+        if labels is not None:
+            frame.index = pd.Index(list(labels), name="series")
+        return frame
+
+
+# Totals a block returns, one element per series
+_TOTALS = ("demand", "served", "stockouts", "on_hand", "orders")
+
+
+def _simulate_block(task: Tuple[int, Tuple[int, int], int, int, Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Simulate one block of scenarios x series and return its per-series totals."""
+    random_state, key, scenarios, periods, inputs = task
+    rng = np.random.default_rng(np.random.SeedSequence(random_state, spawn_key=key))
+    forecasts, error_std = inputs["forecasts"], inputs["error_std"]
+    reorder_point, lot = inputs["reorder_point"], inputs["order_quantity"]
+    lead_time, lead_time_std, review = inputs["lead_time"], inputs["lead_time_std"], inputs["review_period"]
+    shape = (scenarios, len(forecasts))
+    horizon = forecasts.shape[1]
+
+    stochastic = bool(np.any(lead_time_std > 0))
+    longest = int(np.ceil(np.max(lead_time + 4 * lead_time_std, initial=0)))
+    size = longest + 1
+    # Ring of arrivals: an order placed in period t lands in slot (t + lead time) % size
+    pipeline = np.zeros((size, *shape))
+    if stochastic:
+        cells = np.arange(pipeline[0].size)
+    else:
+        # Fixed lead times: one slice add per distinct lead time instead of a scatter
+        delays = np.rint(lead_time).astype(np.int64)
+        groups = [(int(delay), slice(None) if (delays == delay).all() else np.flatnonzero(delays == delay)) for delay in np.unique(delays)]
+    whole = lot > 0
+    unit = np.where(whole, lot, 1.0)
+    reviewed_every_period = bool(np.all(review == 1))
+
+    net = np.array(np.broadcast_to(inputs["initial_on_hand"], shape), dtype="float64")
+    on_order = np.zeros(shape)
+    totals = {name: np.zeros(shape[1]) for name in _TOTALS}
+
+    for t in range(periods):
+        position = net + on_order
+        due = position <= reorder_point
+        if not reviewed_every_period:
+            due &= t % review == 0
+        if due.any():
+            # Whole lots that lift the position above the reorder point; without a lot size, the shortfall
+            shortfall = reorder_point - position
+            order = np.floor(shortfall / unit)
+            order += 1
+            order *= unit
+            if not whole.all():
+                order[:, ~whole] = shortfall[:, ~whole]
+            order *= due
+            if stochastic:
+                delay = np.clip(np.rint(rng.normal(lead_time, lead_time_std, shape)), 0, longest).astype(np.int64)
+                pipeline.reshape(size, -1)[(t + delay.ravel()) % size, cells] += order.ravel()
+            else:
+                for delay, columns in groups:
+                    if isinstance(columns, slice):
+                        pipeline[(t + delay) % size] += order
+                    else:
+                        pipeline[(t + delay) % size][:, columns] += order[:, columns]
+            on_order += order
+            totals["orders"] += due.sum(axis=0)
+
+        arrived = pipeline[t % size]
+        net += arrived
+        on_order -= arrived
+        arrived[...] = 0.0
+
+        demand = rng.standard_normal(shape)
+        demand *= error_std
+        demand += forecasts[:, min(t, horizon - 1)]
+        np.maximum(demand, 0.0, out=demand)
+        served = np.maximum(net, 0.0)
+        np.minimum(served, demand, out=served)
+        totals["demand"] += demand.sum(axis=0)
+        totals["served"] += served.sum(axis=0)
+        totals["stockouts"] += (served < demand).sum(axis=0)
+        net -= demand
+        totals["on_hand"] += np.maximum(net, 0.0).sum(axis=0)
+    return totals
+
+
+class InventorySimulator:
+    """
+    Simulates replenishment policies against random demand, in parallel blocks.
+
+    Args:
+        config (SimulationConfig): Configuration object loaded from YAML.
+    """
+
+    def __init__(self, config: SimulationConfig):
+        self.config = config
+        self.logger = custom_logger()
+
+
+    def _tasks(self, inputs: Dict[str, np.ndarray], periods: int) -> List[Tuple[int, Tuple[int, int], int, int, Dict[str, np.ndarray]]]:
+        n = len(inputs["forecasts"])
+        block_scenarios = max(1, self.config.block_scenarios)
+        block_series = max(1, self.config.block_series)
+        tasks = []
+        for series_block, start in enumerate(range(0, n, block_series)):
+            part = {name: values[start:start + block_series] for name, values in inputs.items()}
+            for scenario_block, first in enumerate(range(0, self.config.scenarios, block_scenarios)):
+                scenarios = min(block_scenarios, self.config.scenarios - first)
+                tasks.append((self.config.random_state, (series_block, scenario_block), scenarios, periods, part))
+        return tasks
+
+
+    def run(
+        self,
+        forecasts: np.ndarray,
+        error_std: ArrayLike,
+        policy: InventoryPolicy,
+        lead_time: ArrayLike,
+        lead_time_std: ArrayLike = 0.0,
+        review_period: ArrayLike = 0.0,
+        holding_cost: ArrayLike = 1.0,
+        initial_on_hand: Optional[ArrayLike] = None
+        ) -> SimulationSummary:
+        """
+        Simulate a policy of every SKU-location.
+
+        Args:
+            forecasts (np.ndarray): Mean demand per period, shape (n,) or (n, horizon); past the
+                horizon the last forecast repeats.
+            error_std (float | np.ndarray): Demand standard deviation per period.
+            policy (InventoryPolicy): Reorder points and lot sizes, e.g. from `compute_policies`.
+            lead_time (float | np.ndarray): Mean lead time, in periods (rounded to whole periods).
+            lead_time_std (float | np.ndarray): Lead time standard deviation; each order draws its own lead time.
+            review_period (float | np.ndarray): Periods between reviews, 0 for every period. Stock is
+                reviewed at most once a period, so policies from `compute_policies` should be computed
+                with a review period of at least 1.
+            holding_cost (float | np.ndarray): Cost per unit on hand at the end of a period.
+            initial_on_hand (float | np.ndarray, optional): Starting stock, reorder point plus one lot by default.
+
+        Returns:
+            SimulationSummary: One element per SKU-location.
+        """
+        forecasts = np.asarray(forecasts, dtype="float64")
+        if forecasts.ndim == 1:
+            forecasts = forecasts[:, None]
+        n = len(forecasts)
+        periods = self.config.periods or forecasts.shape[1]
+
+        def column(value: ArrayLike) -> np.ndarray:
+            return np.ascontiguousarray(np.broadcast_to(np.asarray(value, dtype="float64"), (n,)))
+
+        if initial_on_hand is None:
+            initial_on_hand = policy.reorder_point + policy.order_quantity
+        inputs = {
+            "forecasts": forecasts,
+            "error_std": column(error_std),
+            "reorder_point": column(policy.reorder_point),
+            "order_quantity": column(policy.order_quantity),
+            "lead_time": np.maximum(column(lead_time), 0.0),
+            "lead_time_std": np.maximum(column(lead_time_std), 0.0),
+            "review_period": np.maximum(np.rint(column(review_period)), 1).astype(np.int64),
+            "initial_on_hand": column(initial_on_hand),
+        }
+        tasks = self._tasks(inputs, periods)
+
+        started = time.perf_counter()
+        if self.config.workers <= 1 or len(tasks) <= 1:
+            totals = self._collect(tasks, map(_simulate_block, tasks), n)
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.config.workers, len(tasks))) as pool:
+                totals = self._collect(tasks, pool.map(_simulate_block, tasks), n)
+        self.logger.info(
+            f"Simulated {n} series x {self.config.scenarios} scenarios x {periods} periods "
+            f"in {len(tasks)} blocks in {time.perf_counter() - started:.1f}s"
+        )
+
+        scenarios = self.config.scenarios
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fill_rate = np.where(totals["demand"] > 0, totals["served"] / totals["demand"], np.nan)
+        return SimulationSummary(
+            fill_rate=fill_rate,
+            stockout_rate=totals["stockouts"] / (scenarios * periods),
+            mean_on_hand=totals["on_hand"] / (scenarios * periods),
+            holding_cost=column(holding_cost) * totals["on_hand"] / scenarios,
+            orders=totals["orders"] / scenarios,
+            scenarios=scenarios,
+            periods=periods,
+        )
+
+
+    def _collect(self, tasks: list, results: Iterator[Dict[str, np.ndarray]], n: int) -> Dict[str, np.ndarray]:
+        """Sum block totals into per-series totals, in block order."""
+        totals = {name: np.zeros(n) for name in _TOTALS}
+        block_series = max(1, self.config.block_series)
+        for (_, (series_block, _), _, _, _), block in zip(tasks, results):
+            start = series_block * block_series
+            for name in _TOTALS:
+                totals[name][start:start + len(block[name])] += block[name]
+        return totals
@@ -1,38 +1,213 @@
-# logger.py placeholder 
+# logger.py placeholder
 import os
+import json
+import math
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import datetime
+import threading
+import contextlib
+import contextvars
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from typing import Dict, Iterator, List, Optional, Set
+
+
+"""
+Logging setup shared by every module.
+
+`custom_logger()` returns the shared logger. By default it writes text
+records synchronously to the console and a rotating file. `configure_logging`
+(called from the `logging` section of the YAML config by the pipeline and
+the API) can switch it to
+
+- queue mode: the logger only puts records on an in-memory queue and a
+  listener thread formats and writes them, so file I/O and rotation never
+  block the caller. Records are formatted by the listener, so arguments
+  passed to lazy `%s` messages must not be mutated after the call.
+- JSON records: one object per line with time, level, stage, message,
+  source location and any `extra` fields.
+- per-stage sampling: only a share of the DEBUG/INFO records of a stage
+  is kept (warnings and errors always are). The stage of a record is the
+  pipeline stage whose thread logged it, see `set_log_stage`.
+
+Hot paths should log with lazy arguments, `logger.debug("... %s", value)`,
+so nothing is formatted when the level is disabled or a record is sampled
+out.
+"""
+
+__all__ = ["custom_logger", "configure_logging", "set_log_stage", "log_stage", "JsonFormatter", "StageFilter"]
+
+
+_stage: contextvars.ContextVar = contextvars.ContextVar("log_stage", default=None)
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+# Loggers set up by configure_logging keep their configured level
+_configured: Set[str] = set()
+# Listener handlers locked while the process forks
+_held: List[logging.Handler] = []
+
+# LogRecord attributes that are not `extra` fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "stage"}
+
+
+def set_log_stage(name: Optional[str]) -> contextvars.Token:
+    """Tag the records logged from now on by the current thread (or asyncio task) with a pipeline stage."""
+    return _stage.set(name)
+
+
+@contextlib.contextmanager
+def log_stage(name: Optional[str]) -> Iterator[None]:
+    """Tag the records logged inside the block with a pipeline stage."""
+    token = set_log_stage(name)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+class StageFilter(logging.Filter):
+    """
+    Sets `record.stage` and keeps only a share of the DEBUG/INFO records of sampled stages.
+
+    Sampling is deterministic: a stage sampled at 0.1 keeps the first of
+    every ten records.
+
+    Args:
+        sampling (dict, optional): Stage -> share of records kept; '*' applies to every other stage.
+    """
+
+    def __init__(self, sampling: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.sampling = dict(sampling or {})
+        self._seen: Dict[Optional[str], int] = {}
+
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        stage = _stage.get()
+        record.stage = stage
+        if record.levelno >= logging.WARNING or not self.sampling:
+            return True
+        rate = self.sampling.get(stage, self.sampling.get("*", 1.0))
+        if rate >= 1:
+            return True
+        seen = self._seen.get(stage, 0)
+        self._seen[stage] = seen + 1
+        # Keep a record whenever the kept share would otherwise fall below `rate`
+        return seen == 0 or math.floor(seen * rate + 1e-9) > math.floor((seen - 1) * rate + 1e-9)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "stage": getattr(record, "stage", None),
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+            "thread": record.threadName,
+            "process": record.process,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Enqueues records as they are; the listener's handlers format them."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _handlers(log_file_path: str, formatter: logging.Formatter, console: bool) -> List[logging.Handler]:
+    handlers: List[logging.Handler] = []
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+    file_handler = RotatingFileHandler(log_file_path, maxBytes=5*1024*1024, backupCount=5)
+    file_handler.setFormatter(formatter)
+    handlers.append(file_handler)
+    return handlers
+
+
+def _log_file_path(log_file: str, base_dir: Optional[str]) -> str:
+    if base_dir is None:
+        base_dir = os.path.join(os.getcwd(), "./artifacts")
+    log_directory = os.path.join(base_dir, "logs")
+    os.makedirs(log_directory, exist_ok=True)
+    return os.path.join(log_directory, log_file)
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()  # writes out every queued record
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def _hold_handlers_before_fork() -> None:
+    """Fork only while the listener is not writing, or the child could inherit a held stream lock."""
+    if _listener is not None:
+        _held.extend(_listener.handlers)
+        for handler in _held:
+            handler.acquire()
+
+
+def _release_handlers_after_fork() -> None:
+    for handler in _held:
+        handler.release()
+    _held.clear()
+
+
+def _write_directly_after_fork() -> None:
+    """A forked worker has no listener thread: its loggers write through the listener's handlers themselves."""
+    global _listener
+    _held.clear()  # logging re-creates the handler locks in the child
+    if _listener is None:
+        return
+    for name in _configured:
+        logger = logging.getLogger(name)
+        for handler in list(logger.handlers):
+            if isinstance(handler, _DeferredQueueHandler):
+                logger.removeHandler(handler)
+                for target in _listener.handlers:
+                    logger.addHandler(target)
+    _listener = None
 
 
 def custom_logger(
         log_file="ml_model.log",
-        log_level=logging.INFO, 
-        base_dir=None, 
+        log_level=logging.INFO,
+        base_dir=None,
         logger_name: str = "ML_Logger"):
-    
+
     """
     Setup a rotating logger.
 
     Args:
         log_file (str): Name of the log file.
-        log_level (str): logging level as a string (e.g.: INFO, DEBUG). 
+        log_level (str): logging level as a string (e.g.: INFO, DEBUG).
         base_dir (str) =  Base directory for artifacts (default to ./artifacts)
-    
-    Returns:
-        logging.Logger: Configured logger instance    
-    
-    """
-    
-    # Determine the base firectory
-    if base_dir is None:
-        base_dir = os.path.join(os.getcwd(), "./artifacts")
 
-    # Ensure log sub directories exists
-    log_directory = os.path.join(base_dir, "logs")
-    os.makedirs(log_directory, exist_ok=True)
+    Returns:
+        logging.Logger: Configured logger instance; after `configure_logging`, its handlers and level
+        are left as configured.
 
-    # Full path of the log file
-    log_file_path = os.path.join(log_directory, log_file)
+    """
 
     # Convert string level to numeric logging level
     if isinstance(log_level, str):
@@ -40,22 +215,86 @@ def custom_logger(
 
     # Create custom logger
     logger = logging.getLogger(logger_name)
-    logger.setLevel(log_level)
+    if logger_name not in _configured:
+        logger.setLevel(log_level)
 
     # Avoid duplicate handler if this function is called multiple times
     if not logger.handlers:
+        # Full path of the log file, under <base_dir>/logs
+        log_file_path = _log_file_path(log_file, base_dir)
         log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        for handler in _handlers(log_file_path, log_formatter, console=True):
+            logger.addHandler(handler)
 
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(log_formatter)
-        logger.addHandler(console_handler)
+    return logger
 
-        # Rotating file handler
-        file_handler = RotatingFileHandler(log_file_path, maxBytes=5*1024*1024, backupCount=5)
-        file_handler.setFormatter(log_formatter)
-        logger.addHandler(file_handler)
 
-    return logger    
+def configure_logging(
+        mode: str = "sync",
+        fmt: str = "text",
+        log_level="INFO",
+        sampling: Optional[Dict[str, float]] = None,
+        console: bool = True,
+        log_file: str = "ml_model.log",
+        base_dir: Optional[str] = None,
+        logger_name: str = "ML_Logger") -> logging.Logger:
+    """
+    Replace the handlers of the shared logger.
+
+    Args:
+        mode (str): 'sync' writes in the calling thread, 'queue' hands records to a listener thread.
+        fmt (str): 'text' or 'json'.
+        log_level (str | int): Level of the logger.
+        sampling (dict, optional): Stage -> share of DEBUG/INFO records kept, see `StageFilter`.
+        console (bool): Also write to the console.
+        log_file (str): Name of the log file under `<base_dir>/logs`.
+        base_dir (str, optional): Base directory for artifacts (default to ./artifacts).
+        logger_name (str): Logger to configure.
+
+    Returns:
+        logging.Logger: The configured logger.
+    """
+    if mode not in ("sync", "queue"):
+        raise ValueError(f"Unknown logging mode '{mode}', expected 'sync' or 'queue'")
+    if fmt not in ("text", "json"):
+        raise ValueError(f"Unknown logging format '{fmt}', expected 'text' or 'json'")
+    global _listener
+    # Not `custom_logger()`: that would open the default handlers only for them to be replaced
+    logger = logging.getLogger(logger_name)
+    with _configure_lock:
+        if isinstance(log_level, str):
+            log_level = getattr(logging, log_level.upper(), logging.INFO)
+        logger.setLevel(log_level)
+        _configured.add(logger_name)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            if not isinstance(handler, QueueHandler):
+                handler.close()
+        for log_filter in list(logger.filters):
+            if isinstance(log_filter, StageFilter):
+                logger.removeFilter(log_filter)
+        _stop_listener()
+
+        if fmt == "json":
+            formatter: logging.Formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handlers = _handlers(_log_file_path(log_file, base_dir), formatter, console)
+        logger.addFilter(StageFilter(sampling))
+        if mode == "queue":
+            records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+            _listener = QueueListener(records, *handlers, respect_handler_level=True)
+            _listener.start()
+            logger.addHandler(_DeferredQueueHandler(records))
+        else:
+            for handler in handlers:
+                logger.addHandler(handler)
+    return logger
 
 
+atexit.register(_stop_listener)
+os.register_at_fork(
+    before=_hold_handlers_before_fork,
+    after_in_parent=_release_handlers_after_fork,
+    after_in_child=_write_directly_after_fork
+)
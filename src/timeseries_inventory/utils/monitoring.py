@@ -1 +1,498 @@
-# monitoring.py placeholder 
+# monitoring.py placeholder
+import os
+import json
+import math
+import time
+import bisect
+import resource
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+"""
+Low-overhead metrics: counters, gauges and histograms.
+
+Metrics live in a process-wide `REGISTRY`. Recording is a dictionary
+lookup and an addition under a per-metric lock, and returns immediately
+when the registry is disabled (`monitoring.enabled: false`). The registry
+renders the Prometheus text format, served at `/metrics` by the API, and a
+JSON snapshot, written as a report at the end of every pipeline run.
+
+Instrumented out of the box:
+
+- pipeline stages (`StageRun`, used by the DAG executor): wall time, rows,
+  rows/sec, in-memory bytes of the output chunks (estimated from the row
+  width of the first one), the time to produce each chunk and the process
+  peak RSS when the stage finished,
+- `FileLoader.load()`: per chunk time, rows and bytes, plus the bytes of
+  the input files read,
+- API requests (`MetricsMiddleware`): latency (and so count) per route
+  template and status, and response bytes,
+- the process: resident and peak RSS, CPU seconds.
+
+Peak RSS is the high-water mark of the whole process; stages run in
+threads of one process and cannot be told apart.
+"""
+
+__all__ = [
+    "Metric",
+    "MetricsRegistry",
+    "REGISTRY",
+    "configure",
+    "ChunkMetrics",
+    "StageRun",
+    "MetricsMiddleware",
+    "chunk_rows",
+    "chunk_bytes",
+    "resident_bytes",
+    "peak_rss_bytes",
+    "write_report",
+]
+
+
+# Seconds; spans a small chunk or request (sub-millisecond) up to a long training stage
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# (name, type, help, labels, value) of a sample computed when the registry is read
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if value.is_integer() and abs(value) < 2 ** 53 else repr(value)
+
+
+class Metric:
+    """
+    A counter, gauge or histogram, with one series per combination of label values.
+
+    Args:
+        registry (MetricsRegistry): Registry the metric belongs to; recording is skipped while it is disabled.
+        kind (str): 'counter', 'gauge' or 'histogram'.
+        name (str): Metric name.
+        help (str): Description.
+        labels (Sequence[str]): Label names; values are passed positionally when recording.
+        buckets (Sequence[float], optional): Upper bounds of the histogram buckets.
+    """
+
+    def __init__(self, registry: "MetricsRegistry", kind: str, name: str, help: str, labels: Sequence[str] = (), buckets: Optional[Sequence[float]] = None):
+        self.registry = registry
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets or DEFAULT_BUCKETS)) if kind == "histogram" else ()
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        """Add to a counter or gauge."""
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0.0) + amount
+
+
+    def set(self, value: float, *labels: str) -> None:
+        """Set a gauge."""
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._series[labels] = value
+
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record a histogram observation."""
+        if not self.registry.enabled:
+            return
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), sum, count
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+
+    def value(self, *labels: str) -> Any:
+        """Current value of a counter or gauge series, or the (count, sum) of a histogram series."""
+        with self._lock:
+            series = self._series.get(labels)
+        if self.kind == "histogram":
+            return (series[2], series[1]) if series else (0, 0.0)
+        return series or 0.0
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+    def _items(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            if self.kind == "histogram":
+                return [(labels, [list(series[0]), series[1], series[2]]) for labels, series in self._series.items()]
+            return list(self._series.items())
+
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, series in sorted(self._items()):
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{_label_text(self.labels, labels)} {_number(series)}")
+                continue
+            counts, total, count = series
+            cumulative = 0
+            for bound, bucket in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, labels)} {count}")
+        return lines
+
+
+    def snapshot(self) -> Dict[str, Any]:
+        samples = []
+        for labels, series in sorted(self._items()):
+            sample: Dict[str, Any] = {"labels": dict(zip(self.labels, labels))}
+            if self.kind == "histogram":
+                counts, total, count = series
+                sample.update(count=count, sum=total, buckets={_number(bound): bucket for bound, bucket in zip((*self.buckets, float("inf")), counts)})
+            else:
+                sample["value"] = series
+            samples.append(sample)
+        return {"type": self.kind, "help": self.help, "samples": samples}
+
+
+class MetricsRegistry:
+    """
+    Named metrics plus collectors computing samples on read.
+
+    Args:
+        enabled (bool): Record observations; a disabled registry ignores them.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Sample]]] = {}
+        self._lock = threading.Lock()
+
+
+    def _get(self, kind: str, name: str, help: str, labels: Sequence[str], buckets: Optional[Sequence[float]] = None) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Metric(self, kind, name, help, labels, buckets)
+            elif metric.kind != kind or metric.labels != tuple(labels):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.kind} with labels {metric.labels}")
+            return metric
+
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Metric:
+        return self._get("counter", name, help, labels)
+
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Metric:
+        return self._get("gauge", name, help, labels)
+
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Optional[Sequence[float]] = None) -> Metric:
+        return self._get("histogram", name, help, labels, buckets)
+
+
+    def add_collector(self, name: str, collect: Callable[[], Iterable[Sample]]) -> None:
+        """Register (or replace) a callable returning samples computed at read time."""
+        with self._lock:
+            self._collectors[name] = collect
+
+
+    def _collected(self) -> Dict[str, Tuple[str, str, List[Tuple[Dict[str, str], float]]]]:
+        with self._lock:
+            collectors = list(self._collectors.values())
+        families: Dict[str, Tuple[str, str, List[Tuple[Dict[str, str], float]]]] = {}
+        for collect in collectors:
+            for name, kind, help, labels, value in collect():
+                families.setdefault(name, (kind, help, []))[2].append((labels, value))
+        return families
+
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for name, (kind, help, samples) in sorted(self._collected().items()):
+            lines.extend([f"# HELP {name} {help}", f"# TYPE {name} {kind}"])
+            for labels, value in samples:
+                lines.append(f"{name}{_label_text(list(labels), list(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Every metric as a JSON-serializable dict."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        report = {name: metric.snapshot() for name, metric in sorted(metrics.items())}
+        for name, (kind, help, samples) in sorted(self._collected().items()):
+            report[name] = {"type": kind, "help": help, "samples": [{"labels": labels, "value": value} for labels, value in samples]}
+        return report
+
+
+    def clear(self) -> None:
+        """Forget every recorded value (the metrics themselves stay registered)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+
+def configure(enabled: bool = True) -> MetricsRegistry:
+    """Enable or disable recording in the shared registry."""
+    REGISTRY.enabled = enabled
+    return REGISTRY
+
+
+def resident_bytes() -> Optional[int]:
+    """Current resident set size of the process (Linux only)."""
+    return _status_bytes("VmRSS:")
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of the process."""
+    peak = _status_bytes("VmHWM:")
+    if peak is not None:
+        return peak
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if os.uname().sysname == "Darwin" else maxrss * 1024
+
+
+def _status_bytes(field: str) -> Optional[int]:
+    try:
+        with open("/proc/self/status") as handle:
+            for line in handle:
+                if line.startswith(field):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _process_samples() -> Iterable[Sample]:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    yield ("process_cpu_seconds_total", "counter", "User and system CPU time of the process.", {}, usage.ru_utime + usage.ru_stime)
+    yield ("process_peak_rss_bytes", "gauge", "Peak resident set size of the process.", {}, peak_rss_bytes())
+    current = resident_bytes()
+    if current is not None:
+        yield ("process_resident_memory_bytes", "gauge", "Resident set size of the process.", {}, current)
+
+
+REGISTRY.add_collector("process", _process_samples)
+
+
+def chunk_rows(chunk: Any) -> int:
+    """Rows of a DataFrame or array chunk; 1 for any other item."""
+    try:
+        return len(chunk) if hasattr(chunk, "shape") else 1
+    except TypeError:
+        return 1
+
+
+def chunk_bytes(chunk: Any) -> int:
+    """In-memory size of a DataFrame or array chunk, without following object pointers; 0 for other items."""
+    if hasattr(chunk, "memory_usage"):
+        return int(chunk.memory_usage(index=True, deep=False).sum())
+    return int(getattr(chunk, "nbytes", 0))
+
+
+class ChunkMetrics:
+    """
+    Time to produce, rows and bytes of every chunk of a stream.
+
+    Args:
+        prefix (str): Metric name prefix, e.g. 'ingest' for `ingest_chunk_seconds`.
+        labels (Sequence[str]): Label names of the streams.
+        registry (MetricsRegistry): Registry the metrics are recorded in.
+    """
+
+    def __init__(self, prefix: str, labels: Sequence[str] = (), registry: MetricsRegistry = REGISTRY):
+        self.registry = registry
+        self.seconds = registry.histogram(f"{prefix}_chunk_seconds", "Time spent producing a chunk.", labels)
+        self.rows = registry.counter(f"{prefix}_rows_total", "Rows of the chunks produced.", labels)
+        self.bytes = registry.counter(f"{prefix}_bytes_total", "In-memory bytes of the chunks produced (estimated from the first chunk's row width).", labels)
+
+
+    def track(self, chunks: Iterator[Any], *labels: str) -> Iterator[Any]:
+        """Yield the items of `chunks`, recording each one; returns `chunks` itself while disabled."""
+        if not self.registry.enabled:
+            return chunks
+        return self._track(chunks, labels)
+
+
+    def _track(self, chunks: Iterator[Any], labels: Tuple[str, ...]) -> Iterator[Any]:
+        chunks = iter(chunks)
+        # Measuring a DataFrame takes as long as a small transformation: bytes are estimated from
+        # the row width of the first chunk, the streams are of one schema
+        width: Optional[float] = None
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    return
+                self.seconds.observe(time.perf_counter() - started, *labels)
+                rows = chunk_rows(chunk)
+                if width is None:
+                    width = chunk_bytes(chunk) / max(rows, 1)
+                self.rows.inc(rows, *labels)
+                self.bytes.inc(rows * width, *labels)
+                yield chunk
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+
+_PIPELINE_CHUNKS = ChunkMetrics("pipeline", ("stage",))
+_STAGE_SECONDS = REGISTRY.gauge("pipeline_stage_seconds", "Wall time of the last run of a stage.", ("stage",))
+_STAGE_ROWS_PER_SECOND = REGISTRY.gauge("pipeline_stage_rows_per_second", "Rows produced per second of wall time in the last run of a stage.", ("stage",))
+_STAGE_PEAK_RSS = REGISTRY.gauge("pipeline_stage_peak_rss_bytes", "Process peak RSS when a stage finished.", ("stage",))
+_STAGE_RUNS = REGISTRY.counter("pipeline_stage_runs_total", "Finished stage runs by outcome.", ("stage", "outcome"))
+
+
+class StageRun:
+    """
+    Metrics of one run of a pipeline stage: created when the stage starts, `finish()`ed when it ends.
+
+    Args:
+        stage (str): Stage name.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.started = time.perf_counter()
+        self._rows_before = _PIPELINE_CHUNKS.rows.value(stage)
+
+
+    def track(self, chunks: Iterator[Any]) -> Iterator[Any]:
+        """Record the chunks the stage yields."""
+        return _PIPELINE_CHUNKS.track(chunks, self.stage)
+
+
+    def finish(self, outcome: str = "success") -> None:
+        if not REGISTRY.enabled:
+            return
+        seconds = time.perf_counter() - self.started
+        rows = _PIPELINE_CHUNKS.rows.value(self.stage) - self._rows_before
+        _STAGE_SECONDS.set(seconds, self.stage)
+        _STAGE_ROWS_PER_SECOND.set(rows / seconds if seconds > 0 else 0.0, self.stage)
+        _STAGE_PEAK_RSS.set(peak_rss_bytes(), self.stage)
+        _STAGE_RUNS.inc(1, self.stage, outcome)
+
+
+# The histogram's _count is the number of requests
+_HTTP_SECONDS = REGISTRY.histogram("http_request_duration_seconds", "Request latency by method, route template and status.", ("method", "route", "status"))
+_HTTP_BYTES = REGISTRY.counter("http_response_bytes_total", "Response body bytes by method and route template.", ("method", "route"))
+
+
+# Route id -> path prefix of the router that included it, as last seen
+_route_prefixes: Dict[int, str] = {}
+
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    """Path template of the route that handled a request, 'unmatched' when none did."""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    path, regex = scope.get("path", ""), getattr(route, "path_regex", None)
+    if regex is None:
+        return template
+    # Routes of an included router can carry their path relative to the router's prefix
+    prefix = _route_prefixes.get(id(route), "")
+    if path.startswith(prefix) and regex.match(path[len(prefix):]):
+        return prefix + template
+    position = 0
+    while position != -1:
+        if regex.match(path[position:]):
+            _route_prefixes[id(route)] = path[:position]
+            return path[:position] + template
+        position = path.find("/", position + 1)
+    return template
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the count, latency and response size of every HTTP request.
+
+    Requests are labelled with the route template (e.g. '/api/v1/inventory/forecast/{series_id}'),
+    never the raw path, so the number of series stays bounded.
+
+    Args:
+        app: The ASGI application to wrap.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not REGISTRY.enabled:
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status, size = 500, 0
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = _route_template(scope)
+            method = scope.get("method", "")
+            _HTTP_SECONDS.observe(time.perf_counter() - started, method, route, str(status))
+            _HTTP_BYTES.inc(size, method, route)
+
+
+def write_report(path: Path, extra: Optional[Dict[str, Any]] = None) -> Path:
+    """Write a JSON snapshot of the shared registry (plus `extra` fields) atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = dict(extra or {})
+    report["metrics"] = REGISTRY.snapshot()
+    tmp = path.with_suffix(f".tmp-{os.getpid()}")
+    tmp.write_text(json.dumps(report, indent=2, default=str))
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,226 @@
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+import collections
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from timeseries_inventory.utils.custom_logging import custom_logger
+
+
+"""
+Profiling of pipeline runs.
+
+A `PipelineProfiler` started around a run (the `--profile` flag of the
+scripts) records, per pipeline stage:
+
+- a cProfile of the stage's thread, written to `cprofile/<stage>.prof`
+  (open with `python -m pstats` or snakeviz),
+- a tracemalloc snapshot when the stage ends, written to
+  `tracemalloc/<stage>.snapshot` (`tracemalloc.Snapshot.load`); allocations
+  are process-wide, so concurrent stages show up in each other's snapshots,
+- sampled stacks of every stage thread, every `sample_interval` seconds, in
+  the collapsed format of flamegraph.pl and speedscope (`stacks.collapsed`,
+  one `stage;outer;...;inner count` line per distinct stack).
+
+`summary.json` lists the wall time, hottest functions and largest
+allocation sites of every stage. The DAG executor calls `profile_stage` for
+every stage it runs; without an active profiler that returns a no-op, so
+normal runs pay nothing. Work done in process pools (ARIMA fits, bulk
+scoring workers) is not profiled, only the stage thread waiting for it.
+
+cProfile can profile only one thread at a time on Python 3.12+; there, the
+first stage to start gets the profile and the others are covered by the
+sampled stacks only.
+"""
+
+__all__ = ["PipelineProfiler", "profile_stage"]
+
+
+_active: Optional["PipelineProfiler"] = None
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _NoProfile:
+    def stop(self) -> None:
+        pass
+
+
+_NO_PROFILE = _NoProfile()
+
+
+class _StageProfile:
+    """cProfile and allocation snapshot of one stage, started and stopped in the stage's thread."""
+
+    def __init__(self, profiler: "PipelineProfiler", stage: str):
+        self.profiler = profiler
+        self.stage = stage
+        self.started = time.perf_counter()
+        self.thread = threading.get_ident()
+        profiler._threads[self.thread] = stage
+        self.profile: Optional[cProfile.Profile] = cProfile.Profile()
+        try:
+            self.profile.enable()
+        except ValueError:
+            # Another thread holds the (interpreter-wide) profiler on Python 3.12+
+            self.profile = None
+
+
+    def stop(self) -> None:
+        profiler = self.profiler
+        if self.profile is not None:
+            self.profile.disable()
+        profiler._threads.pop(self.thread, None)
+        summary: Dict[str, Any] = {"seconds": time.perf_counter() - self.started}
+        if self.profile is not None:
+            path = profiler.directory / "cprofile" / f"{self.stage}.prof"
+            self.profile.dump_stats(path)
+            summary["cprofile"] = str(path)
+            summary["top_functions"] = _top_functions(pstats.Stats(self.profile), profiler.top)
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            path = profiler.directory / "tracemalloc" / f"{self.stage}.snapshot"
+            snapshot.dump(str(path))
+            summary["tracemalloc"] = str(path)
+            summary["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            summary["top_allocations"] = [
+                {"location": str(stat.traceback[0]), "size_bytes": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:profiler.top]
+            ]
+        with profiler._lock:
+            profiler.stages[self.stage] = summary
+
+
+def _top_functions(stats: pstats.Stats, top: int) -> List[Dict[str, Any]]:
+    """Functions with the largest cumulative time."""
+    rows = []
+    for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():  # type: ignore[attr-defined]
+        rows.append({
+            "function": f"{name} ({os.path.basename(filename)}:{line})",
+            "calls": calls,
+            "total_seconds": total,
+            "cumulative_seconds": cumulative,
+        })
+    rows.sort(key=lambda row: row["cumulative_seconds"], reverse=True)
+    return rows[:top]
+
+
+class PipelineProfiler:
+    """
+    Profiles every pipeline stage run while it is active.
+
+    Use as a context manager around `DataStagesPipeline.run`; the profiles
+    are written to `directory` when it exits.
+
+    Args:
+        directory (str | Path): Output directory, created if needed.
+        sample_interval (float): Seconds between stack samples.
+        memory_frames (int): Frames kept per allocation traceback; 0 disables tracemalloc. Tracing
+            is the costly part of profiling (several times the run time on pandas-heavy stages)
+            and grows with the number of frames.
+        top (int): Functions and allocation sites listed per stage in `summary.json`.
+    """
+
+    def __init__(self, directory: Union[str, Path], sample_interval: float = 0.005, memory_frames: int = 1, top: int = 25):
+        self.directory = Path(directory)
+        self.sample_interval = sample_interval
+        self.memory_frames = memory_frames
+        self.top = top
+        self.logger = custom_logger()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.stacks: Dict[str, int] = collections.Counter()
+        self.samples = 0
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started = 0.0
+
+
+    def start(self) -> "PipelineProfiler":
+        global _active
+        if _active is not None:
+            raise RuntimeError("A pipeline profiler is already active")
+        for sub_directory in ("cprofile", "tracemalloc"):
+            (self.directory / sub_directory).mkdir(parents=True, exist_ok=True)
+        if self.memory_frames > 0:
+            tracemalloc.start(self.memory_frames)
+        self._stop_event.clear()
+        self._sampler = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+        self._started = time.perf_counter()
+        _active = self
+        self.logger.info(f"Profiling pipeline stages into {self.directory}")
+        return self
+
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop profiling and write `stacks.collapsed` and `summary.json`."""
+        global _active
+        _active = None
+        self._stop_event.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        with open(self.directory / "stacks.collapsed", "w") as handle:
+            for stack, count in sorted(self.stacks.items()):
+                handle.write(f"{stack} {count}\n")
+        summary = {
+            "seconds": time.perf_counter() - self._started,
+            "sample_interval": self.sample_interval,
+            "samples": self.samples,
+            "stacks": str(self.directory / "stacks.collapsed"),
+            "stages": self.stages,
+        }
+        (self.directory / "summary.json").write_text(json.dumps(summary, indent=2))
+        self.logger.info(f"Wrote profiles of {len(self.stages)} stages to {self.directory}")
+        return summary
+
+
+    def __enter__(self) -> "PipelineProfiler":
+        return self.start()
+
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+    def stage(self, name: str) -> _StageProfile:
+        """Start profiling a stage in the calling thread; `stop()` it from the same thread."""
+        return _StageProfile(self, name)
+
+
+    def _sample(self) -> None:
+        """Sampler thread: count the current stack of every stage thread."""
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.sample_interval):
+            threads = dict(self._threads)
+            for ident, frame in sys._current_frames().items():
+                stage = threads.get(ident)
+                if ident == own or stage is None:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(stage)
+                self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+
+def profile_stage(name: str) -> Union[_StageProfile, _NoProfile]:
+    """Profile a stage in the calling thread while a profiler is active; a no-op otherwise."""
+    profiler = _active
+    if profiler is None:
+        return _NO_PROFILE
+    return profiler.stage(name)
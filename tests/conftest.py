@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import pytest
+from typing import Callable, Iterator
+from timeseries_inventory.data_config.data_stages_config import (
+    DataIngestionConfig,
+    DataCleaningConfig,
+    DataValidationConfig,
+    FeatureEngineeringConfig,
+    FeatureSelectionConfig,
+)
+
+
+"""Builders shared by the tests: config factories, demand frames and chunk streams."""
+
+
+@pytest.fixture
+def ingestion_config(tmp_path) -> Callable[..., DataIngestionConfig]:
+    """Ingestion of the CSVs under `tmp_path`, without retry delays."""
+    def make(**overrides) -> DataIngestionConfig:
+        settings = dict(
+            stage="ingest",
+            input={},
+            source="local",
+            path=tmp_path,
+            file_pattern="*.csv",
+            max_files=100,
+            chunksize=10,
+            retry={},
+            attempts=3,
+            delay_seconds=0,
+            jitter=False,
+            checkpoint_path=tmp_path / "checkpoints" / "ingest.json",
+        )
+        settings.update(overrides)
+        return DataIngestionConfig(**settings)
+    return make
+
+
+@pytest.fixture
+def cleaning_config() -> Callable[..., DataCleaningConfig]:
+    def make(**overrides) -> DataCleaningConfig:
+        settings = dict(
+            stage="clean",
+            operations={},
+            drop_duplicates=True,
+            fill_columns=["value"],
+            duplicate_keys=["date", "sku"],
+            fill_method="ffill",
+            series_columns=["sku"],
+        )
+        settings.update(overrides)
+        return DataCleaningConfig(**settings)
+    return make
+
+
+@pytest.fixture
+def validation_config() -> Callable[..., DataValidationConfig]:
+    def make(**overrides) -> DataValidationConfig:
+        settings = dict(
+            stage="validate",
+            checks={},
+            allow_nulls=False,
+            fail_fast=False,
+            column_ranges={"value": {"min": 0, "max": 100}},
+            value="value",
+            min=0,
+            max=100,
+            max_examples=3,
+        )
+        settings.update(overrides)
+        return DataValidationConfig(**settings)
+    return make
+
+
+@pytest.fixture
+def engineering_config() -> Callable[..., FeatureEngineeringConfig]:
+    def make(**overrides) -> FeatureEngineeringConfig:
+        settings = dict(
+            stage="engineer",
+            operations={},
+            generate_polynomials=False,
+            interaction_terms=False,
+            lag_features={},
+            enabled=True,
+            lags=[1, 3],
+            target_column="value",
+            rolling_windows=[4],
+            ewm_spans=[3],
+            series_columns=["sku"],
+        )
+        settings.update(overrides)
+        return FeatureEngineeringConfig(**settings)
+    return make
+
+
+@pytest.fixture
+def selection_config(tmp_path) -> Callable[..., FeatureSelectionConfig]:
+    """Mutual-information selection spilling under `tmp_path`, scored in-process."""
+    def make(**overrides) -> FeatureSelectionConfig:
+        settings = dict(
+            stage="select",
+            strategy={},
+            method="mutual_info",
+            top_k=2,
+            random_state=0,
+            target_column="value",
+            sample_rows=600,
+            time_column="date",
+            strata_frequency="M",
+            workers=1,
+            directory=tmp_path / "feature_selection",
+        )
+        settings.update(overrides)
+        return FeatureSelectionConfig(**settings)
+    return make
+
+
+@pytest.fixture
+def demand_frame() -> Callable[..., pd.DataFrame]:
+    """
+    Daily demand of `n_skus` series, day-major like the ingested files.
+
+    `missing` is the share of values set to NaN; `shuffle` interleaves the
+    series in random order instead of one row per series per day.
+    """
+    def make(
+        n_days: int = 40,
+        n_skus: int = 3,
+        missing: float = 0.0,
+        shuffle: bool = False,
+        dtype: str = "float64",
+        seed: int = 0,
+    ) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        skus = np.array([f"sku-{i}" for i in range(n_skus)])
+        frame = pd.DataFrame({
+            "date": np.repeat(pd.date_range("2024-01-01", periods=n_days, freq="D"), n_skus),
+            "sku": rng.choice(skus, n_days * n_skus) if shuffle else np.tile(skus, n_days),
+            "value": rng.random(n_days * n_skus).astype(dtype),
+        })
+        frame["sku"] = pd.Categorical(frame["sku"], categories=skus)
+        if missing:
+            frame.loc[rng.random(len(frame)) < missing, "value"] = np.nan
+        return frame
+    return make
+
+
+@pytest.fixture
+def split() -> Callable[[pd.DataFrame, int], Iterator[pd.DataFrame]]:
+    """Stream a frame as chunks of `size` rows."""
+    def make(frame: pd.DataFrame, size: int) -> Iterator[pd.DataFrame]:
+        return iter([frame.iloc[start:start + size] for start in range(0, len(frame), size)])
+    return make
@@ -0,0 +1,83 @@
+import yaml
+import dataclasses
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+from importlib.resources import files
+from fastapi.testclient import TestClient
+from timeseries_inventory.data_config.data_stages_config import ServingConfig
+from timeseries_inventory.data_config.data_stages_manager import DataStagesManager
+from timeseries_inventory.preprocessing.feature_engineering import FeatureEngine
+from timeseries_inventory.models.global_model import GlobalModelTrainer
+from timeseries_inventory.services.model_registry import publish_version
+from timeseries_inventory.main import create_app
+
+
+"""Fixtures of the integration tests: a small global model published to a temporary registry, and a pipeline config over temporary directories."""
+
+
+def make_history(n_skus: int = 12, n_days: int = 40, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    level = rng.uniform(10, 100, n_skus)[:, None]
+    values = level * (1 + 0.2 * np.sin(2 * np.pi * np.arange(n_days) / 7)) + rng.normal(0, 1, (n_skus, n_days))
+    return pd.DataFrame({
+        "date": np.tile(pd.date_range("2024-01-01", periods=n_days, freq="D"), n_skus),
+        "sku": np.repeat([f"SKU-{i}" for i in range(n_skus)], n_days),
+        "location": np.repeat(["WH-1", "WH-2"] * (n_skus // 2), n_days),
+        "value": values.ravel(),
+    })
+
+
+@pytest.fixture
+def history() -> pd.DataFrame:
+    return make_history()
+
+
+@pytest.fixture(scope="module")
+def registry_directory(tmp_path_factory) -> Path:
+    manager = DataStagesManager()
+    directory = tmp_path_factory.mktemp("registry")
+    engineering = dataclasses.replace(manager.feature_engineering_config(), series_columns=["sku", "location"])
+    training = manager.model_training_config()
+    training = dataclasses.replace(
+        training,
+        n_estimators=20,
+        global_model={**training.global_model, "path": str(directory / "global.pkl")},
+    )
+    history = make_history()
+    model = GlobalModelTrainer(training).fit(FeatureEngine(engineering).transform(iter([history])))
+    publish_version(directory, model, iter([history]), ["sku", "location"], "date", version="v1")
+    return directory
+
+
+@pytest.fixture
+def serving_config(registry_directory) -> ServingConfig:
+    return ServingConfig(registry_directory=registry_directory, max_batch_size=20, max_horizon=30)
+
+
+@pytest.fixture
+def client(serving_config):
+    with TestClient(create_app(config=serving_config)) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def pipeline_config(tmp_path) -> Path:
+    """The default config with every input and output under `tmp_path`, training the global and ARIMA models."""
+    data = yaml.safe_load(files("timeseries_inventory.data_config").joinpath("data_path.yaml").read_text())
+    (tmp_path / "raw").mkdir()
+    make_history(n_skus=6, n_days=60).to_csv(tmp_path / "raw" / "sales.csv", index=False)
+    data["data_ingestion"]["input"]["path"] = str(tmp_path / "raw")
+    data["data_transformation"]["output"]["directory"] = str(tmp_path / "transformed")
+    data["feature_selection"]["strategy"]["directory"] = str(tmp_path / "feature_selection")
+    data["model_training"]["model"]["type"] = ["global", "arima"]
+    data["model_training"]["model"]["hyperparameters"]["n_estimators"] = 20
+    data["model_training"]["global_model"]["path"] = str(tmp_path / "models" / "global_model.pkl")
+    data["model_prediction"]["paths"]["model"] = str(tmp_path / "models" / "missing.pkl")
+    data["serving"]["registry_directory"] = str(tmp_path / "registry")
+    data["logging"].update(mode="sync", console=False)
+    data["monitoring"]["report_path"] = None
+    path = tmp_path / "data_path.yaml"
+    path.write_text(yaml.safe_dump(data))
+    return path
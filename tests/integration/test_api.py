@@ -1 +1,110 @@
 # test_api.py placeholder 
+import asyncio
+import dataclasses
+import httpx
+import numpy as np
+import pandas as pd
+from timeseries_inventory.data_config.data_stages_manager import DataStagesManager
+from timeseries_inventory.preprocessing.feature_engineering import FeatureEngine
+from timeseries_inventory.services.model_registry import ModelRegistry
+from timeseries_inventory.services.batching import MicroBatcher
+
+
+def test_next_step_features_match_feature_engine(serving_config, history):
+    following = history.groupby("sku").tail(1).assign(value=np.nan)
+    following["date"] += pd.Timedelta(days=1)
+    engineering = dataclasses.replace(DataStagesManager().feature_engineering_config(), series_columns=["sku", "location"])
+    expected = FeatureEngine(engineering).transform_chunk(pd.concat([history, following], ignore_index=True)).tail(len(following))
+
+    registry = ModelRegistry(serving_config)
+    labels = [f"{sku}|{location}" for sku, location in zip(following["sku"], following["location"])]
+    version, batch, missing = registry.series(labels)
+    assert missing == []
+    features = version._features(batch.tail, batch.counts.astype("float64"), batch.ewm)
+    np.testing.assert_allclose(features, expected[version.model.feature_columns].to_numpy(dtype="float64"), rtol=1e-6)
+    np.testing.assert_allclose(version.forecast(batch, 1)[:, 0], version.model.predict(expected), rtol=1e-6)
+
+
+def test_series_state_is_evicted_beyond_the_memory_budget(serving_config):
+    registry = ModelRegistry(dataclasses.replace(serving_config, memory_budget_mb=1e-3))
+    for sku in range(12):
+        registry.series([f"SKU-{sku}|WH-{sku % 2 + 1}"])
+    assert registry.resident_bytes <= 1e-3 * 2 ** 20
+    assert 0 < len(registry._series) < 12
+
+
+def test_forecast_endpoint(client):
+    response = client.get("/api/v1/inventory/forecast/SKU-0|WH-1", params={"horizon": 5})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["version"] == "v1" and body["horizon"] == 5 and len(body["forecast"]) == 5
+    assert client.get("/api/v1/inventory/forecast/SKU-0|WH-1", params={"horizon": 5}).json() == body
+
+
+def test_forecast_errors(client):
+    assert client.get("/api/v1/inventory/forecast/unknown").status_code == 404
+    assert client.get("/api/v1/inventory/forecast/SKU-0|WH-1", params={"horizon": 31}).status_code == 422
+    assert client.get("/api/v1/inventory/forecast/SKU-0|WH-1", params={"version": "v0"}).status_code == 404
+
+
+def test_batch_matches_single_forecasts(client):
+    ids = [f"SKU-{sku}|WH-{sku % 2 + 1}" for sku in range(6)]
+    response = client.post("/api/v1/inventory/forecast/batch", json={"series_ids": ids + ["unknown"], "horizon": 3})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["missing"] == ["unknown"]
+    client.app.state.inventory_service.cache.clear()
+    for series_id in ids:
+        single = client.get(f"/api/v1/inventory/forecast/{series_id}", params={"horizon": 3}).json()
+        np.testing.assert_allclose(body["forecasts"][series_id], single["forecast"])
+    too_many = {"series_ids": [f"SKU-{i}" for i in range(21)]}
+    assert client.post("/api/v1/inventory/forecast/batch", json=too_many).status_code == 413
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    calls = []
+
+    def handler(group, items):
+        calls.append((group, items))
+        return {item: item * 10 for item in items if item != 3}
+
+    async def run():
+        batcher = MicroBatcher(handler, max_batch_size=4, max_wait_ms=5)
+        results = await asyncio.gather(*[batcher.submit("g", i) for i in range(6)], return_exceptions=True)
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+    assert [group for group, _ in calls] == ["g", "g"] and sorted(len(items) for _, items in calls) == [2, 4]
+    assert results[:3] == [0, 10, 20] and results[4:] == [40, 50]
+    assert isinstance(results[3], KeyError)
+    assert batcher.mean_batch_size == 3
+
+
+def test_concurrent_forecasts_share_batches(client):
+    app = client.app
+    service = app.state.inventory_service
+    ids = [f"SKU-{sku}|WH-{sku % 2 + 1}" for sku in range(12)]
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*[http.get(f"/api/v1/inventory/forecast/{i}", params={"horizon": 4}) for i in ids])
+
+    responses = asyncio.run(run())
+    assert all(response.status_code == 200 for response in responses)
+    assert service.batcher.batches < len(ids)
+    service.cache.clear()
+    batch = service.forecast(ids, 4).forecasts
+    for series_id, response in zip(ids, responses):
+        np.testing.assert_allclose(response.json()["forecast"], batch[series_id])
+
+
+def test_metrics_endpoint(client):
+    client.get("/api/v1/inventory/forecast/SKU-1|WH-2", params={"horizon": 2})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/inventory/forecast/{series_id}",status="200"}' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/v1/inventory/forecast/{series_id}",status="200",le="+Inf"}' in text
+    assert "process_peak_rss_bytes " in text and "forecast_cache_entries " in text
@@ -0,0 +1,89 @@
+import dataclasses
+import pandas as pd
+import pytest
+from timeseries_inventory.data_config.data_stages_manager import DataStagesManager
+from timeseries_inventory.preprocessing.feature_engineering import FeatureEngine
+from timeseries_inventory.models.global_model import GlobalModel
+from timeseries_inventory.services.bulk_prediction import BulkPredictor
+from tests.integration.conftest import make_history
+
+
+"""Bulk scoring with the global model of the test registry."""
+
+
+@pytest.fixture
+def model_path(registry_directory):
+    return registry_directory / "global.pkl"
+
+
+@pytest.fixture(scope="module")
+def features() -> pd.DataFrame:
+    manager = DataStagesManager()
+    engineering = dataclasses.replace(manager.feature_engineering_config(), series_columns=["sku", "location"])
+    return FeatureEngine(engineering).transform_chunk(make_history(seed=1))
+
+
+def predictor(**settings) -> BulkPredictor:
+    config = dataclasses.replace(DataStagesManager().model_prediction_config(), **{"chunk_size": 50, **settings})
+    return BulkPredictor(config)
+
+
+def chunks(frame: pd.DataFrame, size: int = 50):
+    return (frame.iloc[start:start + size] for start in range(0, len(frame), size))
+
+
+def read(path):
+    return pd.read_csv(path) if path.suffix == ".csv" else pd.read_parquet(path)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_predictions_are_written_with_the_id_columns(tmp_path, model_path, features, suffix):
+    output = tmp_path / f"predictions{suffix}"
+    result = predictor(workers=1).predict(chunks(features), model_path, output)
+    assert result["rows"] == len(features)
+    written = read(output)
+    assert list(written.columns) == ["date", "sku", "location", "prediction"]
+    assert list(written["sku"]) == list(features["sku"].astype(str))
+    pd.testing.assert_series_equal(
+        written["prediction"], pd.Series(GlobalModel.load(model_path).predict(features), name="prediction"), check_dtype=False
+    )
+    assert sorted(path.name for path in tmp_path.iterdir()) == [output.name]
+
+
+def test_worker_pool_keeps_the_input_order(tmp_path, model_path, features):
+    for workers in (1, 4):
+        predictor(workers=workers).predict(chunks(features, 37), model_path, tmp_path / f"w{workers}.parquet")
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "w1.parquet"), pd.read_parquet(tmp_path / "w4.parquet"))
+
+
+def test_missing_model_columns_are_reported(tmp_path, model_path, features):
+    column = GlobalModel.load(model_path).input_columns[0]
+    with pytest.raises(ValueError, match="lacks the model columns"):
+        predictor(workers=1).predict(chunks(features.drop(columns=column)), model_path, tmp_path / "out.csv")
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_failure_keeps_the_previous_predictions(tmp_path, model_path, features, workers):
+    output = tmp_path / "out.csv"
+    output.write_text("previous\n")
+
+    def failing():
+        yield features.iloc[:50]
+        raise OSError("input gone")
+
+    with pytest.raises(OSError, match="input gone"):
+        predictor(workers=workers).predict(failing(), model_path, output)
+    assert output.read_text() == "previous\n"
+    assert list(tmp_path.iterdir()) == [output]
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_empty_input_replaces_the_previous_predictions(tmp_path, model_path, features, suffix):
+    output = tmp_path / f"out{suffix}"
+    predictor(workers=1).predict(chunks(features), model_path, output)
+    result = predictor(workers=1).predict(iter([features.iloc[:0]]), model_path, output)
+    assert result["rows"] == 0
+    written = read(output)
+    assert written.empty
+    assert list(written.columns) == ["date", "sku", "location", "prediction"]
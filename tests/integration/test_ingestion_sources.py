@@ -0,0 +1,146 @@
+import json
+import sqlite3
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from timeseries_inventory.ingestion import api_loader, db_loader
+from timeseries_inventory.ingestion.api_loader import ApiLoader
+from timeseries_inventory.ingestion.db_loader import DbLoader
+
+
+"""Async API and DB loaders against a local stub HTTP server and a SQLite file."""
+
+
+TOTAL_RECORDS = 53
+
+
+class StubFeed:
+    """Paged JSON feed; earlier pages answer slower so responses complete out of order."""
+
+    def __init__(self, fail_pages=()):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.requests = []
+        self.fail_pages = set(fail_pages)
+
+    def respond(self, page: int, size: int):
+        with self.lock:
+            self.requests.append(page)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            fail = page in self.fail_pages
+            self.fail_pages.discard(page)
+        try:
+            time.sleep(0.01 * max(0, 6 - page))
+            if fail:
+                return 503, {"error": "unavailable"}
+            start = (page - 1) * size
+            records = [{"sku": f"sku-{i % 4}", "value": float(i)} for i in range(start, min(start + size, TOTAL_RECORDS))]
+            return 200, {"data": records}
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def feed():
+    feed = StubFeed()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            status, body = feed.respond(int(query["page"][0]), int(query["page_size"][0]))
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    feed.url = f"http://127.0.0.1:{server.server_address[1]}/sales"
+    yield feed
+    server.shutdown()
+    server.server_close()
+
+
+def api_config(ingestion_config, feed, attempts=3, **api):
+    settings = {"url": feed.url, "page_size": 5, "max_concurrency": 3, "timeout_seconds": 5, **api}
+    return ingestion_config(source="api", api=settings, attempts=attempts)
+
+
+def test_api_pages_are_yielded_in_order_with_several_in_flight(ingestion_config, feed):
+    chunks = list(ApiLoader(api_config(ingestion_config, feed)).load())
+    out = pd.concat(chunks, ignore_index=True)
+    np.testing.assert_array_equal(out["value"], np.arange(TOTAL_RECORDS, dtype="float64"))
+    assert [len(chunk) for chunk in chunks] == [5] * 10 + [3]
+    assert feed.peak > 1
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 3])
+def test_api_concurrency_is_bounded(ingestion_config, feed, max_concurrency):
+    list(ApiLoader(api_config(ingestion_config, feed, max_concurrency=max_concurrency)).load())
+    assert feed.peak <= max_concurrency
+
+
+def test_api_failing_page_is_retried(ingestion_config, feed):
+    feed.fail_pages = {3}
+    out = pd.concat(ApiLoader(api_config(ingestion_config, feed)).load(), ignore_index=True)
+    np.testing.assert_array_equal(out["value"], np.arange(TOTAL_RECORDS, dtype="float64"))
+    assert feed.requests.count(3) == 2
+
+
+def test_api_gives_up_after_consecutive_failures(ingestion_config, feed):
+    feed.fail_pages = {2}
+    with pytest.raises(Exception, match="503"):
+        list(ApiLoader(api_config(ingestion_config, feed, attempts=1)).load())
+    assert not api_loader._clients
+
+
+def test_api_repeated_loads_use_and_release_a_client_per_loop(ingestion_config, feed):
+    loader = ApiLoader(api_config(ingestion_config, feed))
+    for _ in range(3):
+        assert len(pd.concat(loader.load())) == TOTAL_RECORDS
+        # Each load() runs on its own loop; its pooled client is closed with it
+        assert not api_loader._clients
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "inventory.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE stock_levels (id INTEGER PRIMARY KEY, sku TEXT, level REAL)")
+        conn.executemany(
+            "INSERT INTO stock_levels VALUES (?, ?, ?)",
+            [(i, f"sku-{i % 4}", i * 1.5) for i in range(TOTAL_RECORDS)],
+        )
+    return f"sqlite+aiosqlite:///{path}"
+
+
+def test_db_table_is_read_in_ordered_pages(ingestion_config, database):
+    config = ingestion_config(source="db", db={"url": database, "table": "stock_levels", "order_by": "id", "page_size": 10, "max_concurrency": 3})
+    chunks = list(DbLoader(config).load())
+    out = pd.concat(chunks, ignore_index=True)
+    assert list(out.columns) == ["id", "sku", "level"]
+    np.testing.assert_array_equal(out["id"], np.arange(TOTAL_RECORDS))
+    assert [len(chunk) for chunk in chunks] == [10] * 5 + [3]
+
+
+def test_db_query_source_and_repeated_loads(ingestion_config, database):
+    config = ingestion_config(source="db", db={"url": database, "query": "SELECT id, level FROM stock_levels WHERE id % 2 = 0", "order_by": "id", "page_size": 8})
+    loader = DbLoader(config)
+    for _ in range(3):
+        out = pd.concat(loader.load(), ignore_index=True)
+        np.testing.assert_array_equal(out["id"], np.arange(0, TOTAL_RECORDS, 2))
+        # The pooled engine of each private loop is disposed with it
+        assert not db_loader._engines
@@ -0,0 +1,37 @@
+import json
+import pstats
+import tracemalloc
+import pytest
+from timeseries_inventory.pipeline.data_pipeline import DataStagesPipeline
+from scripts.ingest_data import main as ingest
+from scripts.train_model import main as train
+
+
+"""Profiling whole pipeline runs through the `--profile` flag of the scripts."""
+
+
+@pytest.mark.parametrize("script, arguments", [(ingest, []), (train, ["--models", "global"])], ids=["ingest", "train"])
+def test_profile_flag_writes_every_stage_profile(pipeline_config, tmp_path, script, arguments):
+    directory = tmp_path / "profiles"
+    pipeline = DataStagesPipeline(pipeline_config)
+    if script is ingest:
+        targets = [pipeline.manager.feature_selection_config().stage]
+    else:
+        targets = [f"{pipeline.manager.model_training_config().stage}_global"]
+    stages = pipeline.dry_run(targets)
+
+    assert script(["--config", str(pipeline_config), *arguments, "--profile", "--profile-dir", str(directory), "--profile-interval", "0.001"]) == 0
+
+    summary = json.loads((directory / "summary.json").read_text())
+    assert sorted(summary["stages"]) == sorted(stages)
+    for stage, profile in summary["stages"].items():
+        assert profile["seconds"] > 0
+        assert pstats.Stats(str(directory / "cprofile" / f"{stage}.prof")).total_calls > 0
+        assert profile["top_functions"]
+        tracemalloc.Snapshot.load(str(directory / "tracemalloc" / f"{stage}.snapshot"))
+        assert profile["top_allocations"]
+    lines = (directory / "stacks.collapsed").read_text().splitlines()
+    assert lines and summary["samples"] > 0
+    assert {line.split(";", 1)[0] for line in lines} <= set(stages)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,28 @@
+import pytest
+from fastapi.testclient import TestClient
+from timeseries_inventory.data_config.data_stages_config import ServingConfig
+from timeseries_inventory.main import create_app
+from timeseries_inventory.services.model_registry import ModelRegistry
+from scripts.train_model import main as train
+
+
+"""Training through the pipeline and the train CLI, up to serving the published model."""
+
+
+def test_train_cli_publishes_a_servable_version(pipeline_config, tmp_path):
+    assert train(["--config", str(pipeline_config), "--models", "global", "--publish"]) == 0
+
+    config = ServingConfig(registry_directory=tmp_path / "registry")
+    versions = ModelRegistry(config).versions()
+    assert len(versions) == 1
+    assert [path.name for path in (tmp_path / "registry").iterdir()] == versions
+    with TestClient(create_app(config=config)) as client:
+        response = client.get("/api/v1/inventory/forecast/SKU-0|WH-1", params={"horizon": 3})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["version"] == versions[0] and len(body["forecast"]) == 3
+
+
+def test_publish_needs_the_global_model(pipeline_config):
+    with pytest.raises(SystemExit, match="--publish"):
+        train(["--config", str(pipeline_config), "--models", "arima", "--publish"])
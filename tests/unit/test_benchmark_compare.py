@@ -0,0 +1,91 @@
+import sys
+import json
+import pytest
+from benchmarks import compare
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("rows_per_second", 1),
+    ("requests_per_second_p50", 1),
+    ("seconds", -1),
+    ("wall_seconds", -1),
+    ("latency_us", -1),
+    ("p99_ms", -1),
+    ("peak_rss_bytes", -1),
+    ("bytes", -1),
+    ("spill_mb", -1),
+    ("rows", None),
+    ("mase", None),
+    ("seconds_per_row_estimate", None),
+    ("workers", None),
+])
+def test_direction_of_metric_names(name, expected):
+    assert compare.direction(name) == expected
+
+
+BASELINE = {
+    "stages": {
+        "ingest": {"seconds": 2.0, "rows_per_second": 1000, "rows": 500},
+        "train": {"seconds": 0.001, "peak_rss_bytes": 100},
+    },
+    "latency": [{"p99_ms": 10}],
+    "settings": {"workers": 4, "profile": True},
+}
+
+
+def current(**changes):
+    results = json.loads(json.dumps(BASELINE))
+    results["stages"]["ingest"].update(changes)
+    return results
+
+
+def by_metric(rows):
+    return {row["metric"]: row for row in rows}
+
+
+def test_compare_flags_worse_metrics_in_both_directions():
+    rows = by_metric(compare.compare(BASELINE, current(seconds=2.5, rows_per_second=1200, rows=1), threshold=0.1))
+    assert sorted(rows) == ["latency.0.p99_ms", "stages.ingest.rows_per_second", "stages.ingest.seconds", "stages.train.peak_rss_bytes", "stages.train.seconds"]
+    assert rows["stages.ingest.seconds"]["status"] == "regressed"
+    assert rows["stages.ingest.seconds"]["change"] == pytest.approx(-0.25)
+    assert rows["stages.ingest.rows_per_second"]["status"] == "improved"
+    assert rows["stages.ingest.rows_per_second"]["change"] == pytest.approx(0.2)
+    assert rows["latency.0.p99_ms"]["status"] == "ok"
+
+    rows = by_metric(compare.compare(BASELINE, current(seconds=1.5, rows_per_second=950), threshold=0.1))
+    assert rows["stages.ingest.seconds"]["status"] == "improved"
+    assert rows["stages.ingest.rows_per_second"]["status"] == "ok"
+
+
+def test_small_baselines_are_skipped():
+    rows = by_metric(compare.compare(BASELINE, current(), min_value=0.01))
+    assert "stages.train.seconds" not in rows
+    assert "stages.ingest.seconds" in rows
+
+
+def test_disappeared_metrics_are_reported():
+    results = current()
+    del results["stages"]["train"]
+    rows = by_metric(compare.compare(BASELINE, results))
+    assert rows["stages.train.seconds"] == {"metric": "stages.train.seconds", "baseline": 0.001, "current": None, "change": None, "status": "missing"}
+    assert rows["stages.train.peak_rss_bytes"]["status"] == "missing"
+    # Metrics only in the new results are not compared
+    results["stages"]["select"] = {"seconds": 1.0}
+    assert "stages.select.seconds" not in by_metric(compare.compare(BASELINE, results))
+
+
+def test_main_exits_with_status_1_on_regressions(tmp_path, monkeypatch, capsys):
+    baseline, new, output = tmp_path / "baseline.json", tmp_path / "current.json", tmp_path / "comparison.json"
+    baseline.write_text(json.dumps(BASELINE))
+
+    new.write_text(json.dumps(current(seconds=2.1)))
+    monkeypatch.setattr(sys, "argv", ["compare.py", str(baseline), str(new), "--threshold", "0.1", "--output", str(output)])
+    assert compare.main()["regressions"] == []
+    assert "No regression beyond 10%" in capsys.readouterr().out
+
+    new.write_text(json.dumps(current(seconds=3.0)))
+    with pytest.raises(SystemExit) as excinfo:
+        compare.main()
+    assert excinfo.value.code == 1
+    assert json.loads(output.read_text())["regressions"] == ["stages.ingest.seconds"]
+    assert "1 regression(s) beyond 10%" in capsys.readouterr().out
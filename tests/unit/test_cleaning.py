@@ -1 +1,143 @@
-# test_cleaning.py placeholder 
+# test_cleaning.py placeholder
+import numpy as np
+import pandas as pd
+import pytest
+from timeseries_inventory.preprocessing.cleaning import DataCleaner, HashedKeySet
+from timeseries_inventory.preprocessing.series_state import SeriesState
+
+
+def test_hashed_key_set_detects_repeats_across_batches():
+    keys = HashedKeySet(max_keys=1000)
+    first = keys.add(np.array([1, 2, 2, 3], dtype=np.uint64))
+    second = keys.add(np.array([3, 4, 1], dtype=np.uint64))
+    assert first.tolist() == [True, True, False, True]
+    assert second.tolist() == [False, True, False]
+    assert len(keys) == 4
+
+
+def test_hashed_key_set_is_bounded():
+    keys = HashedKeySet(max_keys=100)
+    for start in range(0, 1000, 10):
+        keys.add(np.arange(start, start + 10, dtype=np.uint64))
+    assert len(keys) <= 100
+
+
+def test_series_state_replaces_only_the_series_it_is_given():
+    state = SeriesState(depth=3, width=1)
+    state.put(np.array([1, 2, 1, 1, 1], dtype=np.uint64), np.array([1.0, 10.0, 2.0, 3.0, 4.0]))
+    keys, values = state.get(np.array([1, 2, 3], dtype=np.uint64))
+    assert keys.tolist() == [1, 1, 1, 2]
+    assert values[:, 0].tolist() == [2.0, 3.0, 4.0, 10.0]
+
+    state.put(np.array([2], dtype=np.uint64), np.array([20.0]))
+    keys, values = state.get(np.array([2, 1], dtype=np.uint64))
+    assert keys.tolist() == [2, 1, 1, 1]
+    assert values[:, 0].tolist() == [20.0, 2.0, 3.0, 4.0]
+    assert (len(state), state.series) == (4, 2)
+
+
+def test_series_state_finds_series_added_over_many_puts():
+    rng = np.random.default_rng(0)
+    state = SeriesState(depth=2, width=1)
+    expected = {}
+    for batch in range(40):
+        keys = rng.integers(0, 5000, size=rng.integers(1, 300)).astype(np.uint64)
+        values = rng.random(len(keys))
+        state.put(keys, values)
+        # A put replaces the rows of its series with their last two
+        for key in np.unique(keys):
+            expected[int(key)] = values[keys == key].tolist()[-2:]
+    # Lookups span the slots indexed at different times
+    assert len(state._levels) > 1
+    assert state.series == len(expected)
+
+    lookup = np.array([*rng.permutation(list(expected))[:500], 10_000, 10_001], dtype=np.uint64)
+    keys, values = state.get(lookup)
+    known = [int(key) for key in lookup if int(key) in expected]
+    assert keys.tolist() == [key for key in known for _ in expected[key]]
+    assert values[:, 0].tolist() == [value for key in known for value in expected[key]]
+
+
+@pytest.mark.parametrize("n_series", [10, 20_000])
+def test_chunk_work_does_not_grow_with_the_catalogue(n_series, cleaning_config, monkeypatch):
+    cleaner = DataCleaner(cleaning_config(drop_duplicates=False))
+    catalogue = pd.DataFrame({"sku": [f"sku-{i}" for i in range(n_series)], "value": np.arange(n_series, dtype="float64")})
+    cleaner.clean_chunk(catalogue)
+
+    # Rows carried into the chunk: one anchor per known series of the chunk, whatever the catalogue size
+    anchors = []
+    get = SeriesState.get
+
+    def recording_get(self, keys):
+        rows = get(self, keys)
+        anchors.append(len(rows[0]))
+        return rows
+
+    monkeypatch.setattr(SeriesState, "get", recording_get)
+    chunk = pd.DataFrame({"sku": ["sku-1", "sku-2", "sku-1", "new"], "value": [np.nan, 5.0, np.nan, np.nan]})
+    cleaned = cleaner.clean_chunk(chunk)
+    assert anchors == [2]
+    assert cleaned["value"].tolist()[:3] == [1.0, 5.0, 1.0]
+    assert np.isnan(cleaned["value"].iloc[3])
+
+
+def test_duplicates_dropped_across_chunk_boundaries(cleaning_config, demand_frame, split):
+    frame = demand_frame(dtype="float32")
+    stream = pd.concat([frame, frame.iloc[::7]]).sort_index(kind="stable")
+    cleaned = pd.concat(DataCleaner(cleaning_config()).clean(split(stream, 11)))
+    expected = stream.drop_duplicates(["date", "sku"])
+    assert len(cleaned) == len(expected)
+    assert not cleaned.duplicated(["date", "sku"]).any()
+
+
+@pytest.mark.parametrize("chunksize", [1, 5, 17, 1000])
+def test_forward_fill_matches_pandas(chunksize, cleaning_config, demand_frame, split):
+    frame = demand_frame(missing=0.3, dtype="float32")
+    cleaned = pd.concat(DataCleaner(cleaning_config(drop_duplicates=False)).clean(split(frame, chunksize)))
+    expected = frame.groupby("sku", observed=True)["value"].ffill()
+    np.testing.assert_allclose(cleaned["value"], expected, equal_nan=True)
+    assert cleaned["value"].dtype == np.float32
+
+
+@pytest.mark.parametrize("chunksize", [1, 5, 17, 1000])
+def test_interpolation_matches_pandas(chunksize, cleaning_config, demand_frame, split):
+    frame = demand_frame(missing=0.3, dtype="float32")
+    cleaner = DataCleaner(cleaning_config(drop_duplicates=False, fill_method="interpolate"))
+    cleaned = pd.concat(cleaner.clean(split(frame, chunksize))).sort_index(kind="stable")
+    expected = frame.groupby("sku", observed=True)["value"].transform(lambda s: s.astype("float64").interpolate())
+    assert cleaned.index.equals(frame.index)
+    np.testing.assert_allclose(cleaned["value"], expected, rtol=1e-6, equal_nan=True)
+
+
+def test_interpolation_holds_at_most_max_held_rows_per_series(cleaning_config):
+    # Series 'a' stops reporting values for a while, 'b' keeps reporting
+    frame = pd.DataFrame({
+        "sku": np.repeat(["a", "b"], 10),
+        "value": [1.0, *[np.nan] * 8, 10.0, *np.arange(10.0)],
+    }).iloc[np.tile([0, 10], 10) + np.repeat(np.arange(10), 2)].reset_index(drop=True)
+    cleaner = DataCleaner(cleaning_config(drop_duplicates=False, fill_method="interpolate", max_held_rows=3))
+    out, held = [], []
+    for start in range(0, len(frame), 4):
+        out.append(cleaner.clean_chunk(frame.iloc[start:start + 4]))
+        held.append(0 if cleaner._held is None else len(cleaner._held))
+    assert max(held) == 3
+    assert cleaner.flush() is None
+
+    cleaned = pd.concat(out).sort_index()
+    assert cleaned.index.equals(frame.index)
+    # The first five gap rows are forward filled, the rest is interpolated towards 10
+    a = cleaned.loc[cleaned["sku"] == "a", "value"].tolist()
+    assert a == [1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 3.25, 5.5, 7.75, 10.0]
+    assert cleaned.loc[cleaned["sku"] == "b", "value"].tolist() == list(np.arange(10.0))
+
+
+def test_leading_gaps_stay_missing(cleaning_config, split):
+    frame = pd.DataFrame({"date": pd.date_range("2024-01-01", periods=4), "sku": "a", "value": [np.nan, np.nan, 1.0, np.nan]})
+    cleaned = pd.concat(DataCleaner(cleaning_config()).clean(split(frame, 2)))
+    assert cleaned["value"].tolist()[:2] == pytest.approx([np.nan, np.nan], nan_ok=True)
+    assert cleaned["value"].tolist()[2:] == [1.0, 1.0]
+
+
+def test_unknown_fill_method_rejected(cleaning_config):
+    with pytest.raises(ValueError):
+        DataCleaner(cleaning_config(fill_method="spline"))
@@ -0,0 +1,87 @@
+import os
+import re
+import yaml
+import pytest
+from importlib.resources import files
+from timeseries_inventory.data_config import data_path_loader
+from timeseries_inventory.data_config.data_stages_manager import _SCHEMAS, DataStagesManager
+
+
+def default_yaml() -> dict:
+    return yaml.safe_load(files("timeseries_inventory.data_config").joinpath("data_path.yaml").read_text())
+
+
+def write_config(path, data: dict):
+    path.write_text(yaml.safe_dump(data))
+    return path
+
+
+def accessor(cls: type) -> str:
+    """`ModelTrainingConfig` -> 'model_training_config'."""
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", cls.__name__).lower()
+
+
+@pytest.mark.parametrize("cls", list(_SCHEMAS), ids=lambda cls: cls.__name__)
+def test_every_config_builds_from_the_default_yaml(cls):
+    assert isinstance(getattr(DataStagesManager(), accessor(cls))(), cls)
+
+
+def test_absolute_paths_fall_back_to_other_sections(tmp_path):
+    data = default_yaml()
+    data["simulation"]["random_state"] = None
+    data["model_training"]["training"]["random_state"] = 123
+    assert DataStagesManager(write_config(tmp_path / "fallback.yaml", data)).simulation_config().random_state == 123
+
+    data["simulation"]["random_state"] = 7
+    assert DataStagesManager(write_config(tmp_path / "own.yaml", data)).simulation_config().random_state == 7
+    # Training mini-batches are read from the prediction section
+    assert DataStagesManager(tmp_path / "own.yaml").model_training_config().batch_size == data["model_prediction"]["settings"]["batch_size"]
+
+
+def test_missing_required_key_is_reported(tmp_path):
+    data = default_yaml()
+    del data["model_training"]["model"]["type"]
+    data["model_training"]["training"]["random_state"] = "seed"
+    manager = DataStagesManager(write_config(tmp_path / "broken.yaml", data))
+    with pytest.raises(ValueError) as excinfo:
+        manager.model_training_config()
+    # Every problem of the config at once
+    assert "model_training.model.type: missing" in str(excinfo.value)
+    assert "model_training.training.random_state: expected int" in str(excinfo.value)
+
+
+def test_file_is_parsed_again_only_after_it_changes(tmp_path, monkeypatch):
+    parses = []
+    load_yaml = data_path_loader.DataPathLoader._load_yaml
+    monkeypatch.setattr(data_path_loader.DataPathLoader, "_load_yaml", lambda self: parses.append(1) or load_yaml(self))
+    data = default_yaml()
+    path = write_config(tmp_path / "config.yaml", data)
+    assert DataStagesManager(path).serving_config().max_horizon == data["serving"]["max_horizon"]
+    DataStagesManager(path).serving_config()
+    assert len(parses) == 1
+
+    # Size change
+    data["serving"]["max_horizon"] = 12345
+    write_config(path, data)
+    assert DataStagesManager(path).serving_config().max_horizon == 12345
+    assert len(parses) == 2
+
+    # Same size, new mtime
+    data["serving"]["max_horizon"] = 54321
+    write_config(path, data)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert DataStagesManager(path).serving_config().max_horizon == 54321
+    assert len(parses) == 3
+
+
+def test_changing_a_config_does_not_leak_into_other_managers():
+    config = DataStagesManager().model_training_config()
+    config.global_model["path"] = "elsewhere.pkl"
+    config.segments["modes"]["A"] = "global"
+    config.type.append("prophet")
+
+    fresh = DataStagesManager().model_training_config()
+    assert fresh.global_model["path"] != "elsewhere.pkl"
+    assert fresh.segments["modes"] == {}
+    assert "prophet" not in fresh.type
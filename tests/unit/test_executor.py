@@ -0,0 +1,133 @@
+import threading
+import time
+import pytest
+from timeseries_inventory.pipeline.executor import DagExecutor, PipelineError, Stage
+
+
+def run_with_timeout(executor: DagExecutor, timeout: float = 20.0, **kwargs):
+    """Run the DAG in a helper thread so a deadlock fails the test instead of hanging it."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["results"] = executor.run(**kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline deadlocked"
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["results"]
+
+
+class Source:
+    """Endless numbered stream that records how far it got and whether it was closed."""
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.produced = 0
+        self.closed = False
+
+    def __call__(self):
+        def stream():
+            try:
+                while self.limit is None or self.produced < self.limit:
+                    self.produced += 1
+                    yield self.produced
+            finally:
+                self.closed = True
+        return stream()
+
+
+def test_streams_through_a_diamond():
+    source = Source(limit=100)
+    stages = [
+        Stage("source", source),
+        Stage("double", lambda items: (2 * item for item in items), ("source",)),
+        Stage("square", lambda items: (item * item for item in items), ("source",)),
+        Stage("total", lambda a, b: sum(x + y for x, y in zip(a, b)), ("double", "square")),
+    ]
+    results = run_with_timeout(DagExecutor(stages, max_buffered_chunks=2))
+    assert results == {"total": sum(2 * i + i * i for i in range(1, 101))}
+
+
+def test_edges_bound_how_far_producers_run_ahead():
+    source = Source(limit=50)
+    lag = []
+
+    def slow(items):
+        for consumed, _ in enumerate(items, start=1):
+            lag.append(source.produced - consumed)
+            time.sleep(0.002)
+        return consumed
+
+    results = run_with_timeout(DagExecutor([Stage("source", source), Stage("sink", slow, ("source",), max_buffered_chunks=3)]))
+    assert results == {"sink": 50}
+    # Queue capacity plus the item held by the blocked producer
+    assert max(lag) <= 3 + 1
+
+
+def test_failing_stage_stops_endless_producers():
+    source = Source()
+
+    def failing(items):
+        for index, _ in enumerate(items):
+            if index == 3:
+                raise ValueError("bad chunk")
+            yield index
+
+    stages = [
+        Stage("source", source),
+        Stage("transform", failing, ("source",), max_buffered_chunks=1),
+        Stage("sink", lambda items: sum(items), ("transform",)),
+    ]
+    with pytest.raises(PipelineError) as excinfo:
+        run_with_timeout(DagExecutor(stages))
+    assert excinfo.value.stage == "transform"
+    assert isinstance(excinfo.value.error, ValueError)
+    assert source.closed
+
+
+def test_failing_source_ends_downstream_stages():
+    def source():
+        yield 1
+        raise OSError("disk gone")
+
+    stages = [Stage("source", source), Stage("sink", lambda items: list(items), ("source",))]
+    with pytest.raises(PipelineError, match="disk gone") as excinfo:
+        run_with_timeout(DagExecutor(stages))
+    assert excinfo.value.stage == "source"
+
+
+def test_consumer_stopping_early_cancels_its_producer():
+    source = Source()
+
+    def head(items):
+        return [item for _, item in zip(range(5), items)]
+
+    results = run_with_timeout(DagExecutor([Stage("source", source), Stage("head", head, ("source",), max_buffered_chunks=2)]))
+    assert results == {"head": [1, 2, 3, 4, 5]}
+    assert source.closed
+
+
+def test_targets_only_run_the_stages_they_need():
+    calls = []
+    stages = [
+        Stage("source", lambda: iter([1, 2, 3])),
+        Stage("a", lambda items: calls.append("a") or sum(items), ("source",)),
+        Stage("b", lambda items: calls.append("b") or max(items), ("source",)),
+    ]
+    assert run_with_timeout(DagExecutor(stages), targets=["b"]) == {"b": 3}
+    assert calls == ["b"]
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError, match="unknown stage"):
+        DagExecutor([Stage("a", lambda items: items, ("missing",))])
+    with pytest.raises(ValueError, match="cycle"):
+        DagExecutor([Stage("a", lambda items: items, ("b",)), Stage("b", lambda items: items, ("a",))])
+    with pytest.raises(ValueError, match="unique"):
+        DagExecutor([Stage("a", lambda: 1), Stage("a", lambda: 2)])
@@ -1 +1,76 @@
-# test_feature_engineering.py placeholder 
+# test_feature_engineering.py placeholder
+import numpy as np
+import pandas as pd
+import pytest
+from timeseries_inventory.preprocessing.feature_engineering import FeatureEngine
+from timeseries_inventory.preprocessing.series_state import SeriesState
+
+
+@pytest.mark.parametrize("chunksize", [1, 7, 50, 1000])
+def test_features_match_full_frame_groupby(chunksize, engineering_config, demand_frame, split):
+    frame = demand_frame(n_days=50, n_skus=4, shuffle=True)
+    out = pd.concat(FeatureEngine(engineering_config()).transform(split(frame, chunksize)))
+    grouped = frame.groupby("sku")["value"]
+    np.testing.assert_allclose(out["value_lag_1"], grouped.shift(1), equal_nan=True)
+    np.testing.assert_allclose(out["value_lag_3"], grouped.shift(3), equal_nan=True)
+    np.testing.assert_allclose(
+        out["value_rolling_mean_4"],
+        grouped.transform(lambda s: s.shift(1).rolling(4).mean()),
+        equal_nan=True,
+    )
+    np.testing.assert_allclose(
+        out["value_ewm_3"],
+        grouped.transform(lambda s: s.ewm(span=3, adjust=False).mean().shift(1)),
+        equal_nan=True,
+    )
+
+
+def test_tail_buffer_is_bounded(engineering_config, demand_frame, split):
+    engine = FeatureEngine(engineering_config())
+    for _ in engine.transform(split(demand_frame(n_days=250, n_skus=4, shuffle=True), 100)):
+        pass
+    assert len(engine._tail) <= 4 * engine.tail_length
+
+
+@pytest.mark.parametrize("n_series", [10, 20_000])
+def test_chunk_work_does_not_grow_with_the_catalogue(n_series, engineering_config, monkeypatch):
+    engine = FeatureEngine(engineering_config())
+    skus = [f"sku-{i}" for i in range(n_series)]
+    for day in range(2):
+        engine.transform_chunk(pd.DataFrame({"sku": skus, "value": np.arange(n_series, dtype="float64") + day}))
+
+    # Rows carried into the chunk: the tails and EWM anchors of its known series only
+    carried = []
+    get = SeriesState.get
+
+    def recording_get(self, keys):
+        rows = get(self, keys)
+        carried.append(len(rows[0]))
+        return rows
+
+    monkeypatch.setattr(SeriesState, "get", recording_get)
+    out = engine.transform_chunk(pd.DataFrame({"sku": ["sku-1", "sku-2", "sku-1", "new"], "value": [7.0, 8.0, 9.0, 1.0]}))
+    assert carried == [4, 2]
+    assert out["value_lag_1"].tolist()[:3] == [2.0, 3.0, 7.0]
+    assert out["value_lag_3"].tolist()[2] == 1.0
+    assert np.isnan(out["value_lag_1"].iloc[3])
+
+
+def test_polynomials_and_interactions(engineering_config, demand_frame):
+    frame = demand_frame(n_days=5, n_skus=4, shuffle=True)
+    config = engineering_config(lags=[1, 2], rolling_windows=[], ewm_spans=[], generate_polynomials=True, polynomial_degree=3, interaction_terms=True)
+    out = next(FeatureEngine(config).transform(iter([frame])))
+    np.testing.assert_allclose(out["value_lag_1_pow_3"], out["value_lag_1"] ** 3, equal_nan=True)
+    np.testing.assert_allclose(out["value_lag_1_x_value_lag_2"], out["value_lag_1"] * out["value_lag_2"], equal_nan=True)
+
+
+def test_float32_target_keeps_float32_features(engineering_config, demand_frame):
+    frame = demand_frame(n_days=50, n_skus=4, shuffle=True, dtype="float32")
+    out = next(FeatureEngine(engineering_config()).transform(iter([frame])))
+    assert out["value_lag_1"].dtype == np.float32
+
+
+def test_disabled_lag_features_add_nothing(engineering_config, demand_frame):
+    frame = demand_frame(n_days=50, n_skus=4, shuffle=True)
+    out = next(FeatureEngine(engineering_config(enabled=False)).transform(iter([frame])))
+    assert list(out.columns) == ["date", "sku", "value"]
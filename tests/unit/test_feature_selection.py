@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+from timeseries_inventory.preprocessing import feature_selection
+from timeseries_inventory.preprocessing.feature_selection import FeatureSelector, StratifiedReservoir
+
+
+def features_frame(rows: int = 900, seed: int = 0) -> pd.DataFrame:
+    """Two informative features among four noise columns, plus id, date and categorical columns."""
+    rng = np.random.default_rng(seed)
+    signal, trend = rng.normal(size=rows), rng.normal(size=rows)
+    frame = pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=rows, freq="D"),
+        "sku": [f"sku-{i % 4}" for i in range(rows)],
+        "store_id": np.arange(rows) % 7,
+        "location": pd.Categorical([f"WH-{i % 2}" for i in range(rows)]),
+        "signal": signal,
+        "trend": trend,
+        **{f"noise_{i}": rng.normal(size=rows) for i in range(4)},
+        "promo": rng.random(rows) < 0.2,
+        "value": signal + trend ** 2 + 0.1 * rng.normal(size=rows),
+    })
+    # An integer id is numeric: its values carry no information
+    frame["store_id"] = rng.permutation(frame["store_id"].to_numpy())
+    return frame
+
+
+def test_top_k_informative_features_are_kept(selection_config, split):
+    frame = features_frame()
+    out = pd.concat(FeatureSelector(selection_config()).transform(split(frame, 100)), ignore_index=True)
+    assert list(out.columns) == ["date", "sku", "location", "signal", "trend", "promo", "value"]
+    pd.testing.assert_frame_equal(out, frame[out.columns.tolist()])
+
+
+def test_selection_does_not_depend_on_the_worker_count(selection_config, split, tmp_path):
+    frame = features_frame()
+    runs = [
+        pd.concat(FeatureSelector(selection_config(workers=workers, top_k=3, directory=tmp_path / f"w{workers}")).transform(split(frame, 100)))
+        for workers in (1, 3)
+    ]
+    pd.testing.assert_frame_equal(runs[0], runs[1])
+
+
+def test_scores_are_reused_when_only_top_k_changes(selection_config, split, monkeypatch):
+    frame = features_frame()
+    list(FeatureSelector(selection_config(top_k=2)).transform(split(frame, 100)))
+
+    def not_called(*args, **kwargs):
+        raise AssertionError("the scores should come from the cache")
+
+    monkeypatch.setattr(feature_selection, "mutual_info_scores", not_called)
+    out = pd.concat(FeatureSelector(selection_config(top_k=3)).transform(split(frame, 100)))
+    assert {"signal", "trend"} <= set(out.columns)
+    assert len(set(out.columns) & {"store_id", *(f"noise_{i}" for i in range(4))}) == 1
+    # Another sample is scored again
+    with pytest.raises(AssertionError, match="from the cache"):
+        list(FeatureSelector(selection_config(top_k=3, random_state=1)).transform(split(frame, 100)))
+
+
+def test_few_candidates_pass_through_unchanged(selection_config, split):
+    frame = features_frame()[["date", "sku", "signal", "value"]]
+    chunks = list(FeatureSelector(selection_config()).transform(split(frame, 100)))
+    pd.testing.assert_frame_equal(pd.concat(chunks), frame)
+
+
+def test_reservoir_gives_every_stratum_an_equal_share_regardless_of_chunking():
+    rows = 5000
+    frame = pd.DataFrame({"row": np.arange(rows)})
+    # Strata of very different sizes, interleaved
+    strata = np.random.default_rng(0).choice([10, 20, 30], size=rows, p=[0.8, 0.15, 0.05])
+
+    samples = []
+    for chunksize in (rows, 333, 37):
+        reservoir = StratifiedReservoir(300, random_state=5)
+        for start in range(0, rows, chunksize):
+            reservoir.add(frame.iloc[start:start + chunksize], strata[start:start + chunksize])
+        samples.append(reservoir.result())
+    for sample in samples[1:]:
+        pd.testing.assert_frame_equal(sample, samples[0])
+
+    sample = samples[0]
+    assert sample["row"].is_monotonic_increasing
+    assert np.bincount(strata[sample["row"]])[[10, 20, 30]].tolist() == [100, 100, 100]
+
+
+def test_reservoir_keeps_small_strata_whole():
+    reservoir = StratifiedReservoir(100, random_state=0)
+    reservoir.add(pd.DataFrame({"row": np.arange(30)}), np.repeat([1, 2], [25, 5]))
+    assert reservoir.result()["row"].tolist() == list(range(30))
+    assert StratifiedReservoir(10, random_state=0).result().empty
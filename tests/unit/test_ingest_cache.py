@@ -0,0 +1,182 @@
+import os
+import time
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from timeseries_inventory.ingestion import ingest_cache
+from timeseries_inventory.ingestion.file_loader import FileLoader
+from timeseries_inventory.ingestion.ingest_cache import IngestCache
+
+
+def write_file(directory, name: str = "demand.csv", rows: int = 40):
+    frame = pd.DataFrame({"sku": [f"sku-{i % 3}" for i in range(rows)], "value": np.arange(rows, dtype="float64")})
+    frame.to_csv(directory / name, index=False)
+    return frame
+
+
+def cache_file(cache: IngestCache, file, chunksize: int = 15) -> pd.DataFrame:
+    """Parse a file through the cache and return what the parser produced."""
+    frame = pd.read_csv(file)
+    chunks = (frame.iloc[start:start + chunksize] for start in range(0, len(frame), chunksize))
+    assert cache.lookup(file) is None
+    return pd.concat(cache.write_through(file, chunks), ignore_index=True)
+
+
+def set_last_access(cache: IngestCache, key: str, seconds_ago: float) -> None:
+    meta = cache._read_meta(key)
+    meta["last_access"] = time.time() - seconds_ago
+    cache._write_meta(key, meta)
+
+
+def touch(file, seconds: int = 10) -> None:
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10 ** 9))
+
+
+def test_miss_then_hit_returns_the_same_frame(tmp_path):
+    write_file(tmp_path)
+    cache = IngestCache(tmp_path / "cache")
+    parsed = cache_file(cache, tmp_path / "demand.csv")
+
+    key = cache.lookup(tmp_path / "demand.csv")
+    assert key is not None
+    pd.testing.assert_frame_equal(pd.concat(cache.read(key), ignore_index=True), parsed)
+    pd.testing.assert_frame_equal(pd.concat(cache.read(key, start_row=20), ignore_index=True), parsed.iloc[20:].reset_index(drop=True))
+
+
+def test_file_loader_serves_unchanged_files_from_the_cache(tmp_path, ingestion_config):
+    write_file(tmp_path)
+    config = ingestion_config(cache_enabled=True, cache_directory=tmp_path / "cache")
+    first = pd.concat(FileLoader(config).load(), ignore_index=True)
+
+    loader = FileLoader(config)
+
+    class UnusedReader:
+        def read(self, file, start_row=0):
+            raise AssertionError("the file should come from the cache")
+
+    loader.reader = UnusedReader()
+    pd.testing.assert_frame_equal(pd.concat(loader.load(), ignore_index=True), first)
+
+
+def test_changed_files_are_parsed_again(tmp_path):
+    file = tmp_path / "demand.csv"
+    write_file(tmp_path)
+    cache = IngestCache(tmp_path / "cache")
+    cache_file(cache, file)
+
+    # Size change
+    write_file(tmp_path, rows=41)
+    assert cache.lookup(file) is None
+    cache_file(cache, file)
+
+    # Same size and a new mtime, different content
+    size = file.stat().st_size
+    file.write_text(file.read_text().replace("sku-0", "sku-9"))
+    touch(file)
+    assert file.stat().st_size == size
+    assert cache.lookup(file) is None
+
+
+def test_touched_but_unchanged_file_is_a_hit(tmp_path):
+    file = tmp_path / "demand.csv"
+    write_file(tmp_path)
+    cache = IngestCache(tmp_path / "cache")
+    cache_file(cache, file)
+
+    touch(file)
+    key = cache.lookup(file)
+    assert key is not None
+    # The new mtime is recorded, the next lookup skips the content hash
+    assert cache._read_meta(key)["mtime_ns"] == file.stat().st_mtime_ns
+
+
+def test_reader_params_are_part_of_the_key(tmp_path):
+    file = tmp_path / "demand.csv"
+    write_file(tmp_path)
+    cache_file(IngestCache(tmp_path / "cache", params={"chunksize": 15}), file)
+    assert IngestCache(tmp_path / "cache", params={"chunksize": 15}).lookup(file) is not None
+    assert IngestCache(tmp_path / "cache", params={"chunksize": 20}).lookup(file) is None
+
+
+def test_warm_lookups_do_not_rewrite_the_sidecar(tmp_path, monkeypatch):
+    file = tmp_path / "demand.csv"
+    write_file(tmp_path)
+    cache = IngestCache(tmp_path / "cache")
+    cache_file(cache, file)
+    key = cache.lookup(file)
+
+    writes = []
+    write_meta = cache._write_meta
+    monkeypatch.setattr(cache, "_write_meta", lambda key, meta: writes.append(key) or write_meta(key, meta))
+    for _ in range(5):
+        assert cache.lookup(file) == key
+    assert writes == []
+
+    # A last access older than the resolution is refreshed once
+    set_last_access(cache, key, ingest_cache._ACCESS_RESOLUTION_SECONDS + 60)
+    writes.clear()
+    cache.lookup(file)
+    cache.lookup(file)
+    assert writes == [key]
+    assert time.time() - cache._read_meta(key)["last_access"] < 60
+
+
+def test_least_recently_used_entries_are_evicted_above_the_size_limit(tmp_path):
+    for index in range(3):
+        write_file(tmp_path, f"part-{index}.csv")
+    cache = IngestCache(tmp_path / "cache")
+    cache_file(cache, tmp_path / "part-0.csv")
+    entry_bytes = cache.entries()[0]["bytes"]
+
+    cache = IngestCache(tmp_path / "cache", max_size_mb=2.5 * entry_bytes / (1024 * 1024))
+    cache_file(cache, tmp_path / "part-1.csv")
+    set_last_access(cache, cache.lookup(tmp_path / "part-0.csv"), 120)
+    cache_file(cache, tmp_path / "part-2.csv")
+
+    assert cache.lookup(tmp_path / "part-0.csv") is None
+    assert sorted(json.loads(path.read_text())["file"] for path in cache.directory.glob("*.json")) == [
+        str((tmp_path / name).resolve()) for name in ("part-1.csv", "part-2.csv")
+    ]
+
+
+def test_entries_unused_for_too_long_are_evicted(tmp_path):
+    write_file(tmp_path)
+    cache = IngestCache(tmp_path / "cache", max_age_days=1)
+    cache_file(cache, tmp_path / "demand.csv")
+    key = cache.lookup(tmp_path / "demand.csv")
+
+    assert cache.evict() == 0
+    set_last_access(cache, key, 2 * 86400)
+    assert cache.evict() == 1
+    assert list(cache.directory.iterdir()) == []
+
+
+def test_info_and_purge_cli(tmp_path, capsys):
+    for index in range(2):
+        write_file(tmp_path, f"part-{index}.csv")
+    cache = IngestCache(tmp_path / "cache")
+    cache_file(cache, tmp_path / "part-0.csv")
+    cache_file(cache, tmp_path / "part-1.csv")
+    set_last_access(cache, cache.lookup(tmp_path / "part-0.csv"), 10 * 86400)
+    (cache.directory / "leftover.arrows.tmp-1-2").write_bytes(b"partial")
+
+    ingest_cache.main(["--directory", str(cache.directory), "info"])
+    out = capsys.readouterr().out
+    assert "2 entries" in out
+    assert str((tmp_path / "part-1.csv").resolve()) in out
+
+    ingest_cache.main(["--directory", str(cache.directory), "purge", "--older-than-days", "7"])
+    assert "Removed 1 entries" in capsys.readouterr().out
+    assert [entry["file"] for entry in cache.entries()] == [str((tmp_path / "part-1.csv").resolve())]
+    assert not (cache.directory / "leftover.arrows.tmp-1-2").exists()
+
+    ingest_cache.main(["--directory", str(cache.directory), "purge"])
+    assert "Removed 1 entries" in capsys.readouterr().out
+    assert list(cache.directory.iterdir()) == []
+
+
+def test_cli_requires_a_command(tmp_path):
+    with pytest.raises(SystemExit):
+        ingest_cache.main(["--directory", str(tmp_path)])
@@ -0,0 +1,287 @@
+import time
+import threading
+import multiprocessing
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+from timeseries_inventory.ingestion.file_loader import FileLoader
+from timeseries_inventory.ingestion.checkpoint import IngestCheckpoint
+from timeseries_inventory.ingestion.readers import get_reader
+
+
+def write_csv(directory, name: str = "demand.csv", rows: int = 95):
+    frame = pd.DataFrame({"sku": [f"sku-{i % 3}" for i in range(rows)], "value": np.arange(rows, dtype="float64")})
+    frame.to_csv(directory / name, index=False)
+    return frame
+
+
+class FlakyReader:
+    """Wraps a reader and fails once, after `fail_after` rows of the file were yielded."""
+
+    def __init__(self, reader, fail_after: int):
+        self.reader = reader
+        self.fail_after = fail_after
+        self.starts = []
+
+    def read(self, file, start_row=0):
+        self.starts.append(start_row)
+        rows = start_row
+        for chunk in self.reader.read(file, start_row=start_row):
+            if self.fail_after is not None and rows >= self.fail_after:
+                self.fail_after = None
+                raise OSError("connection reset")
+            rows += len(chunk)
+            yield chunk
+
+
+class CountingReader:
+    """Wraps a reader and counts the chunks parsed so far, across threads."""
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.parsed = 0
+        self.lock = threading.Lock()
+
+    def read(self, file, start_row=0):
+        for chunk in self.reader.read(file, start_row=start_row):
+            with self.lock:
+                self.parsed += 1
+            yield chunk
+
+
+class FailingReader:
+    """Wraps a reader and fails on one of the files."""
+
+    def __init__(self, reader, name: str):
+        self.reader = reader
+        self.name = name
+
+    def read(self, file, start_row=0):
+        if file.name == self.name:
+            raise ValueError(f"corrupt file {file.name}")
+        yield from self.reader.read(file, start_row=start_row)
+
+
+BACKENDS = [("csv", "pandas"), ("csv", "pyarrow"), ("parquet", "pandas"), ("feather", "pandas")]
+
+
+def write_sales(directory, rows: int = 25):
+    """The same sales rows as CSV, Parquet (row groups of 7) and Feather files."""
+    frame = pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=rows),
+        "sku": [f"sku-{i % 3}" for i in range(rows)],
+        "location": ["WH-1"] * rows,
+        "value": np.arange(rows, dtype="float64"),
+    })
+    frame.to_csv(directory / "sales.csv", index=False)
+    frame.to_parquet(directory / "sales.parquet", row_group_size=7)
+    frame.to_feather(directory / "sales.feather")
+    return frame
+
+
+def reader_config(ingestion_config, format: str, engine: str):
+    return ingestion_config(
+        format=format, engine=engine, file_pattern=f"*.{format}", datetime_column="date",
+        dtypes={"sku": "category", "location": "category", "value": "float32"},
+    )
+
+
+@pytest.mark.parametrize("format, engine", BACKENDS)
+def test_every_backend_reads_the_same_frame(tmp_path, ingestion_config, format, engine):
+    write_sales(tmp_path)
+    expected = pd.concat(get_reader(reader_config(ingestion_config, "csv", "pandas")).read(tmp_path / "sales.csv"), ignore_index=True)
+    assert expected["date"].dtype == "datetime64[ns]"
+    assert expected["value"].dtype == "float32"
+
+    reader = get_reader(reader_config(ingestion_config, format, engine))
+    out = pd.concat(reader.read(tmp_path / f"sales.{format}"), ignore_index=True)
+    pd.testing.assert_frame_equal(out, expected)
+
+
+@pytest.mark.parametrize("format, engine", BACKENDS)
+@pytest.mark.parametrize("start_row", [0, 3, 14, 25])
+def test_backends_chunk_from_a_row_offset(tmp_path, ingestion_config, format, engine, start_row):
+    frame = write_sales(tmp_path)
+    chunks = list(get_reader(reader_config(ingestion_config, format, engine)).read(tmp_path / f"sales.{format}", start_row=start_row))
+    assert all(0 < len(chunk) <= 10 for chunk in chunks)
+    values = pd.concat(chunks)["value"] if chunks else pd.Series([], dtype="float32")
+    np.testing.assert_array_equal(values, frame["value"].iloc[start_row:])
+
+
+def test_unknown_backends_are_rejected(ingestion_config):
+    with pytest.raises(ValueError, match="Unsupported input format 'xlsx'"):
+        get_reader(ingestion_config(format="xlsx"))
+    with pytest.raises(ValueError, match="Unsupported csv engine 'polars'"):
+        get_reader(ingestion_config(engine="polars"))
+
+
+def write_csvs(directory, sizes=(23, 41, 7, 30, 55, 12)):
+    return [write_csv(directory, f"part-{index}.csv", rows) for index, rows in enumerate(sizes)]
+
+
+def parallel_config(ingestion_config, **overrides):
+    settings = dict(parallel_enabled=True, workers=3, max_inflight_chunks=6, attempts=1)
+    settings.update(overrides)
+    return ingestion_config(**settings)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_ordered_parallel_load_matches_the_sequential_load(tmp_path, ingestion_config, executor):
+    write_csvs(tmp_path)
+    expected = pd.concat(FileLoader(ingestion_config()).load(), ignore_index=True)
+    loader = FileLoader(parallel_config(ingestion_config, executor=executor))
+    pd.testing.assert_frame_equal(pd.concat(loader.load(), ignore_index=True), expected)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_unordered_parallel_load_yields_every_row(tmp_path, ingestion_config, executor):
+    write_csvs(tmp_path)
+    expected = pd.concat(FileLoader(ingestion_config()).load(), ignore_index=True)
+    out = pd.concat(FileLoader(parallel_config(ingestion_config, executor=executor, ordered=False)).load(), ignore_index=True)
+    key = ["value", "sku"]
+    pd.testing.assert_frame_equal(
+        out.sort_values(key, ignore_index=True), expected.sort_values(key, ignore_index=True)
+    )
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_parallel_load_bounds_the_chunks_in_flight(tmp_path, ingestion_config, ordered):
+    # Many small files: in ordered mode finished files must not pile up behind the first one
+    write_csvs(tmp_path, sizes=(60, 5, 8, 3, 15, 9, 4, 12, 7, 30))
+    loader = FileLoader(parallel_config(ingestion_config, workers=2, max_inflight_chunks=4, ordered=ordered))
+    loader.reader = CountingReader(loader.reader)
+
+    peak = 0
+    for consumed, _ in enumerate(loader.load(), start=1):
+        # A slow consumer lets the workers run ahead as far as they may
+        time.sleep(0.02)
+        peak = max(peak, loader.reader.parsed - consumed)
+    assert 0 < peak <= 4
+    assert loader.reader.parsed == consumed
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+@pytest.mark.parametrize("ordered", [True, False])
+def test_parallel_worker_error_reaches_the_consumer(tmp_path, ingestion_config, executor, ordered):
+    write_csvs(tmp_path)
+    loader = FileLoader(parallel_config(ingestion_config, executor=executor, ordered=ordered))
+    loader.reader = FailingReader(loader.reader, "part-3.csv")
+    with pytest.raises(ValueError, match="corrupt file part-3.csv"):
+        list(loader.load())
+
+
+def test_closing_the_parallel_load_early_shuts_the_pools_down(tmp_path, ingestion_config):
+    write_csvs(tmp_path)
+
+    chunks = FileLoader(parallel_config(ingestion_config, executor="thread")).load()
+    next(chunks)
+    assert any(thread.name.startswith("file_loader") for thread in threading.enumerate())
+    chunks.close()
+    assert not any(thread.name.startswith("file_loader") for thread in threading.enumerate())
+
+    children = set(multiprocessing.active_children())
+    chunks = FileLoader(parallel_config(ingestion_config, executor="process")).load()
+    next(chunks)
+    assert set(multiprocessing.active_children()) - children
+    chunks.close()
+    assert not set(multiprocessing.active_children()) - children
+
+
+def test_checkpoint_resumes_mid_file(tmp_path, ingestion_config):
+    frame = write_csv(tmp_path)
+    config = ingestion_config(checkpoint_enabled=True)
+
+    # The run stops while the third chunk is processed: the first two are committed
+    chunks = FileLoader(config).load()
+    for _ in range(3):
+        next(chunks)
+    chunks.close()
+    assert IngestCheckpoint(config.checkpoint_path).offset(tmp_path / "demand.csv") == 20
+
+    resumed = list(FileLoader(config).load())
+    assert resumed[0].attrs["source"]["start_row"] == 20
+    assert resumed[-1].attrs["source"]["last"]
+    np.testing.assert_array_equal(pd.concat(resumed)["value"], frame["value"].iloc[20:])
+    # A completed run clears the checkpoint, the next one starts over
+    assert not config.checkpoint_path.exists()
+    assert len(pd.concat(FileLoader(config).load())) == len(frame)
+
+
+def test_manual_commit_resumes_and_clears_after_a_full_pass(tmp_path, ingestion_config):
+    frame = write_csv(tmp_path)
+    write_csv(tmp_path, "other.csv", rows=45)
+    config = ingestion_config(checkpoint_enabled=True, auto_commit=False)
+
+    # Downstream commits the first three chunks, then the run stops
+    loader = FileLoader(config)
+    chunks = list(loader.load())
+    for chunk in chunks[:3]:
+        loader.commit(chunk)
+    first = chunks[0].attrs["source"]["file"]
+    assert IngestCheckpoint(config.checkpoint_path).offset(Path(first)) == 30
+
+    loader = FileLoader(config)
+    resumed = list(loader.load())
+    assert len(pd.concat(resumed)) == len(frame) + 45 - 30
+    for chunk in resumed[:-1]:
+        loader.commit(chunk)
+    assert config.checkpoint_path.exists()
+    # Committing the last chunk completes the pass, the next run starts over
+    loader.commit(resumed[-1])
+    assert not config.checkpoint_path.exists()
+    assert len(pd.concat(FileLoader(config).load())) == len(frame) + 45
+
+
+def test_reset_checkpoint_rereads_every_file(tmp_path, ingestion_config):
+    frame = write_csv(tmp_path)
+    config = ingestion_config(checkpoint_enabled=True, auto_commit=False)
+    loader = FileLoader(config)
+    for chunk in loader.load():
+        if chunk.attrs["source"]["last"]:
+            break
+        loader.commit(chunk)
+    assert IngestCheckpoint(config.checkpoint_path).offset(tmp_path / "demand.csv") == 90
+
+    loader = FileLoader(config)
+    loader.reset_checkpoint()
+    assert not config.checkpoint_path.exists()
+    np.testing.assert_array_equal(pd.concat(loader.load())["value"], frame["value"])
+    # Without checkpointing there is nothing to reset
+    FileLoader(ingestion_config()).reset_checkpoint()
+
+
+def test_checkpoint_skips_committed_files_and_rereads_changed_ones(tmp_path):
+    write_csv(tmp_path)
+    checkpoint = IngestCheckpoint(tmp_path / "checkpoints" / "ingest.json")
+    file = tmp_path / "demand.csv"
+    checkpoint.commit(file, 95, complete=True)
+    assert checkpoint.offset(file) is None
+    checkpoint.commit(file, 40)
+    assert checkpoint.offset(file) is None, "offsets only move forward"
+
+    write_csv(tmp_path, rows=50)
+    assert checkpoint.offset(file) == 0
+
+
+def test_failed_read_is_retried_from_the_failing_row(tmp_path, ingestion_config):
+    frame = write_csv(tmp_path)
+    loader = FileLoader(ingestion_config())
+    loader.reader = FlakyReader(loader.reader, fail_after=30)
+    out = pd.concat(loader.load())
+    assert loader.reader.starts == [0, 30]
+    np.testing.assert_array_equal(out["value"], frame["value"])
+
+
+def test_retries_give_up_after_consecutive_failures(tmp_path, ingestion_config):
+    write_csv(tmp_path)
+    loader = FileLoader(ingestion_config(attempts=2))
+
+    class BrokenReader:
+        def read(self, file, start_row=0):
+            raise OSError("disk gone")
+            yield
+
+    loader.reader = BrokenReader()
+    with pytest.raises(OSError, match="disk gone"):
+        list(loader.load())
@@ -0,0 +1,34 @@
+import numpy as np
+from scipy.optimize import brentq
+from scipy.stats import norm
+from timeseries_inventory.services.inventory import _protection_demand, compute_policies, fill_rate_z
+
+
+def test_fill_rate_z_solves_the_normal_loss_function():
+    targets = np.array([1e-6, 1e-3, 0.05, 0.2, norm.pdf(0), 1.0, 3.0])
+    expected = [brentq(lambda z: norm.pdf(z) - z * norm.sf(z) - target, -50, 50, xtol=1e-12) for target in targets]
+    np.testing.assert_allclose(fill_rate_z(targets), expected, atol=1e-8)
+
+
+def test_cycle_service_policy_matches_the_closed_form():
+    # d = 100 per period, sigma = 20, L = 4 periods: sigma_L = 2 * 20, z_0.95 = 1.6449, EOQ = sqrt(2 * 100 * 50 / 2)
+    policy = compute_policies(
+        np.array([100.0, 100.0]), error_std=20.0, lead_time=4.0, lead_time_std=np.array([0.0, 1.0]),
+        service_level=0.95, order_cost=50.0, holding_cost=2.0, inventory_position=300.0,
+    )
+    z = 1.6448536269514722
+    demand_std = np.array([40.0, np.sqrt(4 * 20 ** 2 + 100 ** 2 * 1 ** 2)])
+    np.testing.assert_allclose(policy.lead_time_demand, [400.0, 400.0])
+    np.testing.assert_allclose(policy.demand_std, demand_std)
+    np.testing.assert_allclose(policy.safety_stock, z * demand_std)
+    np.testing.assert_allclose(policy.reorder_point, 400.0 + z * demand_std)
+    np.testing.assert_array_equal(policy.order_quantity, [71.0, 71.0])
+    # Shortfalls of 165.8 and 277.2 below the reorder point take three and four lots of 71 to clear
+    np.testing.assert_array_equal(policy.order, [3 * 71.0, 4 * 71.0])
+
+
+def test_protection_demand_over_fractional_periods_past_the_horizon():
+    forecasts = np.array([[1.0, 2.0, 3.0]] * 5)
+    periods = np.array([0.5, 1.25, 3.0, 4.5, 6.0])
+    # Past the horizon the last forecast (3) repeats: 4.5 periods = 1 + 2 + 3 + 3 + 0.5 * 3
+    np.testing.assert_allclose(_protection_demand(forecasts, periods), [0.5, 1.5, 6.0, 10.5, 15.0])
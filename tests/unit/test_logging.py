@@ -0,0 +1,121 @@
+import sys
+import json
+import logging
+import threading
+import subprocess
+import pytest
+from logging.handlers import QueueHandler, RotatingFileHandler
+from timeseries_inventory.utils import custom_logging
+from timeseries_inventory.utils.custom_logging import JsonFormatter, StageFilter, configure_logging, log_stage
+
+
+@pytest.fixture
+def logger_name(request):
+    """A logger of its own for every test, left without handlers or listener afterwards."""
+    name = f"test.{request.node.name}"
+    yield name
+    custom_logging._stop_listener()
+    logger = logging.getLogger(name)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    custom_logging._configured.discard(name)
+
+
+def record(message: str = "hello %s", args=("world",), level: int = logging.INFO, **extra) -> logging.LogRecord:
+    return logging.getLogger("test").makeRecord("test", level, "module.py", 12, message, args, None, "func", extra)
+
+
+def log_lines(base_dir, log_file: str = "test.log"):
+    return (base_dir / "logs" / log_file).read_text().splitlines()
+
+
+def test_json_records_carry_the_fields_and_extra():
+    item = record(rows=12, source={"file": "a.csv"})
+    item.stage = "ingest"
+    payload = json.loads(JsonFormatter().format(item))
+    assert payload["message"] == "hello world"
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "test"
+    assert payload["stage"] == "ingest"
+    assert (payload["function"], payload["line"]) == ("func", 12)
+    assert payload["time"].endswith("+00:00")
+    assert payload["rows"] == 12
+    assert payload["source"] == {"file": "a.csv"}
+    assert "args" not in payload and "msg" not in payload
+
+
+def test_json_records_include_the_exception():
+    try:
+        raise ValueError("bad chunk")
+    except ValueError:
+        item = logging.getLogger("test").makeRecord("test", logging.ERROR, "m.py", 1, "failed", (), sys.exc_info())
+    payload = json.loads(JsonFormatter().format(item))
+    assert "ValueError: bad chunk" in payload["exception"]
+
+
+def test_stage_filter_keeps_one_record_in_ten():
+    stage_filter = StageFilter({"ingest": 0.1})
+    with log_stage("ingest"):
+        kept = [stage_filter.filter(record()) for _ in range(100)]
+        warnings = [stage_filter.filter(record(level=logging.WARNING)) for _ in range(20)]
+    assert [index for index, keep in enumerate(kept) if keep] == list(range(0, 100, 10))
+    assert all(warnings)
+    # Other stages are not sampled without a '*' rate
+    with log_stage("train"):
+        assert all(stage_filter.filter(record()) for _ in range(10))
+
+
+def test_stage_filter_default_rate_and_stage_tag():
+    stage_filter = StageFilter({"*": 0.5, "train": 1.0})
+    item = record()
+    with log_stage("clean"):
+        kept = [stage_filter.filter(record()) for _ in range(10)]
+        stage_filter.filter(item)
+    assert sum(kept) == 5
+    assert item.stage == "clean"
+    with log_stage("train"):
+        assert all(stage_filter.filter(record()) for _ in range(10))
+
+
+def test_queue_mode_writes_every_record_when_reconfigured(tmp_path, logger_name):
+    logger = configure_logging(mode="queue", fmt="json", console=False, log_file="test.log", base_dir=str(tmp_path), logger_name=logger_name)
+    assert [type(handler) for handler in logger.handlers] == [custom_logging._DeferredQueueHandler]
+    for index in range(500):
+        logger.info("record %d", index, extra={"index": index})
+
+    configure_logging(mode="sync", console=False, log_file="test.log", base_dir=str(tmp_path), logger_name=logger_name)
+    records = [json.loads(line) for line in log_lines(tmp_path)]
+    assert [item["index"] for item in records] == list(range(500))
+    assert records[-1]["message"] == "record 499"
+
+
+def test_queue_mode_writes_every_record_at_exit(tmp_path):
+    script = (
+        "from timeseries_inventory.utils.custom_logging import configure_logging\n"
+        f"logger = configure_logging(mode='queue', console=False, log_file='test.log', base_dir={str(tmp_path)!r})\n"
+        "for index in range(1000):\n"
+        "    logger.info('record %d', index)\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=tmp_path)
+    lines = log_lines(tmp_path)
+    assert len(lines) == 1000
+    assert lines[-1].endswith("record 999")
+
+
+def test_reconfiguring_does_not_leak_handlers(tmp_path, logger_name, monkeypatch):
+    built = []
+    handlers = custom_logging._handlers
+    monkeypatch.setattr(custom_logging, "_handlers", lambda *args: built.extend(handlers(*args)) or built[-1:])
+    threads = threading.active_count()
+
+    for mode in ("queue", "sync", "queue", "queue", "sync"):
+        logger = configure_logging(mode=mode, console=False, log_file="test.log", base_dir=str(tmp_path), logger_name=logger_name)
+        assert len(logger.handlers) == 1
+        assert len([f for f in logger.filters if isinstance(f, StageFilter)]) == 1
+    # One file handler per call, every replaced one closed
+    assert len(built) == 5
+    assert all(isinstance(handler, RotatingFileHandler) for handler in built)
+    assert [handler.stream is None for handler in built] == [True] * 4 + [False]
+    assert not isinstance(logger.handlers[0], QueueHandler)
+    assert threading.active_count() == threads
@@ -0,0 +1,197 @@
+import dataclasses
+import threading
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import pytest
+from timeseries_inventory.data_config.data_stages_manager import DataStagesManager
+from timeseries_inventory.models import arima, global_model, series
+from timeseries_inventory.models.cross_validation import TimeSeriesCrossValidator
+from timeseries_inventory.models.global_model import GlobalModelTrainer, route_segments
+from timeseries_inventory.models.lstm import LstmModel, LstmTrainer, WindowedSeries, torch
+from timeseries_inventory.models.series import collect_series
+
+
+def training_config(**overrides):
+    return dataclasses.replace(DataStagesManager().model_training_config(), **overrides)
+
+
+def history(n_series: int = 3, n_days: int = 30, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "date": np.tile(pd.date_range("2024-01-01", periods=n_days, freq="D"), n_series),
+        "sku": np.repeat([f"sku-{i}" for i in range(n_series)], n_days),
+        "location": "WH-1",
+        "value": rng.random(n_series * n_days) * 10,
+    })
+
+
+class StuckArima:
+    """Stands in for statsmodels' ARIMA: a fit that never ends and swallows every Exception."""
+
+    param_names = ["ar.L1"]
+
+    def __init__(self, y, order, seasonal_order):
+        pass
+
+    def fit(self, start_params=None, method_kwargs=None):
+        while True:
+            try:
+                time.sleep(0.005)
+            except Exception:
+                pass
+
+
+@pytest.fixture
+def stuck_arima(monkeypatch, tmp_path):
+    monkeypatch.setattr(arima, "ARIMA", StuckArima)
+    return {"timeout_seconds": 0.2, "min_observations": 5, "params_path": str(tmp_path / "params.json"), "series_columns": ["sku", "location"]}
+
+
+@pytest.mark.skipif(not hasattr(arima.signal, "setitimer"), reason="SIGALRM timeouts need setitimer")
+def test_arima_timeout_escapes_broad_exception_handlers(stuck_arima):
+    fits = arima.ArimaTrainer(training_config(arima={**stuck_arima, "workers": 1})).fit(iter([history()]))
+    assert {fit.status for fit in fits.values()} == {"timeout"}
+
+
+@pytest.mark.skipif(not hasattr(arima.signal, "setitimer"), reason="SIGALRM timeouts need setitimer")
+def test_arima_timeout_applies_off_the_main_thread(stuck_arima):
+    # A pipeline stage thread cannot receive SIGALRM: the fits move to a worker process
+    trainer = arima.ArimaTrainer(training_config(arima={**stuck_arima, "workers": 1}))
+    outcome = {}
+    thread = threading.Thread(target=lambda: outcome.update(trainer.fit(iter([history(n_series=2)]))), daemon=True)
+    thread.start()
+    thread.join(30)
+    assert not thread.is_alive()
+    assert {fit.status for fit in outcome.values()} == {"timeout"}
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_spilled_series_match_the_in_memory_layout(monkeypatch, tmp_path, shuffle):
+    # Tiny blocks exercise the block-wise scatter and per-series date sort
+    monkeypatch.setattr(series, "_BLOCK_ROWS", 7)
+    frame = history(n_series=5, n_days=40).assign(location=lambda f: np.where(f.index % 2, "WH-1", "WH-2"))
+    frame.loc[::17, "sku"] = None
+    if shuffle:
+        frame = frame.sample(frac=1, random_state=0)
+
+    def chunks():
+        return (frame.iloc[start:start + 32] for start in range(0, len(frame), 32))
+
+    expected = collect_series(chunks(), "value", ["sku", "location"], "date", with_keys=True)
+    spilled = collect_series(chunks(), "value", ["sku", "location"], "date", with_keys=True, spill=tmp_path / "series.npy")
+    assert spilled[0] == expected[0] and spilled[3] == expected[3]
+    np.testing.assert_array_equal(spilled[1], expected[1])
+    np.testing.assert_array_equal(spilled[2], expected[2])
+    assert isinstance(spilled[1], np.memmap)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["series.npy"]
+
+
+def test_series_scale_is_computed_block_by_block(monkeypatch, tmp_path):
+    rng = np.random.default_rng(0)
+    lengths = np.array([5, 0, 1, 40, 12, 3])
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    values = np.lib.format.open_memmap(tmp_path / "series.npy", mode="w+", dtype=np.float32, shape=(offsets[-1],))
+    values[:] = rng.normal(10, 3, offsets[-1])
+    values[::7] = np.nan
+    expected = [(np.nanmean(part), np.nanstd(part) or 1.0) if np.isfinite(part).any() else (0.0, 1.0)
+                for part in np.split(values.astype("float64"), offsets[1:-1])]
+    monkeypatch.setattr(series, "_BLOCK_ROWS", 7)
+    mean, std = WindowedSeries._scale(values, offsets)
+    np.testing.assert_allclose(mean, [m for m, _ in expected], rtol=1e-5)
+    np.testing.assert_allclose(std, [s for _, s in expected], rtol=1e-4)
+
+    # Peak memory follows the block size, not the history
+    long = np.lib.format.open_memmap(tmp_path / "long.npy", mode="w+", dtype=np.float32, shape=(4_000_000,))
+    long[:] = 1.0
+    monkeypatch.setattr(series, "_BLOCK_ROWS", 1 << 16)
+    tracemalloc.start()
+    try:
+        WindowedSeries._scale(long, np.arange(0, len(long) + 1, 1000))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < long.nbytes / 4
+
+
+@pytest.mark.skipif(torch is None, reason="torch is not installed")
+def test_lstm_forecasts_the_horizon_of_every_trained_series(tmp_path):
+    settings = {"series_columns": ["sku"], "window": 5, "horizon": 2, "hidden_size": 4, "epochs": 1, "checkpoint_dir": str(tmp_path)}
+    frame = history(n_series=3, n_days=30)
+    model = LstmTrainer(training_config(lstm=settings)).fit(iter([frame.iloc[:45], frame.iloc[45:]]))
+    assert not (tmp_path / "series.npy").exists()
+
+    recent = pd.concat([frame, frame.iloc[:3].assign(sku="sku-new")])
+    recent.loc[recent.index[-4], "value"] = np.nan
+    forecasts = LstmModel.load(tmp_path / "model.pt").predict(recent)
+    assert list(forecasts.columns) == [1, 2]
+    assert list(forecasts.index) == ["sku-0", "sku-1", "sku-2", "sku-new"]
+    # A missing value in the last window or an unseen series leaves NaN
+    assert forecasts.loc[["sku-0", "sku-1"]].notna().all().all()
+    assert forecasts.loc[["sku-2", "sku-new"]].isna().all().all()
+    np.testing.assert_allclose(forecasts.loc["sku-0"], model.predict(frame).loc["sku-0"], rtol=1e-5)
+
+
+def test_default_segments_feed_every_configured_model_type():
+    config = training_config()
+    frame = history()
+    assert "global" in config.type
+    for mode in ("local", "global"):
+        assert sum(len(chunk) for chunk in route_segments(iter([frame]), config.segments, mode)) == len(frame)
+
+
+def test_segments_split_series_between_modes():
+    frame = history(n_series=3).assign(abc_class=lambda f: f["sku"].map({"sku-0": "A", "sku-1": "B"}))
+    segments = {"column": "abc_class", "default": None, "modes": {"A": "global", "B": "local"}}
+    routed = {mode: pd.concat(route_segments(iter([frame]), segments, mode)) for mode in ("local", "global")}
+    assert set(routed["global"]["sku"]) == {"sku-0", "sku-2"}
+    assert set(routed["local"]["sku"]) == {"sku-1", "sku-2"}
+    local_only = {**segments, "default": "local"}
+    assert set(pd.concat(route_segments(iter([frame]), local_only, "global"))["sku"]) == {"sku-0"}
+
+
+def test_mode_without_routed_series_fails_loudly():
+    with pytest.raises(ValueError, match="No series are routed to the global models"):
+        list(route_segments(iter([history()]), {"column": None, "default": "local"}, "global"))
+
+
+class ZeroForecast:
+    def predict(self, frame):
+        return np.zeros(len(frame))
+
+
+def test_mase_scales_errors_by_the_naive_mae_of_each_series(monkeypatch, tmp_path):
+    # One SKU at two locations: steps of 1 at WH-1 and 10 at WH-2, so a naive scale per SKU would mix them
+    days = pd.date_range("2024-01-01", periods=6, freq="D")
+    frame = pd.DataFrame({
+        "date": np.repeat(days, 2),
+        "sku": "sku-0",
+        "location": ["WH-1", "WH-2"] * 6,
+        "value": np.ravel([[day, 10.0 * day] for day in range(6)]),
+    }).assign(value_lag_1=lambda f: f.groupby("location")["value"].shift(1))
+    monkeypatch.setattr(GlobalModelTrainer, "fit_arrays", lambda self, *arrays: ZeroForecast())
+    evaluation = dataclasses.replace(
+        DataStagesManager().model_evaluation_config(),
+        metrics=["mase"], n_splits=1, horizon=2, workers=1, directory=tmp_path, report_path=None, series_columns=["sku", "location"],
+    )
+    report = TimeSeriesCrossValidator(evaluation, training_config()).evaluate(iter([frame.iloc[:5], frame.iloc[5:]]))
+    # Test days 4 and 5: |4| / 1, |5| / 1, |40| / 10, |50| / 10
+    assert report["folds"][0]["mase"] == pytest.approx(4.5)
+
+
+def test_global_model_fits_memory_mapped_arrays_like_chunks(monkeypatch, tmp_path):
+    monkeypatch.setattr(global_model, "_DESIGN_BLOCK_ROWS", 16)
+    frame = history(n_series=4, n_days=30).assign(value_lag_1=lambda f: f.groupby("sku")["value"].shift(1))
+    settings = {"categorical_columns": ["sku", "location"], "scale_column": "sku", "path": str(tmp_path / "model.pkl")}
+    trainer = GlobalModelTrainer(training_config(n_estimators=10, global_model=settings))
+    expected = trainer.fit(iter([frame.iloc[:50], frame.iloc[50:]]))
+
+    X = np.lib.format.open_memmap(tmp_path / "X.npy", mode="w+", dtype=np.float32, shape=(len(frame), 1))
+    X[:, 0] = frame["value_lag_1"]
+    categorical = {}
+    for column in settings["categorical_columns"]:
+        codes, uniques = pd.factorize(frame[column])
+        categorical[column] = ({category: code for code, category in enumerate(uniques)}, codes)
+    model = trainer.fit_arrays(["value_lag_1"], X, frame["value"].to_numpy(), categorical)
+    np.testing.assert_allclose(model.predict(frame), expected.predict(frame))
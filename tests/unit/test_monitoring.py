@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import numpy as np
+import pytest
+from timeseries_inventory.utils import monitoring
+from timeseries_inventory.utils.monitoring import REGISTRY, ChunkMetrics, MetricsRegistry, StageRun, write_report
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(REGISTRY, "enabled", True)
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(1.0, 0.125))
+    for value in (0.0625, 0.125, 0.5, 4.0):
+        latency.observe(value, "/a")
+    latency.observe(2.0, "/b")
+
+    assert latency.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.125"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 4.6875',
+        'latency_seconds_count{route="/a"} 4',
+        'latency_seconds_bucket{route="/b",le="0.125"} 0',
+        'latency_seconds_bucket{route="/b",le="1"} 0',
+        'latency_seconds_bucket{route="/b",le="+Inf"} 1',
+        'latency_seconds_sum{route="/b"} 2',
+        'latency_seconds_count{route="/b"} 1',
+    ]
+    assert latency.value("/a") == (4, 4.6875)
+    assert latency.snapshot()["samples"][0]["buckets"] == {"0.125": 2, "1": 1, "+Inf": 1}
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("rows_total", "Rows.", ("file",)).inc(3, 'C:\\data\\"new"\nfile.csv')
+    assert 'rows_total{file="C:\\\\data\\\\\\"new\\"\\nfile.csv"} 3' in registry.render().splitlines()
+
+
+def test_metrics_keep_their_kind_and_labels():
+    registry = MetricsRegistry()
+    assert registry.counter("rows_total", "Rows.", ("stage",)) is registry.counter("rows_total", "Rows.", ("stage",))
+    with pytest.raises(ValueError, match="already registered"):
+        registry.gauge("rows_total", "Rows.", ("stage",))
+    with pytest.raises(ValueError, match="already registered"):
+        registry.counter("rows_total", "Rows.", ("file",))
+
+
+def test_disabled_registry_records_nothing_and_tracks_nothing():
+    registry = MetricsRegistry(enabled=False)
+    metrics = ChunkMetrics("test", registry=registry)
+    chunks = iter([[1, 2], [3]])
+    assert metrics.track(chunks) is chunks
+    metrics.rows.inc(5)
+    metrics.seconds.observe(0.1)
+    assert metrics.rows.value() == 0.0
+    assert metrics.seconds.value() == (0, 0.0)
+
+
+def test_chunk_metrics_record_rows_bytes_and_close_the_source():
+    registry = MetricsRegistry()
+    metrics = ChunkMetrics("test", ("stage",), registry=registry)
+    closed = []
+
+    def chunks():
+        try:
+            yield from (bytearray(8), bytearray(8), bytearray(8))
+        finally:
+            closed.append(True)
+
+    arrays = (np.zeros((10, 2)), np.zeros((5, 2)))
+    assert [len(chunk) for chunk in metrics.track(iter(arrays), "clean")] == [10, 5]
+    assert metrics.rows.value("clean") == 15
+    assert metrics.bytes.value("clean") == 15 * 16
+    assert metrics.seconds.value("clean")[0] == 2
+
+    tracked = metrics.track(chunks(), "ingest")
+    next(tracked)
+    tracked.close()
+    assert closed == [True]
+
+
+def test_stage_run_reports_rows_per_second(enabled):
+    run = StageRun("test_rows_per_second")
+    list(run.track(iter([np.zeros(300), np.zeros(100)])))
+    run.started = time.perf_counter() - 2.0
+    run.finish()
+
+    assert monitoring._STAGE_ROWS_PER_SECOND.value("test_rows_per_second") == pytest.approx(200, rel=0.01)
+    assert monitoring._STAGE_SECONDS.value("test_rows_per_second") == pytest.approx(2.0, rel=0.01)
+    assert monitoring._STAGE_RUNS.value("test_rows_per_second", "success") == 1
+
+    # A second run only counts its own rows
+    run = StageRun("test_rows_per_second")
+    list(run.track(iter([np.zeros(50)])))
+    run.started = time.perf_counter() - 1.0
+    run.finish("failed")
+    assert monitoring._STAGE_ROWS_PER_SECOND.value("test_rows_per_second") == pytest.approx(50, rel=0.01)
+    assert monitoring._STAGE_RUNS.value("test_rows_per_second", "failed") == 1
+
+
+def test_report_is_written_atomically_as_json(tmp_path, enabled, monkeypatch):
+    path = tmp_path / "metrics" / "run.json"
+    REGISTRY.counter("test_report_total", "Report test.").inc(7)
+    write_report(path, {"targets": ["select"], "started": "2024-01-01T00:00:00"})
+    first = json.loads(path.read_text())
+    assert first["targets"] == ["select"]
+    assert first["metrics"]["test_report_total"]["samples"] == [{"labels": {}, "value": 7}]
+    assert "process_peak_rss_bytes" in first["metrics"]
+
+    # The previous report stays in place until the new one is complete
+    replaced = []
+    replace = os.replace
+
+    def checked_replace(source, target):
+        assert json.loads(target.read_text()) == first
+        replaced.append(json.loads(open(source).read())["targets"])
+        replace(source, target)
+
+    monkeypatch.setattr(monitoring.os, "replace", checked_replace)
+    write_report(path, {"targets": ["train"]})
+    assert replaced == [["train"]]
+    assert json.loads(path.read_text())["targets"] == ["train"]
+    assert os.listdir(path.parent) == ["run.json"]
@@ -0,0 +1,40 @@
+import json
+import threading
+import tracemalloc
+import pytest
+from timeseries_inventory.utils import profiling
+from timeseries_inventory.utils.profiling import PipelineProfiler, profile_stage
+
+
+def busy(n: int = 20000) -> list:
+    return [str(i) * 3 for i in range(n)]
+
+
+def test_profile_stage_is_a_no_op_without_a_profiler(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    threads = threading.active_count()
+    profile = profile_stage("ingest")
+    busy()
+    profile.stop()
+    assert profile is profiling._NO_PROFILE
+    assert not tracemalloc.is_tracing()
+    assert threading.active_count() == threads
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiler_records_the_stages_run_while_active(tmp_path):
+    with PipelineProfiler(tmp_path, sample_interval=0.001) as profiler:
+        with pytest.raises(RuntimeError, match="already active"):
+            PipelineProfiler(tmp_path / "other").start()
+        profile = profile_stage("clean")
+        busy(200000)
+        profile.stop()
+    assert profile_stage("clean") is profiling._NO_PROFILE
+
+    summary = json.loads((tmp_path / "summary.json").read_text())
+    assert list(summary["stages"]) == ["clean"] == list(profiler.stages)
+    assert any(row["function"].startswith("busy") for row in summary["stages"]["clean"]["top_functions"])
+    assert (tmp_path / "cprofile" / "clean.prof").exists()
+    assert (tmp_path / "tracemalloc" / "clean.snapshot").exists()
+    assert all(line.startswith("clean;") for line in (tmp_path / "stacks.collapsed").read_text().splitlines())
+    assert not tracemalloc.is_tracing()
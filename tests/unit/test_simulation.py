@@ -0,0 +1,22 @@
+import dataclasses
+import numpy as np
+import pytest
+from timeseries_inventory.data_config.data_stages_config import SimulationConfig
+from timeseries_inventory.services.inventory import compute_policies
+from timeseries_inventory.services.simulation import InventorySimulator
+
+
+@pytest.mark.parametrize("lead_time_std", [0.0, 1.0])
+def test_simulation_does_not_depend_on_the_number_of_workers(lead_time_std):
+    forecasts = np.linspace(5, 50, 7)
+    policy = compute_policies(forecasts, error_std=0.3 * forecasts, lead_time=3.0, lead_time_std=lead_time_std, review_period=1.0)
+    config = SimulationConfig(random_state=7, scenarios=40, periods=30, block_scenarios=15, block_series=3, workers=1)
+    summaries = [
+        InventorySimulator(dataclasses.replace(config, workers=workers)).run(
+            forecasts, 0.3 * forecasts, policy, lead_time=3.0, lead_time_std=lead_time_std, review_period=1.0,
+        )
+        for workers in (1, 4)
+    ]
+    for field in dataclasses.fields(summaries[0]):
+        np.testing.assert_array_equal(getattr(summaries[0], field.name), getattr(summaries[1], field.name))
+    assert np.all((summaries[0].fill_rate > 0.5) & (summaries[0].fill_rate <= 1))
@@ -0,0 +1,108 @@
+import dataclasses
+import pandas as pd
+from timeseries_inventory.pipeline.executor import DagExecutor, Stage
+from timeseries_inventory.pipeline.stage_cache import StageCache, chain_key, files_fingerprint
+
+
+def chunks(n: int = 3, rows: int = 4):
+    return [pd.DataFrame({"sku": [f"sku-{i}"] * rows, "value": range(rows)}) for i in range(n)]
+
+
+def fill(cache: StageCache, key: str, n: int = 2) -> None:
+    for _ in cache.write_through(key, key, iter(chunks(n))):
+        pass
+
+
+def test_write_through_then_read_round_trips(tmp_path):
+    cache = StageCache(tmp_path)
+    written = list(cache.write_through("k", "clean", iter(chunks())))
+    assert cache.has("k")
+    for before, after in zip(written, cache.read("k")):
+        pd.testing.assert_frame_equal(before, after)
+
+
+def test_interrupted_stream_is_not_published(tmp_path):
+    cache = StageCache(tmp_path)
+    stream = cache.write_through("k", "clean", iter(chunks()))
+    next(stream)
+    stream.close()
+    assert not cache.has("k")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_keys_follow_config_and_upstream_changes(tmp_path, cleaning_config):
+    (tmp_path / "a.csv").write_text("sku,value\na,1\n")
+    source = files_fingerprint([tmp_path / "a.csv"])
+    config = cleaning_config()
+    key = chain_key("clean", config, [source])
+    assert chain_key("clean", cleaning_config(), [source]) == key
+    assert chain_key("clean", cleaning_config(fill_method="interpolate"), [source]) != key
+
+    (tmp_path / "a.csv").write_text("sku,value\na,1\nb,2\n")
+    assert chain_key("clean", config, [files_fingerprint([tmp_path / "a.csv"])]) != key
+
+
+def test_executor_hits_cache_and_recomputes_after_a_config_change(tmp_path, cleaning_config):
+    cache = StageCache(tmp_path / "cache")
+    calls = []
+
+    def source():
+        calls.append("source")
+        return iter(chunks())
+
+    def clean(items):
+        calls.append("clean")
+        return (chunk.assign(value=chunk["value"] * 2) for chunk in items)
+
+    def build(config):
+        source_key = "source-v1"
+        stages = [
+            Stage("source", source, cache_key=source_key),
+            Stage("clean", clean, ("source",), cache_key=chain_key("clean", config, [source_key])),
+            Stage("count", lambda items: sum(len(chunk) for chunk in items), ("clean",)),
+        ]
+        return DagExecutor(stages, cache=cache)
+
+    config = cleaning_config()
+    assert build(config).plan() == {"source": "recompute", "clean": "recompute", "count": "run"}
+    assert build(config).run() == {"count": 12}
+    assert calls == ["source", "clean"]
+
+    calls.clear()
+    assert build(config).plan() == {"clean": "cached", "count": "run"}
+    assert build(config).run() == {"count": 12}
+    assert calls == []
+
+    # Only the changed stage is recomputed; its input comes from the cache
+    calls.clear()
+    changed = dataclasses.replace(config, fill_method="interpolate")
+    assert build(changed).plan() == {"source": "cached", "clean": "recompute", "count": "run"}
+    assert build(changed).run() == {"count": 12}
+    assert calls == ["clean"]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = StageCache(tmp_path, max_entries=2)
+    fill(cache, "first")
+    fill(cache, "second")
+    list(cache.read("first"))
+    fill(cache, "third")
+    assert [entry["key"] for entry in cache.entries()] == ["third", "first"]
+    assert not cache.has("second")
+
+
+def test_entries_are_evicted_above_the_size_limit(tmp_path):
+    cache = StageCache(tmp_path)
+    fill(cache, "first")
+    entry_bytes = cache.entries()[0]["bytes"]
+    cache.max_size_bytes = int(2.5 * entry_bytes)
+    fill(cache, "second")
+    fill(cache, "third")
+    assert {entry["key"] for entry in cache.entries()} == {"second", "third"}
+
+
+def test_purge_removes_everything(tmp_path):
+    cache = StageCache(tmp_path)
+    fill(cache, "first")
+    cache.purge()
+    assert cache.entries() == []
@@ -1 +1,65 @@
-# test_validation.py placeholder 
+# test_validation.py placeholder
+import numpy as np
+import pandas as pd
+import pytest
+from timeseries_inventory.preprocessing.validation import DataValidator, DataValidationError
+
+
+def make_chunks():
+    frame = pd.DataFrame({
+        "sku": ["a", "b", None, "a", "b", "a"],
+        "value": [1.0, -5.0, 50.0, np.nan, 150.0, -1.0],
+    })
+    return [frame.iloc[:3], frame.iloc[3:]]
+
+
+def test_valid_stream_passes_through_unchanged(validation_config):
+    frame = pd.DataFrame({"sku": ["a", "b"], "value": [0.0, 100.0]})
+    validator = DataValidator(validation_config(fail_fast=True))
+    out = list(validator.validate(iter([frame])))
+    assert out[0] is frame
+    assert validator.report.ok
+    assert validator.report.rows == 2
+
+
+def test_violations_are_collected_with_stream_positions(validation_config):
+    validator = DataValidator(validation_config())
+    out = list(validator.validate(iter(make_chunks())))
+    assert sum(len(chunk) for chunk in out) == 6
+    violations = validator.report.violations
+    assert violations["value: below min 0"] == {"count": 2, "examples": [1, 5]}
+    assert violations["value: above max 100"] == {"count": 1, "examples": [4]}
+    assert violations["value: null"] == {"count": 1, "examples": [3]}
+    assert violations["sku: null"] == {"count": 1, "examples": [2]}
+    assert validator.report.violating_rows == 5
+    assert validator.report.summary().startswith("Validation found violations in 5 of 6 rows (2 chunks)")
+
+
+def test_examples_are_capped(validation_config):
+    frame = pd.DataFrame({"value": np.full(20, -1.0)})
+    validator = DataValidator(validation_config())
+    list(validator.validate(iter([frame, frame])))
+    entry = validator.report.violations["value: below min 0"]
+    assert entry["count"] == 40
+    assert entry["examples"] == [0, 1, 2]
+    assert validator.report.violating_rows == 40
+
+
+def test_nulls_allowed(validation_config):
+    validator = DataValidator(validation_config(allow_nulls=True))
+    list(validator.validate(iter(make_chunks())))
+    assert not any(rule.endswith("null") for rule in validator.report.violations)
+
+
+def test_fail_fast_raises_on_first_bad_chunk(validation_config):
+    validator = DataValidator(validation_config(fail_fast=True))
+    stream = validator.validate(iter(make_chunks()))
+    with pytest.raises(DataValidationError) as excinfo:
+        list(stream)
+    assert excinfo.value.report.chunks == 1
+
+
+def test_missing_range_column_reported(validation_config):
+    validator = DataValidator(validation_config())
+    list(validator.validate(iter([pd.DataFrame({"sku": ["a"]})])))
+    assert validator.report.violations["value: missing column"]["count"] == 1